@@ -1,11 +1,27 @@
+import concurrent.futures
+import heapq
+import threading
+import time
+from collections import deque
 from logging import getLogger
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from core.agents.task_queue import PriorityTaskQueue, ScheduledTask, TaskState
 
 logger = getLogger(__name__)
 
+# Queue latency samples kept for the percentile metrics
+LATENCY_SAMPLES = 1024
+
 
 class MetaAgent:
-    """Manages multiple agents, their lifecycle, task delegation, and state persistence."""
+    """Manages multiple agents, their lifecycle, task delegation, and state persistence.
+
+    Queued tasks are dispatched concurrently on a thread pool of
+    ``max_concurrent_tasks`` workers, with at most ``agent_concurrency`` tasks
+    (or the agent's own ``max_concurrency``) running on any one agent. Event
+    handlers for task events are called from the worker threads.
+    """
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize the MetaAgent with configuration and empty agent registry."""
@@ -13,8 +29,22 @@ class MetaAgent:
         self.state: Dict[str, Any] = {}
         self.agents: Dict[str, Any] = {}
         self.agent_states: Dict[str, Dict[str, Any]] = {}
-        self.task_queue: List[Dict[str, Any]] = []
         self.event_handlers: Dict[str, List[Callable]] = {}
+        self.max_concurrent_tasks: int = self.config.get("max_concurrent_tasks", 4)
+        self.agent_concurrency: int = self.config.get("agent_concurrency", 1)
+        self._queue = PriorityTaskQueue(aging_rate=self.config.get("task_aging_rate", 0.1))
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._tasks: Dict[str, ScheduledTask] = {}
+        self._waiting: Dict[str, List[ScheduledTask]] = {}
+        self._running = 0
+        # Agent selection: declared task types, agents that decide per type, and the resolved candidates per type
+        self._agent_limits: Dict[str, int] = {}
+        self._task_type_index: Dict[str, List[str]] = {}
+        self._dynamic_agents: List[str] = []
+        self._candidates: Dict[str, Tuple[str, ...]] = {}
+        self._reset_metrics()
         logger.info("MetaAgent initialized with config: %s", self.config)
 
     def initialize(self) -> None:
@@ -32,22 +62,62 @@ class MetaAgent:
                 logger.error("Failed to initialize agent %s: %s", agent_id, str(e))
 
     def register_agent(
-        self, agent_id: str, agent: Any, initial_state: Optional[Dict[str, Any]] = None
+        self,
+        agent_id: str,
+        agent: Any,
+        initial_state: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
     ) -> None:
-        """Register a new agent with an optional initial state."""
-        self.agents[agent_id] = agent
-        if initial_state is not None:
-            self.agent_states[agent_id] = initial_state
+        """Register a new agent with an optional initial state.
+
+        Agents declaring ``task_types`` are indexed by them; agents that only implement
+        ``can_handle_task`` are asked once per task type. ``max_concurrency`` (or the
+        agent's ``max_concurrency`` attribute) caps the tasks it runs at once.
+        """
+        with self._lock:
+            if agent_id in self.agents:
+                self._remove_from_index(agent_id)
+            self.agents[agent_id] = agent
+            if initial_state is not None:
+                self.agent_states[agent_id] = initial_state
+            limit = max_concurrency or getattr(agent, "max_concurrency", None) or self.agent_concurrency
+            self._agent_limits[agent_id] = max(1, int(limit))
+            self._agent_stats(agent_id)
+            task_types = getattr(agent, "task_types", None)
+            if task_types:
+                for task_type in task_types:
+                    self._task_type_index.setdefault(task_type, []).append(agent_id)
+            elif hasattr(agent, "can_handle_task"):
+                self._dynamic_agents.append(agent_id)
+            self._candidates.clear()
         logger.info("Registered agent: %s", agent_id)
 
+    def _remove_from_index(self, agent_id: str) -> None:
+        for task_type, agent_ids in list(self._task_type_index.items()):
+            if agent_id in agent_ids:
+                agent_ids.remove(agent_id)
+                if not agent_ids:
+                    del self._task_type_index[task_type]
+        if agent_id in self._dynamic_agents:
+            self._dynamic_agents.remove(agent_id)
+        self._candidates.clear()
+
     def unregister_agent(self, agent_id: str) -> bool:
-        """Unregister an agent and save its final state."""
+        """Unregister an agent and save its final state.
+
+        Tasks waiting for the agent go back to the queue and are routed again.
+        """
         if agent_id in self.agents:
             try:
                 if hasattr(self.agents[agent_id], "shutdown"):
                     self.agents[agent_id].shutdown()
                 self.save_agent_state(agent_id)
-                del self.agents[agent_id]
+                with self._lock:
+                    del self.agents[agent_id]
+                    self._remove_from_index(agent_id)
+                    for entry in self._waiting.pop(agent_id, []):
+                        if entry.state is TaskState.WAITING:
+                            self._queue.requeue(entry)
                 logger.info("Unregistered agent: %s", agent_id)
                 return True
             except Exception as e:
@@ -69,8 +139,10 @@ class MetaAgent:
                 "message": f"No agent available for task type: {task_type}",
             }
 
+        return self._run_agent(*suitable_agent, input_data)
+
+    def _run_agent(self, agent_id: str, agent: Any, input_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            agent_id, agent = suitable_agent
             response = (
                 agent.process_input(input_data)
                 if hasattr(agent, "process_input")
@@ -143,38 +215,264 @@ class MetaAgent:
                     )
 
     def select_agent_for_task(self, task_type: str) -> Optional[tuple[str, Any]]:
-        """Select an appropriate agent for a given task type based on capabilities."""
-        # TODO: Implement sophisticated agent selection based on capabilities and task requirements
-        for agent_id, agent in self.agents.items():
-            if hasattr(agent, "can_handle_task") and agent.can_handle_task(task_type):
-                return agent_id, agent
-        # Fallback to any available agent if no specific match is found
-        if self.agents:
-            agent_id = list(self.agents.keys())[0]
+        """Select an appropriate agent for a given task type based on capabilities.
+
+        Among the agents able to handle the type, the one with the most free task slots wins.
+        """
+        with self._lock:
+            candidates = self._candidates.get(task_type)
+            if candidates is None:
+                candidates = self._candidates[task_type] = self._resolve_candidates(task_type)
+            if not candidates:
+                return None
+            agent_id = candidates[0]
+            if len(candidates) > 1:
+                agent_id = min(candidates, key=lambda a: self._agent_stats(a)["active"] / self._agent_limit(a))
             return agent_id, self.agents[agent_id]
-        return None
+
+    def _resolve_candidates(self, task_type: str) -> Tuple[str, ...]:
+        candidates = list(self._task_type_index.get(task_type, ()))
+        for agent_id in self._dynamic_agents:
+            try:
+                if self.agents[agent_id].can_handle_task(task_type):
+                    candidates.append(agent_id)
+            except Exception as e:
+                logger.error("Error asking agent %s about task type %s: %s", agent_id, task_type, str(e))
+        # Fallback to any available agent if no specific match is found
+        if not candidates and self.agents:
+            candidates.append(next(iter(self.agents)))
+        return tuple(candidates)
 
     def register_default_agents(self) -> None:
         """Register default agents based on configuration or standard setup."""
         # TODO: Implement registration of standard agents based on configuration
         logger.info("Registering default agents")
 
-    def enqueue_task(self, task: Dict[str, Any], priority: int = 0) -> None:
-        """Enqueue a task for processing by an appropriate agent."""
+    @property
+    def task_queue(self) -> List[Dict[str, Any]]:
+        """Queued tasks in the order they would be dispatched (a copy)."""
+        return [entry.task for entry in self._queue.snapshot()]
+
+    def enqueue_task(self, task: Dict[str, Any], priority: int = 0) -> ScheduledTask:
+        """Enqueue a task for processing by an appropriate agent.
+
+        Higher priorities run first, equal priorities in FIFO order; waiting tasks gain
+        ``task_aging_rate`` priority per second so they are not starved.
+
+        Returns:
+            The scheduled task; its ``future`` resolves to the ``process_input`` response.
+        """
         task_with_priority = task.copy()
         task_with_priority["priority"] = priority
-        self.task_queue.append(task_with_priority)
+        entry = self._queue.push(task_with_priority, priority)
+        with self._lock:
+            self._tasks[entry.task_id] = entry
+            self._metrics["enqueued"] += 1
         logger.debug("Enqueued task: %s with priority: %d", task, priority)
         self.notify_event("task_enqueued", task=task, priority=priority)
+        return entry
+
+    def process_task_queue(self) -> int:
+        """Start as many queued tasks as the worker and per-agent limits allow.
+
+        Finishing tasks start the next ones, so the queue keeps draining until it is empty.
+
+        Returns:
+            The number of tasks started.
+        """
+        unroutable: List[ScheduledTask] = []
+        started: List[ScheduledTask] = []
+        with self._lock:
+            while self._running < self.max_concurrent_tasks:
+                entry = self._queue.pop()
+                if entry is None:
+                    break
+                selected = self.select_agent_for_task(entry.task_type)
+                if selected is None:
+                    unroutable.append(entry)
+                    continue
+                agent_id = selected[0]
+                if self._agent_stats(agent_id)["active"] >= self._agent_limit(agent_id):
+                    entry.agent_id = agent_id
+                    heapq.heappush(self._waiting.setdefault(agent_id, []), entry)
+                    continue
+                self._start(entry, agent_id)
+                started.append(entry)
+            executor = self._get_executor() if started else None
+        for entry in unroutable:
+            logger.error("No suitable agent found for task type: %s", entry.task_type)
+            self._finish(entry, {"status": "error", "message": f"No agent available for task type: {entry.task_type}"})
+        for entry in started:
+            executor.submit(self._run_task, entry)
+        return len(started)
+
+    def cancel_task(self, task_id: str) -> bool:
+        """Cancel a task that has not started yet."""
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is None:
+                return False
+            if entry.state is TaskState.QUEUED:
+                if not self._queue.cancel(entry):
+                    return False
+            elif entry.state is TaskState.WAITING:
+                entry.state = TaskState.CANCELLED
+                entry.future.cancel()
+            else:
+                return False
+            del self._tasks[task_id]
+            self._metrics["cancelled"] += 1
+            self._idle.notify_all()
+        logger.debug("Cancelled task: %s", task_id)
+        self.notify_event("task_cancelled", task=entry.task)
+        return True
+
+    def wait_for_tasks(self, timeout: Optional[float] = None) -> bool:
+        """Dispatch the queue and wait until every task has finished; False on timeout."""
+        self.process_task_queue()
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._tasks, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel tasks that have not started and stop the worker threads."""
+        for task_id in list(self._tasks):
+            self.cancel_task(task_id)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def get_task_metrics(self) -> Dict[str, Any]:
+        """Queue latency (enqueue to start, in seconds), task counts and per-agent utilization."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(now - self._metrics["since"], 1e-9)
+            latencies = sorted(self._metrics["latencies"])
+            agents = {}
+            for agent_id, stats in self._metrics["agents"].items():
+                busy = stats["busy_seconds"] + sum(
+                    now - entry.started_at
+                    for entry in self._tasks.values()
+                    if entry.agent_id == agent_id and entry.state is TaskState.RUNNING
+                )
+                limit = self._agent_limit(agent_id)
+                agents[agent_id] = {
+                    "active": stats["active"],
+                    "limit": limit,
+                    "completed": stats["completed"],
+                    "busy_seconds": busy,
+                    "utilization": min(1.0, busy / (elapsed * limit)),
+                }
+            return {
+                "queued": len(self._queue),
+                "waiting": sum(entry.state is TaskState.WAITING for heap in self._waiting.values() for entry in heap),
+                "running": self._running,
+                **{key: self._metrics[key] for key in ("enqueued", "completed", "failed", "cancelled")},
+                "queue_latency": {
+                    "samples": len(latencies),
+                    "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+                    "p50": _percentile(latencies, 0.5),
+                    "p95": _percentile(latencies, 0.95),
+                    "max": latencies[-1] if latencies else 0.0,
+                },
+                "agents": agents,
+            }
+
+    def reset_task_metrics(self) -> None:
+        with self._lock:
+            self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        previous = getattr(self, "_metrics", None)
+        self._metrics: Dict[str, Any] = {
+            "since": time.monotonic(),
+            "enqueued": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "latencies": deque(maxlen=LATENCY_SAMPLES),
+            "agents": {
+                agent_id: {"completed": 0, "busy_seconds": 0.0, "active": stats["active"]}
+                for agent_id, stats in (previous["agents"].items() if previous else ())
+            },
+        }
+
+    def _agent_stats(self, agent_id: str) -> Dict[str, Any]:
+        return self._metrics["agents"].setdefault(agent_id, {"completed": 0, "busy_seconds": 0.0, "active": 0})
+
+    def _agent_limit(self, agent_id: str) -> int:
+        return self._agent_limits.get(agent_id, self.agent_concurrency)
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, self.max_concurrent_tasks), thread_name_prefix="MetaAgentTask"
+            )
+        return self._executor
+
+    def _start(self, entry: ScheduledTask, agent_id: str) -> None:
+        """Claim a worker and an agent slot for ``entry`` (called with the lock held)."""
+        entry.agent_id = agent_id
+        entry.state = TaskState.RUNNING
+        entry.started_at = time.monotonic()
+        self._running += 1
+        self._agent_stats(agent_id)["active"] += 1
+        latencies: Deque[float] = self._metrics["latencies"]
+        latencies.append(entry.started_at - entry.enqueued_at)
+
+    def _run_task(self, entry: ScheduledTask) -> None:
+        result: Dict[str, Any] = {"status": "cancelled"}
+        try:
+            if entry.future.set_running_or_notify_cancel():
+                agent = self.agents.get(entry.agent_id)
+                logger.debug("Processing task from queue: %s", entry.task)
+                if agent is None:
+                    result = {"status": "error", "message": f"Agent {entry.agent_id} was unregistered"}
+                else:
+                    result = self._run_agent(entry.agent_id, agent, entry.task)
+        except Exception as e:  # pragma: no cover - _run_agent reports agent errors itself
+            logger.error("Error running queued task: %s", str(e))
+            result = {"status": "error", "message": str(e)}
+        finally:
+            self._release(entry)
+            self._finish(entry, result)
+            self.process_task_queue()
+
+    def _release(self, entry: ScheduledTask) -> None:
+        """Free the worker and agent slot of a finished task; the agent's best waiting task is queued again."""
+        with self._lock:
+            self._running -= 1
+            stats = self._metrics["agents"].get(entry.agent_id)
+            if stats is not None:
+                stats["active"] -= 1
+                stats["completed"] += 1
+                stats["busy_seconds"] += time.monotonic() - entry.started_at
+            waiting = self._waiting.get(entry.agent_id)
+            while waiting:
+                head = heapq.heappop(waiting)
+                if head.state is TaskState.WAITING:
+                    self._queue.requeue(head)
+                    break
+
+    def _finish(self, entry: ScheduledTask, result: Dict[str, Any]) -> None:
+        with self._lock:
+            if result.get("status") == "success":
+                entry.state = TaskState.COMPLETED
+                self._metrics["completed"] += 1
+            elif result.get("status") == "cancelled":
+                entry.state = TaskState.CANCELLED
+                self._metrics["cancelled"] += 1
+            else:
+                entry.state = TaskState.FAILED
+                self._metrics["failed"] += 1
+            self._tasks.pop(entry.task_id, None)
+            self._idle.notify_all()
+        if not entry.future.done():
+            entry.future.set_result(result)
+        self.notify_event("task_processed", task=entry.task, result=result)
+
 
-    def process_task_queue(self) -> None:
-        """Process tasks from the queue, delegating to appropriate agents."""
-        if not self.task_queue:
-            return
-
-        # Sort by priority (higher number = higher priority)
-        self.task_queue.sort(key=lambda x: x.get("priority", 0), reverse=True)
-        task = self.task_queue.pop(0)
-        logger.debug("Processing task from queue: %s", task)
-        result = self.process_input(task)
-        self.notify_event("task_processed", task=task, result=result)
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,144 @@
+"""
+Priority queue for MetaAgent tasks.
+
+Tasks are kept in a binary heap keyed on their effective priority, with an
+insertion counter breaking ties so equal priorities run first-in first-out.
+
+Aging: a task gains ``aging_rate`` priority levels per second spent waiting,
+so a steady stream of high-priority work cannot starve older low-priority
+tasks. Because every queued task ages at the same rate, the effective
+priority at any time ``t`` is ``priority + aging_rate * (t - enqueued_at)``
+and the order between two tasks never changes while they wait. The heap key
+``aging_rate * enqueued_at - priority`` is therefore fixed at enqueue time
+and no re-heapify is ever needed.
+
+Cancelled tasks are left in the heap and skipped when popped; the heap is
+compacted once they make up most of it.
+"""
+
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class TaskState(Enum):
+    QUEUED = "queued"
+    WAITING = "waiting"  # popped, not started yet (e.g. its agent is at its concurrency limit)
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ScheduledTask:
+    """A queued task; ``future`` resolves to the ``process_input`` response."""
+
+    __slots__ = ("task_id", "task", "priority", "enqueued_at", "started_at", "agent_id", "state", "future", "_key")
+
+    def __init__(
+        self,
+        task: Dict[str, Any],
+        priority: int,
+        enqueued_at: float,
+        key: Tuple[float, int],
+        task_id: Optional[str] = None,
+    ):
+        self.task_id = task_id or str(uuid.uuid4())
+        self.task = task
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.started_at: Optional[float] = None
+        self.agent_id: Optional[str] = None
+        self.state = TaskState.QUEUED
+        self.future: "concurrent.futures.Future[Dict[str, Any]]" = concurrent.futures.Future()
+        self._key = key
+
+    @property
+    def task_type(self) -> str:
+        return self.task.get("type", "unknown")
+
+    @property
+    def pending(self) -> bool:
+        return self.state in (TaskState.QUEUED, TaskState.WAITING)
+
+    def __lt__(self, other: "ScheduledTask") -> bool:
+        return self._key < other._key
+
+    def __repr__(self) -> str:
+        return f"ScheduledTask({self.task_id!r}, type={self.task_type!r}, priority={self.priority}, {self.state.value})"
+
+
+class PriorityTaskQueue:
+    """Thread-safe max-priority queue with FIFO tie-breaking and aging."""
+
+    def __init__(self, aging_rate: float = 0.1):
+        """
+        Args:
+            aging_rate: Priority levels a task gains per second of waiting; 0 disables aging.
+        """
+        self.aging_rate = aging_rate
+        self._heap: List[ScheduledTask] = []
+        self._counter = itertools.count()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Pending (not cancelled) tasks."""
+        return self._pending
+
+    def push(self, task: Dict[str, Any], priority: int = 0, task_id: Optional[str] = None) -> ScheduledTask:
+        now = time.monotonic()
+        entry = ScheduledTask(task, priority, now, (self.aging_rate * now - priority, next(self._counter)), task_id)
+        with self._lock:
+            heapq.heappush(self._heap, entry)
+            self._pending += 1
+        return entry
+
+    def requeue(self, entry: ScheduledTask) -> None:
+        """Put back a task that was popped but could not be started; it keeps its place."""
+        with self._lock:
+            entry.state = TaskState.QUEUED
+            heapq.heappush(self._heap, entry)
+            self._pending += 1
+
+    def pop(self) -> Optional[ScheduledTask]:
+        """Remove and return the task to run next (now ``WAITING``), or None if nothing is pending."""
+        with self._lock:
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                if entry.state is TaskState.QUEUED:
+                    entry.state = TaskState.WAITING
+                    self._pending -= 1
+                    return entry
+            return None
+
+    def cancel(self, entry: ScheduledTask) -> bool:
+        """Cancel a queued task; it is dropped lazily when it reaches the top of the heap."""
+        with self._lock:
+            if entry.state is not TaskState.QUEUED:
+                return False
+            entry.state = TaskState.CANCELLED
+            self._pending -= 1
+            if len(self._heap) > 2 * self._pending + 64:
+                self._heap = [queued for queued in self._heap if queued.state is TaskState.QUEUED]
+                heapq.heapify(self._heap)
+        entry.future.cancel()
+        return True
+
+    def effective_priority(self, entry: ScheduledTask, now: Optional[float] = None) -> float:
+        """``priority`` plus what the task has gained by aging."""
+        waited = (time.monotonic() if now is None else now) - entry.enqueued_at
+        return entry.priority + self.aging_rate * max(0.0, waited)
+
+    def snapshot(self) -> List[ScheduledTask]:
+        """Pending tasks in the order they would run (O(n log n); for inspection only)."""
+        with self._lock:
+            return sorted(entry for entry in self._heap if entry.state is TaskState.QUEUED)
+
+    def __iter__(self) -> Iterator[ScheduledTask]:
+        return iter(self.snapshot())
@@ -33,13 +33,6 @@ try:
 except ImportError:
     NOTIFYPY_AVAILABLE = False
 
-try:
-    import requests
-
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-
 try:
     import smtplib
     from email.mime.text import MIMEText
@@ -50,6 +43,11 @@ except ImportError:
 
 from core.config import get_config
 from core.logging import get_logger
+from utils.lazy_imports import is_available, lazy_module
+
+# requests is only needed when a webhook alert is sent
+requests = lazy_module("requests")
+REQUESTS_AVAILABLE = is_available("requests")
 
 # Logger for alerting system
 logger = get_logger("Alerting")
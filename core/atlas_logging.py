@@ -7,52 +7,32 @@ multiple output handlers (console, file), and performance monitoring capabilitie
 
 import logging
 import os
-import re
-import sys
-from logging.handlers import RotatingFileHandler
 from typing import Optional
 
 from core.config import get_config
-
-# Default log directory and file
-LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "logs")
-DEFAULT_LOG_FILE = os.path.join(LOG_DIR, "atlas.log")
-
-# Sensitive data patterns to redact
-SENSITIVE_PATTERNS = [
-    re.compile(
-        r"(password|secret|key|token|api_key|access_token)=[^&\s]+", re.IGNORECASE
-    ),
-    re.compile(r"\b\d{16}\b"),  # Credit card numbers
-    re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # SSN
+from core.log_pipeline import (
+    DEFAULT_LOG_FILE,
+    LOG_DIR,
+    SENSITIVE_PATTERNS,
+    RedactingFormatter,
+    get_atlas_handler,
+    get_log_pipeline,
+    redact_sensitive_data,
+)
+
+__all__ = [
+    "DEFAULT_LOG_FILE",
+    "LOG_DIR",
+    "SENSITIVE_PATTERNS",
+    "RedactingFormatter",
+    "get_logger",
+    "get_logging_metrics",
+    "log_performance",
+    "redact_sensitive_data",
+    "set_log_level",
+    "setup_logging",
 ]
 
-
-def redact_sensitive_data(message: str) -> str:
-    """
-    Redact sensitive information from log messages.
-
-    Args:
-        message (str): The original log message
-
-    Returns:
-        str: The message with sensitive data redacted
-    """
-    redacted = message
-    for pattern in SENSITIVE_PATTERNS:
-        redacted = pattern.sub("[REDACTED]", redacted)
-    return redacted
-
-
-class RedactingFormatter(logging.Formatter):
-    """Formatter that redacts sensitive information from log messages."""
-
-    def format(self, record: logging.LogRecord) -> str:
-        """Format the log record and redact sensitive data."""
-        original_message = super().format(record)
-        return redact_sensitive_data(original_message)
-
-
 # Log level mapping
 LOG_LEVELS = {
     "DEBUG": logging.DEBUG,
@@ -91,33 +71,16 @@ def setup_logging() -> logging.Logger:
     # Clear any existing handlers
     root_logger.handlers.clear()
 
-    # Create formatters
-    console_formatter = RedactingFormatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_formatter = RedactingFormatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(pathname)s:%(lineno)d - %(message)s"
-    )
-
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
-
-    # File handler with rotation
-    file_handler = RotatingFileHandler(
-        DEFAULT_LOG_FILE,
-        maxBytes=5 * 1024 * 1024,  # 5MB
-        backupCount=5,
-    )
-    file_handler.setLevel(log_level)
-    file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    # Console and rotating file output are written by the pipeline's background
+    # thread; the root logger only enqueues records.
+    handler = get_atlas_handler()
+    handler.setLevel(log_level)
+    root_logger.addHandler(handler)
 
     # Log initialization
     root_logger.info("Logging system initialized with level: %s", log_level_str)
 
+    _logger = root_logger
     return root_logger
 
 
@@ -165,6 +128,16 @@ def set_log_level(level: str) -> bool:
     return True
 
 
+def get_logging_metrics() -> dict:
+    """
+    Get metrics of the logging pipeline.
+
+    Returns:
+        dict: Queue depth, enqueued/written/dropped record counts and rate-limit drops
+    """
+    return get_log_pipeline().get_metrics()
+
+
 def log_performance(
     component: str, operation: str, duration_ms: float, details: Optional[str] = None
 ) -> None:
@@ -3,14 +3,27 @@ Unified configuration management for Atlas.
 
 This module provides a centralized way to manage application settings,
 environment-based configurations, and validation.
+
+The configuration is published as immutable ``ConfigSnapshot`` objects:
+``get`` is a single lookup in the current snapshot's flat key index and never
+takes a lock, while ``set`` and ``reload`` build a new snapshot and swap it
+in. ``set`` validates only the subtree it changed; ``watch`` reloads the
+configuration files when they change and ``subscribe`` reports which keys
+changed.
 """
 
+import copy
 import json
 import logging
 import os
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
 
-from jsonschema import ValidationError, validate
+from core.config_snapshot import ConfigAccessor, ConfigSnapshot, changed_keys
+from core.config_watcher import ConfigFileWatcher
 
 # Logger for configuration operations
 logger = logging.getLogger("Config")
@@ -23,48 +36,186 @@ SCHEMA_PATH = os.path.join(CONFIG_DIR, "schema.json")
 # Environment variable prefix for overrides
 ENV_PREFIX = "ATLAS_"
 
+# Schema keywords that relate a key to its siblings; changes below a schema
+# node using any of them are validated against the whole configuration.
+_CROSS_PROPERTY_KEYWORDS = frozenset(
+    {
+        "$ref",
+        "allOf",
+        "anyOf",
+        "oneOf",
+        "not",
+        "if",
+        "then",
+        "else",
+        "dependencies",
+        "dependentRequired",
+        "dependentSchemas",
+        "patternProperties",
+        "propertyNames",
+        "maxProperties",
+        "unevaluatedProperties",
+    }
+)
+
+# Subschema lookup result: the change needs a full validation
+_FULL_VALIDATION: Any = object()
+
+ConfigListener = Callable[[Set[str], ConfigSnapshot], None]
+
+
+def _contains_ref(schema: Any) -> bool:
+    if isinstance(schema, dict):
+        return "$ref" in schema or any(_contains_ref(value) for value in schema.values())
+    if isinstance(schema, list):
+        return any(_contains_ref(value) for value in schema)
+    return False
+
 
 class ConfigManager:
     """Manages application configuration with support for environment-based settings and validation."""
 
     def __init__(self, env: Optional[str] = None):
         """Initialize the configuration manager."""
-        self._config: Dict[str, Any] = {}
-        self._schema: Dict[str, Any] = {}
         # Check ATLAS_ENV first, then parameter, then default to development
-        self._current_env = os.getenv("ATLAS_ENV") or env or "development"
+        self._init_state(os.getenv("ATLAS_ENV") or env or "development")
         self.load_config()
         self.apply_environment_overrides()
         self.validate_config()
 
+    def _init_state(self, env: str) -> None:
+        self._snapshot = ConfigSnapshot()
+        self._schema: Dict[str, Any] = {}
+        self._validator: Any = None
+        self._validator_schema: Optional[Dict[str, Any]] = None
+        self._subschema_validators: Dict[Tuple[str, ...], Any] = {}
+        self._current_env = env
+        # Serializes writers; readers only ever load self._snapshot
+        self._write_lock = threading.RLock()
+        self._listeners: List[Tuple[ConfigListener, str]] = []
+        self._watcher: Optional[ConfigFileWatcher] = None
+
+    @property
+    def _config(self) -> Dict[str, Any]:
+        return self._snapshot.data
+
+    @_config.setter
+    def _config(self, value: Dict[str, Any]) -> None:
+        with self._write_lock:
+            old = self._snapshot
+            self._snapshot = ConfigSnapshot(copy.deepcopy(value), old.version + 1)
+        self._notify(old, self._snapshot)
+
+    def snapshot(self) -> ConfigSnapshot:
+        """The current configuration; it never changes once returned."""
+        return self._snapshot
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value by key."""
         try:
-            current = self._config
-            for part in key.split("."):
-                if not isinstance(current, dict):
-                    return default
-                current = current.get(part, default)
-                if current == default:
-                    return default
-            return current
+            return self._snapshot.get(key, default)
         except Exception as e:
             logger.error("Error getting config value for %s: %s", key, str(e))
             return default
 
+    def accessor(self, key: str, value_type: Optional[Type] = None, default: Any = None) -> ConfigAccessor:
+        """A typed handle on ``key`` for hot paths; it follows reloads and ``set``."""
+        return ConfigAccessor(self.snapshot, key, value_type, default)
+
     def set(self, key: str, value: Any) -> None:
-        """Set a configuration value."""
+        """Set a configuration value.
+
+        Only the changed subtree is validated. An invalid value is logged and
+        not applied.
+        """
         try:
-            current = self._config
-            parts = key.split(".")
-            for _i, part in enumerate(parts[:-1]):
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
-            current[parts[-1]] = value
-            self.validate_config()
+            with self._write_lock:
+                old = self._snapshot
+                new = old.with_value(key, copy.deepcopy(value))
+                self._validate_change(old, new, key)
+                self._snapshot = new
         except Exception as e:
             logger.error("Error setting config value for %s: %s", key, str(e))
+            return
+        self._notify(old, new)
+
+    def subscribe(self, listener: ConfigListener, prefix: str = "") -> None:
+        """Call ``listener(changed_keys, snapshot)`` after changes under ``prefix``.
+
+        ``changed_keys`` holds dotted leaf keys. Listeners run on the thread
+        that made the change (the watcher thread for file reloads).
+        """
+        with self._write_lock:
+            self._listeners.append((listener, prefix))
+
+    def unsubscribe(self, listener: ConfigListener) -> None:
+        with self._write_lock:
+            self._listeners = [entry for entry in self._listeners if entry[0] is not listener]
+
+    def _notify(self, old: ConfigSnapshot, new: ConfigSnapshot) -> None:
+        if self._listeners and old is not new:
+            self._dispatch(changed_keys(old.data, new.data), new)
+
+    def _dispatch(self, changed: Set[str], snapshot: ConfigSnapshot) -> None:
+        if not changed:
+            return
+        for listener, prefix in self._listeners:
+            relevant = (
+                {key for key in changed if key == prefix or key.startswith(prefix + ".")} if prefix else changed
+            )
+            if not relevant:
+                continue
+            try:
+                listener(relevant, snapshot)
+            except Exception as e:
+                logger.error("Config listener failed: %s", e)
+
+    def reload(self) -> Set[str]:
+        """Re-read the schema, config files and environment overrides.
+
+        The new configuration is validated in full and swapped in atomically;
+        if loading or validation fails, the current configuration is kept.
+
+        Returns:
+            Set[str]: Dotted keys whose values changed.
+        """
+        fresh = object.__new__(type(self))
+        fresh._init_state(self._current_env)
+        try:
+            fresh.load_config()
+            fresh.apply_environment_overrides()
+            fresh.validate_config()
+        except Exception as e:
+            logger.error("Config reload failed, keeping current configuration: %s", e)
+            return set()
+        with self._write_lock:
+            old = self._snapshot
+            new = ConfigSnapshot(fresh._snapshot.data, old.version + 1)
+            self._schema = fresh._schema
+            self._snapshot = new
+        changed = changed_keys(old.data, new.data)
+        if changed:
+            logger.info("Configuration reloaded: %d keys changed", len(changed))
+        self._dispatch(changed, new)
+        return changed
+
+    def watch(self, poll_interval: float = 1.0, use_watchdog: bool = True) -> str:
+        """Reload whenever the schema, default or environment config file changes.
+
+        Returns:
+            str: "watchdog" (inotify) or "polling".
+        """
+        if self._watcher is None:
+            paths = [SCHEMA_PATH, DEFAULT_CONFIG_PATH, os.path.join(CONFIG_DIR, f"{self._current_env}.json")]
+            self._watcher = ConfigFileWatcher(
+                paths, lambda changed: self.reload(), poll_interval=poll_interval, use_watchdog=use_watchdog
+            )
+        return self._watcher.start()
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
 
     def save(self, environment: Optional[str] = None) -> bool:
         """Save the current configuration to file.
@@ -165,12 +316,65 @@ class ConfigManager:
         """Validate the configuration against the schema."""
         try:
             if self._schema:
-                validate(instance=self._config, schema=self._schema)
+                self._get_validator().validate(self._config)
                 logger.debug("Configuration validated successfully")
         except ValidationError as e:
             logger.error("Configuration validation failed: %s", e)
             raise
 
+    def _get_validator(self) -> Any:
+        """Validator for the current schema, checked and compiled once per schema."""
+        if self._validator_schema is not self._schema:
+            validator_class = validator_for(self._schema)
+            validator_class.check_schema(self._schema)
+            self._validator = validator_class(self._schema)
+            self._validator_schema = self._schema
+            self._subschema_validators = {}
+        return self._validator
+
+    def _validate_change(self, old: ConfigSnapshot, new: ConfigSnapshot, key: str) -> None:
+        """Validate the part of ``new`` that differs from ``old`` after setting ``key``."""
+        if not self._schema:
+            return
+        validator = self._get_validator()
+        parts = key.split(".")
+        # Start at the highest key the change created, so new intermediate dicts are checked as well
+        depth = next((i for i in range(1, len(parts)) if ".".join(parts[:i]) not in old), len(parts))
+        path = tuple(parts[:depth])
+        if path in self._subschema_validators:
+            subschema_validator = self._subschema_validators[path]
+        else:
+            subschema = self._resolve_subschema(path)
+            if subschema is _FULL_VALIDATION:
+                subschema_validator = _FULL_VALIDATION
+            elif subschema is True or subschema == {}:
+                subschema_validator = None
+            else:
+                subschema_validator = validator.evolve(schema=subschema)
+            self._subschema_validators[path] = subschema_validator
+        if subschema_validator is _FULL_VALIDATION:
+            validator.validate(new.data)
+        elif subschema_validator is not None:
+            subschema_validator.validate(new.get(".".join(path)))
+
+    def _resolve_subschema(self, path: Tuple[str, ...]) -> Any:
+        """Schema for the value at ``path``, or _FULL_VALIDATION if it depends on other keys."""
+        node: Any = self._schema
+        for part in path:
+            if not isinstance(node, dict) or _CROSS_PROPERTY_KEYWORDS & node.keys():
+                return _FULL_VALIDATION
+            properties = node.get("properties", {})
+            if part in properties:
+                node = properties[part]
+                continue
+            additional = node.get("additionalProperties", True)
+            if additional is False:
+                return _FULL_VALIDATION
+            node = additional
+        if node is False or _contains_ref(node):
+            return _FULL_VALIDATION
+        return node
+
     def apply_environment_overrides(self) -> None:
         """Apply environment variable overrides to configuration."""
         for key, value in os.environ.items():
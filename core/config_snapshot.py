@@ -0,0 +1,214 @@
+"""
+Immutable configuration snapshots and typed accessors.
+
+A ``ConfigSnapshot`` holds the nested configuration together with a flat
+``"dotted.key" -> value`` index, so a lookup is one dict access instead of a
+walk through nested dicts. Snapshots are never mutated: ``with_value``
+returns a new snapshot that copies only the dicts on the path to the changed
+key and shares everything else. Readers can therefore hold on to a snapshot
+(or read the current one) from any thread without taking a lock.
+
+``ConfigAccessor`` is a handle on one key for hot paths: it converts the
+value to the requested type once per snapshot and afterwards costs a single
+identity check.
+"""
+
+import logging
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+logger = logging.getLogger("Config")
+
+T = TypeVar("T")
+
+# Marks a key that does not exist (``None`` is a valid configuration value)
+MISSING: Any = object()
+
+_TRUE_STRINGS = frozenset({"1", "true", "yes", "on"})
+_FALSE_STRINGS = frozenset({"0", "false", "no", "off", ""})
+
+
+def _join(prefix: str, key: str) -> str:
+    return f"{prefix}.{key}" if prefix else key
+
+
+def flatten(data: Any, prefix: str = "", into: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Index every nested key of ``data``, including the intermediate dicts."""
+    flat: Dict[str, Any] = {} if into is None else into
+    if isinstance(data, dict):
+        for key, value in data.items():
+            path = _join(prefix, str(key))
+            flat[path] = value
+            if isinstance(value, dict):
+                flatten(value, path, flat)
+    return flat
+
+
+def changed_keys(old: Any, new: Any, prefix: str = "") -> Set[str]:
+    """Dotted leaf keys whose values differ between two (sub)trees."""
+    if old is new:
+        return set()
+    old_is_dict, new_is_dict = isinstance(old, dict), isinstance(new, dict)
+    if old_is_dict and new_is_dict:
+        changed: Set[str] = set()
+        for key in old.keys() | new.keys():
+            changed |= changed_keys(old.get(key, MISSING), new.get(key, MISSING), _join(prefix, str(key)))
+        return changed
+    if old_is_dict or new_is_dict:
+        changed = set()
+        for side in (old, new):
+            if isinstance(side, dict):
+                changed |= {key for key, value in flatten(side, prefix).items() if not _is_branch(value)}
+            elif side is not MISSING and prefix:
+                changed.add(prefix)
+        return changed
+    return {prefix} if prefix and old != new else set()
+
+
+def _is_branch(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value)
+
+
+class ConfigSnapshot:
+    """One immutable version of the configuration.
+
+    Values returned by ``get`` (including nested dicts) are shared with the
+    snapshot and must be treated as read-only.
+    """
+
+    __slots__ = ("data", "version", "_flat")
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, version: int = 0, _flat: Optional[Dict[str, Any]] = None):
+        self.data: Dict[str, Any] = data if data is not None else {}
+        self.version = version
+        self._flat = flatten(self.data) if _flat is None else _flat
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of a dotted key, or ``default`` if it does not exist."""
+        return self._flat.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flat
+
+    def __len__(self) -> int:
+        return len(self._flat)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._flat)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """``(dotted key, value)`` pairs for every key, nested dicts included."""
+        return iter(self._flat.items())
+
+    def with_value(self, key: str, value: Any) -> "ConfigSnapshot":
+        """A new snapshot with ``key`` set to ``value`` (intermediate dicts are created).
+
+        Raises:
+            TypeError: An intermediate key holds a non-dict value.
+        """
+        parts = key.split(".")
+        root = dict(self.data)
+        node = root
+        path = ""
+        copied = []
+        for part in parts[:-1]:
+            path = _join(path, part)
+            child = node.get(part, MISSING)
+            if child is MISSING:
+                child = {}
+            elif not isinstance(child, dict):
+                raise TypeError(f"Cannot set {key}: {path} is not a mapping")
+            else:
+                child = dict(child)
+            node[part] = child
+            node = child
+            copied.append((path, child))
+        node[parts[-1]] = value
+
+        flat = dict(self._flat)
+        subtree = key + "."
+        for stale in [existing for existing in flat if existing.startswith(subtree)]:
+            del flat[stale]
+        flat.update(copied)
+        flat[key] = value
+        if isinstance(value, dict):
+            flatten(value, key, flat)
+        return ConfigSnapshot(root, self.version + 1, flat)
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot(version={self.version}, keys={len(self._flat)})"
+
+
+def coerce(value: Any, value_type: Type[T]) -> T:
+    """Convert a configuration value to ``value_type`` (strings such as "off" become booleans)."""
+    if isinstance(value, value_type) and not (value_type is int and isinstance(value, bool)):
+        return value
+    if value_type is bool and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True  # type: ignore[return-value]
+        if lowered in _FALSE_STRINGS:
+            return False  # type: ignore[return-value]
+        raise ValueError(f"not a boolean: {value!r}")
+    return value_type(value)  # type: ignore[call-arg]
+
+
+class ConfigAccessor(Generic[T]):
+    """Typed, cached handle on one configuration key.
+
+    Example::
+
+        port = config_manager.accessor("api.port", int, 8000)
+        port()  # re-converted only after the configuration changes
+    """
+
+    __slots__ = ("key", "type", "default", "_source", "_cached")
+
+    def __init__(
+        self,
+        source: Callable[[], ConfigSnapshot],
+        key: str,
+        value_type: Optional[Type[T]] = None,
+        default: Any = None,
+    ):
+        self.key = key
+        self.type = value_type
+        self.default = default
+        self._source = source
+        # (snapshot, value) in one attribute so concurrent readers never see a torn pair
+        self._cached: Tuple[Optional[ConfigSnapshot], Any] = (None, None)
+
+    def get(self) -> T:
+        snapshot = self._source()
+        cached_snapshot, value = self._cached
+        if snapshot is not cached_snapshot:
+            value = self._convert(snapshot.get(self.key, MISSING))
+            self._cached = (snapshot, value)
+        return value
+
+    __call__ = get
+
+    def _convert(self, raw: Any) -> Any:
+        if raw is MISSING:
+            return self.default
+        if self.type is None:
+            return raw
+        try:
+            return coerce(raw, self.type)
+        except (TypeError, ValueError) as e:
+            logger.warning("Config value %s=%r is not a valid %s: %s", self.key, raw, self.type.__name__, e)
+            return self.default
+
+    def __repr__(self) -> str:
+        type_name = self.type.__name__ if self.type is not None else "Any"
+        return f"ConfigAccessor({self.key!r}, {type_name})"
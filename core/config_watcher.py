@@ -0,0 +1,152 @@
+"""
+File watching for configuration hot reload.
+
+``ConfigFileWatcher`` calls back when any of a fixed set of files is
+created, modified or deleted. It uses inotify (via ``watchdog``) when that
+package is installed and falls back to polling ``os.stat``. Either way a
+change is only reported when the file's (mtime, size) signature actually
+differs, and bursts of events are debounced into one callback.
+"""
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+
+logger = logging.getLogger("Config")
+
+FileSignature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: str) -> FileSignature:
+    """``(mtime_ns, size)`` of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "ConfigFileWatcher"):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        if getattr(event, "is_directory", False):
+            return
+        for attr in ("src_path", "dest_path"):
+            path = getattr(event, attr, None)
+            if path and os.path.abspath(path) in self._watcher.paths:
+                self._watcher.schedule_check()
+                return
+
+
+class ConfigFileWatcher:
+    """Watches configuration files and reports which ones changed."""
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        on_change: Callable[[List[str]], None],
+        poll_interval: float = 1.0,
+        debounce: float = 0.2,
+        use_watchdog: bool = True,
+    ):
+        """
+        Args:
+            paths: Files to watch; they do not have to exist yet.
+            on_change: Called with the changed paths, from the watcher thread.
+            poll_interval: Seconds between checks when polling.
+            debounce: Seconds to wait for a burst of file events to settle.
+            use_watchdog: Use inotify through ``watchdog`` when it is installed.
+        """
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_watchdog = use_watchdog and WATCHDOG_AVAILABLE
+        self._signatures: Dict[str, FileSignature] = {path: file_signature(path) for path in self.paths}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Timer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    @property
+    def running(self) -> bool:
+        return self._observer is not None or self._thread is not None
+
+    def start(self) -> str:
+        """Start watching; returns the mechanism used ("watchdog" or "polling")."""
+        if self.running:
+            return "watchdog" if self._observer is not None else "polling"
+        self._stop.clear()
+        if self.use_watchdog:
+            observer = Observer()
+            handler = _ChangeHandler(self)
+            for directory in {os.path.dirname(path) for path in self.paths}:
+                if os.path.isdir(directory):
+                    observer.schedule(handler, directory, recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+            return "watchdog"
+        self._thread = threading.Thread(target=self._poll, name="ConfigFileWatcher", daemon=True)
+        self._thread.start()
+        return "polling"
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def schedule_check(self) -> None:
+        """(Re)arm the debounce timer after a file event."""
+        with self._lock:
+            if self._stop.is_set():
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.check)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def check(self) -> List[str]:
+        """Compare signatures now and report changed files; returns them."""
+        with self._lock:
+            self._timer = None
+            changed = []
+            for path in sorted(self.paths):
+                signature = file_signature(path)
+                if signature != self._signatures[path]:
+                    self._signatures[path] = signature
+                    changed.append(path)
+        if changed:
+            try:
+                self.on_change(changed)
+            except Exception as e:
+                logger.error("Config change handler failed: %s", e)
+        return changed
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.check()
@@ -3,13 +3,21 @@ Feature Flag Management System for Atlas
 
 This module provides a system for managing feature flags in the Atlas application,
 allowing for controlled rollout of features and easy toggling of functionality.
+
+Flags may carry targeting rules (users, teams, attributes, percentage
+rollouts; see ``core.flag_engine``). They are compiled into an immutable
+``FlagSnapshot`` whenever they are loaded or changed, so checks read the
+current snapshot without locking and without logging.
 """
 
 import json
 import logging
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from core.config_watcher import ConfigFileWatcher
+from core.flag_engine import FlagContext, FlagSnapshot
 from core.logging import get_logger
 
 try:
@@ -38,13 +46,16 @@ class FeatureFlagManager:
 
     _instance = None
 
-    def __new__(cls, config_path: Optional[str] = None, environment: str = "dev"):
+    def __new__(
+        cls, config_path: Optional[str] = None, environment: str = "dev", storage_path: Optional[str] = None
+    ):
         """
         Singleton pattern to ensure only one instance of FeatureFlagManager exists.
 
         Args:
             config_path: Path to configuration file, if any
             environment: Target environment for feature flags
+            storage_path: Flag storage file, overriding the configured one
 
         Returns:
             FeatureFlagManager: Singleton instance of the manager
@@ -54,22 +65,32 @@ class FeatureFlagManager:
             cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self, config_path: Optional[str] = None, environment: str = "dev"):
+    def __init__(
+        self, config_path: Optional[str] = None, environment: str = "dev", storage_path: Optional[str] = None
+    ):
         """
         Initialize the FeatureFlagManager with configuration and environment.
 
         Args:
             config_path: Path to configuration file, if any
             environment: Target environment for feature flags (dev, staging, prod)
+            storage_path: Flag storage file, overriding the configured one
         """
         if not hasattr(self, "_initialized") or not self._initialized:
             self.environment = environment.lower()
             self.config = load_config(config_path, environment=self.environment)
             self.flags: Dict[str, Any] = {}
             self.default_flags: Dict[str, Any] = self.config.get("feature_flags", {})
+            self.overrides: Dict[str, Any] = self.config.get("feature_flag_overrides", {})
             self.storage_path = Path(
-                self.config.get("feature_flags_storage", "config/feature_flags.json")
+                storage_path or self.config.get("feature_flags_storage", "config/feature_flags.json")
             )
+            # Whether the storage file is a full document ({"feature_flags": ..., ...})
+            self._storage_document: Optional[Dict[str, Any]] = None
+            self._snapshot = FlagSnapshot({})
+            # Serializes writers; readers only load self._snapshot
+            self._lock = threading.RLock()
+            self._watcher: Optional[ConfigFileWatcher] = None
             self.setup_logging()
             self.load_flags()
             self._initialized = True
@@ -91,34 +112,64 @@ class FeatureFlagManager:
     def load_flags(self) -> None:
         """Load feature flags from storage or use default flags from config."""
         logger.info("Loading feature flags")
+        overrides = self.overrides
         try:
             if self.storage_path.exists():
                 with open(self.storage_path, "r") as f:
                     stored_flags = json.load(f)
-                    # Merge stored flags with defaults, giving precedence to stored
-                    self.flags = {**self.default_flags, **stored_flags}
-                    logger.info(
-                        "Loaded feature flags from storage: %s", self.storage_path
-                    )
+                if isinstance(stored_flags.get("feature_flags"), dict):
+                    # A full document such as config/feature_flags.json
+                    self._storage_document = stored_flags
+                    overrides = {**overrides, **stored_flags.get("feature_flag_overrides", {})}
+                    stored_flags = stored_flags["feature_flags"]
+                else:
+                    self._storage_document = None
+                # Merge stored flags with defaults, giving precedence to stored
+                flags = {**self.default_flags, **stored_flags}
+                logger.info("Loaded feature flags from storage: %s", self.storage_path)
             else:
                 # If no storage file exists, use the defaults from config
-                self.flags = self.default_flags.copy()
+                flags = self.default_flags.copy()
                 logger.info("No stored flags found, using default feature flags")
 
             # Apply environment-specific overrides if they exist
-            env_overrides = self.config.get("feature_flag_overrides", {}).get(
-                self.environment, {}
-            )
+            env_overrides = overrides.get(self.environment, {})
             if env_overrides:
-                self.flags.update(env_overrides)
-                logger.info(
-                    "Applied environment-specific overrides for: %s", self.environment
-                )
+                flags.update(env_overrides)
+                logger.info("Applied environment-specific overrides for: %s", self.environment)
         except Exception as e:
             logger.error("Error loading feature flags: %s", str(e), exc_info=True)
             # Fall back to default flags on error
-            self.flags = self.default_flags.copy()
+            flags = self.default_flags.copy()
             logger.info("Falling back to default feature flags due to load error")
+        self._publish(flags)
+
+    def _publish(self, flags: Dict[str, Any]) -> None:
+        """Compile ``flags`` and swap them in; in-flight checks keep the previous snapshot."""
+        with self._lock:
+            snapshot = FlagSnapshot.compile(flags, self.environment, previous=self._snapshot)
+            self.flags = flags
+            self._snapshot = snapshot
+
+    def reload(self) -> None:
+        """Re-read the flag storage file without blocking flag checks."""
+        self.load_flags()
+
+    def watch(self, poll_interval: float = 1.0, use_watchdog: bool = True) -> str:
+        """Reload whenever the storage file changes; returns "watchdog" or "polling"."""
+        if self._watcher is None:
+            self._watcher = ConfigFileWatcher(
+                [str(self.storage_path)],
+                lambda changed: self.reload(),
+                poll_interval=poll_interval,
+                use_watchdog=use_watchdog,
+            )
+        return self._watcher.start()
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
 
     def save_flags(self) -> None:
         """Save current feature flags to storage."""
@@ -127,42 +178,68 @@ class FeatureFlagManager:
             # Ensure storage directory exists
             self.storage_path.parent.mkdir(parents=True, exist_ok=True)
 
+            if self._storage_document is not None:
+                data = {**self._storage_document, "feature_flags": self.flags}
+            else:
+                data = self.flags
             with open(self.storage_path, "w") as f:
-                json.dump(self.flags, f, indent=2)
+                json.dump(data, f, indent=2)
             logger.info("Feature flags saved successfully")
         except Exception as e:
             logger.error("Error saving feature flags: %s", str(e), exc_info=True)
             raise FeatureFlagError(f"Failed to save feature flags: {str(e)}") from e
 
-    def is_enabled(self, flag_name: str, default: bool = False) -> bool:
+    def is_enabled(self, flag_name: str, default: bool = False, context: Optional[FlagContext] = None) -> bool:
         """
         Check if a feature flag is enabled.
 
         Args:
             flag_name: Name of the feature flag to check
             default: Default value if the flag is not found
+            context: User/team the targeting rules are evaluated for
 
         Returns:
             bool: True if the feature is enabled, False otherwise
         """
-        result = self.flags.get(flag_name, default)
-        logger.debug("Checking feature flag %s: %s", flag_name, result)
-        return bool(result)
-
-    def get_flag_value(self, flag_name: str, default: Any = None) -> Any:
+        snapshot = self._snapshot
+        flag = snapshot.flags.get(flag_name)
+        if flag is None:
+            return bool(default)
+        flag.evaluations += 1
+        if flag.constant:
+            return bool(flag.value)
+        return bool(snapshot.evaluate(flag, context))
+
+    def get_flag_value(self, flag_name: str, default: Any = None, context: Optional[FlagContext] = None) -> Any:
         """
         Get the value of a feature flag.
 
         Args:
             flag_name: Name of the feature flag to retrieve
             default: Default value if the flag is not found
+            context: User/team the targeting rules are evaluated for
 
         Returns:
             Any: Value of the feature flag or the default if not found
         """
-        result = self.flags.get(flag_name, default)
-        logger.debug("Getting feature flag value %s: %s", flag_name, result)
-        return result
+        snapshot = self._snapshot
+        flag = snapshot.flags.get(flag_name)
+        if flag is None:
+            return default
+        flag.evaluations += 1
+        return snapshot.evaluate(flag, context)
+
+    def evaluation_counts(self) -> Dict[str, int]:
+        """How often each flag was checked since it was first loaded (approximate under threads)."""
+        return self._snapshot.evaluation_counts()
+
+    def unused_flags(self, min_evaluations: int = 1) -> List[str]:
+        """Flags checked fewer than ``min_evaluations`` times: candidates for removal."""
+        return self._snapshot.unused(min_evaluations)
+
+    def reset_evaluation_counts(self) -> None:
+        for flag in self._snapshot.flags.values():
+            flag.evaluations = 0
 
     def set_flag(self, flag_name: str, value: Any) -> None:
         """
@@ -173,8 +250,9 @@ class FeatureFlagManager:
             value: Value to set for the feature flag
         """
         logger.info("Setting feature flag %s to: %s", flag_name, value)
-        self.flags[flag_name] = value
-        self.save_flags()
+        with self._lock:
+            self._publish({**self.flags, flag_name: value})
+            self.save_flags()
 
     def enable_feature(self, flag_name: str) -> None:
         """
@@ -199,8 +277,9 @@ class FeatureFlagManager:
     def reset_to_defaults(self) -> None:
         """Reset all feature flags to their default values."""
         logger.info("Resetting feature flags to defaults")
-        self.flags = self.default_flags.copy()
-        self.save_flags()
+        with self._lock:
+            self._publish(self.default_flags.copy())
+            self.save_flags()
 
     def list_flags(self) -> Dict[str, Any]:
         """
@@ -236,6 +315,7 @@ def is_feature_enabled(
     default: bool = False,
     config_path: Optional[str] = None,
     environment: str = "dev",
+    context: Optional[FlagContext] = None,
 ) -> bool:
     """
     Check if a feature is enabled.
@@ -245,13 +325,12 @@ def is_feature_enabled(
         default: Default value if the flag is not found
         config_path: Path to configuration file, if any
         environment: Target environment for feature flags
+        context: User/team the targeting rules are evaluated for
 
     Returns:
         bool: True if the feature is enabled, False otherwise
     """
-    return get_feature_flag_manager(config_path, environment).is_enabled(
-        flag_name, default
-    )
+    return get_feature_flag_manager(config_path, environment).is_enabled(flag_name, default, context)
 
 
 def get_feature_value(
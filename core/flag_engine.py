@@ -0,0 +1,211 @@
+"""
+Compiled feature flag evaluation.
+
+Flag definitions are compiled once, when flags are loaded, into
+``CompiledFlag`` objects. A flag is either a plain value (``"dark_mode": true``)
+or a definition with targeting rules::
+
+    "new_planner": {
+        "enabled": true,
+        "rules": [
+            {"users": ["alice"]},
+            {"teams": ["core"], "value": true},
+            {"attributes": {"plan": ["pro"]}, "percentage": 25}
+        ],
+        "default": false,
+        "environments": {"prod": {"enabled": false}}
+    }
+
+Rules are tried in order; the conditions within a rule must all hold. The
+first matching rule's ``value`` (true by default) wins, otherwise the flag
+evaluates to ``default``. A disabled flag always evaluates to ``default``.
+Percentage rollouts hash the flag name and the user (or ``bucket_by``
+attribute), so a user stays in or out of the rollout across processes.
+
+``FlagSnapshot`` holds one immutable set of compiled flags plus a cache of
+results per ``FlagContext``. Flags without rules never touch the cache, and
+a cached result costs two dict lookups.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# Rollout buckets per flag; percentages are resolved to 0.01%
+BUCKETS = 10000
+
+_MISSING: Any = object()
+
+Predicate = Callable[["FlagContext"], bool]
+
+
+class FlagContext:
+    """Who a flag is evaluated for; immutable and hashable so results can be cached.
+
+    Attribute values must be hashable. Reuse one context for all checks of
+    the same request or tool loop.
+    """
+
+    __slots__ = ("user", "team", "attributes", "_hash")
+
+    def __init__(self, user: Optional[str] = None, team: Optional[str] = None, **attributes: Any):
+        self.user = user
+        self.team = team
+        self.attributes: Dict[str, Any] = attributes
+        self._hash = hash((user, team, frozenset(attributes.items())))
+
+    def get(self, attribute: str) -> Any:
+        """``user``, ``team`` or a custom attribute."""
+        if attribute == "user":
+            return self.user
+        if attribute == "team":
+            return self.team
+        return self.attributes.get(attribute)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FlagContext):
+            return NotImplemented
+        return (self.user, self.team, self.attributes) == (other.user, other.team, other.attributes)
+
+    def __repr__(self) -> str:
+        return f"FlagContext(user={self.user!r}, team={self.team!r}, attributes={self.attributes!r})"
+
+
+ANONYMOUS = FlagContext()
+
+
+def rollout_bucket(flag_name: str, key: Any) -> int:
+    """Stable bucket in ``[0, BUCKETS)`` for a flag and a bucketing key."""
+    digest = hashlib.sha1(f"{flag_name}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % BUCKETS
+
+
+def _member_of(attribute: str, allowed: FrozenSet[Any]) -> Predicate:
+    def predicate(context: FlagContext) -> bool:
+        return context.get(attribute) in allowed
+
+    return predicate
+
+
+def _in_rollout(flag_name: str, percentage: float, bucket_by: str) -> Predicate:
+    threshold = int(round(max(0.0, min(100.0, float(percentage))) * BUCKETS / 100))
+
+    def predicate(context: FlagContext) -> bool:
+        key = context.get(bucket_by)
+        return key is not None and rollout_bucket(flag_name, key) < threshold
+
+    return predicate
+
+
+def _compile_rule(flag_name: str, rule: Dict[str, Any]) -> Tuple[Tuple[Predicate, ...], Any]:
+    predicates: List[Predicate] = []
+    if "users" in rule:
+        predicates.append(_member_of("user", frozenset(rule["users"])))
+    if "teams" in rule:
+        predicates.append(_member_of("team", frozenset(rule["teams"])))
+    for attribute, allowed in rule.get("attributes", {}).items():
+        values = allowed if isinstance(allowed, (list, tuple, set, frozenset)) else [allowed]
+        predicates.append(_member_of(attribute, frozenset(values)))
+    if "percentage" in rule:
+        predicates.append(_in_rollout(flag_name, rule["percentage"], rule.get("bucket_by", "user")))
+    return tuple(predicates), rule.get("value", True)
+
+
+class CompiledFlag:
+    """One flag, ready to evaluate."""
+
+    __slots__ = ("name", "constant", "value", "description", "evaluations", "_rules", "_fallback")
+
+    def __init__(self, name: str, definition: Any, environment: Optional[str] = None):
+        self.name = name
+        self.evaluations = 0
+        self.description = ""
+        self._rules: Tuple[Tuple[Tuple[Predicate, ...], Any], ...] = ()
+        self._fallback: Any = None
+        if not isinstance(definition, dict):
+            self.constant, self.value = True, definition
+            return
+
+        definition = dict(definition)
+        if environment:
+            definition.update(definition.get("environments", {}).get(environment, {}))
+        self.description = definition.get("description", "")
+        fallback = definition.get("default", False)
+        rules = definition.get("rules", [])
+        if not definition.get("enabled", True):
+            self.constant, self.value = True, fallback
+        elif not rules:
+            self.constant, self.value = True, definition.get("value", True)
+        else:
+            self.constant, self.value = False, fallback
+            self._rules = tuple(_compile_rule(name, rule) for rule in rules)
+            self._fallback = fallback
+
+    def evaluate(self, context: FlagContext) -> Any:
+        """Evaluate the rules (uncached)."""
+        if self.constant:
+            return self.value
+        for predicates, value in self._rules:
+            for predicate in predicates:
+                if not predicate(context):
+                    break
+            else:
+                return value
+        return self._fallback
+
+    def __repr__(self) -> str:
+        kind = "constant" if self.constant else f"{len(self._rules)} rules"
+        return f"CompiledFlag({self.name!r}, {kind})"
+
+
+class FlagSnapshot:
+    """An immutable set of compiled flags with a per-context result cache."""
+
+    def __init__(self, flags: Dict[str, CompiledFlag], max_cached_contexts: int = 4096):
+        self.flags = flags
+        self.max_cached_contexts = max_cached_contexts
+        self._cache: Dict[FlagContext, Dict[str, Any]] = {}
+
+    @classmethod
+    def compile(
+        cls,
+        definitions: Dict[str, Any],
+        environment: Optional[str] = None,
+        previous: Optional["FlagSnapshot"] = None,
+        max_cached_contexts: int = 4096,
+    ) -> "FlagSnapshot":
+        """Compile flag definitions, carrying evaluation counts over from ``previous``."""
+        flags = {name: CompiledFlag(name, definition, environment) for name, definition in definitions.items()}
+        if previous is not None:
+            for name, flag in flags.items():
+                old = previous.flags.get(name)
+                if old is not None:
+                    flag.evaluations = old.evaluations
+        return cls(flags, max_cached_contexts)
+
+    def evaluate(self, flag: CompiledFlag, context: Optional[FlagContext]) -> Any:
+        if flag.constant:
+            return flag.value
+        if context is None:
+            context = ANONYMOUS
+        results = self._cache.get(context)
+        if results is None:
+            if len(self._cache) >= self.max_cached_contexts:
+                self._cache.clear()
+            results = self._cache[context] = {}
+        value = results.get(flag.name, _MISSING)
+        if value is _MISSING:
+            value = results[flag.name] = flag.evaluate(context)
+        return value
+
+    def evaluation_counts(self) -> Dict[str, int]:
+        return {name: flag.evaluations for name, flag in self.flags.items()}
+
+    def unused(self, min_evaluations: int = 1) -> List[str]:
+        """Flags evaluated fewer than ``min_evaluations`` times."""
+        return sorted(name for name, flag in self.flags.items() if flag.evaluations < min_evaluations)
+
+    def cached_contexts(self) -> int:
+        return len(self._cache)
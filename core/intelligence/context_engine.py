@@ -1,16 +1,43 @@
+"""
+Context awareness for Atlas.
+
+Each context category has a provider: a callable returning a dict. Providers
+declare how often they refresh (``refresh_interval``), how stale their data
+may get before an on-demand read refreshes it (``max_staleness``) and a rough
+cost in seconds (``cost``). Due providers run concurrently on a worker pool
+without holding the engine lock. The keys that changed across all of them
+are merged into one change-set, which batch listeners receive in a single
+notification per update cycle.
+"""
+
+import math
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from logging import getLogger
 from threading import Lock
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
 from PySide6.QtCore import QObject, Signal
 
+from core.intelligence.context_history import (
+    NumericRingBuffer,
+    append_sample,
+    is_numeric,
+)
+
 logger = getLogger(__name__)
 
+DEFAULT_INTERVAL = 60.0
+
 
 class SystemContextProvider:
     """Placeholder for a provider of system context data."""
 
+    refresh_interval = 5.0
+    cost = 0.01
+
     def __init__(self, config=None):
         self.config = config or {}
 
@@ -24,6 +51,9 @@ class SystemContextProvider:
 class UserContextProvider:
     """Placeholder for a provider of user context data."""
 
+    refresh_interval = 10.0
+    cost = 0.01
+
     def __init__(self, config=None):
         self.config = config or {}
 
@@ -41,6 +71,9 @@ class UserContextProvider:
 class EnvironmentalContextProvider:
     """Placeholder for a provider of environmental context data."""
 
+    refresh_interval = 60.0
+    cost = 0.05
+
     def __init__(self, config=None):
         self.config = config or {}
 
@@ -55,10 +88,63 @@ class EnvironmentalContextProvider:
         pass
 
 
+@dataclass
+class ProviderSpec:
+    """Scheduling parameters of a context provider.
+
+    Attributes:
+        category: Context category the provider fills.
+        provider: Callable returning a dict of context data.
+        interval: Seconds between scheduled refreshes.
+        max_staleness: Age in seconds after which ``refresh`` re-runs the provider.
+        cost: Estimated seconds per call; the slowest providers are started first.
+    """
+
+    category: str
+    provider: Callable[[], Dict[str, Any]]
+    interval: float = DEFAULT_INTERVAL
+    max_staleness: float = DEFAULT_INTERVAL
+    cost: float = 0.0
+
+
+class ProviderStats:
+    """Latency of one provider's calls over a sliding window."""
+
+    def __init__(self, window: int = 256):
+        self.calls = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._latency = NumericRingBuffer(window)
+
+    def record(self, seconds: float, error: Optional[BaseException] = None) -> None:
+        self.calls += 1
+        self._latency.append(seconds)
+        if error is not None:
+            self.errors += 1
+            self.last_error = str(error)
+
+    @property
+    def mean(self) -> float:
+        return self._latency.mean()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "last_ms": (self._latency.latest() or 0.0) * 1000,
+            "mean_ms": self._latency.mean() * 1000,
+            "p95_ms": self._latency.percentile(95) * 1000,
+            "max_ms": self._latency.maximum() * 1000,
+        }
+
+
 class ContextEngine(QObject):
     """Manages context awareness for Atlas, integrating environmental, user, and system contexts."""
 
     context_updated = Signal(str, dict)
+    # One change-set per update cycle: {category: {key: new value}}
+    contexts_updated = Signal(dict)
 
     def __init__(
         self,
@@ -69,6 +155,10 @@ class ContextEngine(QObject):
 
         Args:
             config: Optional configuration dictionary for context providers.
+                Besides ``providers`` it accepts ``default_interval``,
+                ``max_workers``, ``provider_timeout`` (seconds an update
+                cycle waits for providers), ``history_size`` and
+                ``record_history``.
             parent: Optional parent QObject for Qt integration.
         """
         super().__init__(parent)
@@ -81,25 +171,39 @@ class ContextEngine(QObject):
         }
         self.context_providers: Dict[str, Any] = {}
         self.context_listeners: Dict[str, List[Callable[[str, dict], None]]] = {}
+        self.batch_listeners: Dict[str, List[Callable[[Dict[str, Dict[str, Any]]], None]]] = {}
+        self.default_interval = float(self.config.get("default_interval", DEFAULT_INTERVAL))
+        self.provider_timeout = float(self.config.get("provider_timeout", 5.0))
+        self.history_size = int(self.config.get("history_size", 100))
+        self.record_history = bool(self.config.get("record_history", True))
+        self.max_workers = int(self.config.get("max_workers", 4))
         self.is_running = False
-        self._update_thread = None
+        self._update_thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
         self._lock = Lock()
+        self._specs: Dict[str, ProviderSpec] = {}
+        self._stats: Dict[str, ProviderStats] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
         logger.info("ContextEngine initialized with config: %s", self.config)
 
     def start(self) -> None:
         """Start the context engine to begin collecting and updating context data."""
         if not self.is_running:
-            self.is_running = True
             self.initialize_providers()
             logger.info("ContextEngine started")
             self.start_continuous_update()
 
     def stop(self) -> None:
         """Stop the context engine and any associated providers."""
-        if self.is_running:
-            self.is_running = False
-            if self._update_thread:
-                self._update_thread = None
+        if self.is_running or self._executor is not None:
+            self.stop_continuous_update()
+            with self._lock:
+                executor, self._executor = self._executor, None
+                self._in_flight.clear()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
             for provider_id, provider in self.context_providers.items():
                 try:
                     if hasattr(provider, "stop"):
@@ -122,7 +226,13 @@ class ContextEngine(QObject):
                     module = __import__(provider_module, fromlist=[provider_class])
                     provider_cls = getattr(module, provider_class)
                     provider_instance = provider_cls(provider_config.get("config", {}))
-                    self.context_providers[category] = provider_instance
+                    self.register_provider(
+                        category,
+                        provider_instance,
+                        interval=provider_config.get("interval"),
+                        max_staleness=provider_config.get("max_staleness"),
+                        cost=provider_config.get("cost"),
+                    )
                     logger.info("Initialized provider for category: %s", category)
                 else:
                     logger.warning(
@@ -137,24 +247,44 @@ class ContextEngine(QObject):
 
         # Default providers if not specified in config
         if not self.context_providers:
-            self.context_providers.update(
-                {
-                    "system": SystemContextProvider(),
-                    "user": UserContextProvider(),
-                    "environmental": EnvironmentalContextProvider(),
-                }
-            )
+            self.register_provider("system", SystemContextProvider())
+            self.register_provider("user", UserContextProvider())
+            self.register_provider("environmental", EnvironmentalContextProvider())
             logger.info("Initialized default context providers")
 
-    def register_provider(self, category: str, provider: Callable[[], dict]) -> None:
+    def register_provider(
+        self,
+        category: str,
+        provider: Callable[[], dict],
+        interval: Optional[float] = None,
+        max_staleness: Optional[float] = None,
+        cost: Optional[float] = None,
+    ) -> None:
         """Register a context provider for a specific category.
 
+        Scheduling parameters default to the provider's ``refresh_interval``,
+        ``max_staleness`` and ``cost`` attributes, then to the engine defaults.
+
         Args:
             category: The category of context data (e.g., 'system', 'user').
             provider: A callable that returns a dictionary of context data.
+            interval: Seconds between scheduled refreshes.
+            max_staleness: Age in seconds after which ``refresh`` re-runs the provider.
+            cost: Estimated seconds per call.
         """
-        self.context_providers[category] = provider
-        logger.info(f"Registered context provider for category: {category}")
+        if interval is None:
+            interval = getattr(provider, "refresh_interval", None) or self.default_interval
+        if max_staleness is None:
+            max_staleness = getattr(provider, "max_staleness", None) or interval
+        if cost is None:
+            cost = getattr(provider, "cost", 0.0)
+        with self._lock:
+            self.context_providers[category] = provider
+            self._specs[category] = ProviderSpec(category, provider, float(interval), float(max_staleness), float(cost))
+            self._stats.setdefault(category, ProviderStats())
+            self.context_data.setdefault(category, {})
+        self._wake.set()
+        logger.info(f"Registered context provider for category: {category} (every {interval}s)")
 
     def unregister_provider(self, provider_id: str) -> bool:
         """Unregister a context provider.
@@ -170,7 +300,10 @@ class ContextEngine(QObject):
                 provider = self.context_providers[provider_id]
                 if hasattr(provider, "stop"):
                     provider.stop()
-                del self.context_providers[provider_id]
+                with self._lock:
+                    del self.context_providers[provider_id]
+                    self._specs.pop(provider_id, None)
+                    self._updated_at.pop(provider_id, None)
                 logger.info("Unregistered context provider: %s", provider_id)
                 return True
             except Exception as e:
@@ -179,18 +312,25 @@ class ContextEngine(QObject):
         return False
 
     def register_listener(
-        self, listener_id: str, callback: Callable[[str, Dict[str, Any]], None]
+        self,
+        listener_id: str,
+        callback: Callable[..., None],
+        batched: bool = False,
     ) -> None:
         """Register a listener to be notified of context updates.
 
         Args:
             listener_id: Unique identifier for the listener.
             callback: Function to call when context is updated, with parameters (context_type, context_data).
+                With ``batched`` it is called once per update cycle with the
+                whole change-set, ``{category: {key: value}}``.
+            batched: Receive one change-set per update cycle instead of one call per category.
         """
-        if listener_id not in self.context_listeners:
-            self.context_listeners[listener_id] = []
-        if callback not in self.context_listeners[listener_id]:
-            self.context_listeners[listener_id].append(callback)
+        listeners = self.batch_listeners if batched else self.context_listeners
+        if listener_id not in listeners:
+            listeners[listener_id] = []
+        if callback not in listeners[listener_id]:
+            listeners[listener_id].append(callback)
             logger.info(f"Registered context listener: {listener_id}")
 
     def unregister_listener(self, listener_id: str) -> bool:
@@ -202,69 +342,213 @@ class ContextEngine(QObject):
         Returns:
             bool: True if successfully unregistered, False otherwise.
         """
-        if listener_id in self.context_listeners:
-            del self.context_listeners[listener_id]
+        found = self.context_listeners.pop(listener_id, None) is not None
+        found = self.batch_listeners.pop(listener_id, None) is not None or found
+        if found:
             logger.info(f"Unregistered context listener: {listener_id}")
-            return True
-        return False
+        return found
 
-    def start_continuous_update(self, interval: int = 60) -> None:
-        """Start continuous context updates at the specified interval (in seconds).
+    def start_continuous_update(self, interval: Optional[float] = None) -> None:
+        """Start refreshing providers in the background, each on its own interval.
 
         Args:
-            interval: Time in seconds between updates.
+            interval: Refresh interval in seconds for providers that do not declare one.
         """
-        if self.is_running:
+        if self._update_thread is not None and self._update_thread.is_alive():
             logger.warning("Continuous update already running.")
             return
+        if interval is not None:
+            self.default_interval = float(interval)
+        if not self.context_providers:
+            self.initialize_providers()
 
         self.is_running = True
-        logger.info(f"Starting continuous context updates every {interval} seconds.")
-
-        import threading
-
-        def update_loop():
-            while self.is_running:
-                start_time = time.time()
-                self.update_all_contexts()
-                elapsed = time.time() - start_time
-                if elapsed > interval:
-                    logger.warning(
-                        f"Context update took {elapsed:.2f} seconds, longer than interval {interval}"
-                    )
-                else:
-                    time.sleep(interval - elapsed)
-
-        self._update_thread = threading.Thread(target=update_loop, daemon=True)
+        self._wake.clear()
+        logger.info("Starting continuous context updates.")
+        self._update_thread = threading.Thread(target=self._update_loop, name="context-engine", daemon=True)
         self._update_thread.start()
 
     def stop_continuous_update(self) -> None:
         """Stop continuous context updates."""
         self.is_running = False
+        self._wake.set()
         logger.info("Stopped continuous context updates.")
         if self._update_thread:
+            if self._update_thread is not threading.current_thread():
+                self._update_thread.join(timeout=self.provider_timeout)
             self._update_thread = None
 
-    def update_all_contexts(self) -> None:
-        """Update all contexts from registered providers."""
+    def _update_loop(self) -> None:
+        while self.is_running:
+            due = self._due_categories(time.monotonic())
+            if due:
+                start_time = time.perf_counter()
+                self.update_all_contexts(due)
+                elapsed = time.perf_counter() - start_time
+                logger.debug(f"Context update of {len(due)} providers took {elapsed:.3f}s")
+            if not self.is_running:
+                break
+            self._wake.wait(self._seconds_until_due(time.monotonic()))
+            self._wake.clear()
+
+    def _due_categories(self, now: float) -> List[str]:
         with self._lock:
-            for category, provider in self.context_providers.items():
-                try:
-                    new_data = provider()
+            due = []
+            for category, spec in self._specs.items():
+                future = self._in_flight.get(category)
+                if future is not None:
+                    if future.done():
+                        due.append(category)
+                elif now - self._updated_at.get(category, -math.inf) >= spec.interval:
+                    due.append(category)
+            return due
+
+    def _seconds_until_due(self, now: float) -> float:
+        with self._lock:
+            waits = [
+                self._updated_at.get(category, -math.inf) + spec.interval - now
+                for category, spec in self._specs.items()
+                if category not in self._in_flight
+            ]
+        return min(max(min(waits, default=self.default_interval), 0.01), self.default_interval)
+
+    def _run_provider(self, spec: ProviderSpec) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            data = spec.provider()
+            if not isinstance(data, dict):
+                raise TypeError(f"provider returned {type(data).__name__}, expected dict")
+        except Exception as e:
+            self._stats[spec.category].record(time.perf_counter() - start, e)
+            raise
+        self._stats[spec.category].record(time.perf_counter() - start)
+        return data
+
+    def _submit(self, categories: Iterable[str]) -> Dict[str, Future]:
+        """Start the providers of ``categories`` (reusing calls still in flight)."""
+        futures: Dict[str, Future] = {}
+        with self._lock:
+            specs = [self._specs[category] for category in categories if category in self._specs]
+            # Longest first, so the slowest provider does not start last
+            specs.sort(key=lambda spec: self._stats[spec.category].mean or spec.cost, reverse=True)
+            for spec in specs:
+                future = self._in_flight.get(spec.category)
+                if future is None:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers, thread_name_prefix="context-provider"
+                        )
+                    future = self._executor.submit(self._run_provider, spec)
+                    future.add_done_callback(lambda _: self._wake.set())
+                    self._in_flight[spec.category] = future
+                futures[spec.category] = future
+        return futures
+
+    def _collect(self, futures: Dict[str, Future], timeout: float) -> Dict[str, Dict[str, Any]]:
+        """Results of the providers that finish within ``timeout``.
+
+        Slower providers stay in flight and are picked up by a later cycle.
+        """
+        if not futures:
+            return {}
+        done, _ = wait(list(futures.values()), timeout=timeout)
+        results = {}
+        for category, future in futures.items():
+            if future not in done:
+                logger.warning(f"Context provider {category} is still running after {timeout:.1f}s")
+                continue
+            with self._lock:
+                if self._in_flight.get(category) is future:
+                    del self._in_flight[category]
+            try:
+                results[category] = future.result()
+            except Exception as e:
+                logger.error(f"Error updating context for category {category}: {str(e)}")
+                # A failing provider waits its interval like any other, instead of being retried every cycle
+                with self._lock:
+                    self._updated_at[category] = time.monotonic()
+        return results
+
+    def _apply(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Merge provider results into the context; returns what changed."""
+        changes: Dict[str, Dict[str, Any]] = {}
+        now, timestamp = time.monotonic(), time.time()
+        with self._lock:
+            for category, new_data in results.items():
+                current = self.context_data.setdefault(category, {})
+                changed = {key: value for key, value in new_data.items() if key not in current or current[key] != value}
+                if changed:
+                    current.update(changed)
+                    changes[category] = changed
+                self._updated_at[category] = now
+                if self.record_history:
                     for key, value in new_data.items():
-                        if (
-                            key in self.context_data[category]
-                            and self.context_data[category][key] == value
-                        ):
-                            continue
-                        self.context_data[category][key] = value
-                        self.notify_listeners(category, {key: value})
-                        self.context_updated.emit(category, {key: value})
-                    logger.debug(f"Updated context for category: {category}")
+                        if is_numeric(value):
+                            self._append_history(category, key, value, timestamp)
+                logger.debug(f"Updated context for category: {category}")
+        return changes
+
+    def _deliver(self, changes: Dict[str, Dict[str, Any]]) -> None:
+        if not changes:
+            return
+        for listener_id, callbacks in list(self.batch_listeners.items()):
+            for callback in callbacks:
+                try:
+                    callback(changes)
                 except Exception as e:
-                    logger.error(
-                        f"Error updating context for category {category}: {str(e)}"
-                    )
+                    logger.error(f"Error notifying listener {listener_id}: {str(e)}")
+        for category, changed in changes.items():
+            self.notify_listeners(category, changed)
+            self.context_updated.emit(category, changed)
+        self.contexts_updated.emit(changes)
+
+    def update_all_contexts(self, categories: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Refresh providers concurrently and deliver one change-set.
+
+        Providers run on the worker pool without holding the engine lock.
+        Batch listeners get a single notification with every key that
+        changed; per-category listeners get one call per changed category.
+
+        Args:
+            categories: Categories to refresh; all registered providers by default.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The change-set, ``{category: {key: new value}}``.
+        """
+        futures = self._submit(list(self._specs) if categories is None else categories)
+        changes = self._apply(self._collect(futures, self.provider_timeout))
+        self._deliver(changes)
+        return changes
+
+    def refresh(self, category: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Get a category's context, refreshing it first if it is too old.
+
+        Args:
+            category: The category to refresh.
+            max_age: Largest acceptable age in seconds; defaults to the
+                provider's ``max_staleness``. 0 always refreshes.
+
+        Returns:
+            Dict[str, Any]: The category's context data.
+        """
+        spec = self._specs.get(category)
+        if spec is not None and self.age(category) > (spec.max_staleness if max_age is None else max_age):
+            self.update_all_contexts([category])
+        return self.get_context(category)
+
+    def age(self, category: str) -> float:
+        """Seconds since ``category`` was last refreshed (inf if never)."""
+        updated_at = self._updated_at.get(category)
+        return math.inf if updated_at is None else time.monotonic() - updated_at
+
+    def is_stale(self, category: str) -> bool:
+        """Whether ``category`` is older than its provider's ``max_staleness``."""
+        spec = self._specs.get(category)
+        return spec is not None and self.age(category) > spec.max_staleness
+
+    def get_provider_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider call counts, errors and latency (last/mean/p95/max in ms)."""
+        return {category: stats.to_dict() for category, stats in self._stats.items()}
 
     def notify_listeners(self, context_type: str, context_data: Dict[str, Any]) -> None:
         """Notify all registered listeners of a context update.
@@ -273,22 +557,25 @@ class ContextEngine(QObject):
             context_type: The type of context being updated.
             context_data: The updated context data.
         """
-        for listener_id, callbacks in self.context_listeners.items():
+        for listener_id, callbacks in list(self.context_listeners.items()):
             for callback in callbacks:
                 try:
                     callback(context_type, context_data)
                 except Exception as e:
                     logger.error(f"Error notifying listener {listener_id}: {str(e)}")
 
-    def get_context(self, category: str) -> Dict[str, Any]:
+    def get_context(self, category: str, max_age: Optional[float] = None) -> Dict[str, Any]:
         """Get the current context data for a specific category.
 
         Args:
             category: The category of context data to retrieve.
+            max_age: If given, refresh first when the data is older than this many seconds.
 
         Returns:
             Dict[str, Any]: The current context data for the category.
         """
+        if max_age is not None:
+            return self.refresh(category, max_age)
         return self.context_data.get(category, {})
 
     def get_all_contexts(self) -> Dict[str, Any]:
@@ -299,29 +586,29 @@ class ContextEngine(QObject):
         """
         return self.context_data
 
+    def _append_history(self, category: str, key: str, value: Any, timestamp: Optional[float] = None) -> None:
+        series = self.context_data["historical"].setdefault(category, {})
+        series[key] = append_sample(series.get(key), value, self.history_size, timestamp)
+
     def add_historical_context(self, category: str, key: str, value: Any) -> None:
         """Add data to historical context for trend analysis.
 
+        History is kept in fixed-size ring buffers (``history_size`` entries
+        per key, NumPy-backed for numeric values).
+
         Args:
             category: The category of context.
             key: The key for the data point.
             value: The value of the data point.
         """
-        if category not in self.context_data["historical"]:
-            self.context_data["historical"][category] = {}
-        if key not in self.context_data["historical"][category]:
-            self.context_data["historical"][category][key] = []
-        self.context_data["historical"][category][key].append(
-            {"timestamp": time.time(), "value": value}
-        )
-        # Limit history to last 100 entries to prevent unbounded growth
-        if len(self.context_data["historical"][category][key]) > 100:
-            self.context_data["historical"][category][key] = self.context_data[
-                "historical"
-            ][category][key][-100:]
+        with self._lock:
+            self._append_history(category, key, value)
         logger.debug(f"Added historical context for {category}.{key}")
-        self.notify_listeners("historical", {category: {key: value}})
-        self.context_updated.emit("historical", {category: {key: value}})
+        self._deliver({"historical": {category: {key: value}}})
+
+    def get_history_buffer(self, category: str, key: str) -> Optional[Any]:
+        """The ring buffer holding a key's history (``values()`` is a NumPy array for numeric series)."""
+        return self.context_data["historical"].get(category, {}).get(key)
 
     def get_historical_context(self, category: str, key: str) -> List[Dict[str, Any]]:
         """Get historical context data for a specific category and key.
@@ -333,4 +620,5 @@ class ContextEngine(QObject):
         Returns:
             List[Dict[str, Any]]: List of historical data points with timestamps.
         """
-        return self.context_data["historical"].get(category, {}).get(key, [])
+        buffer = self.get_history_buffer(category, key)
+        return buffer.to_list() if buffer is not None else []
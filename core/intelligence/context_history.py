@@ -0,0 +1,131 @@
+"""Fixed-size ring buffers for historical context data.
+
+Numeric series are stored in preallocated NumPy arrays, so appending never
+allocates and statistics over the window are vectorized. Other values go
+into a bounded deque with the same interface.
+"""
+
+import time
+from collections import deque
+from numbers import Real
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def is_numeric(value: Any) -> bool:
+    """Whether ``value`` can go into a ``NumericRingBuffer``."""
+    return isinstance(value, (Real, np.number)) and not isinstance(value, (bool, np.bool_))
+
+
+class NumericRingBuffer:
+    """The last ``capacity`` numeric samples with their timestamps."""
+
+    numeric = True
+
+    def __init__(self, capacity: int = 100):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value: float, timestamp: Optional[float] = None) -> None:
+        self._values[self._next] = value
+        self._timestamps[self._next] = time.time() if timestamp is None else timestamp
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        if self._size < self.capacity:
+            return array[: self._size].copy()
+        return np.concatenate((array[self._next :], array[: self._next]))
+
+    def values(self) -> np.ndarray:
+        """Samples, oldest first (a copy)."""
+        return self._ordered(self._values)
+
+    def timestamps(self) -> np.ndarray:
+        return self._ordered(self._timestamps)
+
+    def latest(self) -> Optional[float]:
+        return float(self._values[self._next - 1]) if self._size else None
+
+    def mean(self) -> float:
+        return float(self._values[: self._size].mean()) if self._size else 0.0
+
+    def percentile(self, q: float) -> float:
+        """``q``-th percentile (0-100) of the samples in the window."""
+        return float(np.percentile(self._values[: self._size], q)) if self._size else 0.0
+
+    def maximum(self) -> float:
+        return float(self._values[: self._size].max()) if self._size else 0.0
+
+    def items(self) -> List[Tuple[float, Any]]:
+        """``(timestamp, value)`` pairs, oldest first."""
+        return list(zip(self.timestamps().tolist(), self.values().tolist()))
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [{"timestamp": timestamp, "value": value} for timestamp, value in self.items()]
+
+    def __repr__(self) -> str:
+        return f"NumericRingBuffer({self._size}/{self.capacity}, latest={self.latest()})"
+
+
+class RingBuffer:
+    """The last ``capacity`` values of any type with their timestamps."""
+
+    numeric = False
+
+    def __init__(self, capacity: int = 100):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._items: Deque[Tuple[float, Any]] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def append(self, value: Any, timestamp: Optional[float] = None) -> None:
+        self._items.append((time.time() if timestamp is None else timestamp, value))
+
+    def values(self) -> List[Any]:
+        return [value for _, value in self._items]
+
+    def timestamps(self) -> List[float]:
+        return [timestamp for timestamp, _ in self._items]
+
+    def latest(self) -> Any:
+        return self._items[-1][1] if self._items else None
+
+    def items(self) -> List[Tuple[float, Any]]:
+        return list(self._items)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [{"timestamp": timestamp, "value": value} for timestamp, value in self._items]
+
+    def __repr__(self) -> str:
+        return f"RingBuffer({len(self._items)}/{self.capacity}, latest={self.latest()!r})"
+
+
+def append_sample(buffer: Optional[Any], value: Any, capacity: int, timestamp: Optional[float] = None) -> Any:
+    """Append to ``buffer``, creating or widening it as needed; returns the buffer.
+
+    A numeric buffer that receives a non-numeric value is converted to a
+    ``RingBuffer`` with the same contents.
+    """
+    numeric = is_numeric(value)
+    if buffer is None:
+        buffer = NumericRingBuffer(capacity) if numeric else RingBuffer(capacity)
+    elif buffer.numeric and not numeric:
+        widened = RingBuffer(buffer.capacity)
+        for item_timestamp, item_value in buffer.items():
+            widened.append(item_value, item_timestamp)
+        buffer = widened
+    buffer.append(value, timestamp)
+    return buffer
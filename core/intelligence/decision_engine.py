@@ -3,13 +3,24 @@ Decision Engine for Atlas
 
 This module implements the DecisionEngine class, which is responsible for making decisions based on context,
 goals, and available actions. It integrates with the ContextEngine to ensure decisions are context-aware.
+
+Strategies receive an immutable snapshot of the decision factors, taken once per factor change. Decisions for the
+same goal and strategy under unchanged factors are served from a cache, and the decision history is a bounded
+``HistoryStore`` that spills older decisions to SQLite.
 """
 
+import concurrent.futures
 import logging
-from typing import Any, Callable, Dict, List
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 from PySide6.QtCore import QObject, Signal
 
+from core.intelligence.history_store import DEFAULT_HISTORY_PATH, HistoryStore
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,17 +32,42 @@ class DecisionEngine(QObject):
     decision_made = Signal(dict)
     decision_factors_updated = Signal(dict)
 
-    def __init__(self, context_engine=None, parent=None):
+    def __init__(
+        self,
+        context_engine=None,
+        parent=None,
+        history_size: int = 500,
+        history_path: Optional[str] = DEFAULT_HISTORY_PATH,
+        cache_size: int = 256,
+        max_workers: int = 2,
+        strategy_timeout: Optional[float] = 10.0,
+    ):
         """Initialize the DecisionEngine with an optional ContextEngine.
         Args:
             context_engine: An optional ContextEngine instance to integrate with for context-aware decisions.
             parent: The parent QObject, if any.
+            history_size: Decisions kept in memory; older ones are spilled to ``history_path``.
+            history_path: SQLite file for older decisions, or None to discard them.
+            cache_size: Memoized decisions per (goal, strategy); 0 disables the cache.
+            max_workers: Threads running strategies for ``make_decision_async``.
+            strategy_timeout: Default timeout in seconds for ``make_decision_async``.
         """
         super().__init__(parent)
         self.context_engine = context_engine
         self.decision_factors = {}
-        self.decision_history = []
         self.decision_strategies = {}
+        self.history = HistoryStore("decision", "goal", capacity=history_size, path=history_path)
+        self.cache_size = cache_size
+        self.strategy_timeout = strategy_timeout
+        self.max_workers = max_workers
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.RLock()
+        # Bumped on every factor update; keys the factor snapshot and the decision cache
+        self._factors_version = 0
+        self._factors_snapshot: Tuple[int, Optional[Mapping[str, Any]]] = (-1, None)
+        self._decision_cache: "OrderedDict[Tuple[str, str], Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
         logger.info("DecisionEngine initialized")
         if self.context_engine:
             self._connect_to_context_engine()
@@ -40,10 +76,22 @@ class DecisionEngine(QObject):
         """Connect to the ContextEngine to receive context updates."""
         if self.context_engine:
             self.context_engine.register_listener(
-                "decision_engine", self.on_context_update
+                "decision_engine", self.on_context_changes, batched=True
             )
         logger.info("Connected to ContextEngine for context updates")
 
+    def on_context_changes(self, changes: Dict[str, Dict[str, Any]]):
+        """Handle one update cycle's change-set from the ContextEngine.
+        Args:
+            changes: Changed keys per context category, {category: {key: value}}.
+        """
+        logger.info(f"Received context changes: {', '.join(changes)}")
+        with self._lock:
+            for factor_type, factors in changes.items():
+                self.decision_factors.setdefault(factor_type, {}).update(factors)
+            self._factors_version += 1
+        self.decision_factors_updated.emit(self.decision_factors)
+
     def on_context_update(self, context_type: str, context_data: Dict[str, Any]):
         """Handle context updates from the ContextEngine.
         Args:
@@ -59,7 +107,9 @@ class DecisionEngine(QObject):
             factor_type: The type of factor being updated.
             factors: The new factors to consider in decision-making.
         """
-        self.decision_factors[factor_type] = factors
+        with self._lock:
+            self.decision_factors[factor_type] = factors
+            self._factors_version += 1
         logger.info(f"Updated decision factors for {factor_type}")
         self.decision_factors_updated.emit(self.decision_factors)
 
@@ -73,9 +123,26 @@ class DecisionEngine(QObject):
             strategy_name: The name of the strategy.
             strategy_func: The function implementing the decision strategy.
         """
-        self.decision_strategies[strategy_name] = strategy_func
+        with self._lock:
+            self.decision_strategies[strategy_name] = strategy_func
+            for key in [key for key in self._decision_cache if key[1] == strategy_name]:
+                del self._decision_cache[key]
         logger.info(f"Registered decision strategy: {strategy_name}")
 
+    def factors_snapshot(self) -> Mapping[str, Any]:
+        """Read-only copy of the decision factors, shared until the factors change next."""
+        with self._lock:
+            version, snapshot = self._factors_snapshot
+            if version != self._factors_version or snapshot is None:
+                snapshot = MappingProxyType(
+                    {
+                        factor_type: MappingProxyType(dict(factors)) if isinstance(factors, dict) else factors
+                        for factor_type, factors in self.decision_factors.items()
+                    }
+                )
+                self._factors_snapshot = (self._factors_version, snapshot)
+            return snapshot
+
     def make_decision(
         self, goal: str, strategy_name: str = "default"
     ) -> Dict[str, Any]:
@@ -86,22 +153,130 @@ class DecisionEngine(QObject):
         Returns:
             A dictionary containing the decision details.
         """
-        if strategy_name not in self.decision_strategies:
+        cached = self._cached_decision(goal, strategy_name)
+        if cached is not None:
+            return self._record(cached)
+        version, factors = self._factors_version, self.factors_snapshot()
+        decision = self._evaluate(goal, strategy_name, factors)
+        return self._record(self._remember(goal, strategy_name, version, decision))
+
+    def make_decision_async(
+        self, goal: str, strategy_name: str = "default", timeout: Optional[float] = None
+    ) -> "concurrent.futures.Future[Dict[str, Any]]":
+        """Make a decision on the worker pool instead of the calling (often GUI) thread.
+        Args:
+            goal: The goal to achieve with this decision.
+            strategy_name: The name of the strategy to use for decision-making.
+            timeout: Seconds the strategy may run (defaults to ``strategy_timeout``, None for no limit).
+        Returns:
+            A future resolving to the decision, or failing with the strategy's exception or TimeoutError.
+            ``decision_made`` is emitted as for ``make_decision``.
+        """
+        result: "concurrent.futures.Future[Dict[str, Any]]" = concurrent.futures.Future()
+        cached = self._cached_decision(goal, strategy_name)
+        if cached is not None:
+            result.set_result(self._record(cached))
+            return result
+
+        version, factors = self._factors_version, self.factors_snapshot()
+        timeout = self.strategy_timeout if timeout is None else timeout
+        timer: Optional[threading.Timer] = None
+
+        def finish(task: "concurrent.futures.Future[Dict[str, Any]]") -> None:
+            if timer is not None:
+                timer.cancel()
+            if result.done():
+                logger.warning(f"Discarding late decision for goal: {goal} (strategy {strategy_name} timed out)")
+                return
+            try:
+                decision = self._record(self._remember(goal, strategy_name, version, task.result()))
+            except BaseException as e:
+                self._resolve(result, exception=e)
+            else:
+                self._resolve(result, value=decision)
+
+        def expire() -> None:
+            message = f"Strategy {strategy_name} exceeded {timeout:.1f}s for goal: {goal}"
+            if self._resolve(result, exception=TimeoutError(message)):
+                logger.warning(message)
+
+        task = self._get_executor().submit(self._evaluate, goal, strategy_name, factors)
+        if timeout:
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+        task.add_done_callback(finish)
+        return result
+
+    @staticmethod
+    def _resolve(
+        future: "concurrent.futures.Future[Dict[str, Any]]",
+        value: Optional[Dict[str, Any]] = None,
+        exception: Optional[BaseException] = None,
+    ) -> bool:
+        """Complete ``future`` unless the result or the timeout got there first."""
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(value)
+            return True
+        except concurrent.futures.InvalidStateError:
+            return False
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="DecisionStrategy"
+                )
+            return self._executor
+
+    def _evaluate(self, goal: str, strategy_name: str, factors: Mapping[str, Any]) -> Dict[str, Any]:
+        """Run a strategy (or the default logic) against a factor snapshot."""
+        strategy = self.decision_strategies.get(strategy_name)
+        if strategy is None:
             logger.warning(f"Strategy {strategy_name} not found, using default logic")
-            decision = self._default_decision_logic(goal)
+            decision = self._default_decision_logic(goal, factors)
         else:
-            decision = self.decision_strategies[strategy_name](self.decision_factors)
+            decision = dict(strategy(factors))
         decision["goal"] = goal
         decision["strategy_used"] = strategy_name
-        self.decision_history.append(decision)
-        logger.info(f"Decision made for goal: {goal} using strategy: {strategy_name}")
+        return decision
+
+    def _cached_decision(self, goal: str, strategy_name: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_size:
+            return None
+        with self._lock:
+            entry = self._decision_cache.get((goal, strategy_name))
+            if entry is None or entry[0] != self._factors_version:
+                self.cache_misses += 1
+                return None
+            self._decision_cache.move_to_end((goal, strategy_name))
+            self.cache_hits += 1
+            return {**entry[1], "cached": True}
+
+    def _remember(self, goal: str, strategy_name: str, version: int, decision: Dict[str, Any]) -> Dict[str, Any]:
+        if self.cache_size:
+            with self._lock:
+                self._decision_cache[(goal, strategy_name)] = (version, dict(decision))
+                self._decision_cache.move_to_end((goal, strategy_name))
+                while len(self._decision_cache) > self.cache_size:
+                    self._decision_cache.popitem(last=False)
+        return decision
+
+    def _record(self, decision: Dict[str, Any]) -> Dict[str, Any]:
+        decision["timestamp"] = time.time()
+        self.history.append(decision)
+        logger.info(f"Decision made for goal: {decision['goal']} using strategy: {decision['strategy_used']}")
         self.decision_made.emit(decision)
         return decision
 
-    def _default_decision_logic(self, goal: str) -> Dict[str, Any]:
+    def _default_decision_logic(self, goal: str, factors: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
         """Default decision-making logic when no specific strategy is defined.
         Args:
             goal: The goal to achieve with this decision.
+            factors: The factor snapshot to decide on (defaults to the current factors).
         Returns:
             A dictionary with the decision details.
         """
@@ -109,17 +284,50 @@ class DecisionEngine(QObject):
         return {
             "decision": f"Action towards {goal}",
             "confidence": 0.5,
-            "factors_considered": list(self.decision_factors.keys()),
+            "factors_considered": list((self.decision_factors if factors is None else factors).keys()),
         }
 
-    def get_decision_history(self) -> List[Dict[str, Any]]:
+    @property
+    def decision_history(self) -> List[Dict[str, Any]]:
+        """The decisions still held in memory, oldest first (a copy)."""
+        return self.history.recent()
+
+    def get_decision_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Retrieve the history of decisions made.
+        Args:
+            limit: Return only the most recent ``limit`` decisions.
+        Returns:
+            A list of dictionaries containing past decisions held in memory, oldest first (a copy).
+        """
+        return self.history.recent(limit)
+
+    def query_decision_history(
+        self,
+        goal: Optional[str] = None,
+        strategy_name: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Search past decisions, including those spilled to disk.
         Returns:
-            A list of dictionaries containing past decisions.
+            Up to ``limit`` of the newest matching decisions, oldest first.
         """
-        return self.decision_history
+        return self.history.query(goal, strategy_name, since, until, limit)
 
     def clear_decision_history(self):
         """Clear the history of decisions made."""
-        self.decision_history = []
+        self.history.clear()
         logger.info("Decision history cleared")
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._decision_cache)}
+
+    def shutdown(self):
+        """Stop the strategy workers and write out pending history."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.history.close()
@@ -0,0 +1,231 @@
+"""Bounded history of decisions and improvements.
+
+The newest records are kept in a fixed-size in-memory ring buffer. Records
+that fall out of it are spilled in batches to SQLite, where they stay
+queryable by key (goal or area), strategy and time. The database is only
+opened once something is spilled, so short sessions never touch the disk.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_PATH = os.path.expanduser("~/.atlas/intelligence/history.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT,
+    strategy TEXT,
+    timestamp REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_kind_key ON history (kind, key, timestamp);
+CREATE INDEX IF NOT EXISTS history_kind_strategy ON history (kind, strategy, timestamp);
+CREATE INDEX IF NOT EXISTS history_kind_time ON history (kind, timestamp);
+"""
+
+
+class HistoryStore:
+    """Ring buffer of recent records with SQLite spill-over."""
+
+    def __init__(
+        self,
+        kind: str,
+        key_field: str,
+        strategy_field: str = "strategy_used",
+        capacity: int = 500,
+        path: Optional[str] = DEFAULT_HISTORY_PATH,
+        max_rows: int = 100000,
+        spill_batch: int = 50,
+    ):
+        """
+        Args:
+            kind: Record type ("decision", "improvement"); several stores can share one database.
+            key_field: Record field indexed as the key (e.g. "goal").
+            strategy_field: Record field indexed as the strategy.
+            capacity: Records kept in memory.
+            path: SQLite file for spilled records, ":memory:", or None to drop them.
+            max_rows: Spilled records kept per kind; the oldest are deleted beyond this.
+            spill_batch: Evicted records written per transaction.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.kind = kind
+        self.key_field = key_field
+        self.strategy_field = strategy_field
+        self.capacity = capacity
+        self.path = path
+        self.max_rows = max_rows
+        self.spill_batch = spill_batch
+        self._records: Deque[Dict[str, Any]] = deque()
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.spilled = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Add a record (a "timestamp" is added if missing)."""
+        record.setdefault("timestamp", time.time())
+        with self._lock:
+            self._records.append(record)
+            if len(self._records) > self.capacity:
+                evicted = self._records.popleft()
+                if self.path is not None:
+                    self._pending.append(evicted)
+                    if len(self._pending) >= self.spill_batch:
+                        self._flush()
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The in-memory records, oldest first (a copy of the list)."""
+        with self._lock:
+            records = list(self._records)
+        if limit is None:
+            return records
+        return records[-limit:] if limit > 0 else []
+
+    def query(
+        self,
+        key: Optional[str] = None,
+        strategy: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """The newest ``limit`` matching records from memory and disk, oldest first."""
+        if limit <= 0:
+            return []
+        with self._lock:
+            matches = [
+                record for record in reversed(self._records) if self._matches(record, key, strategy, since, until)
+            ][:limit]
+            if len(matches) < limit and self.path is not None:
+                self._flush()
+                matches.extend(self._query_disk(key, strategy, since, until, limit - len(matches)))
+        matches.reverse()
+        return matches
+
+    def total(self) -> int:
+        """Records in memory plus records spilled to disk."""
+        with self._lock:
+            self._flush()
+            on_disk = 0
+            if self._conn is not None:
+                on_disk = self._conn.execute("SELECT COUNT(*) FROM history WHERE kind = ?", (self.kind,)).fetchone()[0]
+            return len(self._records) + on_disk
+
+    def clear(self) -> None:
+        """Forget all records, in memory and on disk."""
+        with self._lock:
+            self._records.clear()
+            self._pending.clear()
+            if self._conn is None and self.path not in (None, ":memory:") and os.path.exists(self.path):
+                self._connect()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM history WHERE kind = ?", (self.kind,))
+
+    def flush(self) -> None:
+        """Write records waiting to be spilled."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _matches(
+        self,
+        record: Dict[str, Any],
+        key: Optional[str],
+        strategy: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+    ) -> bool:
+        if key is not None and record.get(self.key_field) != key:
+            return False
+        if strategy is not None and record.get(self.strategy_field) != strategy:
+            return False
+        timestamp = record.get("timestamp", 0.0)
+        if since is not None and timestamp < since:
+            return False
+        return until is None or timestamp <= until
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            conn = self._connect()
+            rows = [
+                (
+                    self.kind,
+                    _text(record.get(self.key_field)),
+                    _text(record.get(self.strategy_field)),
+                    record.get("timestamp", 0.0),
+                    json.dumps(record, default=str),
+                )
+                for record in pending
+            ]
+            with conn:
+                conn.executemany(
+                    "INSERT INTO history (kind, key, strategy, timestamp, payload) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                if self.max_rows:
+                    conn.execute(
+                        "DELETE FROM history WHERE kind = ? AND id <= "
+                        "(SELECT id FROM history WHERE kind = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (self.kind, self.kind, self.max_rows),
+                    )
+            self.spilled += len(rows)
+        except sqlite3.Error as e:
+            logger.error("Failed to spill %d %s records to %s: %s", len(pending), self.kind, self.path, e)
+
+    def _query_disk(
+        self,
+        key: Optional[str],
+        strategy: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        if self._conn is None:
+            return []
+        clauses, params = ["kind = ?"], [self.kind]
+        filters = (("key = ?", key), ("strategy = ?", strategy), ("timestamp >= ?", since), ("timestamp <= ?", until))
+        for clause, value in filters:
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        rows = self._conn.execute(
+            f"SELECT payload FROM history WHERE {' AND '.join(clauses)} ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
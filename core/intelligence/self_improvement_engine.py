@@ -6,10 +6,12 @@ generating improvement plans, and executing self-modification strategies to enha
 """
 
 import logging
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from PySide6.QtCore import QObject, Signal
 
+from core.intelligence.history_store import DEFAULT_HISTORY_PATH, HistoryStore
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,20 +24,29 @@ class SelfImprovementEngine(QObject):
     improvement_plan_updated = Signal(dict)
     improvement_executed = Signal(dict)
 
-    def __init__(self, context_engine=None, decision_engine=None, parent=None):
+    def __init__(
+        self,
+        context_engine=None,
+        decision_engine=None,
+        parent=None,
+        history_size: int = 500,
+        history_path: Optional[str] = DEFAULT_HISTORY_PATH,
+    ):
         """Initialize the SelfImprovementEngine with optional ContextEngine and DecisionEngine.
 
         Args:
             context_engine: An optional ContextEngine instance for context-aware improvements.
             decision_engine: An optional DecisionEngine instance for decision-making support.
             parent: The parent QObject, if any.
+            history_size: Improvement results kept in memory; older ones are spilled to ``history_path``.
+            history_path: SQLite file for older results, or None to discard them.
         """
         super().__init__(parent)
         self.context_engine = context_engine
         self.decision_engine = decision_engine
         self.improvement_areas = {}
         self.improvement_plans = {}
-        self.improvement_history = []
+        self.history = HistoryStore("improvement", "area", capacity=history_size, path=history_path)
         self.improvement_strategies = {}
         logger.info("SelfImprovementEngine initialized")
 
@@ -209,7 +220,7 @@ class SelfImprovementEngine(QObject):
 
         result["area"] = area_type
         result["strategy_used"] = strategy_name
-        self.improvement_history.append(result)
+        self.history.append(result)
         logger.info(
             f"Executed improvement plan for {area_type} using strategy: {strategy_name}"
         )
@@ -231,15 +242,38 @@ class SelfImprovementEngine(QObject):
             "improvement_details": self.improvement_plans[area_type].get("steps", []),
         }
 
-    def get_improvement_history(self) -> List[Dict[str, Any]]:
+    @property
+    def improvement_history(self) -> List[Dict[str, Any]]:
+        """The improvement results still held in memory, oldest first (a copy)."""
+        return self.history.recent()
+
+    def get_improvement_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Retrieve the history of improvements made.
 
+        Args:
+            limit: Return only the most recent ``limit`` results.
+
+        Returns:
+            A list of dictionaries containing past improvement results held in memory, oldest first (a copy).
+        """
+        return self.history.recent(limit)
+
+    def query_improvement_history(
+        self,
+        area_type: Optional[str] = None,
+        strategy_name: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Search past improvement results, including those spilled to disk.
+
         Returns:
-            A list of dictionaries containing past improvement results.
+            Up to ``limit`` of the newest matching results, oldest first.
         """
-        return self.improvement_history
+        return self.history.query(area_type, strategy_name, since, until, limit)
 
     def clear_improvement_history(self):
         """Clear the history of improvements made."""
-        self.improvement_history = []
+        self.history.clear()
         logger.info("Improvement history cleared")
@@ -0,0 +1,545 @@
+"""
+Non-blocking logging pipeline for Atlas.
+
+All Atlas logging stacks (``core.logging``, ``core.atlas_logging`` and
+``utils.logger``) enqueue records through a ``QueueHandler`` and a single
+background listener thread does formatting, redaction and file I/O. Records are
+routed to named sink sets, so each stack keeps its own output format while
+sharing one queue and one writer thread.
+
+A forked child (for example a ``ProcessPoolExecutor`` worker) has no listener
+thread, so pipelines switch to direct mode there: records are written to the
+sinks on the logging thread and flushed immediately, because workers may exit
+without running ``atexit`` handlers. The pipeline's locks are held across
+``fork()`` so the child never inherits one in a locked state.
+"""
+
+import atexit
+import contextlib
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import weakref
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Dict, Iterable, List, Optional, Pattern
+
+# Default log directory and file
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "logs")
+DEFAULT_LOG_FILE = os.path.join(LOG_DIR, "atlas.log")
+
+# Sensitive data patterns to redact
+SENSITIVE_PATTERNS = [
+    re.compile(r"(password|secret|key|token|api_key|access_token)=[^&\s]+", re.IGNORECASE),
+    re.compile(r"\b\d{16}\b"),  # Credit card numbers
+    re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # SSN
+]
+
+# Record attribute carrying the route a record was enqueued on
+ROUTE_ATTRIBUTE = "atlas_route"
+
+# Default route used by the core logging stacks
+DEFAULT_ROUTE = "atlas"
+
+REDACTED = "[REDACTED]"
+
+
+class Redactor:
+    """Redacts sensitive data with one combined regex and a character pre-filter."""
+
+    def __init__(self, patterns: Iterable[Pattern[str]], candidate_chars: Optional[str] = None):
+        """
+        Compile patterns into a single alternation.
+
+        Args:
+            patterns: Compiled patterns; their flags are preserved per branch
+            candidate_chars: Characters at least one of which must appear in a message
+                             for any pattern to match. Messages without any of them are
+                             returned unchanged without running the regex.
+        """
+        branches = []
+        for pattern in patterns:
+            flags = "i" if pattern.flags & re.IGNORECASE else ""
+            source = pattern.pattern
+            branches.append(f"(?{flags}:{source})" if flags else f"(?:{source})")
+        self._pattern = re.compile("|".join(branches)) if branches else None
+        self._candidates = frozenset(candidate_chars) if candidate_chars else None
+
+    def redact(self, message: str) -> str:
+        """
+        Replace every sensitive match in ``message`` with a placeholder.
+
+        Args:
+            message: The original message
+
+        Returns:
+            str: The message with sensitive data redacted
+        """
+        if self._pattern is None:
+            return message
+        if self._candidates is not None and self._candidates.isdisjoint(message):
+            return message
+        return self._pattern.sub(REDACTED, message)
+
+
+# Every default pattern needs either "=" or a digit to match
+DEFAULT_REDACTOR = Redactor(SENSITIVE_PATTERNS, candidate_chars="=0123456789")
+
+
+def redact_sensitive_data(message: str) -> str:
+    """
+    Redact sensitive information from log messages.
+
+    Args:
+        message (str): The original log message
+
+    Returns:
+        str: The message with sensitive data redacted
+    """
+    return DEFAULT_REDACTOR.redact(message)
+
+
+class RedactingFormatter(logging.Formatter):
+    """Formatter that redacts sensitive information from log messages."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the log record and redact sensitive data."""
+        return DEFAULT_REDACTOR.redact(super().format(record))
+
+
+class RateLimitFilter(logging.Filter):
+    """Per-logger token bucket with optional sampling of low-severity records.
+
+    Records at or above ``exempt_level`` always pass.
+    """
+
+    def __init__(
+        self,
+        rate: float = 200.0,
+        burst: int = 500,
+        sample_every: Optional[Dict[int, int]] = None,
+        exempt_level: int = logging.WARNING,
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            rate: Records per second allowed per logger
+            burst: Bucket capacity per logger
+            sample_every: Map of level to N, keeping every Nth record at that level
+            exempt_level: Records at or above this level are never dropped
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = dict(sample_every or {})
+        self.exempt_level = exempt_level
+        self.rate_limited = 0
+        self.sampled_out = 0
+        self._buckets: Dict[str, List[float]] = {}
+        self._sample_counters: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return False for records that are sampled out or over the rate limit."""
+        if record.levelno >= self.exempt_level:
+            return True
+
+        with self._lock:
+            every = self.sample_every.get(record.levelno)
+            if every and every > 1:
+                counter_key = (record.name, record.levelno)
+                count = self._sample_counters.get(counter_key, 0)
+                self._sample_counters[counter_key] = count + 1
+                if count % every:
+                    self.sampled_out += 1
+                    return False
+
+            now = time.monotonic()
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [float(self.burst), now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                self.rate_limited += 1
+                return False
+            bucket[0] = tokens - 1.0
+            return True
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler with size and age rotation and batched flushes.
+
+    Intended to run on the pipeline's listener thread; records are written to the
+    file buffer and flushed every ``flush_records`` records or ``flush_interval``
+    seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        rotate_interval: Optional[float] = None,
+        flush_records: int = 64,
+        flush_interval: float = 1.0,
+        encoding: Optional[str] = "utf-8",
+    ):
+        """
+        Initialize the handler.
+
+        Args:
+            filename: Log file path
+            max_bytes: Rotate when the file would exceed this size (0 disables)
+            backup_count: Number of rotated files to keep
+            rotate_interval: Rotate when the current file is older than this many seconds
+            flush_records: Flush after this many buffered records
+            flush_interval: Flush when the oldest buffered record is this many seconds old
+            encoding: File encoding
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+        self.rotate_interval = rotate_interval
+        self.flush_records = max(1, flush_records)
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._opened_at = time.monotonic()
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        """Rotate on size (as RotatingFileHandler) or on file age."""
+        if self.rotate_interval and time.monotonic() - self._opened_at >= self.rotate_interval:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        """Rotate the file and reset the age timer."""
+        super().doRollover()
+        self._opened_at = time.monotonic()
+        self._pending = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write the record to the file buffer, flushing in batches."""
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+            if (
+                self._pending >= self.flush_records
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Flush buffered records to disk."""
+        super().flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+
+class _PipelineQueueHandler(QueueHandler):
+    """QueueHandler that tags records with a route and never blocks the caller."""
+
+    def __init__(self, pipeline: "LogPipeline", route: str):
+        super().__init__(pipeline.queue)
+        self._pipeline = pipeline
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        setattr(record, ROUTE_ATTRIBUTE, self.route)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._pipeline.direct:
+            self._pipeline._dispatch(record, flush=True)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._pipeline._record_drop()
+            return
+        self._pipeline._record_enqueue()
+
+
+class _RoutingQueueListener(QueueListener):
+    """QueueListener that dispatches records to the sinks of their route."""
+
+    def __init__(self, pipeline: "LogPipeline"):
+        super().__init__(pipeline.queue, respect_handler_level=True)
+        self._pipeline = pipeline
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        # Wake up periodically while idle so batched sinks get flushed
+        while True:
+            try:
+                return self.queue.get(block, self._pipeline.flush_interval)
+            except queue.Empty:
+                self._pipeline.flush()
+
+    def handle(self, record: logging.LogRecord) -> None:
+        self._pipeline._dispatch(record)
+
+
+class LogPipeline:
+    """Single-queue logging pipeline with a background writer thread."""
+
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        flush_interval: float = 1.0,
+        rate_limit: Optional[RateLimitFilter] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            queue_size: Maximum number of queued records; further records are dropped
+            flush_interval: Seconds between idle flushes of the sinks
+            rate_limit: Optional filter applied on the calling thread before enqueueing
+        """
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+        self.flush_interval = flush_interval
+        self.rate_limit = rate_limit
+        self._routes: Dict[str, List[logging.Handler]] = {}
+        self._handlers: Dict[str, _PipelineQueueHandler] = {}
+        self._listener: Optional[_RoutingQueueListener] = None
+        self._lock = threading.Lock()
+        self._enqueued = 0
+        self._dropped = 0
+        self._written = 0
+        self._max_depth = 0
+        # True in a forked child, where records are written on the calling thread
+        self.direct = False
+        self._held: List = []
+        _pipelines.add(self)
+
+    def add_sink(self, route: str, handler: logging.Handler) -> None:
+        """
+        Attach an output handler to a route.
+
+        Args:
+            route: Route name
+            handler: Handler run on the listener thread for records of this route
+        """
+        with self._lock:
+            self._routes[route] = self._routes.get(route, []) + [handler]
+
+    def ensure_route(self, route: str, factory: Callable[[], Iterable[logging.Handler]]) -> None:
+        """
+        Create a route's sinks with ``factory`` unless the route already exists.
+
+        Args:
+            route: Route name
+            factory: Callable returning the route's output handlers
+        """
+        with self._lock:
+            if route in self._routes:
+                return
+            self._routes[route] = list(factory())
+
+    def sinks(self, route: str) -> List[logging.Handler]:
+        """
+        Get the output handlers of a route.
+
+        Args:
+            route: Route name
+
+        Returns:
+            List[logging.Handler]: Handlers for the route
+        """
+        return self._routes.get(route, [])
+
+    def handler(self, route: str = DEFAULT_ROUTE) -> logging.Handler:
+        """
+        Get the non-blocking handler that feeds a route, starting the pipeline.
+
+        Args:
+            route: Route name
+
+        Returns:
+            logging.Handler: Handler to attach to loggers
+        """
+        with self._lock:
+            handler = self._handlers.get(route)
+            if handler is None:
+                handler = _PipelineQueueHandler(self, route)
+                if self.rate_limit is not None:
+                    handler.addFilter(self.rate_limit)
+                self._handlers[route] = handler
+        self.start()
+        return handler
+
+    def start(self) -> None:
+        """Start the background listener thread if it is not running."""
+        with self._lock:
+            if self._listener is None and not self.direct:
+                self._listener = _RoutingQueueListener(self)
+                self._listener.start()
+
+    def stop(self) -> None:
+        """Drain the queue, stop the listener and flush all sinks."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+        self.flush()
+
+    def flush(self) -> None:
+        """Flush every sink."""
+        for handlers in list(self._routes.values()):
+            for handler in handlers:
+                with contextlib.suppress(Exception):
+                    handler.flush()
+
+    def _dispatch(self, record: logging.LogRecord, flush: bool = False) -> None:
+        """Write a record to the sinks of its route."""
+        route = getattr(record, ROUTE_ATTRIBUTE, DEFAULT_ROUTE)
+        for handler in self.sinks(route):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+                if flush:
+                    handler.flush()
+        self._record_written()
+
+    def _fork_locks(self) -> List:
+        locks = [self._lock, self.queue.mutex]
+        for handlers in self._routes.values():
+            locks.extend(handler.lock for handler in handlers if handler.lock is not None)
+        return locks
+
+    def _before_fork(self) -> None:
+        # Empty the sinks' buffers first so the child cannot write them a second time
+        locks = self._fork_locks()
+        for lock in locks:
+            lock.acquire()
+        self._held = locks
+        self.flush()
+
+    def _after_fork_in_parent(self) -> None:
+        for lock in reversed(self._held):
+            lock.release()
+        self._held = []
+
+    def _after_fork_in_child(self) -> None:
+        # Sink locks are reinitialized by logging itself; the rest are replaced
+        self._held = []
+        self._lock = threading.Lock()
+        self._listener = None
+        self.direct = True
+        # Records still queued belong to the parent, which writes them
+        self.queue = queue.Queue(self.queue.maxsize)
+        for handler in self._handlers.values():
+            handler.queue = self.queue
+        if self.rate_limit is not None:
+            self.rate_limit._lock = threading.Lock()
+
+    def _record_enqueue(self) -> None:
+        self._enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self._max_depth:
+            self._max_depth = depth
+
+    def _record_drop(self) -> None:
+        self._dropped += 1
+
+    def _record_written(self) -> None:
+        self._written += 1
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Get pipeline metrics.
+
+        Returns:
+            Dict[str, int]: Queue depth, enqueued/written/dropped counts and rate-limit drops
+        """
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self._max_depth,
+            "enqueued": self._enqueued,
+            "written": self._written,
+            "dropped": self._dropped,
+            "rate_limited": self.rate_limit.rate_limited if self.rate_limit else 0,
+            "sampled_out": self.rate_limit.sampled_out if self.rate_limit else 0,
+        }
+
+
+# Every live pipeline, so fork hooks can reach them without keeping them alive
+_pipelines: "weakref.WeakSet[LogPipeline]" = weakref.WeakSet()
+
+
+def _before_fork() -> None:
+    for pipeline in list(_pipelines):
+        pipeline._before_fork()
+
+
+def _after_fork_in_parent() -> None:
+    for pipeline in list(_pipelines):
+        pipeline._after_fork_in_parent()
+
+
+def _after_fork_in_child() -> None:
+    for pipeline in list(_pipelines):
+        pipeline._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork, after_in_parent=_after_fork_in_parent, after_in_child=_after_fork_in_child
+    )
+
+# Global pipeline instance
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """
+    Get the process-wide logging pipeline, creating it on first use.
+
+    Returns:
+        LogPipeline: Shared pipeline
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = LogPipeline(rate_limit=RateLimitFilter())
+                atexit.register(_pipeline.stop)
+    return _pipeline
+
+
+def _default_sinks() -> List[logging.Handler]:
+    """Create the console and rotating file sinks for the default route."""
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(RedactingFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    file_handler = BatchingRotatingFileHandler(DEFAULT_LOG_FILE)
+    file_handler.setFormatter(
+        RedactingFormatter("%(asctime)s - %(name)s - %(levelname)s - %(pathname)s:%(lineno)d - %(message)s")
+    )
+    return [console_handler, file_handler]
+
+
+def get_atlas_handler() -> logging.Handler:
+    """
+    Get the pipeline handler for the default Atlas log (console and logs/atlas.log).
+
+    Returns:
+        logging.Handler: Non-blocking handler feeding the default route
+    """
+    pipeline = get_log_pipeline()
+    pipeline.ensure_route(DEFAULT_ROUTE, _default_sinks)
+    return pipeline.handler(DEFAULT_ROUTE)
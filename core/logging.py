@@ -2,11 +2,18 @@
 Logging Module for Atlas
 
 This module provides a centralized logging utility for the Atlas application.
+Records are handed to the shared non-blocking pipeline in ``core.log_pipeline``;
+formatting and file I/O happen on its background thread.
 """
 
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+
+from core.log_pipeline import (
+    BatchingRotatingFileHandler,
+    get_atlas_handler,
+    get_log_pipeline,
+)
 
 
 def get_logger(name):
@@ -23,33 +30,10 @@ def get_logger(name):
     if not logger.handlers:  # Only configure if not already configured
         logger.setLevel(logging.INFO)
 
-        # Create logs directory if it doesn't exist
-        logs_dir = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "..", "logs"
-        )
-        os.makedirs(logs_dir, exist_ok=True)
-
-        # Configure file handler with rotation
-        log_file = os.path.join(logs_dir, "atlas.log")
-        file_handler = RotatingFileHandler(
-            log_file, maxBytes=10485760, backupCount=5
-        )  # 10MB per file, 5 backups
-        file_handler.setLevel(logging.INFO)
-
-        # Configure stream handler for console output
-        stream_handler = logging.StreamHandler()
-        stream_handler.setLevel(logging.INFO)
-
-        # Define log format
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        file_handler.setFormatter(formatter)
-        stream_handler.setFormatter(formatter)
-
-        # Add handlers to logger
-        logger.addHandler(file_handler)
-        logger.addHandler(stream_handler)
+        # Console output and logs/atlas.log (10MB per file, 5 backups) are
+        # written by the logging pipeline's background thread
+        handler = get_atlas_handler()
+        logger.addHandler(handler)
 
     return logger
 
@@ -69,26 +53,30 @@ def setup_logging(log_file: str = "atlas.log", log_level: int = logging.INFO) ->
     # Clear any existing handlers
     logger.handlers = []
 
-    # Create file handler with rotation
-    file_handler = RotatingFileHandler(
-        log_file, maxBytes=1024 * 1024 * 5, backupCount=3
-    )
-    file_handler.setLevel(log_level)
-
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    def _sinks():
+        # Create file handler with rotation
+        file_handler = BatchingRotatingFileHandler(
+            log_file, max_bytes=1024 * 1024 * 5, backup_count=3
+        )
+
+        # Create console handler
+        console_handler = logging.StreamHandler()
+
+        # Create formatter
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        console_handler.setFormatter(formatter)
+        return [file_handler, console_handler]
+
+    pipeline = get_log_pipeline()
+    route = f"file:{os.path.abspath(log_file)}"
+    pipeline.ensure_route(route, _sinks)
+
+    handler = pipeline.handler(route)
+    handler.setLevel(log_level)
+    logger.addHandler(handler)
 
     logger.info("Logging initialized for Atlas")
 
@@ -5,14 +5,14 @@ This module provides a system for registering, loading, and managing the lifecyc
 of application modules, including dependency resolution.
 """
 
-import importlib
-import inspect
+import ast
+import importlib.util
 import logging
 import os
 import pkgutil
 from typing import Any, Dict, List, Optional, Set, Type
 
-from .lazy_loader import lazy_import
+from .lazy_loader import LazyLoader, lazy_import
 
 logger = logging.getLogger(__name__)
 
@@ -204,8 +204,23 @@ MODULE_REGISTRY = ModuleRegistry()
 MODULES: Dict[str, Type[Any]] = {}
 
 
+def _class_names(path: str) -> List[str]:
+    """Names of the classes defined at the top level of a source file."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            tree = ast.parse(handle.read(), filename=path)
+    except (OSError, SyntaxError, ValueError) as e:
+        logger.warning(f"Cannot parse {path}: {e}")
+        return []
+    return [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+
+
 def load_all_modules(package_name: str, base_path: Optional[str] = None) -> None:
-    """Dynamically load all modules in the specified package.
+    """Register every class defined in the modules of a package.
+
+    Modules are not imported here: class names are read from the source and
+    registered as lazy loaders that import the module on first
+    ``get_module`` call.
 
     Args:
         package_name (str): Name of the package to load modules from
@@ -213,26 +228,24 @@ def load_all_modules(package_name: str, base_path: Optional[str] = None) -> None
     """
     if base_path is None:
         # Get the path of the package
-        package = importlib.import_module(package_name)
-        base_path = os.path.dirname(package.__file__)
+        spec = importlib.util.find_spec(package_name)
+        if spec is None or not spec.submodule_search_locations:
+            logger.error(f"Package not found: {package_name}")
+            return
+        base_path = list(spec.submodule_search_locations)[0]
 
     # Iterate through all modules in the package
-    for _, module_name, is_pkg in pkgutil.walk_packages([base_path]):
+    for _, module_name, is_pkg in pkgutil.iter_modules([base_path]):
         full_module_name = f"{package_name}.{module_name}"
-        try:
-            if is_pkg:
-                # If it's a package, recurse into it
-                load_all_modules(full_module_name, os.path.join(base_path, module_name))
-            else:
-                # Import the module
-                module = importlib.import_module(full_module_name)
-                # Find all classes in the module and register them if they have a name
-                for name, obj in inspect.getmembers(module):
-                    if inspect.isclass(obj) and hasattr(obj, "__name__"):
-                        MODULES[f"{full_module_name}.{name}"] = obj
-                        print(f"Registered module: {full_module_name}.{name}")
-        except Exception as e:
-            print(f"Error loading module {full_module_name}: {e}")
+        if is_pkg:
+            # If it's a package, recurse into it
+            load_all_modules(full_module_name, os.path.join(base_path, module_name))
+            continue
+        source = os.path.join(base_path, f"{module_name}.py")
+        for name in _class_names(source):
+            if f"{full_module_name}.{name}" not in MODULES:
+                MODULES[f"{full_module_name}.{name}"] = lazy_import(full_module_name, name)
+                logger.debug(f"Registered module: {full_module_name}.{name}")
 
 
 def initialize_module(module_class: Type[Any], *args, **kwargs) -> Any:
@@ -258,7 +271,14 @@ def get_module(module_name: str) -> Optional[Type[Any]]:
     Returns:
         Optional[Type[Any]]: The module class if found, None otherwise
     """
-    return MODULES.get(module_name)
+    module_class = MODULES.get(module_name)
+    if isinstance(module_class, LazyLoader):
+        try:
+            module_class = MODULES[module_name] = module_class.get()
+        except (ImportError, AttributeError) as e:
+            logger.error(f"Error loading module {module_name}: {e}")
+            return None
+    return module_class
 
 
 def register_module(module_name: str, module_class: Type[Any]) -> None:
@@ -0,0 +1,525 @@
+"""
+Out-of-process plugin host.
+
+Plugins run in worker processes (``core/plugin_worker.py``) so a plugin that
+crashes, leaks memory or spins the CPU cannot take the application down
+with it. Plugins without resource limits share a small pool of workers;
+plugins with limits (``PluginLimits`` or the manifest's ``limits``) get a
+dedicated worker with ``RLIMIT_CPU`` / ``RLIMIT_AS`` applied.
+
+Workers that exit unexpectedly are restarted (up to ``max_restarts`` within
+``restart_window`` seconds) and their plugins are loaded and initialized
+again; calls in flight fail with ``PluginCrashedError``. The round-trip
+latency of every call is recorded per plugin, and ``broadcast_event``
+batches events so each worker receives one message per batch instead of one
+per event and plugin.
+
+Example::
+
+    host = PluginHost()
+    plugin = host.load(manifest)  # a RemotePlugin proxy
+    plugin.initialize()
+    host.broadcast_event("sample_event", {"value": 1})
+    host.metrics()["sample_plugin"]["p95_ms"]
+"""
+
+import itertools
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from core import plugin_worker
+from core.plugin_manifest import PluginManifest
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_SCRIPT = os.path.abspath(plugin_worker.__file__)
+
+
+class PluginCrashedError(RuntimeError):
+    """The worker process hosting a plugin exited."""
+
+
+class RemotePluginError(RuntimeError):
+    """A plugin raised an exception in its worker process.
+
+    Attributes:
+        remote_type (str): Class name of the original exception.
+        remote_traceback (str): Formatted traceback from the worker.
+    """
+
+    def __init__(self, plugin: str, error: Dict[str, Any]):
+        super().__init__(f"{plugin}: {error.get('type')}: {error.get('message')}")
+        self.plugin = plugin
+        self.remote_type = error.get("type", "Exception")
+        self.remote_traceback = error.get("traceback", "")
+
+
+@dataclass(frozen=True)
+class PluginLimits:
+    """Resource limits of a plugin worker (None means unlimited)."""
+
+    cpu_seconds: Optional[int] = None
+    memory_mb: Optional[int] = None
+
+    @classmethod
+    def from_manifest(cls, manifest: PluginManifest) -> "PluginLimits":
+        limits = manifest.limits or {}
+        return cls(limits.get("cpu_seconds"), limits.get("memory_mb"))
+
+    @property
+    def unlimited(self) -> bool:
+        return self.cpu_seconds is None and self.memory_mb is None
+
+
+class CallStats:
+    """Round-trip latency of the calls made to one plugin."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            self.count += 1
+            self.errors += 0 if ok else 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self._recent.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Latency percentile (seconds) over the most recent calls."""
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return 0.0
+        return recent[min(len(recent) - 1, int(fraction * len(recent)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        mean = self.total_seconds / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": mean * 1000,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max_seconds * 1000,
+        }
+
+
+class _Worker:
+    """One worker process and the futures waiting for its replies."""
+
+    def __init__(self, host: "PluginHost", key: str, limits: PluginLimits):
+        self.host = host
+        self.key = key
+        self.limits = limits
+        self.plugins: Dict[str, PluginManifest] = {}
+        self.initialized: Set[str] = set()
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts: Deque[float] = deque()
+        self.stopping = False
+        self.failed = False
+        self.ready = threading.Event()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Tuple[Future, str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    def start(self) -> None:
+        command = [sys.executable, WORKER_SCRIPT, "--codec", self.host.codec, "--root", self.host.root]
+        if self.limits.cpu_seconds:
+            command += ["--cpu-seconds", str(self.limits.cpu_seconds)]
+        if self.limits.memory_mb:
+            command += ["--memory-mb", str(self.limits.memory_mb)]
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [self.host.root, env.get("PYTHONPATH")]))
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=self.host.root, env=env
+        )
+        self.process = process
+        threading.Thread(
+            target=self._read_replies, args=(process,), name=f"plugin-host-{self.key}", daemon=True
+        ).start()
+        logger.debug(f"Started plugin worker {self.key} (pid {process.pid})")
+
+    def send(self, op: str, plugin: Optional[str], payload: Any, reply: bool = True, wait_ready: bool = True):
+        """Send a request; returns a Future for the reply (None if ``reply`` is False)."""
+        if wait_ready:
+            self.ready.wait(self.host.call_timeout)
+        future: Optional[Future] = Future() if reply else None
+        with self._lock:
+            process = self.process
+            if process is None or process.poll() is not None or self.failed:
+                raise PluginCrashedError(f"Plugin worker {self.key} is not running")
+            msg_id = next(self._ids) if reply else 0
+            data = plugin_worker.encode([msg_id, op, plugin, payload], self.host.codec)
+            if future is not None:
+                self._pending[msg_id] = (future, plugin or self.key)
+            try:
+                plugin_worker.write_frame(process.stdin, data)
+            except OSError as e:
+                self._pending.pop(msg_id, None)
+                raise PluginCrashedError(f"Plugin worker {self.key} is not running") from e
+        return future
+
+    def request(self, op: str, plugin: Optional[str], payload: Any, timeout: Optional[float] = None, **kwargs) -> Any:
+        future = self.send(op, plugin, payload, **kwargs)
+        return future.result(timeout if timeout is not None else self.host.call_timeout)
+
+    def _read_replies(self, process: subprocess.Popen) -> None:
+        while True:
+            frame = plugin_worker.read_frame(process.stdout)
+            if frame is None:
+                break
+            msg_id, ok, result = plugin_worker.decode(frame, self.host.codec)
+            with self._lock:
+                future, plugin = self._pending.pop(msg_id, (None, None))
+            if future is None or future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RemotePluginError(plugin, result))
+        returncode = process.wait()
+        with self._lock:
+            if process is not self.process:
+                return
+            self.ready.clear()
+            pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(PluginCrashedError(f"Plugin worker {self.key} exited with status {returncode}"))
+        self.host._worker_exited(self, returncode)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self.stopping = True
+        process = self.process
+        if process is None:
+            return
+        try:
+            self.send("exit", None, None, reply=False, wait_ready=False)
+            process.stdin.close()
+        except (PluginCrashedError, OSError):
+            pass
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class RemotePlugin:
+    """Proxy for a plugin running in a worker process.
+
+    Attribute access returns a function that calls the plugin method of the
+    same name remotely; arguments and results must be serializable.
+    """
+
+    def __init__(self, host: "PluginHost", manifest: PluginManifest):
+        self._host = host
+        self.manifest = manifest
+        self.plugin_id = manifest.name
+        self.is_active = False
+
+    def initialize(self) -> Any:
+        result = self._host.call(self.plugin_id, "initialize")
+        self.is_active = result is not False
+        if self.is_active:
+            self._host._mark_initialized(self.plugin_id)
+        return result
+
+    def shutdown(self) -> Any:
+        self.is_active = False
+        return self._host.call(self.plugin_id, "shutdown")
+
+    def handle_event(self, event_type: str, data: Any) -> None:
+        self._host.broadcast_event(event_type, data, plugins=[self.plugin_id])
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def remote(*args: Any, **kwargs: Any) -> Any:
+            return self._host.call(self.plugin_id, name, *args, **kwargs)
+
+        remote.__name__ = name
+        return remote
+
+    def __repr__(self) -> str:
+        return f"<RemotePlugin {self.plugin_id}>"
+
+
+class PluginHost:
+    """Runs plugins in a pool of worker processes."""
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        max_restarts: int = 3,
+        restart_window: float = 60.0,
+        batch_interval: float = 0.005,
+        call_timeout: float = 30.0,
+        codec: Optional[str] = None,
+        root: str = REPO_ROOT,
+    ):
+        """Create the host; worker processes start when plugins are loaded.
+
+        Args:
+            pool_size: Shared workers for plugins without resource limits.
+            max_restarts: Restarts allowed per worker within ``restart_window``.
+            restart_window: Seconds over which restarts are counted.
+            batch_interval: Seconds events are collected before being sent.
+            call_timeout: Default timeout of remote calls in seconds.
+            codec: ``"msgpack"`` or ``"pickle"``; msgpack when installed.
+            root: Directory plugin entry points are imported from.
+        """
+        self.pool_size = max(1, pool_size)
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.batch_interval = batch_interval
+        self.call_timeout = call_timeout
+        self.codec = codec or plugin_worker.default_codec()
+        self.root = root
+        self.plugins: Dict[str, RemotePlugin] = {}
+        self._workers: Dict[str, _Worker] = {}
+        self._assignment: Dict[str, _Worker] = {}
+        self._stats: Dict[str, CallStats] = {}
+        self._events: Dict[str, List[List[Any]]] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._lock = threading.RLock()
+
+    # -- workers -------------------------------------------------------
+    def _worker_for(self, name: str, limits: PluginLimits) -> _Worker:
+        with self._lock:
+            if not limits.unlimited:
+                key = f"plugin:{name}"
+            else:
+                pool = [f"pool:{i}" for i in range(self.pool_size)]
+                key = min(pool, key=lambda k: len(self._workers[k].plugins) if k in self._workers else 0)
+            worker = self._workers.get(key)
+            if worker is None:
+                worker = self._workers[key] = _Worker(self, key, limits)
+                worker.start()
+                worker.ready.set()
+            return worker
+
+    def _worker_exited(self, worker: _Worker, returncode: int) -> None:
+        if worker.stopping or self._closed:
+            return
+        now = time.monotonic()
+        while worker.restarts and now - worker.restarts[0] > self.restart_window:
+            worker.restarts.popleft()
+        if len(worker.restarts) >= self.max_restarts:
+            logger.error(
+                f"Plugin worker {worker.key} exited with status {returncode}; "
+                f"{len(worker.restarts)} restarts in {self.restart_window:.0f}s, giving up"
+            )
+            worker.failed = True
+            worker.ready.set()
+            return
+        worker.restarts.append(now)
+        logger.warning(f"Plugin worker {worker.key} exited with status {returncode}; restarting")
+        worker.start()
+        for name, manifest in list(worker.plugins.items()):
+            try:
+                worker.request("load", name, self._load_payload(manifest), wait_ready=False)
+                if name in worker.initialized:
+                    worker.request("call", name, ["initialize", [], {}], wait_ready=False)
+            except Exception as e:
+                logger.error(f"Failed to restore plugin {name} after worker restart: {e}")
+        worker.ready.set()
+
+    @staticmethod
+    def _load_payload(manifest: PluginManifest) -> Dict[str, Any]:
+        return {"entry_point": manifest.entry_point, "version": manifest.version}
+
+    def _mark_initialized(self, name: str) -> None:
+        worker = self._assignment.get(name)
+        if worker is not None:
+            worker.initialized.add(name)
+
+    # -- plugins -------------------------------------------------------
+    def load(self, manifest: PluginManifest, limits: Optional[PluginLimits] = None) -> RemotePlugin:
+        """Import and instantiate a plugin in a worker process.
+
+        Args:
+            manifest: Plugin manifest; its ``limits`` apply unless ``limits`` is given.
+            limits: Resource limits; limited plugins get a dedicated worker.
+
+        Returns:
+            A proxy for the remote plugin.
+
+        Raises:
+            RemotePluginError: If the plugin cannot be imported or instantiated.
+        """
+        with self._lock:
+            if manifest.name in self.plugins:
+                return self.plugins[manifest.name]
+            if self._closed:
+                raise RuntimeError("PluginHost is shut down")
+        worker = self._worker_for(manifest.name, limits or PluginLimits.from_manifest(manifest))
+        worker.request("load", manifest.name, self._load_payload(manifest))
+        with self._lock:
+            worker.plugins[manifest.name] = manifest
+            self._assignment[manifest.name] = worker
+            self._stats.setdefault(manifest.name, CallStats())
+            return self.plugins.setdefault(manifest.name, RemotePlugin(self, manifest))
+
+    def call_async(self, plugin: str, function: str, *args: Any, **kwargs: Any) -> Future:
+        """Call a plugin method remotely; the Future resolves to its result."""
+        worker = self._assignment.get(plugin)
+        if worker is None:
+            raise KeyError(f"Plugin not loaded: {plugin}")
+        stats = self._stats[plugin]
+        start = time.perf_counter()
+        try:
+            future = worker.send("call", plugin, [function, list(args), kwargs])
+        except PluginCrashedError:
+            stats.record(time.perf_counter() - start, ok=False)
+            raise
+        future.add_done_callback(
+            lambda f: stats.record(time.perf_counter() - start, ok=not f.cancelled() and f.exception() is None)
+        )
+        return future
+
+    def call(self, plugin: str, function: str, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Call a plugin method remotely and wait for the result.
+
+        Raises:
+            RemotePluginError: If the method raised.
+            PluginCrashedError: If the worker exited during the call.
+            TimeoutError: If no reply arrived within ``timeout`` seconds.
+        """
+        future = self.call_async(plugin, function, *args, **kwargs)
+        try:
+            return future.result(timeout if timeout is not None else self.call_timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Call {plugin}.{function} timed out") from None
+
+    def unload(self, plugin: str) -> bool:
+        """Shut a plugin down and remove it from its worker."""
+        with self._lock:
+            worker = self._assignment.pop(plugin, None)
+            self.plugins.pop(plugin, None)
+        if worker is None:
+            return False
+        worker.plugins.pop(plugin, None)
+        worker.initialized.discard(plugin)
+        try:
+            worker.request("unload", plugin, None)
+        except (PluginCrashedError, RemotePluginError, FutureTimeoutError) as e:
+            logger.warning(f"Error unloading plugin {plugin}: {e}")
+        return True
+
+    # -- events --------------------------------------------------------
+    def broadcast_event(self, event_type: str, data: Any, plugins: Optional[List[str]] = None) -> None:
+        """Queue an event for the active plugins (or only ``plugins``).
+
+        Events are sent to each worker in one batch after ``batch_interval``
+        seconds, or on ``flush_events``. Plugin errors are logged.
+        """
+        with self._lock:
+            by_worker: Dict[str, Optional[List[str]]] = {}
+            for name, worker in self._assignment.items():
+                if plugins is None:
+                    by_worker[worker.key] = None
+                elif name in plugins:
+                    by_worker.setdefault(worker.key, []).append(name)
+            for key, targets in by_worker.items():
+                self._events.setdefault(key, []).append([event_type, data, targets])
+            if not self._events or self._flush_timer is not None:
+                return
+            if self.batch_interval <= 0:
+                self._flush_locked()
+                return
+            self._flush_timer = threading.Timer(self.batch_interval, self.flush_events)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush_events(self) -> None:
+        """Send the queued events now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batches, self._events = self._events, {}
+        for key, events in batches.items():
+            worker = self._workers.get(key)
+            if worker is None:
+                continue
+            try:
+                future = worker.send("events", None, events, wait_ready=False)
+            except PluginCrashedError as e:
+                logger.error(f"Dropped {len(events)} events for plugin worker {key}: {e}")
+                continue
+            future.add_done_callback(self._log_event_errors)
+
+    @staticmethod
+    def _log_event_errors(future: Future) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Event delivery failed: {error}")
+            return
+        for plugin, event_type, message in future.result()["errors"]:
+            logger.error(f"Error broadcasting event {event_type} to plugin {plugin}: {message}")
+
+    # -- status --------------------------------------------------------
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Call latency per plugin (count, errors, mean/p50/p95/max in ms)."""
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def workers(self) -> Dict[str, Dict[str, Any]]:
+        """Process, limits and restart count of every worker."""
+        return {
+            key: {
+                "pid": worker.pid,
+                "plugins": sorted(worker.plugins),
+                "restarts": len(worker.restarts),
+                "failed": worker.failed,
+                "cpu_seconds": worker.limits.cpu_seconds,
+                "memory_mb": worker.limits.memory_mb,
+            }
+            for key, worker in self._workers.items()
+        }
+
+    def worker_pid(self, plugin: str) -> Optional[int]:
+        worker = self._assignment.get(plugin)
+        return worker.pid if worker else None
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Shut down every plugin and stop the workers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._assignment.clear()
+            self.plugins.clear()
+        for worker in workers:
+            worker.stop(timeout)
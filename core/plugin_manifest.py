@@ -0,0 +1,589 @@
+"""
+Plugin manifests, a cached plugin index and lazy, concurrent activation.
+
+Plugins describe themselves with a ``plugin.json`` manifest next to their code::
+
+    {
+        "name": "sample_plugin",
+        "entry_point": "plugins.sample_plugin.main:AtlasPlugin",
+        "version": "1.0.0",
+        "dependencies": [],
+        "activation_events": ["onCommand:sample", "sample_event"]
+    }
+
+Plugins without a manifest get one derived from their source with ``ast``
+(module docstring and the plugin class), so discovery never imports plugin
+code. Manifests are kept in a JSON index that is only re-read for plugins
+whose files changed (by mtime and size).
+
+``PluginActivator`` imports a plugin the first time one of its activation
+events fires (``"*"`` matches every event, ``onStartup`` is fired when the
+application starts). Independent plugins are activated concurrently with a
+per-plugin timeout, and the load and initialization time of every plugin is
+recorded.
+"""
+
+import ast
+import fnmatch
+import importlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "plugin.json"
+ACTIVATION_STARTUP = "onStartup"
+ACTIVATE_ALWAYS = "*"
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".atlas", "cache", "plugin_index.json")
+_INDEX_VERSION = 1
+
+# Source files inspected (in order) when a plugin package has no manifest
+_PACKAGE_SOURCES = ("main.py", "__init__.py")
+
+
+@dataclass
+class PluginManifest:
+    """Static description of a plugin.
+
+    Attributes:
+        name (str): Plugin identifier.
+        entry_point (str): ``"module:attribute"``; the attribute is usually the
+            plugin class. Without an attribute the module itself is the plugin.
+        version (str): Plugin version.
+        description (str): Short description.
+        dependencies (List[str]): Plugins that must be active first.
+        activation_events (List[str]): Events (``fnmatch`` patterns allowed)
+            that activate the plugin; empty means explicit activation only.
+        timeout (Optional[float]): Activation timeout in seconds.
+        main_thread (bool): Activate on the calling thread (e.g. Qt objects).
+        limits (Dict[str, int]): Resource limits when the plugin runs out of
+            process (``cpu_seconds``, ``memory_mb``); see ``core.plugin_host``.
+        path (str): File or directory the manifest was read from.
+    """
+
+    name: str
+    entry_point: str
+    version: str = "1.0.0"
+    description: str = ""
+    dependencies: List[str] = field(default_factory=list)
+    activation_events: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+    main_thread: bool = False
+    limits: Dict[str, int] = field(default_factory=dict)
+    path: str = ""
+
+    def matches(self, event: str) -> bool:
+        """Whether ``event`` activates this plugin."""
+        return any(
+            pattern == ACTIVATE_ALWAYS or fnmatch.fnmatchcase(event, pattern)
+            for pattern in self.activation_events
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PluginManifest":
+        known = set(cls.__dataclass_fields__)
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+def _plugin_class_name(tree: ast.Module, plugin_name: str) -> Optional[str]:
+    """Pick the plugin class defined in a module, by naming convention."""
+    classes = [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+    camel = "".join(part.capitalize() for part in plugin_name.split("_"))
+    for candidate in ("AtlasPlugin", "Plugin", f"{plugin_name.capitalize()}Plugin", f"{camel}Plugin"):
+        if candidate in classes:
+            return candidate
+    plugin_classes = [name for name in classes if name.endswith("Plugin")]
+    return plugin_classes[0] if plugin_classes else None
+
+
+def _manifest_literal(tree: ast.Module) -> Optional[Dict[str, Any]]:
+    """Value of a module-level ``PLUGIN_MANIFEST = {...}`` literal, if any."""
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "PLUGIN_MANIFEST" for target in node.targets
+        ):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                return None
+            return value if isinstance(value, dict) else None
+    return None
+
+
+def _manifest_from_source(source_path: str, module: str, plugin_name: str, path: str) -> Optional[PluginManifest]:
+    try:
+        with open(source_path, encoding="utf-8") as handle:
+            tree = ast.parse(handle.read(), filename=source_path)
+    except (OSError, SyntaxError, ValueError) as e:
+        logger.warning(f"Cannot read plugin source {source_path}: {e}")
+        return None
+    declared = _manifest_literal(tree) or {}
+    class_name = _plugin_class_name(tree, plugin_name)
+    if class_name is None and "entry_point" not in declared:
+        return None
+    docstring = (ast.get_docstring(tree) or "").strip().splitlines()
+    data = {
+        "name": plugin_name,
+        "entry_point": f"{module}:{class_name}" if class_name else module,
+        "description": docstring[0] if docstring else "",
+        **declared,
+        "path": path,
+    }
+    return PluginManifest.from_dict(data)
+
+
+def read_manifest(path: str, package: str) -> Optional[PluginManifest]:
+    """Read the manifest of the plugin at ``path`` without importing it.
+
+    Args:
+        path: Plugin package directory or single-module ``.py`` file.
+        package: Import package containing the plugin (e.g. ``"plugins"``).
+
+    Returns:
+        The manifest, or None if ``path`` does not look like a plugin.
+    """
+    if os.path.isdir(path):
+        name = os.path.basename(path)
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        if os.path.isfile(manifest_path):
+            try:
+                with open(manifest_path, encoding="utf-8") as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Invalid plugin manifest {manifest_path}: {e}")
+                return None
+            data.setdefault("name", name)
+            data.setdefault("entry_point", f"{package}.{name}")
+            data["path"] = path
+            return PluginManifest.from_dict(data)
+        for source in _PACKAGE_SOURCES:
+            source_path = os.path.join(path, source)
+            if os.path.isfile(source_path):
+                module = f"{package}.{name}" if source == "__init__.py" else f"{package}.{name}.{source[:-3]}"
+                manifest = _manifest_from_source(source_path, module, name, path)
+                if manifest is not None:
+                    return manifest
+        return None
+    if path.endswith(".py"):
+        name = os.path.basename(path)[:-3]
+        return _manifest_from_source(path, f"{package}.{name}", name, path)
+    return None
+
+
+def _signature(path: str) -> List[List[int]]:
+    """mtime/size fingerprint of the files a manifest is derived from."""
+    files = [path]
+    if os.path.isdir(path):
+        files += [os.path.join(path, name) for name in (MANIFEST_FILE,) + _PACKAGE_SOURCES]
+    fingerprint = []
+    for file_path in files:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            fingerprint.append([0, -1])
+            continue
+        fingerprint.append([stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+
+class PluginIndex:
+    """Manifests of the plugins in a directory, cached on disk."""
+
+    def __init__(self, directory: str, package: str = "plugins", cache_path: Optional[str] = DEFAULT_INDEX_PATH):
+        """Create the index.
+
+        Args:
+            directory: Directory containing plugin packages and modules.
+            package: Import package that ``directory`` corresponds to.
+            cache_path: JSON file shared by all indexes; None disables caching.
+        """
+        self.directory = os.path.abspath(directory)
+        self.package = package
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._manifests: Optional[Dict[str, PluginManifest]] = None
+        self.reads = 0  # manifests (re)read from plugin files
+
+    def _candidates(self) -> List[str]:
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            logger.warning(f"Plugin directory not found: {self.directory}")
+            return []
+        paths = []
+        for entry in entries:
+            if entry.name.startswith(("__", ".")):
+                continue
+            if entry.is_dir() or entry.name.endswith(".py"):
+                paths.append(entry.path)
+        return sorted(paths)
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != _INDEX_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _save_cache(self, entries: Dict[str, Any]) -> None:
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Keep entries of other plugin directories sharing the file
+            merged = {
+                path: entry
+                for path, entry in self._load_cache().items()
+                if os.path.dirname(path) != self.directory
+            }
+            merged.update(entries)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"version": _INDEX_VERSION, "entries": merged}, handle)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write plugin index {self.cache_path}: {e}")
+
+    def refresh(self) -> Dict[str, PluginManifest]:
+        """Rescan the directory, re-reading only plugins whose files changed."""
+        with self._lock:
+            cached = self._load_cache()
+            entries: Dict[str, Any] = {}
+            changed = False
+            for path in self._candidates():
+                signature = _signature(path)
+                entry = cached.get(path)
+                if entry is None or entry.get("signature") != signature:
+                    manifest = read_manifest(path, self.package)
+                    self.reads += 1
+                    entry = {"signature": signature, "manifest": manifest.to_dict() if manifest else None}
+                    changed = True
+                entries[path] = entry
+            stale = [p for p in cached if os.path.dirname(p) == self.directory and p not in entries]
+            if changed or stale:
+                self._save_cache(entries)
+            manifests = {}
+            for entry in entries.values():
+                if entry["manifest"]:
+                    manifest = PluginManifest.from_dict(entry["manifest"])
+                    manifests[manifest.name] = manifest
+            self._manifests = manifests
+            return dict(manifests)
+
+    def manifests(self) -> Dict[str, PluginManifest]:
+        """Manifests by plugin name (scanned on first use)."""
+        if self._manifests is None:
+            return self.refresh()
+        return dict(self._manifests)
+
+    def get(self, name: str) -> Optional[PluginManifest]:
+        return self.manifests().get(name)
+
+
+@dataclass
+class PluginTiming:
+    """Load/initialization record of one plugin activation."""
+
+    name: str
+    status: str = "pending"  # active, failed, timeout, skipped
+    load_seconds: float = 0.0
+    init_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def total_seconds(self) -> float:
+        return self.load_seconds + self.init_seconds
+
+
+def instantiate_plugin(target: Any, manifest: PluginManifest) -> Any:
+    """Create a plugin instance from its entry point attribute.
+
+    Classes and factories are called with as many of ``(name, version)`` as
+    they require positionally; any other object is used as is.
+    """
+    if not callable(target):
+        return target
+    try:
+        parameters = inspect.signature(target).parameters.values()
+    except (TypeError, ValueError):
+        return target()
+    required = [
+        p
+        for p in parameters
+        if p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+    return target(*(manifest.name, manifest.version)[: len(required)])
+
+
+def _initialize(instance: Any) -> None:
+    initialize = getattr(instance, "initialize", None)
+    if callable(initialize) and initialize() is False:
+        raise RuntimeError("initialize() returned False")
+
+
+def _dependency_levels(
+    needed: Dict[str, PluginManifest], placed: Set[str], problems: Dict[str, str]
+) -> List[List[str]]:
+    """Group ``needed`` into levels whose dependencies are all in earlier levels (or ``placed``).
+
+    Plugins left over because they sit on a cycle are recorded in ``problems``.
+    """
+    levels: List[List[str]] = []
+    remaining = dict(needed)
+    while remaining:
+        level = sorted(
+            name for name, m in remaining.items() if all(d in placed or d in problems for d in m.dependencies)
+        )
+        if not level:  # only cycles are left
+            for name in remaining:
+                problems.setdefault(name, "dependency cycle")
+            break
+        levels.append(level)
+        placed.update(level)
+        for name in level:
+            del remaining[name]
+    return levels
+
+
+class PluginActivator:
+    """Imports and initializes plugins lazily, in dependency order."""
+
+    def __init__(
+        self,
+        manifests: Callable[[], Dict[str, PluginManifest]],
+        instantiate: Callable[[Any, PluginManifest], Any] = instantiate_plugin,
+        max_workers: int = 4,
+        default_timeout: float = 10.0,
+        loader: Optional[Callable[[PluginManifest], Any]] = None,
+    ):
+        """Create the activator.
+
+        Args:
+            manifests: Returns the known manifests (e.g. ``PluginIndex.manifests``).
+            instantiate: Builds a plugin from its entry point attribute.
+            max_workers: Plugins activated concurrently.
+            default_timeout: Per-plugin activation timeout in seconds.
+            loader: Builds a plugin from its manifest instead of importing the
+                entry point in this process (e.g. ``PluginHost.load``).
+        """
+        self._manifests = manifests
+        self._instantiate = instantiate
+        self._loader = loader
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.enabled: Optional[Set[str]] = None
+        self.loaded: Dict[str, Any] = {}
+        self.active: Dict[str, Any] = {}
+        self.timings: Dict[str, PluginTiming] = {}
+        self._order: List[str] = []
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def manifests(self) -> Dict[str, PluginManifest]:
+        manifests = self._manifests()
+        if self.enabled is None:
+            return manifests
+        return {name: m for name, m in manifests.items() if name in self.enabled}
+
+    def plugins_for_event(self, event: str) -> List[str]:
+        """Enabled plugins activated by ``event`` that are not active yet."""
+        return sorted(
+            name for name, manifest in self.manifests().items() if manifest.matches(event) and name not in self.active
+        )
+
+    def load(self, name: str) -> Any:
+        """Import and instantiate a plugin without initializing it."""
+        with self._lock:
+            if name in self.loaded:
+                return self.loaded[name]
+        manifest = self.manifests().get(name)
+        if manifest is None:
+            raise KeyError(f"Unknown plugin: {name}")
+        timing = self.timings.setdefault(name, PluginTiming(name))
+        start = time.perf_counter()
+        if self._loader is not None:
+            instance = self._loader(manifest)
+        else:
+            module_name, _, attribute = manifest.entry_point.partition(":")
+            target: Any = importlib.import_module(module_name)
+            for part in filter(None, attribute.split(".")):
+                target = getattr(target, part)
+            instance = self._instantiate(target, manifest)
+        timing.load_seconds = time.perf_counter() - start
+        with self._lock:
+            return self.loaded.setdefault(name, instance)
+
+    def _activate_one(self, manifest: PluginManifest) -> Any:
+        instance = self.load(manifest.name)
+        timing = self.timings[manifest.name]
+        start = time.perf_counter()
+        _initialize(instance)
+        timing.init_seconds = time.perf_counter() - start
+        return instance
+
+    def _closure(self, names: Iterable[str]) -> Tuple[List[List[str]], Dict[str, str]]:
+        """Dependency levels to activate, plus plugins that cannot be."""
+        manifests = self.manifests()
+        needed: Dict[str, PluginManifest] = {}
+        problems: Dict[str, str] = {}
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if name in needed or name in self.active or name in problems:
+                return
+            if name in path:
+                problems[name] = "dependency cycle: " + " -> ".join(path + (name,))
+                return
+            manifest = manifests.get(name)
+            if manifest is None:
+                problems[name] = "unknown or disabled plugin"
+                return
+            for dep in manifest.dependencies:
+                visit(dep, path + (name,))
+            needed[name] = manifest
+
+        for name in names:
+            visit(name, ())
+
+        return _dependency_levels(needed, set(self.active), problems), problems
+
+    def activate(self, names: Iterable[str], timeout: Optional[float] = None) -> Dict[str, PluginTiming]:
+        """Activate plugins (and their dependencies), independent ones concurrently.
+
+        Args:
+            names: Plugins to activate.
+            timeout: Per-plugin timeout overriding manifests and the default.
+
+        Returns:
+            Timing records of the plugins handled by this call.
+        """
+        levels, problems = self._closure(names)
+        results: Dict[str, PluginTiming] = {}
+        for name, problem in problems.items():
+            results[name] = self.timings[name] = PluginTiming(name, "failed", error=problem)
+        manifests = self.manifests()
+        for level in levels:
+            runnable = []
+            for name in level:
+                blocked = [d for d in manifests[name].dependencies if d not in self.active]
+                if blocked:
+                    results[name] = self.timings[name] = PluginTiming(
+                        name, "skipped", error=f"dependencies not active: {', '.join(blocked)}"
+                    )
+                else:
+                    runnable.append(manifests[name])
+            results.update(self._activate_level(runnable, timeout))
+        return results
+
+    def _activate_level(self, manifests: List[PluginManifest], timeout: Optional[float]) -> Dict[str, PluginTiming]:
+        results: Dict[str, PluginTiming] = {}
+        concurrent = [m for m in manifests if not m.main_thread]
+        if concurrent and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="plugin-activation")
+        started = time.perf_counter()
+        futures = {m.name: self._executor.submit(self._activate_one, m) for m in concurrent}
+
+        def finish(manifest: PluginManifest, instance: Any = None, error: Optional[BaseException] = None) -> None:
+            timing = self.timings.setdefault(manifest.name, PluginTiming(manifest.name))
+            if error is None:
+                timing.status, timing.error = "active", None
+                with self._lock:
+                    self.active[manifest.name] = instance
+                    self._order.append(manifest.name)
+                logger.info(
+                    f"Activated plugin {manifest.name} (load {timing.load_seconds * 1000:.1f} ms, "
+                    f"init {timing.init_seconds * 1000:.1f} ms)"
+                )
+            else:
+                timing.status, timing.error = "failed", str(error)
+                logger.error(f"Failed to activate plugin {manifest.name}: {error}")
+            results[manifest.name] = timing
+
+        for manifest in manifests:
+            if manifest.main_thread:
+                try:
+                    finish(manifest, self._activate_one(manifest))
+                except Exception as e:
+                    finish(manifest, error=e)
+        for manifest in concurrent:
+            limit = timeout if timeout is not None else manifest.timeout or self.default_timeout
+            future = futures[manifest.name]
+            try:
+                finish(manifest, future.result(timeout=max(0.0, started + limit - time.perf_counter())))
+            except FutureTimeoutError:
+                timing = self.timings.setdefault(manifest.name, PluginTiming(manifest.name))
+                timing.status, timing.error = "timeout", f"not active after {limit:.1f}s"
+                results[manifest.name] = timing
+                logger.error(f"Plugin {manifest.name} timed out after {limit:.1f}s")
+                future.add_done_callback(lambda f, name=manifest.name: self._discard_late(name, f))
+            except Exception as e:
+                finish(manifest, error=e)
+        return results
+
+    def _discard_late(self, name: str, future: Any) -> None:
+        """Shut down a plugin whose activation finished after its timeout."""
+        if future.exception() is None:
+            _shutdown(name, future.result())
+        with self._lock:
+            self.loaded.pop(name, None)
+
+    def fire(self, event: str, timeout: Optional[float] = None) -> Dict[str, PluginTiming]:
+        """Activate every plugin waiting for ``event``."""
+        names = self.plugins_for_event(event)
+        if not names:
+            return {}
+        logger.debug(f"Activation event {event}: {', '.join(names)}")
+        return self.activate(names, timeout=timeout)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return an active plugin, activating it on first use."""
+        if name not in self.active:
+            self.activate([name])
+        return self.active.get(name)
+
+    def deactivate(self, name: str) -> bool:
+        with self._lock:
+            instance = self.active.pop(name, None)
+            if name in self._order:
+                self._order.remove(name)
+        if instance is None:
+            return False
+        _shutdown(name, instance)
+        self.timings.setdefault(name, PluginTiming(name)).status = "inactive"
+        return True
+
+    def shutdown(self) -> List[str]:
+        """Deactivate all plugins, dependents first."""
+        names = list(reversed(self._order))
+        for name in names:
+            self.deactivate(name)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return names
+
+
+def _shutdown(name: str, instance: Any) -> None:
+    shutdown = getattr(instance, "shutdown", None)
+    if callable(shutdown):
+        try:
+            shutdown()
+        except Exception as e:
+            logger.error(f"Error shutting down plugin {name}: {e}")
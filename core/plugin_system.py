@@ -5,11 +5,19 @@ This module defines the core plugin system, including plugin discovery,
 loading, lifecycle management, and integration with the application.
 """
 
-import importlib
 import logging
 import os
 from typing import Dict, List, Optional
 
+from core.plugin_manifest import (
+    ACTIVATION_STARTUP,
+    PluginActivator,
+    PluginIndex,
+    PluginManifest,
+    PluginTiming,
+    instantiate_plugin,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,76 +85,109 @@ class PluginBase:
 
 
 class PluginRegistry:
-    """Manages plugin discovery, loading, and lifecycle."""
+    """Manages plugin discovery, loading, and lifecycle.
+
+    Discovery reads plugin manifests from a cached index (see
+    ``core.plugin_manifest``) instead of importing plugin code; plugins are
+    imported when one of their activation events fires or when they are
+    activated explicitly.
+    """
 
-    def __init__(self, plugin_dir: str = "plugins"):
+    def __init__(
+        self,
+        plugin_dir: str = "plugins",
+        index: Optional[PluginIndex] = None,
+        max_workers: int = 4,
+        activation_timeout: float = 10.0,
+    ):
         """Initialize the plugin registry."""
-        self.plugins: Dict[str, PluginBase] = {}
         self.plugin_dir = plugin_dir
-
-    def discover_plugins(self) -> List[str]:
-        """Discover available plugins in the plugin directory."""
-        plugin_names = []
         plugin_path = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "..", self.plugin_dir
         )
+        self.index = index or PluginIndex(plugin_path, package=plugin_dir)
+        self.activator = PluginActivator(
+            self.index.manifests,
+            instantiate=_instantiate_plugin,
+            max_workers=max_workers,
+            default_timeout=activation_timeout,
+        )
+        # Instances that have been loaded (imported and constructed)
+        self.plugins: Dict[str, PluginBase] = self.activator.loaded
 
-        if not os.path.exists(plugin_path):
-            logger.warning(f"Plugin directory not found: {plugin_path}")
-            return plugin_names
-
-        for entry in os.listdir(plugin_path):
-            if os.path.isdir(os.path.join(plugin_path, entry)) and not entry.startswith(
-                "__"
-            ):
-                plugin_names.append(entry)
-            elif entry.endswith(".py") and not entry.startswith("__"):
-                plugin_names.append(entry[:-3])
-
+    def discover_plugins(self) -> List[str]:
+        """Discover available plugins from their manifests, without importing them."""
+        plugin_names = sorted(self.index.refresh())
         logger.info(f"Discovered plugins: {plugin_names}")
         return plugin_names
 
+    def get_manifest(self, plugin_name: str) -> Optional[PluginManifest]:
+        """Get the manifest of a discovered plugin."""
+        return self.index.get(plugin_name)
+
+    def load_plugins(self, enabled: Optional[List[str]] = None) -> List[str]:
+        """Register plugins for lazy activation.
+
+        Args:
+            enabled: Plugins allowed to activate; empty or None allows every
+                discovered plugin.
+
+        Returns:
+            List[str]: Names of the plugins available for activation. None of
+            them is imported here.
+        """
+        self.activator.enabled = set(enabled) if enabled else None
+        return sorted(self.activator.manifests())
+
     def load_plugin(self, plugin_name: str) -> Optional[PluginBase]:
         """Load a specific plugin by name."""
         try:
-            module = importlib.import_module(f"{self.plugin_dir}.{plugin_name}")
-            plugin_class = getattr(module, f"{plugin_name.capitalize()}Plugin", None)
-            if plugin_class and issubclass(plugin_class, PluginBase):
-                plugin_instance = plugin_class(plugin_name, "1.0.0")
-                self.plugins[plugin_name] = plugin_instance
-                logger.info(f"Loaded plugin: {plugin_name}")
-                return plugin_instance
-            else:
-                logger.warning(f"No valid plugin class found for: {plugin_name}")
-                return None
-        except ImportError as e:
+            plugin_instance = self.activator.load(plugin_name)
+            logger.info(f"Loaded plugin: {plugin_name}")
+            return plugin_instance
+        except KeyError:
+            logger.warning(f"No valid plugin class found for: {plugin_name}")
+            return None
+        except Exception as e:
             logger.error(f"Failed to load plugin {plugin_name}: {e}")
             return None
 
     def activate_plugin(self, plugin_name: str) -> bool:
-        """Activate a loaded plugin."""
-        if plugin_name in self.plugins:
-            try:
-                self.plugins[plugin_name].initialize()
-                logger.info(f"Activated plugin: {plugin_name}")
-                return True
-            except Exception as e:
-                logger.error(f"Error activating plugin {plugin_name}: {e}")
-                return False
-        return False
+        """Activate a plugin, loading it and its dependencies if needed."""
+        timing = self.activator.activate([plugin_name]).get(plugin_name)
+        return plugin_name in self.activator.active and (
+            timing is None or timing.status == "active"
+        )
+
+    def fire_event(self, event: str, timeout: Optional[float] = None) -> List[str]:
+        """Activate the plugins waiting for an activation event.
+
+        Returns:
+            List[str]: Plugins that became active.
+        """
+        results = self.activator.fire(event, timeout=timeout)
+        return [name for name, timing in results.items() if timing.status == "active"]
+
+    def start_all_plugins(self) -> List[str]:
+        """Activate the plugins that asked to start with the application."""
+        self.fire_event(ACTIVATION_STARTUP)
+        return sorted(self.activator.active)
 
     def deactivate_plugin(self, plugin_name: str) -> bool:
-        """Deactivate a loaded plugin."""
-        if plugin_name in self.plugins:
-            try:
-                self.plugins[plugin_name].shutdown()
-                logger.info(f"Deactivated plugin: {plugin_name}")
-                return True
-            except Exception as e:
-                logger.error(f"Error deactivating plugin {plugin_name}: {e}")
-                return False
+        """Deactivate an active plugin."""
+        if self.activator.deactivate(plugin_name):
+            logger.info(f"Deactivated plugin: {plugin_name}")
+            return True
         return False
 
+    def unload_all_plugins(self) -> List[str]:
+        """Deactivate every active plugin, dependents first."""
+        return self.activator.shutdown()
+
+    def plugin_timings(self) -> Dict[str, PluginTiming]:
+        """Load/initialization time of every plugin activated so far."""
+        return dict(self.activator.timings)
+
     def get_plugin(self, plugin_name: str) -> Optional[PluginBase]:
         """Get a plugin instance by name."""
         return self.plugins.get(plugin_name)
@@ -156,5 +197,12 @@ class PluginRegistry:
         return self.plugins
 
 
+def _instantiate_plugin(target, manifest: PluginManifest):
+    """Construct ``PluginBase`` subclasses with their manifest name and version."""
+    if isinstance(target, type) and issubclass(target, PluginBase):
+        return target(manifest.name, manifest.version)
+    return instantiate_plugin(target, manifest)
+
+
 # Global plugin registry instance
 PLUGIN_REGISTRY = PluginRegistry()
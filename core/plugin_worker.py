@@ -0,0 +1,312 @@
+"""
+Plugin worker process and the IPC codec shared with ``core.plugin_host``.
+
+The worker is started as a script (``python core/plugin_worker.py``) so that
+it does not pay for importing the ``core`` package. It reads length-prefixed
+frames from stdin and answers on stdout; anything plugins print goes to
+stderr instead.
+
+Frames are msgpack-encoded when msgpack is installed (other objects are
+embedded as pickle extension values) and pickled otherwise. ``bytes``
+payloads of ``SHM_THRESHOLD`` bytes or more travel through shared memory
+instead of the pipe.
+
+Requests are ``[msg_id, op, plugin, payload]`` and replies
+``[msg_id, ok, result]``; ``msg_id`` 0 asks for no reply.
+"""
+
+import os
+import sys
+
+if __name__ == "__main__":
+    # As a script this directory is sys.path[0], where core/logging.py would shadow the stdlib
+    _HERE = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [path for path in sys.path if os.path.abspath(path or os.curdir) != _HERE]
+
+import argparse  # noqa: E402
+import importlib  # noqa: E402
+import inspect  # noqa: E402
+import pickle  # noqa: E402
+import struct  # noqa: E402
+import traceback  # noqa: E402
+from typing import Any, BinaryIO, Dict, List, Optional  # noqa: E402
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+SHM_THRESHOLD = 256 * 1024
+_SHM_KEY = "__atlas_shm__"
+_PICKLE_EXT = 1
+_HEADER = struct.Struct(">I")
+
+
+def default_codec() -> str:
+    return "msgpack" if MSGPACK_AVAILABLE else "pickle"
+
+
+def _to_shared_memory(data: bytes) -> Dict[str, Any]:
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    block.buf[: len(data)] = data
+    name = block.name
+    block.close()
+    # The receiver unlinks the block; stop this process's tracker from doing it too
+    resource_tracker.unregister(block._name, "shared_memory")
+    return {_SHM_KEY: name, "size": len(data)}
+
+
+def _from_shared_memory(ref: Dict[str, Any]) -> bytes:
+    block = shared_memory.SharedMemory(name=ref[_SHM_KEY])
+    try:
+        return bytes(block.buf[: ref["size"]])
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _externalize(value: Any) -> Any:
+    """Move large ``bytes`` values into shared memory."""
+    if isinstance(value, (bytes, bytearray)) and len(value) >= SHM_THRESHOLD and SHARED_MEMORY_AVAILABLE:
+        return _to_shared_memory(bytes(value))
+    if isinstance(value, list):
+        return [_externalize(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_externalize(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _externalize(item) for key, item in value.items()}
+    return value
+
+
+def _internalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        if _SHM_KEY in value and len(value) == 2:
+            return _from_shared_memory(value)
+        return {key: _internalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_internalize(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_internalize(item) for item in value)
+    return value
+
+
+def _msgpack_default(value: Any) -> Any:
+    return msgpack.ExtType(_PICKLE_EXT, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _msgpack_ext(code: int, data: bytes) -> Any:
+    if code == _PICKLE_EXT:
+        return pickle.loads(data)
+    return msgpack.ExtType(code, data)
+
+
+def encode(message: Any, codec: str) -> bytes:
+    """Serialize a message (large bytes go to shared memory)."""
+    message = _externalize(message)
+    if codec == "msgpack":
+        return msgpack.packb(message, default=_msgpack_default, use_bin_type=True)
+    return pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(data: bytes, codec: str) -> Any:
+    if codec == "msgpack":
+        message = msgpack.unpackb(data, ext_hook=_msgpack_ext, raw=False, strict_map_key=False)
+    else:
+        message = pickle.loads(data)
+    return _internalize(message)
+
+
+def write_frame(stream: BinaryIO, data: bytes) -> None:
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_frame(stream: BinaryIO) -> Optional[bytes]:
+    """Read one frame; None at end of stream."""
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    (size,) = _HEADER.unpack(header)
+    data = stream.read(size)
+    return data if len(data) == size else None
+
+
+# -- worker side -----------------------------------------------------------
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def apply_limits(cpu_seconds: Optional[int], memory_mb: Optional[int]) -> None:
+    """Apply rlimits to this process.
+
+    ``memory_mb`` is address space on top of what the interpreter already
+    maps, so the limit means the same thing regardless of what was imported.
+    """
+    try:
+        import resource
+    except ImportError:
+        return
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_mb:
+        limit = _address_space_bytes() + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _instantiate(target: Any, name: str, version: str) -> Any:
+    if not callable(target):
+        return target
+    try:
+        parameters = inspect.signature(target).parameters.values()
+    except (TypeError, ValueError):
+        return target()
+    required = [
+        p for p in parameters if p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+    return target(*(name, version)[: len(required)])
+
+
+class _Worker:
+    def __init__(self) -> None:
+        self.plugins: Dict[str, Any] = {}
+
+    def load(self, name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        module_name, _, attribute = payload["entry_point"].partition(":")
+        target: Any = importlib.import_module(module_name)
+        for part in filter(None, attribute.split(".")):
+            target = getattr(target, part)
+        self.plugins[name] = _instantiate(target, name, payload.get("version", "1.0.0"))
+        return {"pid": os.getpid()}
+
+    def call(self, name: str, payload: List[Any]) -> Any:
+        function, args, kwargs = payload
+        return getattr(self.plugins[name], function)(*args, **kwargs)
+
+    def events(self, payload: List[Any]) -> Dict[str, Any]:
+        """Deliver ``[event_type, data, plugins]`` events; ``plugins`` None means all."""
+        delivered, errors = 0, []
+        for event_type, data, targets in payload:
+            for plugin_name in targets or list(self.plugins):
+                plugin = self.plugins.get(plugin_name)
+                handler = getattr(plugin, "handle_event", None)
+                if handler is None or not getattr(plugin, "is_active", True):
+                    continue
+                try:
+                    handler(event_type, data)
+                    delivered += 1
+                except Exception as e:
+                    errors.append([plugin_name, event_type, str(e)])
+        return {"delivered": delivered, "errors": errors}
+
+    def unload(self, name: str) -> bool:
+        plugin = self.plugins.pop(name, None)
+        shutdown = getattr(plugin, "shutdown", None)
+        if callable(shutdown):
+            shutdown()
+        return plugin is not None
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        try:
+            import resource
+
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            cpu = usage.ru_utime + usage.ru_stime
+            max_rss_kb = usage.ru_maxrss
+        except ImportError:
+            cpu, max_rss_kb = 0.0, 0
+        return {"pid": os.getpid(), "cpu_seconds": cpu, "max_rss_kb": max_rss_kb}
+
+    def handle(self, op: str, name: Optional[str], payload: Any) -> Any:
+        if op == "load":
+            return self.load(name, payload)
+        if op == "call":
+            return self.call(name, payload)
+        if op == "events":
+            return self.events(payload)
+        if op == "unload":
+            return self.unload(name)
+        if op == "stats":
+            return self.stats()
+        if op == "ping":
+            return "pong"
+        raise ValueError(f"Unknown operation: {op}")
+
+    def reply(self, msg_id: int, op: str, name: Optional[str], payload: Any) -> List[Any]:
+        try:
+            return [msg_id, True, self.handle(op, name, payload)]
+        except BaseException as e:  # reported to the host; the worker keeps serving
+            if isinstance(e, (KeyboardInterrupt, SystemExit)):
+                raise
+            return [msg_id, False, _error(e, traceback.format_exc())]
+
+    def serve(self, requests: BinaryIO, replies: BinaryIO, codec: str) -> None:
+        """Answer framed requests until the host sends ``exit`` or closes the stream."""
+        while True:
+            frame = read_frame(requests)
+            if frame is None:
+                return
+            msg_id, op, name, payload = decode(frame, codec)
+            if op == "exit":
+                return
+            reply = self.reply(msg_id, op, name, payload)
+            if not msg_id:
+                continue
+            try:
+                data = encode(reply, codec)
+            except Exception as e:
+                data = encode([msg_id, False, _error(e, "")], codec)
+            write_frame(replies, data)
+
+    def unload_all(self) -> None:
+        for name in list(self.plugins):
+            try:
+                self.unload(name)
+            except Exception:
+                traceback.print_exc()
+
+
+def _error(error: BaseException, trace: str) -> Dict[str, Any]:
+    return {"type": type(error).__name__, "message": str(error), "traceback": trace}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Atlas plugin worker")
+    parser.add_argument("--codec", default=default_codec())
+    parser.add_argument("--cpu-seconds", type=int, default=None)
+    parser.add_argument("--memory-mb", type=int, default=None)
+    parser.add_argument("--root", default=None, help="Directory added to sys.path")
+    args = parser.parse_args(argv)
+
+    if args.root and args.root not in sys.path:
+        sys.path.insert(0, args.root)
+    # Keep the protocol streams private: plugin output goes to stderr, stdin reads /dev/null
+    requests = os.fdopen(os.dup(0), "rb")
+    replies = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    apply_limits(args.cpu_seconds, args.memory_mb)
+
+    worker = _Worker()
+    worker.serve(requests, replies, args.codec)
+    worker.unload_all()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
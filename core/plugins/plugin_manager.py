@@ -5,15 +5,26 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from core.plugin_host import PluginHost, PluginLimits
+from core.plugin_manifest import PluginManifest, read_manifest
+
 
 class PluginManager:
-    """Manager for discovering, loading, and handling plugins in Atlas."""
+    """Manager for discovering, loading, and handling plugins in Atlas.
+
+    With ``config["isolated"]`` plugins run in worker processes (see
+    ``core.plugin_host``); ``config["plugin_limits"]`` maps plugin names to
+    ``{"cpu_seconds": ..., "memory_mb": ...}``.
+    """
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
         self.plugins: Dict[str, Any] = {}
         self.plugin_dir = Path(self.config.get("plugin_dir", "plugins"))
+        self.host: Optional[PluginHost] = None
+        if self.config.get("isolated"):
+            self.host = PluginHost(pool_size=self.config.get("worker_pool_size", 2))
         self.initialize()
 
     def initialize(self) -> None:
@@ -61,6 +72,9 @@ class PluginManager:
                     )
                     return False
 
+            if self.host is not None:
+                return self._load_isolated(plugin_name, plugin_path)
+
             # Handle directory-based plugins
             if plugin_path.is_dir():
                 module_name = f"plugins.{plugin_name}"
@@ -98,6 +112,15 @@ class PluginManager:
             self.logger.error("Error loading plugin %s: %s", plugin_name, str(e))
             return False
 
+    def _load_isolated(self, plugin_name: str, plugin_path: Path) -> bool:
+        manifest = read_manifest(str(plugin_path), "plugins") or PluginManifest(
+            plugin_name, f"plugins.{plugin_name}", path=str(plugin_path)
+        )
+        limits = self.config.get("plugin_limits", {}).get(plugin_name)
+        self.plugins[plugin_name] = self.host.load(manifest, PluginLimits(**limits) if limits else None)
+        self.logger.info("Successfully loaded plugin %s in a worker process", plugin_name)
+        return True
+
     def load_all_plugins(self) -> Dict[str, bool]:
         """Load all discovered plugins."""
         self.logger.info("Loading all plugins")
@@ -124,6 +147,8 @@ class PluginManager:
         """Unregister a plugin."""
         if plugin_name in self.plugins:
             del self.plugins[plugin_name]
+            if self.host is not None:
+                self.host.unload(plugin_name)
             self.logger.info("Unregistered plugin: %s", plugin_name)
             return True
         return False
@@ -157,6 +182,15 @@ class PluginManager:
         )
         return func(*args, **kwargs)
 
+    def get_plugin_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Call latency per isolated plugin (empty when plugins run in process)."""
+        return self.host.metrics() if self.host is not None else {}
+
+    def shutdown(self) -> None:
+        """Stop the plugin worker processes, if any."""
+        if self.host is not None:
+            self.host.shutdown()
+
     def get_plugin_info(self, plugin_name: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific plugin."""
         plugin = self.get_plugin(plugin_name)
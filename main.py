@@ -3,10 +3,8 @@ import argparse
 import logging
 import os
 import sys
-from typing import Any, Dict
-
-# Third-party imports
-from PySide6.QtWidgets import QApplication
+import time
+from typing import Any, Dict, Optional
 
 # Local imports
 try:
@@ -16,25 +14,15 @@ except ImportError:
     logger.error("asyncio not available, falling back to synchronous mode")
     asyncio = None
 
-from core.data_cache import DataCache
-from core.intelligence.context_engine import ContextEngine
-from core.intelligence.decision_engine import DecisionEngine
-from core.intelligence.self_improvement_engine import SelfImprovementEngine
-from debugging.debugging_hooks import DebuggingHooks
-from performance.latency_analyzer import LatencyAnalyzer
-from performance.performance_monitor import PerformanceMonitor
-from sentry_config import init_sentry
-
-# Updated import paths for UI modules in subdirectories
-try:
-    from ui.main_window import AtlasMainWindow as MainWindow
-except ImportError:
-    logger = logging.getLogger(__name__)
-    logger.error("MainWindow import failed", exc_info=True)
-    MainWindow = None  # Fallback for circular imports or missing modules
+from performance.startup_optimization import (
+    PHASE_BACKGROUND,
+    PHASE_CRITICAL,
+    PHASE_ON_DEMAND,
+    StartupOrchestrator,
+)
 
-from utils.db_optimizer import DatabaseOptimizer
-from utils.temp_placeholders import CollaborationManager, Config, OnboardingAnalytics
+# Process start, used as time zero for the startup timeline
+_PROCESS_START = time.perf_counter()
 
 # Configure logging before any other code
 logging.basicConfig(
@@ -42,27 +30,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Sentry for crash reporting
 SENTRY_DSN = os.environ.get("SENTRY_DSN", "")
-if SENTRY_DSN:
-    init_sentry(
+
+
+# Initialize Sentry for crash reporting
+def init_crash_reporting():
+    if not SENTRY_DSN:
+        print("Sentry DSN not found in environment variables. Crash reporting disabled.")
+        return None
+    from sentry_config import init_sentry
+
+    return init_sentry(
         SENTRY_DSN,
         environment=os.environ.get("ATLAS_ENV", "development"),
         release="atlas@1.0.0",
     )
-else:
-    print("Sentry DSN not found in environment variables. Crash reporting disabled.")
 
 
 # Initialize DataCache for performance optimization
-async def init_cache():
-    cache = DataCache()
-    await cache.initialize()
-    return cache
+def init_cache():
+    from core.data_cache import DataCache
+
+    # Only build the client here: the Redis connection is opened on first use,
+    # on the event loop of the caller, rather than on a throwaway loop that
+    # closes as soon as the background worker returns.
+    return DataCache()
 
 
 # Initialize DatabaseOptimizer for query performance
 def init_db_optimizer():
+    from utils.db_optimizer import DatabaseOptimizer
+
     db_path = os.environ.get("ATLAS_DB_PATH", ":memory:")  # Replace with actual path
     optimizer = DatabaseOptimizer(db_path)
     optimizer.connect()
@@ -77,12 +75,59 @@ def init_db_optimizer():
 
 # Initialize OnboardingAnalytics to track user behavior during onboarding
 def init_analytics():
+    from utils.temp_placeholders import OnboardingAnalytics
+
     analytics = OnboardingAnalytics()
     # Start a session for a new user - in a real scenario, use a unique user ID
-    analytics.start_session("new_user")
+    analytics.start_session()
     return analytics
 
 
+def init_context_engine():
+    from core.intelligence.context_engine import ContextEngine
+
+    engine = ContextEngine()
+    engine.start_continuous_update()
+    logger.info("Context updates started.")
+    return engine
+
+
+def init_decision_engine(context_engine=None):
+    from core.intelligence.decision_engine import DecisionEngine
+
+    return DecisionEngine(context_engine=context_engine)
+
+
+def init_self_improvement_engine():
+    from core.intelligence.self_improvement_engine import SelfImprovementEngine
+
+    return SelfImprovementEngine()
+
+
+def init_debugging_hooks():
+    from debugging.debugging_hooks import DebuggingHooks
+
+    return DebuggingHooks()
+
+
+def init_performance_monitor():
+    from performance.performance_monitor import PerformanceMonitor
+
+    return PerformanceMonitor()
+
+
+def init_latency_analyzer():
+    from performance.latency_analyzer import LatencyAnalyzer
+
+    return LatencyAnalyzer()
+
+
+def init_config():
+    from utils.temp_placeholders import Config
+
+    return Config()
+
+
 def run_async(coroutine):
     if asyncio is not None and isinstance(coroutine, asyncio.Future):
         loop = asyncio.get_event_loop()
@@ -94,45 +139,91 @@ def run_async(coroutine):
         return None
 
 
-class AtlasApp:
-    """Main application class for Atlas AI platform."""
+def _startup_component(name: str):
+    """Expose a startup component as an attribute built on first access."""
+
+    def getter(self):
+        return self.startup.get(name)
+
+    return property(getter, doc=f"The '{name}' component (see build_startup).")
+
+
+def build_startup(start_time: Optional[float] = None) -> StartupOrchestrator:
+    """Declare Atlas components and the phase in which each becomes ready.
+
+    * critical: what the first window needs (configuration only);
+    * background: initialized concurrently, off the GUI thread, right after
+      the first paint;
+    * on_demand: built the first time they are used.
+    """
+    startup = StartupOrchestrator(start_time=start_time)
+    startup.register("config", init_config, phase=PHASE_CRITICAL, required=True)
+    startup.register(
+        "crash_reporting", init_crash_reporting, phase=PHASE_BACKGROUND, thread_safe=True
+    )
+    startup.register(
+        "data_cache", init_cache, phase=PHASE_BACKGROUND, thread_safe=True
+    )
+    startup.register(
+        "db_optimizer", init_db_optimizer, phase=PHASE_BACKGROUND, thread_safe=True
+    )
+    startup.register(
+        "analytics", init_analytics, phase=PHASE_BACKGROUND, thread_safe=True
+    )
+    startup.register(
+        "performance_monitor",
+        init_performance_monitor,
+        phase=PHASE_BACKGROUND,
+        thread_safe=True,
+    )
+    # Emits context_updated from its own update thread, so GUI affinity is moot
+    startup.register("context_engine", init_context_engine, phase=PHASE_BACKGROUND)
+    startup.register(
+        "decision_engine",
+        init_decision_engine,
+        phase=PHASE_ON_DEMAND,
+        depends_on=("context_engine",),
+    )
+    startup.register(
+        "self_improvement_engine", init_self_improvement_engine, phase=PHASE_ON_DEMAND
+    )
+    startup.register("debugging_hooks", init_debugging_hooks, phase=PHASE_ON_DEMAND)
+    startup.register("latency_analyzer", init_latency_analyzer, phase=PHASE_ON_DEMAND)
+    return startup
+
 
-    def __init__(self):
+class AtlasApp:
+    """Main application class for Atlas AI platform.
+
+    Components are created by a ``StartupOrchestrator`` (see ``build_startup``):
+    only what the first window needs is built before it is shown, the rest is
+    initialized after the first paint or on first access.
+    """
+
+    config = _startup_component("config")
+    data_cache = _startup_component("data_cache")
+    db_optimizer = _startup_component("db_optimizer")
+    analytics = _startup_component("analytics")
+    context_engine = _startup_component("context_engine")
+    decision_engine = _startup_component("decision_engine")
+    self_improvement_engine = _startup_component("self_improvement_engine")
+    debugging_hooks = _startup_component("debugging_hooks")
+    performance_monitor = _startup_component("performance_monitor")
+    latency_analyzer = _startup_component("latency_analyzer")
+
+    def __init__(self, startup: Optional[StartupOrchestrator] = None):
         self.app = None
+        self.main_window = None
         self.async_components = []
-        self.data_cache = DataCache()
-        self.db_optimizer = DatabaseOptimizer(
-            os.environ.get("ATLAS_DB_PATH", ":memory:")
-        )
-        self.analytics = OnboardingAnalytics()
-        logger.info("Onboarding analytics initialized.")
         self.collab_manager = None  # Initialize later with user data
-        # Initialize intelligence components
-        self.context_engine = ContextEngine()
-        self.decision_engine = DecisionEngine(context_engine=self.context_engine)
-        self.self_improvement_engine = SelfImprovementEngine()
-        # Initialize developer tools for Phase 13
-        self.debugging_hooks = DebuggingHooks()
-        self.performance_monitor = PerformanceMonitor()
-        self.latency_analyzer = LatencyAnalyzer()
-        logger.info("Advanced developer tools initialized.")
-        self.config = Config()
+        self.startup = startup or build_startup(start_time=_PROCESS_START)
+        self.startup.on_phase_complete(self._on_startup_phase)
 
     async def initialize(self):
-        """Initialize app components."""
-        if asyncio is not None:
-            future = run_async(self.data_cache.initialize())
-            if future is not None:
-                future.result(timeout=5)  # Wait up to 5 seconds for initialization
-        # Ensure no reference to start_optimization
-        if hasattr(self.db_optimizer, "connect"):
-            self.db_optimizer.connect()
-        else:
-            logger.info("Database optimizer connection method not available, skipping.")
-        logger.info("Database optimizer initialized.")
-        logger.info("Onboarding analytics initialized.")
-        # Initialize intelligence components
-        self.context_engine.start_continuous_update()
+        """Initialize every component that is not on-demand (headless use)."""
+        loop = asyncio.get_running_loop()
+        for phase in (PHASE_CRITICAL, PHASE_BACKGROUND):
+            await loop.run_in_executor(None, self.startup.run_phase, phase)
         logger.info("Intelligence components initialized and context updates started.")
         # Temporarily comment out collaboration initialization
         # user_id = "placeholder_user"
@@ -145,6 +236,8 @@ class AtlasApp:
 
     def _setup_collaboration(self):
         """Set up team collaboration features via WebSocket."""
+        from utils.temp_placeholders import CollaborationManager
+
         logger.info("Setting up collaboration features")
         server_url = os.environ.get("ATLAS_COLLAB_SERVER", "wss://collab.atlas-ai.dev")
         user_id = os.environ.get("ATLAS_USER_ID", "default_user")
@@ -167,14 +260,20 @@ class AtlasApp:
 
     def setup_ui(self):
         """Set up UI components."""
-        # Reverted to passing app_instance now that constructor accepts it
+        from ui.main_window import AtlasMainWindow as MainWindow
+
         self.main_window = MainWindow(app_instance=self)
         self.main_window.show()
         logger.info("UI setup complete")
 
     def shutdown(self):
         """Shut down app components."""
-        self.context_engine.stop_continuous_update()
+        if self.startup.is_ready("context_engine") and self.context_engine:
+            self.context_engine.stop()
+        if self.startup.is_ready("decision_engine") and self.decision_engine:
+            self.decision_engine.shutdown()
+        if self.startup.is_ready("self_improvement_engine") and self.self_improvement_engine:
+            self.self_improvement_engine.history.close()
         # Removed all references to disconnect or close methods to avoid attribute errors
         logger.info("Database optimizer shutdown skipped due to method unavailability.")
         logger.info("Application shutdown complete")
@@ -182,35 +281,50 @@ class AtlasApp:
             self.collab_manager.stop()
 
     def run(self) -> int:
-        """Run the Atlas application."""
+        """Run the Atlas application.
+
+        The critical phase runs before the main window is created; the
+        background phase starts on a worker thread at the first event-loop
+        iteration so it never delays the first paint.
+        """
+        from PySide6.QtCore import QTimer
+        from PySide6.QtWidgets import QApplication
+
         logger.info("Starting Atlas application")
-        self.app = QApplication(sys.argv)
-        # Ensure _setup_ui method exists or replace with actual UI setup
-        if hasattr(self, "_setup_ui"):
-            self._setup_ui()
-        else:
-            logger.warning("_setup_ui method not found, skipping UI setup")
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.startup.mark("qt_ready")
+        self.startup.run_phase(PHASE_CRITICAL)
+        self.setup_ui()
+        QTimer.singleShot(0, self._after_first_paint)
+        self.app.aboutToQuit.connect(self.shutdown)
+        return self.app.exec()
+
+    mainloop = run
+
+    def _after_first_paint(self):
+        """Record time-to-first-window, then initialize background components."""
+        self.startup.mark("time_to_first_window")
+        self.startup.start_background()
         self._run_async_tasks()
-        return self.app.exec_()
+
+    def _on_startup_phase(self, phase: str, entries) -> None:
+        if phase == PHASE_BACKGROUND:
+            self.startup.mark("background_ready")
+            self.startup.publish_metrics(self.performance_monitor)
 
     def _run_async_tasks(self):
         """Run asynchronous initialization tasks."""
-        import asyncio
-
-        def run_async_tasks():
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            tasks = [
-                component.initialize()
-                for component in self.async_components
-                if hasattr(component, "initialize")
-            ]
-            if tasks:
-                loop.run_until_complete(asyncio.gather(*tasks))
-
-        run_async_tasks()
+        tasks = [
+            component.initialize()
+            for component in self.async_components
+            if hasattr(component, "initialize")
+        ]
+        if tasks:
+
+            async def gather():
+                await asyncio.gather(*tasks)
+
+            asyncio.run(gather())
 
     async def _init_component(
         self, component: Any, success_msg: str, error_attr=None
@@ -264,7 +378,15 @@ def parse_arguments():
     parser.add_argument(
         "--no-splash", action="store_true", help="Disable splash screen during startup"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--profile-imports",
+        nargs="*",
+        metavar="MODULE",
+        help="Report import time per Atlas package for MODULE(s) (default: core workflow) and exit",
+    )
+    # Unknown arguments are left for Qt
+    args, _ = parser.parse_known_args()
+    return args
 
 
 def raise_alert(title, message, level):
@@ -274,18 +396,15 @@ def raise_alert(title, message, level):
 
 def main():
     """Main entry point for the Atlas application."""
-    logger.info("Starting Atlas application")
-    app = QApplication(sys.argv)
-    # Initialize core components before UI if needed, but keep it minimal for now
-    # Now initialize UI after QApplication is created
-    if MainWindow is not None:
-        window = (
-            MainWindow()
-        )  # Removed app_instance parameter to match constructor signature
-        window.show()
-        sys.exit(app.exec())
-    else:
-        logger.error("Cannot create main window, exiting")
+    args = parse_arguments()
+    if args.profile_imports is not None:
+        from performance.import_profiler import main as profile_imports
+
+        sys.exit(profile_imports(args.profile_imports))
+    try:
+        sys.exit(AtlasApp().run())
+    except ImportError:
+        logger.error("Cannot create main window, exiting", exc_info=True)
         sys.exit(1)
 
 
@@ -0,0 +1,233 @@
+"""
+Import-time profiling for Atlas.
+
+Runs imports in a fresh interpreter with ``-X importtime`` and attributes the
+time to Atlas packages: every module's own import time is charged to the
+nearest Atlas module above it in the import tree, so third-party libraries
+count against the Atlas package that pulled them in.
+
+Command line::
+
+    python -m performance.import_profiler core workflow --top 15
+    python main.py --profile-imports core workflow
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets (seconds) enforced by tests/test_import_profiler.py
+IMPORT_BUDGETS = {"core": 2.0, "workflow": 1.0}
+
+# Heavy optional dependencies that importing an Atlas package must not pull in;
+# use utils.lazy_imports instead.
+DEFERRED_DEPENDENCIES = (
+    "pandas",
+    "sklearn",
+    "networkx",
+    "cv2",
+    "chromadb",
+    "Quartz",
+    "pyautogui",
+    "matplotlib",
+    "seaborn",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    """One line of ``-X importtime`` output (times in microseconds)."""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".")[0]
+
+
+def atlas_packages(root: str = REPO_ROOT) -> List[str]:
+    """Top-level packages and modules that belong to the Atlas source tree."""
+    names = []
+    for entry in sorted(os.listdir(root)):
+        path = os.path.join(root, entry)
+        if os.path.isfile(os.path.join(path, "__init__.py")):
+            names.append(entry)
+        elif entry.endswith(".py") and os.path.isfile(path):
+            names.append(entry[:-3])
+    return names
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse ``-X importtime`` stderr into records, in output (post-)order."""
+    records = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # One leading space separates the column; two more per nesting level
+            depth = max(0, (len(indent) - 1) // 2)
+            records.append(ImportRecord(name, int(self_us), int(cumulative_us), depth))
+    return records
+
+
+class ImportProfile:
+    """Parsed import timings with Atlas attribution."""
+
+    def __init__(self, records: List[ImportRecord], packages: Optional[Sequence[str]] = None):
+        self.records = records
+        self.packages = set(packages if packages is not None else atlas_packages())
+
+    @property
+    def modules(self) -> List[str]:
+        return [record.name for record in self.records]
+
+    def cumulative(self, module: str) -> float:
+        """Cumulative import time of ``module`` in seconds (0 if not imported)."""
+        for record in self.records:
+            if record.name == module:
+                return record.cumulative_us / 1e6
+        return 0.0
+
+    def imported(self, module: str) -> bool:
+        """Whether ``module`` or any of its submodules was imported."""
+        return any(name == module or name.startswith(module + ".") for name in self.modules)
+
+    def owners(self) -> List[Tuple[ImportRecord, Optional[str]]]:
+        """Pair each record with the Atlas module charged for it.
+
+        ``-X importtime`` prints children before their parent, so the
+        reversed output visits parents first.
+        """
+        stack: List[Tuple[int, Optional[str]]] = []
+        owned = []
+        for record in reversed(self.records):
+            while stack and stack[-1][0] >= record.depth:
+                stack.pop()
+            if record.package in self.packages:
+                owner: Optional[str] = record.name
+            else:
+                owner = stack[-1][1] if stack else None
+            stack.append((record.depth, owner))
+            owned.append((record, owner))
+        owned.reverse()
+        return owned
+
+    def by_package(self) -> Dict[str, float]:
+        """Seconds charged to each top-level Atlas package, slowest first."""
+        totals: Dict[str, float] = {}
+        for record, owner in self.owners():
+            key = owner.split(".")[0] if owner else "<python>"
+            totals[key] = totals.get(key, 0.0) + record.self_us / 1e6
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def by_module(self) -> Dict[str, float]:
+        """Seconds charged to each Atlas module (including what it pulled in)."""
+        totals: Dict[str, float] = {}
+        for record, owner in self.owners():
+            if owner:
+                totals[owner] = totals.get(owner, 0.0) + record.self_us / 1e6
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def format_report(self, top: int = 15) -> str:
+        """Human-readable report."""
+        lines = ["Import time by Atlas package:"]
+        for name, seconds in list(self.by_package().items())[:top]:
+            lines.append(f"  {seconds * 1000:9.1f} ms  {name}")
+        lines.append("Slowest Atlas modules (own code plus the dependencies they import):")
+        for name, seconds in list(self.by_module().items())[:top]:
+            lines.append(f"  {seconds * 1000:9.1f} ms  {name}")
+        deferred = [name for name in DEFERRED_DEPENDENCIES if self.imported(name)]
+        if deferred:
+            lines.append("Heavy optional dependencies imported eagerly: " + ", ".join(deferred))
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "by_package": self.by_package(),
+            "by_module": self.by_module(),
+            "deferred_dependencies_imported": [
+                name for name in DEFERRED_DEPENDENCIES if self.imported(name)
+            ],
+        }
+
+
+def record_imports(
+    modules: Sequence[str],
+    python: str = sys.executable,
+    cwd: str = REPO_ROOT,
+    timeout: float = 120,
+) -> ImportProfile:
+    """Import ``modules`` in a fresh interpreter under ``-X importtime``.
+
+    Args:
+        modules: Module names to import, in order.
+        python: Interpreter to use.
+        cwd: Working directory (the repository root by default).
+        timeout: Seconds before the child process is abandoned.
+
+    Returns:
+        The parsed profile.
+
+    Raises:
+        RuntimeError: If an import fails.
+    """
+    code = "; ".join(f"import {module}" for module in modules) or "pass"
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [cwd, env.get("PYTHONPATH")]))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        tail = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n" + "\n".join(tail[-20:]))
+    return ImportProfile(parse_importtime(result.stderr))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(description="Profile Atlas import times")
+    parser.add_argument("modules", nargs="*", default=["core", "workflow"])
+    parser.add_argument("--top", type=int, default=15, help="Rows per section")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for module in args.modules or ["core", "workflow"]:
+        try:
+            profile = record_imports([module])
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            status = 1
+            continue
+        seconds = profile.cumulative(module)
+        budget = IMPORT_BUDGETS.get(module)
+        if args.json:
+            print(json.dumps({"module": module, "seconds": seconds, "budget": budget, **profile.to_dict()}))
+            continue
+        budget_note = f" (budget {budget:.2f} s)" if budget is not None else ""
+        print(f"import {module}: {seconds * 1000:.1f} ms{budget_note}")
+        print(profile.format_report(args.top))
+        print()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Throughput benchmark for ``IntelligentModeDetector``.
+
+Classifies a fixed corpus of simple commands, analysis questions and
+conversational messages (English and Ukrainian) and reports messages per
+second and per-message latency percentiles, with and without the detector's
+result cache.
+
+Command line::
+
+    python -m performance.mode_detector_benchmark --repeat 200
+    python -m performance.mode_detector_benchmark --json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Sequence
+
+from utils.intelligent_mode_detector import IntelligentModeDetector
+
+# Per-message latency budget (microseconds, uncached) enforced by
+# tests/test_intelligent_mode_detector.py
+LATENCY_BUDGET_US = 200.0
+
+SAMPLE_MESSAGES = (
+    "read file main.py",
+    "list directory agents",
+    "show tree",
+    "search for MemoryManager",
+    "info about config.py",
+    "metrics",
+    "stats for today",
+    "where is config.py",
+    "find functions parse_config",
+    "usage of helper",
+    "just show a quick basic list of files",
+    "hello",
+    "Проаналізуй архітектуру пам'яті в Atlas",
+    "Що не так з модулем думання?",
+    "Як можна покращити продуктивність Atlas?",
+    "Порівняй різні стратегії мислення",
+    "Чому система працює повільно?",
+    "що треба зробити щоб це працювало",
+    "порівняння та різниця між стратегіями",
+    "search for architecture patterns",
+    "analyze file structure main.py",
+    "how does memory manager work?",
+    "show me how the system works",
+    "Give me a detailed, comprehensive and thorough in-depth analysis of the agent memory module design",
+    "why does the code throw an error? what should I change? is it the algorithm?",
+    "how to optimize the implementation of this class method with a variable parameter",
+    "compare approach A with approach B, which is better?",
+    "what is the purpose of the thinking manager in atlas",
+    "describe the system architecture and component integration strategy",
+    "read file a/b/c.py and explain why it is broken",
+)
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput and latency of one benchmark run."""
+
+    messages: int
+    cached: bool
+    seconds: float
+    messages_per_second: float
+    p50_us: float
+    p99_us: float
+    max_us: float
+
+    def format(self) -> str:
+        mode = "cached" if self.cached else "uncached"
+        return (
+            f"{mode:>8}: {self.messages_per_second:,.0f} msg/s over {self.messages} messages "
+            f"(p50 {self.p50_us:.1f} us, p99 {self.p99_us:.1f} us, max {self.max_us:.1f} us)"
+        )
+
+
+def run_benchmark(
+    messages: Sequence[str] = SAMPLE_MESSAGES,
+    repeat: int = 100,
+    cached: bool = False,
+    detector: Optional[IntelligentModeDetector] = None,
+) -> BenchmarkResult:
+    """Classify ``messages`` ``repeat`` times and time every call.
+
+    Without ``cached`` the detector's cache is disabled, so every call runs
+    the full analysis; with it, all but the first pass are cache hits.
+    """
+    if detector is None:
+        detector = IntelligentModeDetector(cache_size=1024 if cached else 0)
+    timings: List[float] = []
+    clock = time.perf_counter
+    start = clock()
+    for _ in range(repeat):
+        for message in messages:
+            before = clock()
+            detector.detect_chat_mode(message)
+            timings.append(clock() - before)
+    elapsed = clock() - start
+
+    timings.sort()
+    count = len(timings)
+    p99_index = min(count - 1, int(count * 0.99))
+    return BenchmarkResult(
+        messages=count,
+        cached=cached,
+        seconds=elapsed,
+        messages_per_second=count / elapsed if elapsed else 0.0,
+        p50_us=statistics.median(timings) * 1e6 if timings else 0.0,
+        p99_us=timings[p99_index] * 1e6 if timings else 0.0,
+        max_us=timings[-1] * 1e6 if timings else 0.0,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(description="Benchmark chat mode detection")
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the sample corpus")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    args = parser.parse_args(argv)
+
+    results = [run_benchmark(repeat=args.repeat, cached=cached) for cached in (False, True)]
+    if args.json:
+        print(json.dumps([asdict(result) for result in results]))
+    else:
+        for result in results:
+            print(result.format())
+    uncached = results[0]
+    if uncached.p50_us > LATENCY_BUDGET_US:
+        print(f"p50 latency exceeds the {LATENCY_BUDGET_US:.0f} us budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
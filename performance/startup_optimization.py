@@ -1,11 +1,28 @@
 """Startup Time Optimization for Atlas (ASC-025)
 
 This module implements strategies to reduce the startup time of the Atlas application as part of ASC-025. Techniques include lazy loading of modules and dependencies.
+
+``StartupOrchestrator`` stages application start-up. Components are declared with
+their dependencies and a readiness phase:
+
+* ``critical`` - needed before the first window can be painted;
+* ``background`` - initialized right after the first paint, with independent
+  async components (and thread-safe sync ones) running concurrently;
+* ``on_demand`` - built the first time something asks for them.
+
+Every component start and finish is recorded in a timeline that is logged as
+each phase completes. Milestones such as time-to-first-window are kept as
+metrics that can be forwarded to the ``PerformanceMonitor``.
 """
 
+import asyncio
 import importlib
+import inspect
 import logging
-from typing import Any
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 try:
     from PySide6.QtCore import Qt
@@ -86,10 +103,12 @@ def optimize_startup():
     """Optimize startup by setting up lazy loading for heavy modules."""
     lazy_loader = LazyLoader()
 
-    # Register heavy modules for lazy loading
-    lazy_loader.register_module("ai_context", "core.ai_context")
+    # Register heavy modules for lazy loading (see performance.import_profiler
+    # for finding new candidates)
+    lazy_loader.register_module("chromadb_manager", "core.memory.chromadb_manager")
     lazy_loader.register_module("cloud_sync", "core.cloud_sync")
-    lazy_loader.register_module("plugins", "plugins.manager")
+    lazy_loader.register_module("plugins", "core.plugin_system")
+    lazy_loader.register_module("workflow_analytics", "workflow.workflow_analytics")
 
     logger.info("Startup optimization applied with lazy loading for heavy modules")
     return lazy_loader
@@ -136,3 +155,376 @@ class SplashScreenManager:
             self._splash.close()
             self._splash = None
             logger.info("Splash screen closed")
+
+
+def _run_coroutine(coroutine: Any) -> Any:
+    """Run a coroutine to completion, even when called from inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    result: Dict[str, Any] = {}
+
+    def runner() -> None:
+        try:
+            result["value"] = asyncio.run(coroutine)
+        except BaseException as e:  # re-raised in the calling thread
+            result["error"] = e
+
+    thread = threading.Thread(target=runner, name="startup-coroutine")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
+
+
+PHASE_CRITICAL = "critical"
+PHASE_BACKGROUND = "background"
+PHASE_ON_DEMAND = "on_demand"
+PHASES = (PHASE_CRITICAL, PHASE_BACKGROUND, PHASE_ON_DEMAND)
+
+
+@dataclass
+class StartupComponent:
+    """A component declared with the startup orchestrator.
+
+    Attributes:
+        name (str): Unique component name.
+        factory (Callable): Builds the component. Receives the instances of
+            ``depends_on`` as keyword arguments; may be a coroutine function.
+        phase (str): One of ``PHASES``.
+        depends_on (Sequence[str]): Components that must be ready first.
+        initializer (Optional[Callable]): Called with the built instance; may
+            be async (e.g. ``DataCache.initialize``).
+        thread_safe (bool): Factories marked thread-safe run in a worker
+            thread so they overlap with other components (and blocking calls
+            in async factories cannot stall the others); the rest run on the
+            thread running the phase.
+        required (bool): Failures of required components are raised; others
+            are logged and the component resolves to ``None``.
+    """
+
+    name: str
+    factory: Callable[..., Any]
+    phase: str = PHASE_BACKGROUND
+    depends_on: Sequence[str] = ()
+    initializer: Optional[Callable[[Any], Any]] = None
+    thread_safe: bool = False
+    required: bool = False
+
+
+@dataclass
+class TimelineEntry:
+    """Start/end offsets (seconds since orchestrator creation) of one component."""
+
+    name: str
+    phase: str
+    start: float
+    end: float = 0.0
+    status: str = "running"
+    error: Optional[str] = None
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+
+class StartupOrchestrator:
+    """Builds declared components phase by phase and records a timeline."""
+
+    def __init__(self, start_time: Optional[float] = None):
+        """Create the orchestrator.
+
+        Args:
+            start_time (Optional[float]): ``time.perf_counter()`` value treated
+                as time zero, e.g. captured at process start.
+        """
+        self.t0 = start_time if start_time is not None else time.perf_counter()
+        self._components: Dict[str, StartupComponent] = {}
+        self._instances: Dict[str, Any] = {}
+        self._ready: Dict[str, threading.Event] = {}
+        self._building: Dict[str, threading.Thread] = {}
+        self._lock = threading.RLock()
+        self.timeline: List[TimelineEntry] = []
+        self.metrics: Dict[str, float] = {}
+        self.completed_phases: List[str] = []
+        self._phase_listeners: List[Callable[[str, List[TimelineEntry]], None]] = []
+
+    def now(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[..., Any],
+        phase: str = PHASE_BACKGROUND,
+        depends_on: Sequence[str] = (),
+        initializer: Optional[Callable[[Any], Any]] = None,
+        thread_safe: bool = False,
+        required: bool = False,
+    ) -> None:
+        """Declare a component (see ``StartupComponent`` for the arguments)."""
+        if phase not in PHASES:
+            raise ValueError(f"Unknown startup phase: {phase}")
+        with self._lock:
+            self._components[name] = StartupComponent(
+                name, factory, phase, tuple(depends_on), initializer, thread_safe, required
+            )
+            self._ready.setdefault(name, threading.Event())
+
+    def on_phase_complete(self, callback: Callable[[str, List[TimelineEntry]], None]) -> None:
+        """Call ``callback(phase, entries)`` whenever a phase finishes."""
+        self._phase_listeners.append(callback)
+
+    def is_ready(self, name: str) -> bool:
+        event = self._ready.get(name)
+        return event is not None and event.is_set()
+
+    def mark(self, milestone: str) -> float:
+        """Record a milestone (e.g. ``"time_to_first_window"``) at the current offset."""
+        value = self.now()
+        self.metrics.setdefault(milestone, value)
+        logger.info(f"Startup milestone {milestone}: {value * 1000:.1f} ms")
+        return self.metrics[milestone]
+
+    def publish_metrics(self, monitor: Any, prefix: str = "startup.") -> None:
+        """Forward milestones and phase durations to a ``PerformanceMonitor``."""
+        if monitor is None or not hasattr(monitor, "record_metric"):
+            return
+        for name, value in self.metrics.items():
+            monitor.record_metric(prefix + name, value)
+
+    # -- building ----------------------------------------------------------
+    def _order(self, names: Sequence[str]) -> List[str]:
+        """Dependency order for ``names`` (dependencies of other phases are skipped)."""
+        ordered: List[str] = []
+        state: Dict[str, int] = {}
+        wanted = set(names)
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Startup dependency cycle involving {name}")
+            state[name] = 1
+            for dep in self._components[name].depends_on:
+                if dep not in self._components:
+                    raise KeyError(f"{name} depends on unknown component {dep}")
+                if dep in wanted:
+                    visit(dep)
+            state[name] = 2
+            ordered.append(name)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    def _begin(self, component: StartupComponent) -> TimelineEntry:
+        entry = TimelineEntry(component.name, component.phase, self.now())
+        with self._lock:
+            self.timeline.append(entry)
+        return entry
+
+    def _finish(
+        self, component: StartupComponent, entry: TimelineEntry, instance: Any, error: Optional[BaseException]
+    ) -> None:
+        entry.end = self.now()
+        if error is None:
+            entry.status = "ready"
+        else:
+            entry.status = "failed"
+            entry.error = str(error)
+            instance = None
+            logger.error(f"Startup component {component.name} failed: {error}", exc_info=error)
+        with self._lock:
+            self._instances[component.name] = instance
+        self._ready[component.name].set()
+        if error is not None and component.required:
+            raise error
+
+    def _dependencies(self, component: StartupComponent) -> Dict[str, Any]:
+        return {dep: self.get(dep) for dep in component.depends_on}
+
+    def _build_sync(self, component: StartupComponent) -> Any:
+        entry = self._begin(component)
+        instance, error = None, None
+        try:
+            instance = component.factory(**self._dependencies(component))
+            if inspect.isawaitable(instance):
+                instance = _run_coroutine(instance)
+            if component.initializer is not None:
+                result = component.initializer(instance)
+                if inspect.isawaitable(result):
+                    _run_coroutine(result)
+        except Exception as e:
+            error = e
+        self._finish(component, entry, instance, error)
+        return self._instances.get(component.name)
+
+    async def _build_async(self, component: StartupComponent, pending: Dict[str, "asyncio.Task"]) -> None:
+        for dep in component.depends_on:
+            if dep in pending:
+                await pending[dep]
+        if self._ready[component.name].is_set():
+            return  # built on demand while waiting for dependencies
+        kwargs = {dep: self.get(dep) for dep in component.depends_on}
+        entry = self._begin(component)
+        instance, error = None, None
+        try:
+            instance = await self._construct_async(component, kwargs, entry)
+            await self._initialize_async(component, instance)
+        except Exception as e:
+            error = e
+        self._finish(component, entry, instance, error)
+
+    @staticmethod
+    async def _construct_async(component: StartupComponent, kwargs: Dict[str, Any], entry: TimelineEntry) -> Any:
+        if component.thread_safe:
+
+            def build_in_worker() -> Any:
+                entry.thread = threading.current_thread().name
+                result = component.factory(**kwargs)
+                # Blocking work inside "async" factories must not stall the loop
+                return asyncio.run(result) if inspect.isawaitable(result) else result
+
+            return await asyncio.get_running_loop().run_in_executor(None, build_in_worker)
+        if inspect.iscoroutinefunction(component.factory):
+            return await component.factory(**kwargs)
+        instance = component.factory(**kwargs)
+        if inspect.isawaitable(instance):
+            instance = await instance
+        return instance
+
+    @staticmethod
+    async def _initialize_async(component: StartupComponent, instance: Any) -> None:
+        if component.initializer is None:
+            return
+        if component.thread_safe and not inspect.iscoroutinefunction(component.initializer):
+            result = await asyncio.get_running_loop().run_in_executor(None, component.initializer, instance)
+        else:
+            result = component.initializer(instance)
+        if inspect.isawaitable(result):
+            await result
+
+    def run_phase(self, phase: str) -> List[TimelineEntry]:
+        """Initialize every component of ``phase`` and return its timeline.
+
+        Independent components run concurrently on an asyncio loop; each
+        waits only for its own dependencies. Must not be called from inside
+        a running event loop.
+        """
+        ordered = self._claim_phase(phase)
+        phase_start = self.now()
+
+        async def run_all() -> None:
+            pending: Dict[str, asyncio.Task] = {}
+            for name in ordered:
+                pending[name] = asyncio.ensure_future(self._build_async(self._components[name], pending))
+            if pending:
+                results = await asyncio.gather(*pending.values(), return_exceptions=True)
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+
+        try:
+            if ordered:
+                asyncio.run(run_all())
+        finally:
+            with self._lock:
+                for name in ordered:
+                    self._building.pop(name, None)
+        self.metrics[f"{phase}_phase"] = self.now() - phase_start
+        self.completed_phases.append(phase)
+        entries = [entry for entry in self.timeline if entry.phase == phase]
+        self.log_timeline(phase, entries)
+        self._notify_phase(phase, entries)
+        return entries
+
+    def _claim_phase(self, phase: str) -> List[str]:
+        """Mark the unbuilt components of ``phase`` as being built here, in dependency order."""
+        with self._lock:
+            names = [
+                name
+                for name, component in self._components.items()
+                if component.phase == phase and not self._ready[name].is_set() and name not in self._building
+            ]
+            ordered = self._order(names)
+            for name in ordered:
+                self._building[name] = threading.current_thread()
+        return ordered
+
+    def _notify_phase(self, phase: str, entries: List[TimelineEntry]) -> None:
+        for listener in self._phase_listeners:
+            try:
+                listener(phase, entries)
+            except Exception as e:
+                logger.error(f"Startup phase listener failed: {e}")
+
+    def start_background(self) -> threading.Thread:
+        """Run the background phase on a worker thread.
+
+        Keeps the GUI event loop responsive while background components
+        initialize. Components must not need GUI-thread affinity; completion
+        is reported through ``on_phase_complete``.
+        """
+        thread = threading.Thread(
+            target=self.run_phase, args=(PHASE_BACKGROUND,), name="startup-background", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Return a component, building it now if it has not been built yet.
+
+        On-demand components (and any component whose phase has not run yet)
+        are built synchronously on first access. A component that another
+        thread is building is waited for.
+        """
+        if name not in self._components:
+            raise KeyError(f"Unknown startup component: {name}")
+        event = self._ready[name]
+        if event.is_set():
+            return self._instances.get(name)
+
+        with self._lock:
+            building = self._building.get(name)
+            if building is None and not event.is_set():
+                self._building[name] = threading.current_thread()
+        if building is not None and building is not threading.current_thread():
+            if not event.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for startup component {name}")
+            return self._instances.get(name)
+        if event.is_set():
+            return self._instances.get(name)
+        try:
+            return self._build_sync(self._components[name])
+        finally:
+            with self._lock:
+                self._building.pop(name, None)
+
+    def log_timeline(self, phase: str, entries: Optional[List[TimelineEntry]] = None) -> None:
+        """Log the timeline of a phase, one line per component."""
+        entries = entries if entries is not None else [e for e in self.timeline if e.phase == phase]
+        logger.info(f"Startup phase '{phase}' finished at {self.now() * 1000:.1f} ms ({len(entries)} components)")
+        for entry in sorted(entries, key=lambda e: e.start):
+            logger.info(
+                f"  {entry.name:<28} {entry.start * 1000:8.1f} -> {entry.end * 1000:8.1f} ms "
+                f"({entry.duration * 1000:.1f} ms, {entry.status}, {entry.thread})"
+            )
+
+    def timeline_report(self) -> List[Dict[str, Any]]:
+        """The full timeline as plain dictionaries (e.g. for JSON export)."""
+        return [
+            {
+                "name": e.name,
+                "phase": e.phase,
+                "start_ms": round(e.start * 1000, 3),
+                "end_ms": round(e.end * 1000, 3),
+                "status": e.status,
+                "error": e.error,
+                "thread": e.thread,
+            }
+            for e in sorted(self.timeline, key=lambda e: e.start)
+        ]
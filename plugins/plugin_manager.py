@@ -1,6 +1,5 @@
 """Plugin Manager for Atlas."""
 
-import importlib
 import logging
 import os
 import sys
@@ -8,6 +7,9 @@ from typing import Any, Dict, List, Optional
 
 from PySide6.QtCore import QObject, Signal, Slot
 
+from core.plugin_host import PluginHost
+from core.plugin_manifest import PluginActivator, PluginIndex, PluginManifest
+
 from .plugin_interface import PluginInterface
 
 
@@ -17,13 +19,44 @@ class PluginManager(QObject):
     plugins_loaded = Signal(list)
     plugin_status_changed = Signal(str, str)
 
-    def __init__(self, parent: Optional[QObject] = None):
+    def __init__(self, parent: Optional[QObject] = None, host: Optional[PluginHost] = None):
+        """Create the manager.
+
+        Args:
+            parent (Optional[QObject]): Qt parent.
+            host (Optional[PluginHost]): Run plugins out of process in this host;
+                plugins are then ``RemotePlugin`` proxies.
+        """
         super().__init__(parent)
         self.logger = logging.getLogger(__name__)
         self.plugins_directory = os.path.join(os.path.dirname(__file__), "")
-        self.plugins: Dict[str, PluginInterface] = {}
+        self.index = PluginIndex(self.plugins_directory, package="plugins")
+        self.host = host
+        # Plugins are Qt objects, so they are constructed on this thread
+        self.activator = PluginActivator(
+            self._discovered_manifests,
+            instantiate=self._create_plugin,
+            loader=host.load if host is not None else None,
+        )
+        self.plugins: Dict[str, PluginInterface] = self.activator.loaded
         self.logger.info("PluginManager initialized")
 
+    def _discovered_manifests(self) -> Dict[str, PluginManifest]:
+        manifests = {}
+        for name, manifest in self.index.manifests().items():
+            if os.path.isdir(manifest.path):
+                manifest.main_thread = True
+                manifests[name] = manifest
+        return manifests
+
+    def _create_plugin(self, plugin_class: Any, manifest: PluginManifest) -> PluginInterface:
+        plugin_instance = plugin_class(manifest.name)
+        if not isinstance(plugin_instance, PluginInterface):
+            raise TypeError(f"Plugin {manifest.name} does not inherit from PluginInterface")
+        plugin_id = manifest.name
+        plugin_instance.status_changed.connect(lambda status: self.plugin_status_changed.emit(plugin_id, status))
+        return plugin_instance
+
     def discover_plugins(self) -> List[str]:
         """Discover available plugins in the plugins directory.
 
@@ -43,11 +76,11 @@ class PluginManager(QObject):
             sys.path.append(plugins_path)
             self.logger.debug(f"Added {plugins_path} to sys.path")
 
-        for entry in os.scandir(plugins_path):
-            if entry.is_dir() and not entry.name.startswith("__"):
-                plugin_id = entry.name
-                plugin_ids.append(plugin_id)
-                self.logger.debug(f"Discovered plugin: {plugin_id}")
+        # Manifests come from the cached index; no plugin code is imported
+        self.index.refresh()
+        for plugin_id in sorted(self._discovered_manifests()):
+            plugin_ids.append(plugin_id)
+            self.logger.debug(f"Discovered plugin: {plugin_id}")
 
         self.logger.info(f"Discovered {len(plugin_ids)} plugins")
         return plugin_ids
@@ -66,37 +99,9 @@ class PluginManager(QObject):
 
         for plugin_id in plugin_ids:
             try:
-                # Import the plugin module
-                plugin_module_name = f"plugins.{plugin_id}.main"
-                self.logger.debug(f"Importing plugin module: {plugin_module_name}")
-                plugin_module = importlib.import_module(plugin_module_name)
-
-                # Get the plugin class from the module
-                plugin_class = getattr(plugin_module, "AtlasPlugin", None)
-                if plugin_class is None:
-                    self.logger.error(
-                        f"No AtlasPlugin class found in {plugin_module_name}"
-                    )
-                    continue
-
-                # Create plugin instance
-                plugin_instance = plugin_class(plugin_id)
-                if not isinstance(plugin_instance, PluginInterface):
-                    self.logger.error(
-                        f"Plugin {plugin_id} does not inherit from PluginInterface"
-                    )
-                    continue
-
-                # Store plugin
-                self.plugins[plugin_id] = plugin_instance
+                plugin_instance = self.activator.load(plugin_id)
                 self.logger.info(f"Loaded plugin: {plugin_id}")
 
-                # Connect plugin status signal
-                def create_status_handler(pid: str):
-                    return lambda status: self.plugin_status_changed.emit(pid, status)
-
-                plugin_instance.status_changed.connect(create_status_handler(plugin_id))
-
                 # Get metadata
                 metadata = plugin_instance.get_metadata()
                 metadata["id"] = plugin_id
@@ -115,22 +120,16 @@ class PluginManager(QObject):
     def initialize_plugins(self) -> None:
         """Initialize all loaded plugins."""
         self.logger.info("Initializing all plugins")
-        for plugin_id, plugin in self.plugins.items():
-            try:
-                if not plugin.initialize():
-                    self.logger.error(f"Failed to initialize plugin: {plugin_id}")
-            except Exception as e:
-                self.logger.error(f"Error initializing plugin {plugin_id}: {str(e)}")
+        results = self.activator.activate(list(self.plugins))
+        for plugin_id, timing in results.items():
+            if timing.status != "active":
+                self.logger.error(f"Failed to initialize plugin {plugin_id}: {timing.error}")
         self.logger.info("Completed initializing plugins")
 
     def shutdown_plugins(self) -> None:
         """Shut down all loaded plugins."""
         self.logger.info("Shutting down all plugins")
-        for plugin_id, plugin in self.plugins.items():
-            try:
-                plugin.shutdown()
-            except Exception as e:
-                self.logger.error(f"Error shutting down plugin {plugin_id}: {str(e)}")
+        self.activator.shutdown()
         self.logger.info("Completed shutting down plugins")
 
     def get_plugin(self, plugin_id: str) -> Optional[PluginInterface]:
@@ -181,15 +180,50 @@ class PluginManager(QObject):
             metadata_list.append(metadata)
         return metadata_list
 
+    def activate_for_event(self, event_type: str) -> List[str]:
+        """Load and initialize the plugins whose manifests list ``event_type``.
+
+        Args:
+            event_type (str): Activation event.
+
+        Returns:
+            List[str]: IDs of the plugins activated by this call.
+        """
+        results = self.activator.fire(event_type)
+        activated = [plugin_id for plugin_id, timing in results.items() if timing.status == "active"]
+        if activated:
+            self.plugins_loaded.emit([self.get_plugin_metadata(plugin_id) for plugin_id in activated])
+        return activated
+
+    def get_plugin_timings(self) -> Dict[str, Dict[str, Any]]:
+        """Load and initialization times of the plugins activated so far."""
+        return {
+            plugin_id: {
+                "status": timing.status,
+                "load_seconds": timing.load_seconds,
+                "init_seconds": timing.init_seconds,
+                "error": timing.error,
+            }
+            for plugin_id, timing in self.activator.timings.items()
+        }
+
     @Slot(str, object)
     def broadcast_event(self, event_type: str, data: Any) -> None:
         """Broadcast an event to all active plugins.
 
+        Plugins that declare ``event_type`` as an activation event are loaded
+        first. With a ``PluginHost`` the event is queued and delivered to each
+        worker process in a batch.
+
         Args:
             event_type (str): Type of event.
             data (Any): Event data.
         """
+        self.activate_for_event(event_type)
         self.logger.debug(f"Broadcasting event {event_type} to plugins")
+        if self.host is not None:
+            self.host.broadcast_event(event_type, data, plugins=list(self.activator.active))
+            return
         for plugin_id, plugin in self.plugins.items():
             if plugin.is_active:
                 try:
@@ -15,7 +15,11 @@ __all__ = [
     "check_password_strength",
     "constant_time_compare",
     "decrypt_data",
+    "decrypt_many",
     "encrypt_data",
+    "encrypt_many",
+    "CryptoService",
+    "get_crypto_service",
     "generate_secure_token",
     "hash_password",
     "validate_input",
@@ -29,6 +33,7 @@ __all__ = [
 ]
 
 from security.credential_manager import CredentialManager
+from security.crypto_service import CryptoService
 from security.network_security import (
     configure_secure_session,
     enforce_https_url,
@@ -41,8 +46,11 @@ from security.security_utils import (
     check_password_strength,
     constant_time_compare,
     decrypt_data,
+    decrypt_many,
     encrypt_data,
+    encrypt_many,
     generate_secure_token,
+    get_crypto_service,
     sanitize_input,
     secure_hash,
 )
@@ -9,9 +9,16 @@ derived from a master password or system-specific information.
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Dict, Optional, Set
 
-from security.security_utils import decrypt_data, derive_key, encrypt_data, get_logger
+from security.crypto_service import pair_results
+from security.security_utils import (
+    decrypt_data,
+    derive_key,
+    encrypt_many,
+    get_crypto_service,
+    get_logger,
+)
 
 # Logger for credential operations
 logger = get_logger("CredentialManager")
@@ -25,7 +32,11 @@ MASTER_KEY_ENV = "ATLAS_MASTER_KEY"
 
 
 class CredentialManager:
-    """Manages secure storage and retrieval of credentials."""
+    """Manages secure storage and retrieval of credentials.
+
+    Stored values are kept encrypted after loading and decrypted individually on
+    first access, so start-up only pays for reading the credential file.
+    """
 
     def __init__(self, master_key: Optional[str] = None):
         """
@@ -35,7 +46,9 @@ class CredentialManager:
             master_key: Optional master key for encryption. If not provided,
                        will use environment variable or default derivation.
         """
-        self._credentials: Dict[str, Any] = {}
+        self._credentials: Dict[str, str] = {}
+        self._encrypted: Dict[str, str] = {}
+        self._dirty: Set[str] = set()
         self._master_key = master_key or os.environ.get(MASTER_KEY_ENV)
         self._loaded = False
         logger.info("Credential Manager initialized")
@@ -62,6 +75,8 @@ class CredentialManager:
         """
         Load credentials from storage.
 
+        Values stay encrypted until they are first requested.
+
         Returns:
             bool: True if credentials loaded successfully
         """
@@ -73,49 +88,76 @@ class CredentialManager:
                 with open(CREDENTIAL_FILE, "r") as f:
                     encrypted_data = json.load(f)
 
-                decrypted_data = {}
-                for key, encrypted_value in encrypted_data.items():
-                    decrypted_value = decrypt_data(encrypted_value)
-                    if decrypted_value:
-                        decrypted_data[key] = decrypted_value
-                    else:
-                        logger.warning("Failed to decrypt credential: %s", key)
-
-                self._credentials = decrypted_data
+                self._encrypted = {str(k): v for k, v in encrypted_data.items()}
+                self._credentials = {}
+                self._dirty = set()
                 self._loaded = True
-                logger.info("Credentials loaded from storage")
+                logger.info("Credentials loaded from storage (%d entries)", len(self._encrypted))
                 return True
             else:
                 logger.info("No credential file found, starting with empty credentials")
                 self._credentials = {}
+                self._encrypted = {}
+                self._dirty = set()
                 self._loaded = True
                 return True
         except Exception as e:
             logger.error("Error loading credentials: %s", str(e))
             self._credentials = {}
+            self._encrypted = {}
+            self._dirty = set()
             self._loaded = False
             return False
 
+    def _decrypt_entry(self, key: str) -> Optional[str]:
+        """
+        Decrypt a stored credential on first access and cache the plain value.
+
+        Args:
+            key: Credential key
+
+        Returns:
+            Optional[str]: Decrypted value, or None if missing or undecryptable
+        """
+        if key in self._credentials:
+            return self._credentials[key]
+
+        encrypted_value = self._encrypted.get(key)
+        if encrypted_value is None:
+            return None
+
+        decrypted_value = decrypt_data(encrypted_value)
+        if decrypted_value is None:
+            logger.warning("Failed to decrypt credential: %s", key)
+            return None
+
+        self._credentials[key] = decrypted_value
+        return decrypted_value
+
     def save_credentials(self) -> bool:
         """
         Save credentials to storage.
 
+        Only values changed since loading are re-encrypted; untouched entries are
+        written back with their existing ciphertext.
+
         Returns:
             bool: True if credentials saved successfully
         """
         try:
             self._ensure_directory()
-            encrypted_data = {}
-            for key, value in self._credentials.items():
-                encrypted_value = encrypt_data(value)
-                if encrypted_value:
-                    encrypted_data[key] = encrypted_value
-                else:
-                    logger.warning("Failed to encrypt credential: %s", key)
-                    encrypted_data[key] = value  # Fallback to unencrypted (not ideal)
+            dirty_keys = [key for key in self._dirty if key in self._credentials]
+            encrypted_values = encrypt_many([self._credentials[key] for key in dirty_keys])
+            encrypted, failed = pair_results(dirty_keys, encrypted_values)
+            for key in failed:
+                logger.warning("Failed to encrypt credential: %s", key)
+                encrypted[key] = self._credentials[key]  # Fallback to unencrypted (not ideal)
+
+            self._encrypted.update(encrypted)
+            self._dirty.clear()
 
             with open(CREDENTIAL_FILE, "w") as f:
-                json.dump(encrypted_data, f, indent=2)
+                json.dump(self._encrypted, f, indent=2)
 
             # Set proper permissions
             os.chmod(CREDENTIAL_FILE, 0o600)
@@ -125,6 +167,46 @@ class CredentialManager:
             logger.error("Error saving credentials: %s", str(e))
             return False
 
+    def rotate_encryption_key(
+        self, old_key: bytes, new_key: bytes, max_workers: Optional[int] = None
+    ) -> bool:
+        """
+        Re-encrypt all stored credentials with a new key.
+
+        Ciphertexts are rotated in bulk on the crypto service's thread pool without
+        decrypting them into the in-memory cache. On success ``new_key`` becomes the
+        crypto service's default key; the old key is still accepted for decryption.
+
+        Args:
+            old_key: Key the stored credentials are encrypted with
+            new_key: Key to re-encrypt them with
+            max_workers: Optional thread pool size for the rotation
+
+        Returns:
+            bool: True if every credential was rotated and saved
+        """
+        if not self._loaded:
+            self.load_credentials()
+
+        # Persist pending changes under the old key first so everything is rotated
+        if self._dirty and not self.save_credentials():
+            return False
+
+        keys = list(self._encrypted)
+        rotated_values = get_crypto_service().rotate_many(
+            [self._encrypted[key] for key in keys], old_key, new_key, max_workers
+        )
+        rotated, failed = pair_results(keys, rotated_values)
+        if failed:
+            logger.error("Key rotation failed for %d credential(s): %s", len(failed), ", ".join(failed))
+            return False
+
+        self._encrypted = rotated
+        self._credentials.clear()
+        get_crypto_service().set_default_key(new_key)
+        logger.info("Rotated encryption key for %d credential(s)", len(rotated))
+        return self.save_credentials()
+
     def get_credential(self, key: str, default: Optional[str] = None) -> Optional[str]:
         """
         Retrieve a credential by key.
@@ -139,7 +221,8 @@ class CredentialManager:
         if not self._loaded:
             self.load_credentials()
 
-        return self._credentials.get(key, default)
+        value = self._decrypt_entry(key)
+        return default if value is None else value
 
     def set_credential(self, key: str, value: str) -> bool:
         """
@@ -156,6 +239,7 @@ class CredentialManager:
             self.load_credentials()
 
         self._credentials[key] = value
+        self._dirty.add(key)
         logger.info("Credential set for key: %s", key)
         return self.save_credentials()
 
@@ -172,8 +256,10 @@ class CredentialManager:
         if not self._loaded:
             self.load_credentials()
 
-        if key in self._credentials:
-            del self._credentials[key]
+        if key in self._credentials or key in self._encrypted:
+            self._credentials.pop(key, None)
+            self._encrypted.pop(key, None)
+            self._dirty.discard(key)
             logger.info("Credential deleted for key: %s", key)
             return self.save_credentials()
         return True
@@ -188,7 +274,7 @@ class CredentialManager:
         if not self._loaded:
             self.load_credentials()
 
-        return list(self._credentials.keys())
+        return list(dict.fromkeys([*self._encrypted, *self._credentials]))
 
 
 def get_credential_manager(master_key: Optional[str] = None) -> CredentialManager:
@@ -0,0 +1,432 @@
+"""
+Cached cryptography service for the Atlas application.
+
+This module keeps resolved encryption keys and their Fernet cipher objects in memory
+so that repeated encrypt/decrypt calls do not reload configuration, re-decode keys or
+rebuild ciphers. It also provides bulk helpers used by the credential manager for
+loading and key rotation.
+"""
+
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+from core.logging import get_logger
+
+logger = get_logger("CryptoService")
+
+# Number of PBKDF2 iterations used for password based key derivation
+KDF_ITERATIONS = 100000
+
+# Maximum number of cipher objects kept in the key ring
+MAX_CACHED_CIPHERS = 16
+
+# Maximum number of password-derived keys kept in memory
+MAX_DERIVED_KEYS = 32
+
+# Retired default keys still accepted for decryption after a rotation
+MAX_PREVIOUS_KEYS = 4
+
+# Below this many items bulk operations run inline instead of on a thread pool
+PARALLEL_THRESHOLD = 64
+
+KeyProvider = Callable[[], Optional[bytes]]
+
+
+class KeyRing:
+    """LRU cache of Fernet cipher objects keyed by key material."""
+
+    def __init__(self, max_size: int = MAX_CACHED_CIPHERS):
+        """
+        Initialize the key ring.
+
+        Args:
+            max_size: Maximum number of cipher objects to keep
+        """
+        self._max_size = max_size
+        self._ciphers: "OrderedDict[bytes, Fernet]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cipher(self, key: bytes) -> "Fernet":
+        """
+        Get a cached cipher for a key, creating it on first use.
+
+        Args:
+            key: Fernet key
+
+        Returns:
+            Fernet: Cipher object for the key
+        """
+        with self._lock:
+            cipher = self._ciphers.get(key)
+            if cipher is not None:
+                self._ciphers.move_to_end(key)
+                return cipher
+
+        # Construction validates the key, do it outside the lock
+        cipher = Fernet(key)
+        with self._lock:
+            self._ciphers[key] = cipher
+            self._ciphers.move_to_end(key)
+            while len(self._ciphers) > self._max_size:
+                self._ciphers.popitem(last=False)
+        return cipher
+
+    def rotation_cipher(self, new_key: bytes, old_keys: Iterable[bytes]) -> "MultiFernet":
+        """
+        Build a MultiFernet that encrypts with ``new_key`` and accepts ``old_keys``.
+
+        Args:
+            new_key: Key used for re-encryption
+            old_keys: Keys accepted for decryption
+
+        Returns:
+            MultiFernet: Cipher suitable for ``rotate``
+        """
+        ciphers = [self.cipher(new_key)] + [self.cipher(k) for k in old_keys if k != new_key]
+        return MultiFernet(ciphers)
+
+    def clear(self) -> None:
+        """Drop all cached cipher objects."""
+        with self._lock:
+            self._ciphers.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ciphers)
+
+
+class CryptoService:
+    """Encryption service with a cached key ring and bulk operations."""
+
+    def __init__(self, key_provider: Optional[KeyProvider] = None, max_workers: int = 4):
+        """
+        Initialize the crypto service.
+
+        Args:
+            key_provider: Callable returning the default encryption key. It is called
+                          once and the result is cached until ``invalidate_key``.
+            max_workers: Thread pool size used for bulk operations
+        """
+        self._key_provider = key_provider
+        self._max_workers = max(1, max_workers)
+        self._key_ring = KeyRing()
+        self._default_key: Optional[bytes] = None
+        self._default_key_resolved = False
+        self._previous_keys: List[bytes] = []
+        self._default_cipher: Optional["MultiFernet"] = None
+        self._derived_keys: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """bool: Whether the cryptography library is installed."""
+        return CRYPTOGRAPHY_AVAILABLE
+
+    def get_default_key(self) -> Optional[bytes]:
+        """
+        Get the default encryption key, resolving it through the provider once.
+
+        Returns:
+            Optional[bytes]: Default key, or None if no key is configured
+        """
+        if self._default_key_resolved:
+            return self._default_key
+
+        with self._lock:
+            if not self._default_key_resolved:
+                self._default_key = self._key_provider() if self._key_provider else None
+                # Only cache successful lookups so a key configured later is picked up
+                self._default_key_resolved = self._default_key is not None
+            return self._default_key
+
+    def set_default_key(self, key: bytes) -> None:
+        """
+        Make ``key`` the default key, e.g. after a key rotation.
+
+        New data is encrypted with ``key``; data encrypted with the previous default
+        keys can still be decrypted.
+
+        Args:
+            key: New default Fernet key
+        """
+        with self._lock:
+            self._retire_default_key()
+            if key in self._previous_keys:
+                self._previous_keys.remove(key)
+            self._default_key = key
+            self._default_key_resolved = True
+
+    def invalidate_key(self) -> None:
+        """Forget the cached default key and cipher objects (e.g. after config reload)."""
+        with self._lock:
+            self._retire_default_key()
+            self._default_key = None
+            self._default_key_resolved = False
+        self._key_ring.clear()
+
+    def _retire_default_key(self) -> None:
+        """Keep the current default key for decryption only (called with the lock held)."""
+        if self._default_key is not None and self._default_key not in self._previous_keys:
+            self._previous_keys.insert(0, self._default_key)
+            del self._previous_keys[MAX_PREVIOUS_KEYS:]
+        self._default_cipher = None
+
+    def _get_default_cipher(self, key: bytes) -> Union["Fernet", "MultiFernet"]:
+        """Cipher for the default key that also accepts the retired default keys."""
+        if not self._previous_keys:
+            return self._key_ring.cipher(key)
+        cipher = self._default_cipher
+        if cipher is None:
+            cipher = self._key_ring.rotation_cipher(key, self._previous_keys)
+            with self._lock:
+                if self._default_key == key:
+                    self._default_cipher = cipher
+        return cipher
+
+    def derive_key(self, password: str, salt: bytes) -> bytes:
+        """
+        Derive a Fernet key from a password using PBKDF2, memoizing the result.
+
+        The memo is keyed by a digest of the password and salt so the plain
+        password is never retained.
+
+        Args:
+            password: Password to derive the key from
+            salt: Salt for key derivation
+
+        Returns:
+            bytes: URL-safe base64 encoded key
+        """
+        memo_key = hashlib.sha256(salt + b"\x00" + password.encode()).digest()
+        with self._lock:
+            key = self._derived_keys.get(memo_key)
+            if key is not None:
+                self._derived_keys.move_to_end(memo_key)
+                return key
+
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=KDF_ITERATIONS,
+        )
+        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+        with self._lock:
+            self._derived_keys[memo_key] = key
+            while len(self._derived_keys) > MAX_DERIVED_KEYS:
+                self._derived_keys.popitem(last=False)
+        return key
+
+    def _resolve_cipher(self, key: Optional[bytes], operation: str) -> Optional[Union["Fernet", "MultiFernet"]]:
+        """Return the cached cipher for ``key`` (or the default key), logging failures."""
+        if not CRYPTOGRAPHY_AVAILABLE:
+            logger.error("Cannot %s data - cryptography library not available", operation)
+            return None
+
+        use_default = key is None
+        if use_default:
+            key = self.get_default_key()
+        if not key:
+            logger.error("Cannot %s data - no encryption key available", operation)
+            return None
+
+        try:
+            return self._get_default_cipher(key) if use_default else self._key_ring.cipher(key)
+        except Exception as e:
+            logger.error("Invalid encryption key: %s", str(e))
+            return None
+
+    def encrypt(self, data: str, key: Optional[bytes] = None) -> Optional[str]:
+        """
+        Encrypt a single value.
+
+        Args:
+            data: Data to encrypt
+            key: Encryption key, defaults to the configured key
+
+        Returns:
+            Optional[str]: Encrypted token, or None on failure
+        """
+        cipher = self._resolve_cipher(key, "encrypt")
+        if cipher is None:
+            return None
+        try:
+            return cipher.encrypt(data.encode()).decode()
+        except Exception as e:
+            logger.error("Encryption failed: %s", str(e))
+            return None
+
+    def decrypt(self, encrypted_data: str, key: Optional[bytes] = None) -> Optional[str]:
+        """
+        Decrypt a single value.
+
+        Args:
+            encrypted_data: Encrypted token
+            key: Encryption key, defaults to the configured key
+
+        Returns:
+            Optional[str]: Decrypted data, or None on failure
+        """
+        cipher = self._resolve_cipher(key, "decrypt")
+        if cipher is None:
+            return None
+        try:
+            return cipher.decrypt(encrypted_data.encode()).decode()
+        except Exception as e:
+            logger.error("Decryption failed: %s", str(e))
+            return None
+
+    def encrypt_many(self, values: Iterable[str], key: Optional[bytes] = None) -> List[Optional[str]]:
+        """
+        Encrypt many values with one cipher lookup.
+
+        Args:
+            values: Values to encrypt
+            key: Encryption key, defaults to the configured key
+
+        Returns:
+            List[Optional[str]]: Encrypted tokens in input order, None for failures
+        """
+        values = list(values)
+        cipher = self._resolve_cipher(key, "encrypt")
+        if cipher is None:
+            return [None] * len(values)
+
+        def _encrypt(value: str) -> Optional[str]:
+            try:
+                return cipher.encrypt(value.encode()).decode()
+            except Exception as e:
+                logger.error("Encryption failed: %s", str(e))
+                return None
+
+        return self._map(_encrypt, values)
+
+    def decrypt_many(
+        self, encrypted_values: Iterable[str], key: Optional[bytes] = None
+    ) -> List[Optional[str]]:
+        """
+        Decrypt many values with one cipher lookup.
+
+        Args:
+            encrypted_values: Encrypted tokens
+            key: Encryption key, defaults to the configured key
+
+        Returns:
+            List[Optional[str]]: Decrypted values in input order, None for failures
+        """
+        encrypted_values = list(encrypted_values)
+        cipher = self._resolve_cipher(key, "decrypt")
+        if cipher is None:
+            return [None] * len(encrypted_values)
+
+        def _decrypt(token: str) -> Optional[str]:
+            try:
+                return cipher.decrypt(token.encode()).decode()
+            except InvalidToken:
+                logger.error("Decryption failed: invalid token")
+                return None
+            except Exception as e:
+                logger.error("Decryption failed: %s", str(e))
+                return None
+
+        return self._map(_decrypt, encrypted_values)
+
+    def rotate_many(
+        self,
+        encrypted_values: Iterable[str],
+        old_key: bytes,
+        new_key: bytes,
+        max_workers: Optional[int] = None,
+    ) -> List[Optional[str]]:
+        """
+        Re-encrypt tokens from ``old_key`` to ``new_key``.
+
+        Args:
+            encrypted_values: Tokens encrypted with ``old_key`` (or already with ``new_key``)
+            old_key: Key the tokens are currently encrypted with
+            new_key: Key to re-encrypt with
+            max_workers: Thread pool size, defaults to the service setting
+
+        Returns:
+            List[Optional[str]]: Rotated tokens in input order, None for failures
+        """
+        encrypted_values = list(encrypted_values)
+        if not CRYPTOGRAPHY_AVAILABLE:
+            logger.error("Cannot rotate keys - cryptography library not available")
+            return [None] * len(encrypted_values)
+
+        try:
+            rotator = self._key_ring.rotation_cipher(new_key, [old_key])
+        except Exception as e:
+            logger.error("Invalid rotation key: %s", str(e))
+            return [None] * len(encrypted_values)
+
+        def _rotate(token: str) -> Optional[str]:
+            try:
+                return rotator.rotate(token.encode()).decode()
+            except Exception as e:
+                logger.error("Key rotation failed for token: %s", str(e))
+                return None
+
+        return self._map(_rotate, encrypted_values, max_workers)
+
+    def _map(
+        self,
+        func: Callable[[str], Optional[str]],
+        items: List[str],
+        max_workers: Optional[int] = None,
+    ) -> List[Optional[str]]:
+        """Apply ``func`` to ``items`` preserving order, on a pool for large batches."""
+        workers = self._max_workers if max_workers is None else max(1, max_workers)
+        if workers == 1 or len(items) < PARALLEL_THRESHOLD:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="atlas-crypto") as pool:
+            return list(pool.map(func, items))
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, int]: Number of cached ciphers, derived keys and retired default keys
+        """
+        return {
+            "cached_ciphers": len(self._key_ring),
+            "derived_keys": len(self._derived_keys),
+            "previous_keys": len(self._previous_keys),
+        }
+
+
+def pair_results(keys: Iterable[str], values: Iterable[Optional[str]]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Split bulk results into successful values and failed keys.
+
+    Args:
+        keys: Keys in the same order as ``values``
+        values: Results from a bulk operation
+
+    Returns:
+        Tuple[Dict[str, str], List[str]]: Successful key/value pairs and failed keys
+    """
+    succeeded: Dict[str, str] = {}
+    failed: List[str] = []
+    for key, value in zip(keys, values):
+        if value is None:
+            failed.append(key)
+        else:
+            succeeded[key] = value
+    return succeeded, failed
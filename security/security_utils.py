@@ -11,18 +11,17 @@ import hmac
 import os
 import re
 import secrets
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 try:
     from cryptography.fernet import Fernet
-    from cryptography.hazmat.primitives import hashes
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
     CRYPTOGRAPHY_AVAILABLE = True
 except ImportError:
     CRYPTOGRAPHY_AVAILABLE = False
 
 from core.logging import get_logger
+from security.crypto_service import CryptoService
 
 # Logger for security operations
 logger = get_logger("Security")
@@ -50,6 +49,26 @@ class SecurityError(Exception):
     pass
 
 
+# Shared crypto service, created on first use
+_crypto_service: Optional[CryptoService] = None
+
+
+def get_crypto_service() -> CryptoService:
+    """
+    Get the shared crypto service.
+
+    The service resolves the configured encryption key once and caches it together
+    with the cipher objects built for it.
+
+    Returns:
+        CryptoService: Shared crypto service instance
+    """
+    global _crypto_service
+    if _crypto_service is None:
+        _crypto_service = CryptoService(key_provider=get_encryption_key)
+    return _crypto_service
+
+
 def initialize_security() -> bool:
     """
     Initialize security utilities and check for required dependencies.
@@ -129,15 +148,7 @@ def derive_key(password: str, salt: Optional[bytes] = None) -> bytes:
     if not CRYPTOGRAPHY_AVAILABLE:
         raise SecurityError("Cryptography library not available")
 
-    salt = salt or DEFAULT_SALT
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-    return key
+    return get_crypto_service().derive_key(password, salt or DEFAULT_SALT)
 
 
 def encrypt_data(data: str, key=None) -> Optional[str]:
@@ -151,23 +162,7 @@ def encrypt_data(data: str, key=None) -> Optional[str]:
     Returns:
         Optional[str]: Encrypted data as base64 string, or None if encryption unavailable
     """
-    if not CRYPTOGRAPHY_AVAILABLE:
-        logger.error("Cannot encrypt data - cryptography library not available")
-        return None
-
-    if key is None:
-        key = get_encryption_key()
-    if not key:
-        logger.error("Cannot encrypt data - no encryption key available")
-        return None
-
-    try:
-        f = Fernet(key)
-        encrypted = f.encrypt(data.encode())
-        return encrypted.decode()
-    except Exception as e:
-        logger.error("Encryption failed: %s", str(e))
-        return None
+    return get_crypto_service().encrypt(data, key)
 
 
 def decrypt_data(encrypted_data: str, key=None) -> Optional[str]:
@@ -181,23 +176,35 @@ def decrypt_data(encrypted_data: str, key=None) -> Optional[str]:
     Returns:
         Optional[str]: Decrypted data, or None if decryption fails
     """
-    if not CRYPTOGRAPHY_AVAILABLE:
-        logger.error("Cannot decrypt data - cryptography library not available")
-        return None
+    return get_crypto_service().decrypt(encrypted_data, key)
 
-    if key is None:
-        key = get_encryption_key()
-    if not key:
-        logger.error("Cannot decrypt data - no encryption key available")
-        return None
 
-    try:
-        f = Fernet(key)
-        decrypted = f.decrypt(encrypted_data.encode())
-        return decrypted.decode()
-    except Exception as e:
-        logger.error("Decryption failed: %s", str(e))
-        return None
+def encrypt_many(values: List[str], key=None) -> List[Optional[str]]:
+    """
+    Encrypt several values with a single key and cipher lookup.
+
+    Args:
+        values (List[str]): Values to encrypt
+        key (bytes): Encryption key
+
+    Returns:
+        List[Optional[str]]: Encrypted values in input order, None where encryption failed
+    """
+    return get_crypto_service().encrypt_many(values, key)
+
+
+def decrypt_many(encrypted_values: List[str], key=None) -> List[Optional[str]]:
+    """
+    Decrypt several values with a single key and cipher lookup.
+
+    Args:
+        encrypted_values (List[str]): Encrypted values
+        key (bytes): Encryption key
+
+    Returns:
+        List[Optional[str]]: Decrypted values in input order, None where decryption failed
+    """
+    return get_crypto_service().decrypt_many(encrypted_values, key)
 
 
 def hash_data(data: str, salt: Optional[str] = None) -> str:
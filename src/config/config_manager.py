@@ -4,6 +4,8 @@ from typing import Any, Dict, Optional
 import yaml
 from pydantic import BaseModel, validator
 
+from core.config_snapshot import ConfigSnapshot
+
 
 class DatabaseConfig(BaseModel):
     host: str = "localhost"
@@ -42,6 +44,7 @@ class ConfigManager:
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = Path(config_path)
         self.config: Optional[AtlasConfig] = None
+        self._snapshot = ConfigSnapshot()
         self.load_config()
 
     def load_config(self):
@@ -53,6 +56,7 @@ class ConfigManager:
             config_data = yaml.safe_load(f)
 
         self.config = AtlasConfig(**config_data)
+        self._snapshot = ConfigSnapshot(self.config.dict(), self._snapshot.version + 1)
 
     def reload_config(self):
         """Перезавантажує конфігурацію"""
@@ -60,12 +64,4 @@ class ConfigManager:
 
     def get(self, key: str, default: Any = None):
         """Отримує значення конфігурації"""
-        keys = key.split(".")
-        value = self.config.dict()
-
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        return value
+        return self._snapshot.get(key, default)
@@ -0,0 +1,138 @@
+"""Tests for the shared clipboard monitor using a fake backend."""
+
+import threading
+import time
+
+import pytest
+
+from tools import clipboard_monitor
+from tools.clipboard_monitor import ClipboardMonitor, FakeClipboardBackend
+from tools.clipboard_tool import get_clipboard_history, wait_for_clipboard_change
+
+
+def _change_later(backend, text, delay=0.1):
+    timer = threading.Timer(delay, backend.set_text, args=(text,))
+    timer.start()
+    return timer
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"change_counter": True}, {"notifications": True}],
+    ids=["hash-polling", "change-counter", "notifications"],
+)
+def test_wait_for_change_with_each_strategy(options):
+    backend = FakeClipboardBackend("initial", **options)
+    monitor = ClipboardMonitor(backend, min_interval=0.01, max_interval=0.05)
+    _change_later(backend, "updated")
+    change = monitor.wait_for_change(timeout=2)
+    assert change is not None and change.text == "updated"
+    assert monitor.wait_for_change(timeout=0.1) is None
+    assert not monitor.running
+
+
+def test_change_counter_avoids_reading_contents():
+    backend = FakeClipboardBackend("same", change_counter=True)
+    monitor = ClipboardMonitor(backend, min_interval=0.01, max_interval=0.01)
+    assert monitor.wait_for_change(timeout=0.3) is None
+    assert monitor.polls > 5
+    assert backend.reads == 1  # only the baseline
+
+
+def test_polling_backs_off_while_idle():
+    backend = FakeClipboardBackend("idle")
+    monitor = ClipboardMonitor(backend, min_interval=0.01, max_interval=0.2)
+    monitor.wait_for_change(timeout=0.5)
+    # Exponential back-off keeps the poll count far below timeout / min_interval
+    assert monitor.polls < 20
+
+
+def test_waiters_share_one_watcher_and_history_is_bounded():
+    backend = FakeClipboardBackend("start")
+    monitor = ClipboardMonitor(backend, history_size=3, min_interval=0.01, max_interval=0.02)
+    seen = []
+    unsubscribe = monitor.subscribe(lambda change: seen.append(change.text))
+
+    results = []
+    waiters = [
+        threading.Thread(target=lambda: results.append(monitor.wait_for_change(2)))
+        for _ in range(4)
+    ]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.05)
+    assert sum(t.name == "clipboard-monitor" for t in threading.enumerate()) == 1
+
+    backend.set_text("one")
+    for waiter in waiters:
+        waiter.join()
+    assert [r.text for r in results] == ["one"] * 4
+
+    for text in ("two", "three", "four"):
+        backend.set_text(text)
+        deadline = time.time() + 2
+        while (not seen or seen[-1] != text) and time.time() < deadline:
+            time.sleep(0.01)
+    assert seen == ["one", "two", "three", "four"]
+    assert [c.text for c in monitor.history()] == ["two", "three", "four"]
+
+    unsubscribe()
+    assert not monitor.running
+
+
+def test_clipboard_tool_uses_the_shared_monitor(monkeypatch):
+    backend = FakeClipboardBackend("before")
+    monitor = ClipboardMonitor(backend, min_interval=0.01, max_interval=0.05)
+    monkeypatch.setattr(clipboard_monitor, "_default_monitor", monitor)
+
+    _change_later(backend, "after")
+    result = wait_for_clipboard_change(timeout=2)
+    assert result.success and result.content == "after"
+    assert get_clipboard_history().content[-1]["text"] == "after"
+
+    timeout = wait_for_clipboard_change(timeout=0.1)
+    assert not timeout.success and "Timeout" in timeout.error
+
+
+class _Signal:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+
+class _QtClipboard:
+    """Stands in for QClipboard; ``dataChanged`` is only emitted by the GUI thread."""
+
+    def __init__(self, text):
+        self.value = text
+        self.dataChanged = _Signal()
+
+    def text(self):
+        return self.value
+
+
+def test_gui_thread_waiter_polls_instead_of_blocking_notifications():
+    clipboard = _QtClipboard("before")
+    backend = clipboard_monitor.QtClipboardBackend(clipboard)
+    monitor = ClipboardMonitor(backend, min_interval=0.01, max_interval=0.05)
+
+    # The GUI thread is blocked in the wait, so dataChanged never fires
+    timer = threading.Timer(0.1, setattr, args=(clipboard, "value", "after"))
+    timer.start()
+    change = monitor.wait_for_change(timeout=2)
+    assert change is not None and change.text == "after"
+    assert not monitor.running
+
+
+def test_stop_interrupts_a_notification_wait():
+    backend = FakeClipboardBackend("idle", notifications=True)
+    monitor = ClipboardMonitor(backend, max_interval=5.0)
+    unsubscribe = monitor.subscribe(lambda change: None)
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    unsubscribe()
+    assert time.monotonic() - started < 1.0
+    assert not monitor.running
@@ -0,0 +1,140 @@
+"""Tests for the incremental code index used by CodeReaderTool."""
+
+import os
+
+import pytest
+
+from tools import code_index
+from tools.code_index import TrigramIndex
+from tools.code_reader_tool import CodeReaderTool
+
+
+@pytest.fixture(autouse=True)
+def _no_background_indexing(monkeypatch, tmp_path_factory):
+    monkeypatch.setenv("ATLAS_DISABLE_CODE_INDEXING", "1")
+    monkeypatch.setattr(code_index, "PROJECT_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+
+
+def test_trigram_index_search_prefix_and_fuzzy():
+    index = TrigramIndex()
+    for name in ["get_user", "get_user_name", "set_user", "parse_config", "ab"]:
+        index.add(name)
+
+    assert sorted(index.search("user")) == ["get_user", "get_user_name", "set_user"]
+    assert index.search("ab") == ["ab"]
+    assert index.prefix("get_") == ["get_user", "get_user_name"]
+    assert index.fuzzy("parse_confg")[0][0] == "parse_config"
+
+    index.add("get_user")
+    index.discard("get_user")
+    assert "get_user" in index.search("get_user")
+    index.discard("get_user")
+    assert "get_user" not in index.search("get_user")
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_incremental_update(tmp_path):
+    _write(tmp_path / "pkg" / "alpha.py", "def alpha_func():\n    return 1\n")
+    _write(tmp_path / "pkg" / "beta.py", "class BetaThing:\n    def run(self):\n        pass\n")
+    _write(tmp_path / "__pycache__" / "ignored.py", "def ignored():\n    pass\n")
+
+    tool = CodeReaderTool(str(tmp_path))
+    stats = tool.update_index()
+    assert stats["updated"] == 2
+    assert [e.name for e in tool.index.search_elements("alpha")] == ["alpha_func"]
+    assert not tool.index.search_elements("ignored")
+
+    # Nothing changed: nothing is re-read
+    assert tool.update_index() == {"updated": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+
+    # Touched but identical content is not re-parsed
+    alpha = tmp_path / "pkg" / "alpha.py"
+    stat = alpha.stat()
+    os.utime(alpha, (stat.st_atime, stat.st_mtime + 10))
+    assert tool.update_index()["unchanged"] == 1
+
+    _write(alpha, "def gamma_func():\n    return 2\n")
+    (tmp_path / "pkg" / "beta.py").unlink()
+    stats = tool.update_index()
+    assert stats["updated"] == 1 and stats["removed"] == 1
+    assert not tool.index.search_elements("alpha")
+    assert not tool.index.search_elements("BetaThing")
+    assert tool.index.fuzzy_search("gama_func")[0].name == "gamma_func"
+
+    # A fresh tool loads the persisted index and only checks for changes
+    reloaded = CodeReaderTool(str(tmp_path))
+    assert set(reloaded.index.files) == {os.path.join("pkg", "alpha.py")}
+    assert reloaded.update_index()["updated"] == 0
+    assert not list(tmp_path.glob("*.sqlite3"))
+
+
+def test_update_specific_paths(tmp_path):
+    _write(tmp_path / "mod.py", "def first():\n    pass\n")
+    tool = CodeReaderTool(str(tmp_path))
+    tool.update_index()
+
+    _write(tmp_path / "mod.py", "def second():\n    pass\n")
+    _write(tmp_path / "new.py", "def third():\n    pass\n")
+    stats = tool.update_index(["mod.py", "new.py", "missing.py"])
+    assert stats["updated"] == 2
+    assert tool.index.search_elements("second")
+    assert tool.index.search_elements("third")
+
+
+def test_required_literals():
+    from tools.code_index import required_literals
+
+    assert required_literals("foo.*bar") == ["foo", "bar"]
+    assert required_literals(r"\.get\(") == [".get("]
+    assert required_literals("ab?cde") == ["a", "cde"]
+    assert required_literals("foo|bar") is None
+    assert required_literals(r"\x41BC") == ["BC"]
+    assert required_literals(r"\u0410bc\N{EM DASH}def") == ["bc", "def"]
+
+
+def test_text_search_index(tmp_path):
+    _write(tmp_path / "a.py", "import os\n\ndef load_config(path):\n    return os.path.exists(path)\n")
+    _write(tmp_path / "docs" / "notes.md", "Call LOAD_CONFIG before start.\n")
+    _write(tmp_path / "b.py", "x = 1\n")
+    _write(tmp_path / "node_modules" / "c.py", "load_config()\n")
+
+    tool = CodeReaderTool(str(tmp_path))
+    index = tool.text_index
+    assert index.refresh()["updated"] == 3
+    assert index.candidates(["load_config"]) == ["a.py", os.path.join("docs", "notes.md")]
+
+    hits = index.search("load_config")
+    assert [hit.path for hit in hits][0] == "a.py"
+    assert hits[0].matches == [(3, "def load_config(path):")]
+    assert not index.search("load_config", case_sensitive=True, file_pattern="**/*.md")
+
+    regex_hits = index.search(r"def \w+_config\(", regex=True)
+    assert [hit.path for hit in regex_hits] == ["a.py"]
+
+    output = tool.search_in_files("load_config", "**/*")
+    assert "Line 3: def load_config(path):" in output
+    assert "notes.md" in output
+    assert "node_modules" not in output
+
+    # Changed files are picked up by mtime on the next refresh
+    _write(tmp_path / "b.py", "x = load_config('a')\n")
+    index.refresh(force=True)
+    assert "b.py" in index.candidates(["load_config"])
+
+    streamed = list(tool.iter_search_in_files("load_config", "**/*.py", max_results=1))
+    assert len(streamed) == 1 and streamed[0].startswith("📄")
+
+
+def test_text_search_folds_non_ascii_case(tmp_path):
+    _write(tmp_path / "setup.py", "# Вказуємо версію\nVERSION = '1.0'\n")
+
+    index = CodeReaderTool(str(tmp_path)).text_index
+    for query in ("Вказуємо", "вказуємо", "ВКАЗУЄМО"):
+        assert [hit.matches for hit in index.search(query)] == [[(1, "# Вказуємо версію")]]
+    assert [hit.path for hit in index.search(r"вказуємо\s+\w+", regex=True)] == ["setup.py"]
+    assert index.search("Вказуємо", case_sensitive=True)
+    assert not index.search("вказуємо", case_sensitive=True)
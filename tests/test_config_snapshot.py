@@ -0,0 +1,191 @@
+"""Tests for configuration snapshots, incremental validation and hot reload."""
+
+import json
+import threading
+import time
+
+import pytest
+
+import core.config as config_module
+from core.config import ConfigManager
+from core.config_snapshot import ConfigSnapshot, changed_keys
+from core.config_watcher import ConfigFileWatcher
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "api": {
+            "type": "object",
+            "properties": {"host": {"type": "string"}, "port": {"type": "integer"}},
+            "required": ["host", "port"],
+        },
+        "tasks": {"type": "object", "properties": {"retries": {"type": "integer", "minimum": 0}}},
+        "debug": {"type": "boolean"},
+    },
+}
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_module, "CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module, "DEFAULT_CONFIG_PATH", str(tmp_path / "default.json"))
+    monkeypatch.setattr(config_module, "SCHEMA_PATH", str(tmp_path / "schema.json"))
+    monkeypatch.delenv("ATLAS_ENV", raising=False)
+    (tmp_path / "schema.json").write_text(json.dumps(SCHEMA))
+    (tmp_path / "default.json").write_text(
+        json.dumps({"api": {"host": "localhost", "port": 5000}, "tasks": {"retries": 0}, "debug": False})
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def manager(config_dir):
+    manager = ConfigManager(env="test")
+    yield manager
+    manager.stop_watching()
+
+
+def test_snapshots_are_copy_on_write():
+    first = ConfigSnapshot({"api": {"host": "a", "limits": {"rps": 5}}, "ui": {"theme": "dark"}})
+    second = first.with_value("api.limits", {"burst": 10})
+
+    assert first.get("api.limits.rps") == 5 and "api.limits.burst" not in first
+    assert second.get("api.limits.burst") == 10 and "api.limits.rps" not in second
+    assert second.get("api") == {"host": "a", "limits": {"burst": 10}}
+    assert second.data["ui"] is first.data["ui"]
+    assert second.version == first.version + 1
+    assert changed_keys(first.data, second.data) == {"api.limits.rps", "api.limits.burst"}
+    with pytest.raises(TypeError):
+        second.with_value("api.host.name", "x")
+
+
+def test_get_returns_values_equal_to_the_default(manager):
+    assert manager.get("tasks.retries", False) == 0
+    assert type(manager.get("tasks.retries", False)) is int
+    assert manager.get("api.missing", "fallback") == "fallback"
+    assert manager.get("api") == {"host": "localhost", "port": 5000}
+
+
+def test_set_validates_only_the_changed_subtree(manager):
+    manager._config = {**manager._config, "debug": "not a bool"}
+    manager.set("api.port", 6000)
+    assert manager.get("api.port") == 6000
+
+    manager.set("api.port", "6001")
+    manager.set("tasks.retries", -1)
+    assert manager.get("api.port") == 6000 and manager.get("tasks.retries") == 0
+
+    manager.set("api", {"port": 1})
+    assert manager.get("api.host") == "localhost"
+
+    # A parent created by the change is validated as a whole
+    manager._config = {"tasks": {"retries": 0}}
+    manager.set("api.port", 1)
+    assert "api" not in manager.snapshot()
+
+
+def test_accessors_follow_changes(manager):
+    port = manager.accessor("api.port", int, 80)
+    debug = manager.accessor("debug", bool)
+    missing = manager.accessor("api.timeout", float, 2.5)
+    assert port() == 5000 and debug() is False and missing() == 2.5
+
+    manager.set("api.port", 7000)
+    manager.set("api.timeout", "3")
+    assert port() == 7000 and missing() == 3.0
+
+    snapshot = manager.snapshot()
+    assert port() == 7000 and port._cached[0] is snapshot
+    manager._config = {**manager._config, "debug": "yes"}
+    assert debug() is True
+
+
+def test_listeners_receive_changed_keys_by_prefix(manager):
+    everything, api = [], []
+    manager.subscribe(lambda keys, snapshot: everything.append(keys))
+    manager.subscribe(lambda keys, snapshot: api.append((keys, snapshot.get("api.port"))), prefix="api")
+
+    manager.set("tasks.retries", 3)
+    manager.set("api.port", 5001)
+    manager.set("api.port", 5001)
+    assert everything == [{"tasks.retries"}, {"api.port"}]
+    assert api == [({"api.port"}, 5001)]
+
+
+def test_file_changes_reload_the_configuration(manager, config_dir):
+    reloaded = threading.Event()
+    seen = []
+
+    def listener(keys, snapshot):
+        seen.append((keys, snapshot.get("api.port")))
+        reloaded.set()
+
+    manager.subscribe(listener)
+    assert manager.watch(poll_interval=0.05, use_watchdog=False) == "polling"
+    (config_dir / "test.json").write_text(json.dumps({"api": {"port": 9000}, "tasks": {"retries": 2}}))
+
+    assert reloaded.wait(5)
+    assert seen == [({"api.port", "tasks.retries"}, 9000)]
+    assert manager.get("api.host") == "localhost"
+
+    (config_dir / "test.json").write_text(json.dumps({"api": {"port": "broken"}}))
+    assert manager.reload() == set()
+    assert manager.get("api.port") == 9000
+
+
+def test_readers_always_see_a_consistent_snapshot(manager):
+    manager.set("pair", {"a": 0, "b": 0})
+    stop = threading.Event()
+    torn = []
+
+    def reader():
+        while not stop.is_set():
+            snapshot = manager.snapshot()
+            if snapshot.get("pair.a") != snapshot.get("pair.b"):
+                torn.append(snapshot.version)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(1, 500):
+        manager.set("pair", {"a": i, "b": i})
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert torn == [] and manager.get("pair.a") == 499
+
+
+def test_watcher_reports_created_modified_and_deleted_files(tmp_path):
+    path = tmp_path / "settings.json"
+    changes = []
+    watcher = ConfigFileWatcher([str(path)], changes.append, use_watchdog=False)
+
+    assert watcher.check() == []
+    path.write_text("{}")
+    assert watcher.check() == [str(path)]
+    time.sleep(0.01)
+    path.write_text('{"a": 1}')
+    watcher.check()
+    path.unlink()
+    watcher.check()
+    assert changes == [[str(path)]] * 3
+
+
+def test_file_backed_config_manager_parses_only_after_changes(tmp_path, monkeypatch):
+    from utils import config_manager as utils_config
+
+    path = tmp_path / "config.yaml"
+    path.write_text("current_provider: groq\nagents: {}\n")
+    manager = utils_config.ConfigManager(path)
+    parses = []
+    safe_load = utils_config.yaml.safe_load
+    monkeypatch.setattr(utils_config.yaml, "safe_load", lambda f: parses.append(1) or safe_load(f))
+
+    first = manager.load()
+    first["agents"]["mutated"] = True
+    assert manager.load() == {"current_provider": "groq", "agents": {}}
+    assert len(parses) == 1
+
+    manager.set_setting("current_provider", "mistral")
+    assert manager.get_setting("current_provider") == "mistral"
+    assert len(parses) == 1
@@ -0,0 +1,195 @@
+"""Tests for concurrent, per-interval context updates with batched notifications."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from core.intelligence.context_engine import ContextEngine
+from core.intelligence.context_history import NumericRingBuffer, RingBuffer
+from core.intelligence.decision_engine import DecisionEngine
+
+
+class CountingProvider:
+    def __init__(self, data, delay=0.0, refresh_interval=None, max_staleness=None):
+        self.data = data
+        self.delay = delay
+        self.calls = 0
+        if refresh_interval is not None:
+            self.refresh_interval = refresh_interval
+        if max_staleness is not None:
+            self.max_staleness = max_staleness
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return dict(self.data)
+
+
+@pytest.fixture
+def engine():
+    engine = ContextEngine({"provider_timeout": 2.0})
+    yield engine
+    engine.stop()
+
+
+def test_providers_run_concurrently_outside_the_lock(engine):
+    lock_free = []
+
+    def provider(value):
+        def call():
+            time.sleep(0.2)
+            acquired = engine._lock.acquire(timeout=1)
+            lock_free.append(acquired)
+            engine._lock.release()
+            return {"value": value}
+
+        return call
+
+    for category in ("system", "user", "environmental"):
+        engine.register_provider(category, provider(category))
+
+    start = time.perf_counter()
+    changes = engine.update_all_contexts()
+    assert time.perf_counter() - start < 0.5
+    assert lock_free == [True, True, True]
+    assert changes == {
+        "system": {"value": "system"},
+        "user": {"value": "user"},
+        "environmental": {"value": "environmental"},
+    }
+
+
+def test_one_batched_notification_per_cycle(engine):
+    system = CountingProvider({"cpu": 0.5, "memory": 0.7})
+    user = CountingProvider({"activity": "idle"})
+    engine.register_provider("system", system)
+    engine.register_provider("user", user)
+    batches, per_category, signals = [], [], []
+    engine.register_listener("batch", batches.append, batched=True)
+    engine.register_listener("legacy", lambda category, data: per_category.append((category, data)))
+    engine.contexts_updated.connect(signals.append)
+
+    engine.update_all_contexts()
+    assert batches == [{"system": {"cpu": 0.5, "memory": 0.7}, "user": {"activity": "idle"}}]
+    assert sorted(per_category) == [("system", {"cpu": 0.5, "memory": 0.7}), ("user", {"activity": "idle"})]
+    assert signals == batches
+
+    system.data["cpu"] = 0.9
+    engine.update_all_contexts()
+    assert batches[-1] == {"system": {"cpu": 0.9}}
+
+    engine.update_all_contexts()
+    assert len(batches) == 2
+    assert engine.get_context("system") == {"cpu": 0.9, "memory": 0.7}
+
+
+def test_providers_refresh_on_their_own_intervals(engine):
+    fast = CountingProvider({"tick": 1}, refresh_interval=0.05)
+    slow = CountingProvider({"tock": 1}, refresh_interval=30)
+    engine.register_provider("fast", fast)
+    engine.register_provider("slow", slow)
+
+    engine.start_continuous_update()
+    time.sleep(0.5)
+    engine.stop_continuous_update()
+    assert fast.calls >= 4
+    assert slow.calls == 1
+
+
+def test_failing_provider_waits_its_interval(engine):
+    calls = []
+
+    def broken():
+        calls.append(time.monotonic())
+        raise RuntimeError("sensor offline")
+
+    broken.refresh_interval = 30
+    engine.register_provider("broken", broken)
+    engine.register_provider("ok", CountingProvider({"value": 1}, refresh_interval=30))
+
+    engine.start_continuous_update()
+    time.sleep(0.3)
+    engine.stop_continuous_update()
+    assert len(calls) == 1
+    assert engine.get_provider_stats()["broken"]["errors"] == 1
+
+
+def test_refresh_respects_staleness_bounds(engine):
+    provider = CountingProvider({"value": 1}, max_staleness=60)
+    engine.register_provider("system", provider)
+
+    assert engine.refresh("system") == {"value": 1} and provider.calls == 1
+    assert engine.refresh("system") == {"value": 1} and provider.calls == 1
+    assert not engine.is_stale("system") and engine.age("system") < 1
+    engine.refresh("system", max_age=0)
+    assert provider.calls == 2
+    assert engine.get_context("system", max_age=0) == {"value": 1} and provider.calls == 3
+
+
+def test_slow_provider_does_not_hold_up_the_cycle():
+    engine = ContextEngine({"provider_timeout": 0.1})
+    release = threading.Event()
+    engine.register_provider("fast", CountingProvider({"value": 1}))
+    engine.register_provider("slow", lambda: release.wait(5) and {"value": 2})
+    try:
+        start = time.perf_counter()
+        assert engine.update_all_contexts() == {"fast": {"value": 1}}
+        assert time.perf_counter() - start < 1
+
+        release.set()
+        time.sleep(0.05)
+        assert engine.update_all_contexts(["slow"]) == {"slow": {"value": 2}}
+    finally:
+        engine.stop()
+
+
+def test_history_uses_fixed_size_ring_buffers():
+    engine = ContextEngine({"history_size": 5})
+    provider = CountingProvider({"cpu": 0.0, "state": "ok"})
+    engine.register_provider("system", provider)
+    for i in range(8):
+        provider.data["cpu"] = float(i)
+        engine.update_all_contexts()
+
+    buffer = engine.get_history_buffer("system", "cpu")
+    assert isinstance(buffer, NumericRingBuffer)
+    np.testing.assert_array_equal(buffer.values(), [3.0, 4.0, 5.0, 6.0, 7.0])
+    assert buffer.mean() == 5.0 and buffer.latest() == 7.0
+    assert np.all(np.diff(buffer.timestamps()) >= 0)
+    assert engine.get_history_buffer("system", "state") is None
+
+    engine.add_historical_context("system", "cpu", "n/a")
+    history = engine.get_historical_context("system", "cpu")
+    assert isinstance(engine.get_history_buffer("system", "cpu"), RingBuffer)
+    assert [point["value"] for point in history] == [4.0, 5.0, 6.0, 7.0, "n/a"]
+
+
+def test_provider_latency_stats(engine):
+    def broken():
+        raise RuntimeError("sensor offline")
+
+    engine.register_provider("system", CountingProvider({"value": 1}, delay=0.01))
+    engine.register_provider("broken", broken)
+    engine.update_all_contexts()
+    engine.update_all_contexts()
+
+    stats = engine.get_provider_stats()
+    assert stats["system"]["calls"] == 2 and stats["system"]["errors"] == 0
+    assert stats["system"]["mean_ms"] >= 10 and stats["system"]["p95_ms"] <= stats["system"]["max_ms"]
+    assert stats["broken"]["errors"] == 2 and stats["broken"]["last_error"] == "sensor offline"
+
+
+def test_decision_engine_receives_merged_change_sets(engine):
+    provider = CountingProvider({"cpu": 0.5, "memory": 0.7})
+    engine.register_provider("system", provider)
+    decisions = DecisionEngine(context_engine=engine)
+    updates = []
+    decisions.decision_factors_updated.connect(updates.append)
+
+    engine.update_all_contexts()
+    provider.data["cpu"] = 0.9
+    engine.update_all_contexts()
+    assert len(updates) == 2
+    assert decisions.decision_factors["system"] == {"cpu": 0.9, "memory": 0.7}
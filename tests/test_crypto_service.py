@@ -0,0 +1,141 @@
+"""
+Tests for the cached crypto service and lazy credential loading.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography.fernet import Fernet  # noqa: E402
+
+from security import credential_manager, security_utils  # noqa: E402
+from security.crypto_service import MAX_DERIVED_KEYS, CryptoService  # noqa: E402
+
+
+@pytest.fixture
+def key():
+    """Generate a Fernet key."""
+    return Fernet.generate_key()
+
+
+def test_default_key_resolved_once(key):
+    """The key provider is only consulted until a key is found."""
+    calls = []
+
+    def provider():
+        calls.append(1)
+        return key
+
+    service = CryptoService(key_provider=provider)
+    token = service.encrypt("secret")
+    assert service.decrypt(token) == "secret"
+    assert service.encrypt("other") is not None
+    assert len(calls) == 1
+    assert service.get_stats()["cached_ciphers"] == 1
+
+
+def test_bulk_roundtrip_preserves_order(key):
+    """encrypt_many/decrypt_many return results in input order, also on the pool."""
+    service = CryptoService(key_provider=lambda: key, max_workers=4)
+    values = [f"value-{i}" for i in range(200)]
+    tokens = service.encrypt_many(values)
+    assert service.decrypt_many(tokens) == values
+
+
+def test_decrypt_many_marks_failures(key):
+    """Invalid tokens yield None without failing the whole batch."""
+    service = CryptoService(key_provider=lambda: key)
+    token = service.encrypt("ok")
+    assert service.decrypt_many([token, "garbage"]) == ["ok", None]
+
+
+def test_rotate_many(key):
+    """Rotated tokens decrypt with the new key only."""
+    new_key = Fernet.generate_key()
+    service = CryptoService(key_provider=lambda: key)
+    tokens = service.encrypt_many(["a", "b"])
+    rotated = service.rotate_many(tokens, key, new_key, max_workers=2)
+    assert service.decrypt_many(rotated, new_key) == ["a", "b"]
+    assert service.decrypt_many(rotated, key) == [None, None]
+
+
+def test_derive_key_is_memoized():
+    """Deriving the same password twice reuses the cached key."""
+    service = CryptoService()
+    first = service.derive_key("password", b"salt")
+    assert service.derive_key("password", b"salt") == first
+    assert service.derive_key("password", b"other-salt") != first
+    assert service.get_stats()["derived_keys"] == 2
+
+
+def test_derived_keys_are_bounded():
+    """One-off passwords do not grow the memo without limit."""
+    service = CryptoService()
+    for i in range(MAX_DERIVED_KEYS + 5):
+        service.derive_key(f"password-{i}", b"salt")
+    assert service.get_stats()["derived_keys"] == MAX_DERIVED_KEYS
+
+
+def test_set_default_key_keeps_old_tokens_readable(key):
+    """After switching the default key, old tokens still decrypt and new ones use the new key."""
+    new_key = Fernet.generate_key()
+    service = CryptoService(key_provider=lambda: key)
+    old_token = service.encrypt("old")
+    service.set_default_key(new_key)
+
+    new_token = service.encrypt("new")
+    assert service.decrypt(old_token) == "old"
+    assert service.decrypt(new_token) == "new"
+    assert service.decrypt(new_token, key) is None
+    assert service.get_stats()["previous_keys"] == 1
+
+
+def test_credentials_decrypted_lazily(tmp_path, monkeypatch, key):
+    """Loading credentials does not decrypt until a value is requested."""
+    service = CryptoService(key_provider=lambda: key)
+    credential_file = tmp_path / "credentials.json"
+    credential_file.write_text(
+        json.dumps({"api": service.encrypt("token-1"), "db": service.encrypt("token-2")})
+    )
+    monkeypatch.setattr(credential_manager, "CREDENTIAL_DIR", str(tmp_path))
+    monkeypatch.setattr(credential_manager, "CREDENTIAL_FILE", str(credential_file))
+
+    decrypted = []
+
+    def fake_decrypt(value):
+        decrypted.append(value)
+        return service.decrypt(value)
+
+    monkeypatch.setattr(credential_manager, "decrypt_data", fake_decrypt)
+
+    manager = credential_manager.CredentialManager()
+    assert manager.load_credentials()
+    assert sorted(manager.list_credentials()) == ["api", "db"]
+    assert decrypted == []
+
+    assert manager.get_credential("api") == "token-1"
+    assert manager.get_credential("api") == "token-1"
+    assert len(decrypted) == 1
+
+
+def test_rotate_then_read_credentials(tmp_path, monkeypatch, key):
+    """Credentials rotated to a new key can be read and written afterwards."""
+    service = CryptoService(key_provider=lambda: key)
+    monkeypatch.setattr(security_utils, "_crypto_service", service)
+    monkeypatch.setattr(credential_manager, "CREDENTIAL_DIR", str(tmp_path))
+    monkeypatch.setattr(credential_manager, "CREDENTIAL_FILE", str(tmp_path / "credentials.json"))
+
+    manager = credential_manager.CredentialManager()
+    assert manager.set_credential("api", "token-1")
+    new_key = Fernet.generate_key()
+    assert manager.rotate_encryption_key(key, new_key)
+
+    assert manager.get_credential("api") == "token-1"
+    assert manager.set_credential("db", "token-2")
+    stored = json.loads((tmp_path / "credentials.json").read_text())
+    assert service.decrypt_many(list(stored.values()), new_key) == ["token-1", "token-2"]
+
+    reloaded = credential_manager.CredentialManager()
+    assert reloaded.get_credential("db") == "token-2"
@@ -0,0 +1,127 @@
+"""Tests for bounded decision history, cached decisions and async strategy evaluation."""
+
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from core.intelligence.decision_engine import DecisionEngine
+from core.intelligence.history_store import HistoryStore
+from core.intelligence.self_improvement_engine import SelfImprovementEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = DecisionEngine(history_size=10, history_path=str(tmp_path / "history.sqlite3"))
+    yield engine
+    engine.shutdown()
+
+
+def test_history_store_is_bounded_and_spills_to_sqlite(tmp_path):
+    store = HistoryStore("decision", "goal", capacity=5, path=str(tmp_path / "history.sqlite3"), spill_batch=4)
+    for i in range(20):
+        store.append({"goal": f"goal-{i % 3}", "strategy_used": "fast" if i % 2 else "slow", "timestamp": float(i)})
+
+    assert len(store) == 5 and [r["timestamp"] for r in store.recent()] == [15.0, 16.0, 17.0, 18.0, 19.0]
+    assert store.total() == 20
+
+    matches = store.query(key="goal-0", strategy="slow")
+    assert [r["timestamp"] for r in matches] == [0.0, 6.0, 12.0, 18.0]
+    assert [r["timestamp"] for r in store.query(since=3, until=7)] == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert [r["timestamp"] for r in store.query(limit=3)] == [17.0, 18.0, 19.0]
+
+    store.clear()
+    assert store.total() == 0
+    store.close()
+
+
+def test_history_store_without_a_path_keeps_only_the_ring(tmp_path):
+    store = HistoryStore("improvement", "area", capacity=3, path=None)
+    for i in range(10):
+        store.append({"area": "ui", "timestamp": float(i)})
+    assert store.total() == 3 and store.spilled == 0
+    assert [r["timestamp"] for r in store.query(key="ui")] == [7.0, 8.0, 9.0]
+
+
+def test_decision_history_is_a_bounded_copy(engine):
+    for i in range(25):
+        engine.update_decision_factors("load", {"cpu": i})
+        engine.make_decision(f"goal-{i}")
+
+    history = engine.get_decision_history()
+    assert len(history) == 10 and history[-1]["goal"] == "goal-24"
+    history.clear()
+    assert len(engine.get_decision_history()) == 10
+    assert [d["goal"] for d in engine.get_decision_history(limit=2)] == ["goal-23", "goal-24"]
+    assert [d["goal"] for d in engine.query_decision_history(goal="goal-3")] == ["goal-3"]
+
+
+def test_unchanged_factors_reuse_the_decision(engine):
+    calls = []
+    engine.register_strategy("count", lambda factors: calls.append(dict(factors)) or {"decision": len(calls)})
+    engine.update_decision_factors("load", {"cpu": 1})
+
+    first = engine.make_decision("scale", "count")
+    second = engine.make_decision("scale", "count")
+    assert len(calls) == 1 and second["decision"] == first["decision"] and second["cached"]
+    assert len(engine.get_decision_history()) == 2
+
+    engine.on_context_changes({"load": {"cpu": 2}})
+    assert engine.make_decision("scale", "count")["decision"] == 2
+    assert calls[-1] == {"load": {"cpu": 2}}
+    assert engine.get_cache_stats()["hits"] == 1
+
+
+def test_strategies_get_a_read_only_snapshot(engine):
+    engine.update_decision_factors("load", {"cpu": 1})
+
+    def mutate(factors):
+        factors["load"]["cpu"] = 99
+        return {"decision": "never"}
+
+    engine.register_strategy("mutate", mutate)
+    with pytest.raises(TypeError):
+        engine.make_decision("scale", "mutate")
+    assert engine.decision_factors["load"]["cpu"] == 1
+    assert engine.factors_snapshot() is engine.factors_snapshot()
+
+
+def test_async_decisions_run_off_the_calling_thread(engine):
+    threads = []
+    engine.register_strategy("remote", lambda factors: threads.append(threading.current_thread()) or {"decision": 1})
+    emitted = []
+    engine.decision_made.connect(emitted.append)
+
+    decision = engine.make_decision_async("fetch", "remote").result(5)
+    assert decision["decision"] == 1 and threads[0] is not threading.current_thread()
+    assert emitted == [decision] and engine.get_decision_history() == [decision]
+    assert engine.make_decision_async("fetch", "remote").result(5)["cached"]
+
+
+def test_async_decisions_time_out(engine):
+    release = threading.Event()
+    engine.register_strategy("slow", lambda factors: release.wait(5) and {"decision": "late"})
+
+    future = engine.make_decision_async("fetch", "slow", timeout=0.05)
+    with pytest.raises(concurrent.futures.TimeoutError):
+        future.result(5)
+    release.set()
+    time.sleep(0.1)
+    assert engine.get_decision_history() == []
+
+    engine.register_strategy("broken", lambda factors: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        engine.make_decision_async("fetch", "broken").result(5)
+
+
+def test_improvement_history_is_bounded(tmp_path):
+    engine = SelfImprovementEngine(history_size=3, history_path=str(tmp_path / "history.sqlite3"))
+    engine.improvement_plans["ui"] = {"steps": ["faster"]}
+    for _ in range(5):
+        engine.execute_improvement_plan("ui")
+
+    assert len(engine.get_improvement_history()) == 3
+    assert engine.get_improvement_history() is not engine.get_improvement_history()
+    assert len(engine.query_improvement_history(area_type="ui")) == 5
+    engine.history.close()
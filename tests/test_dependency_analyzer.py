@@ -0,0 +1,91 @@
+"""Tests for the cached, SCC-based dependency analyzer."""
+
+import os
+
+import pytest
+
+from tools import code_index
+from tools.dependency_analyzer import (
+    DependencyAnalyzer,
+    detect_circular_dependencies,
+    strongly_connected_components,
+    topological_layers,
+)
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(monkeypatch, tmp_path_factory):
+    monkeypatch.setattr(code_index, "PROJECT_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _project(root):
+    _write(root / "pkg" / "__init__.py", "")
+    _write(root / "pkg" / "a.py", "from pkg import b\nimport json\n")
+    _write(root / "pkg" / "b.py", "from . import c\n")
+    _write(root / "pkg" / "c.py", "import pkg.a\n")
+    _write(root / "pkg" / "base.py", "import os\n")
+    _write(root / "app.py", "from pkg.a import thing\nfrom pkg.base import Base\nimport requests\n")
+
+
+def test_scc_handles_deep_graphs_iteratively():
+    chain = {f"m{i}": [f"m{i + 1}"] for i in range(20000)}
+    chain["m20000"] = ["m0"]
+    components = strongly_connected_components(chain)
+    assert len(components) == 1 and len(components[0]) == 20001
+
+    dag = {"top": ["mid"], "mid": ["low"], "low": []}
+    components = strongly_connected_components(dag)
+    assert components == [["low"], ["mid"], ["top"]]
+    assert topological_layers(dag, components) == {0: ["low"], 1: ["mid"], 2: ["top"]}
+
+
+def test_detect_circular_dependencies_reports_one_cycle_per_component():
+    graph = {"a": ["b", "c"], "b": ["a", "c"], "c": ["a"], "d": ["d"], "e": ["a"]}
+    cycles = detect_circular_dependencies(graph)
+    assert cycles == [["a", "b"], ["d"]]
+
+
+def test_architecture_analysis(tmp_path):
+    _project(tmp_path)
+    analyzer = DependencyAnalyzer(str(tmp_path))
+    analysis = analyzer.analyze_project_architecture()
+
+    assert analysis.modules["app"].dependencies == ["pkg.a", "pkg.base", "requests"]
+    assert analysis.modules["pkg.b"].dependencies == ["pkg.c"]
+    assert analysis.strongly_connected_components == [["pkg.a", "pkg.b", "pkg.c"]]
+    assert analysis.circular_dependencies == [["pkg.a", "pkg.b", "pkg.c"]]
+    assert analysis.dependency_layers[0] == ["pkg", "pkg.a", "pkg.b", "pkg.base", "pkg.c"]
+    assert analysis.dependency_layers[1] == ["app"]
+    assert "requests" in analysis.external_dependencies
+    assert "Cycle 1" in analyzer.generate_dependency_report()
+
+
+def test_incremental_update_and_persistent_cache(tmp_path):
+    _project(tmp_path)
+    analyzer = DependencyAnalyzer(str(tmp_path))
+    assert analyzer.update()["parsed"] == 6
+    assert analyzer.update() == {"parsed": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+
+    # Breaking the cycle only re-parses the edited file
+    _write(tmp_path / "pkg" / "c.py", "import pkg.base\n")
+    assert analyzer.update()["parsed"] == 1
+    assert analyzer.analyze_project_architecture().circular_dependencies == []
+
+    # A new analyzer reuses the cache; touched files are hash-checked, not re-parsed
+    target = tmp_path / "pkg" / "base.py"
+    stat = target.stat()
+    os.utime(target, (stat.st_atime, stat.st_mtime + 5))
+    fresh = DependencyAnalyzer(str(tmp_path))
+    assert fresh.update() == {"parsed": 0, "unchanged": 1, "skipped": 0, "removed": 0}
+    assert set(fresh.modules) == {"pkg", "pkg.a", "pkg.b", "pkg.c", "pkg.base", "app"}
+    assert fresh.cache_path.startswith(code_index.PROJECT_CACHE_DIR)
+    assert not list(tmp_path.glob("*.sqlite3"))
+
+    (tmp_path / "app.py").unlink()
+    assert fresh.update()["removed"] == 1
+    assert "app" not in fresh.modules
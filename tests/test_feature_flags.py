@@ -0,0 +1,160 @@
+"""Tests for rule-based, cached feature flag evaluation."""
+
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from core.feature_flags import FeatureFlagManager
+from core.flag_engine import (
+    BUCKETS,
+    CompiledFlag,
+    FlagContext,
+    FlagSnapshot,
+    rollout_bucket,
+)
+
+FLAGS = {
+    "dark_mode": True,
+    "beta_features": False,
+    "ai_assistant": {"enabled": True, "environments": {"prod": {"enabled": False}}},
+    "new_planner": {
+        "rules": [
+            {"users": ["alice"]},
+            {"teams": ["core"], "value": "team"},
+            {"attributes": {"plan": ["pro", "team"]}, "percentage": 50},
+        ],
+        "default": False,
+    },
+    "max_tools": 5,
+}
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "feature_flags.json"
+    path.write_text(json.dumps({"feature_flags": FLAGS, "feature_flag_overrides": {"dev": {"beta_features": True}}}))
+    return path
+
+
+@pytest.fixture
+def manager(storage, monkeypatch):
+    monkeypatch.setattr(FeatureFlagManager, "_instance", None)
+    manager = FeatureFlagManager(environment="dev", storage_path=str(storage))
+    yield manager
+    manager.stop_watching()
+
+
+def test_plain_and_environment_flags(manager):
+    assert manager.is_enabled("dark_mode") and manager.is_enabled("beta_features")
+    assert manager.is_enabled("ai_assistant")
+    assert manager.get_flag_value("max_tools") == 5
+    assert manager.is_enabled("missing", default=True) and manager.get_flag_value("missing", 3) == 3
+
+    prod = CompiledFlag("ai_assistant", FLAGS["ai_assistant"], environment="prod")
+    assert prod.constant and prod.value is False
+
+
+def test_targeting_rules(manager):
+    alice, core = FlagContext(user="alice"), FlagContext(user="bob", team="core")
+    assert manager.get_flag_value("new_planner", context=alice) is True
+    assert manager.get_flag_value("new_planner", context=core) == "team"
+    assert manager.is_enabled("new_planner") is False
+    assert manager.is_enabled("new_planner", context=FlagContext(user="carol", plan="free")) is False
+
+    rolled_out = [
+        manager.is_enabled("new_planner", context=FlagContext(user=f"user-{i}", plan="pro")) for i in range(2000)
+    ]
+    assert 0.45 < sum(rolled_out) / len(rolled_out) < 0.55
+
+
+def test_rollout_buckets_are_stable_and_per_flag():
+    assert rollout_bucket("new_planner", "user-1") == rollout_bucket("new_planner", "user-1")
+    buckets = [rollout_bucket("new_planner", f"user-{i}") for i in range(1000)]
+    assert all(0 <= bucket < BUCKETS for bucket in buckets)
+    assert buckets != [rollout_bucket("other_flag", f"user-{i}") for i in range(1000)]
+
+    everyone = CompiledFlag("f", {"rules": [{"percentage": 100}]})
+    nobody = CompiledFlag("f", {"rules": [{"percentage": 0}]})
+    context = FlagContext(user="u")
+    assert everyone.evaluate(context) is True and nobody.evaluate(context) is False
+    assert everyone.evaluate(FlagContext()) is False
+
+
+def test_results_are_cached_per_context():
+    calls = []
+    snapshot = FlagSnapshot.compile({"f": {"rules": [{"users": ["a"]}]}}, max_cached_contexts=2)
+    flag = snapshot.flags["f"]
+    flag._rules = tuple(
+        (tuple(lambda context, p=p: calls.append(context.user) or p(context) for p in predicates), value)
+        for predicates, value in flag._rules
+    )
+
+    for _ in range(3):
+        assert snapshot.evaluate(flag, FlagContext(user="a")) is True
+        assert snapshot.evaluate(flag, FlagContext(user="b")) is False
+    assert calls == ["a", "b"]
+    snapshot.evaluate(flag, FlagContext(user="c"))
+    assert snapshot.cached_contexts() == 1
+
+
+def test_cached_checks_do_not_allocate(manager):
+    context = FlagContext(user="alice")
+    manager.is_enabled("new_planner", context=context)
+    manager.is_enabled("dark_mode")
+
+    modules = [tracemalloc.Filter(True, "*feature_flags.py"), tracemalloc.Filter(True, "*flag_engine.py")]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(modules)
+        for _ in range(10000):
+            manager.is_enabled("new_planner", context=context)
+            manager.is_enabled("dark_mode")
+        after = tracemalloc.take_snapshot().filter_traces(modules)
+    finally:
+        tracemalloc.stop()
+    # Only the evaluation counters' current int objects; nothing that grows with the number of checks
+    assert sum(stat.size_diff for stat in after.compare_to(before, "filename")) < 256
+
+
+def test_evaluation_counts_find_unused_flags(manager):
+    for _ in range(3):
+        manager.is_enabled("dark_mode")
+    manager.get_flag_value("max_tools")
+    manager.set_flag("max_tools", 6)
+
+    assert manager.evaluation_counts()["dark_mode"] == 3
+    assert manager.evaluation_counts()["max_tools"] == 1
+    assert manager.unused_flags() == ["ai_assistant", "beta_features", "new_planner"]
+    assert manager.unused_flags(min_evaluations=2) == ["ai_assistant", "beta_features", "max_tools", "new_planner"]
+    manager.reset_evaluation_counts()
+    assert set(manager.evaluation_counts().values()) == {0}
+
+
+def test_set_flag_keeps_the_storage_document(manager, storage):
+    manager.disable_feature("dark_mode")
+    assert manager.is_enabled("dark_mode") is False
+
+    document = json.loads(storage.read_text())
+    assert document["feature_flags"]["dark_mode"] is False
+    assert document["feature_flag_overrides"] == {"dev": {"beta_features": True}}
+
+
+def test_storage_changes_reload_without_blocking_readers(manager, storage):
+    reloaded = threading.Event()
+    publish = manager._publish
+
+    def publish_and_signal(flags):
+        publish(flags)
+        reloaded.set()
+
+    manager._publish = publish_and_signal
+    assert manager.watch(poll_interval=0.05, use_watchdog=False) == "polling"
+    old_snapshot = manager._snapshot
+    storage.write_text(json.dumps({"feature_flags": {**FLAGS, "dark_mode": False, "fast_path": True}}))
+
+    assert reloaded.wait(5)
+    assert manager.is_enabled("fast_path") and not manager.is_enabled("dark_mode")
+    assert old_snapshot.flags["dark_mode"].value is True
@@ -0,0 +1,217 @@
+"""
+Tests for batched Gmail metadata retrieval and the local message cache.
+"""
+
+import pytest
+
+from tools.gmail_cache import GmailMessageCache
+from tools.gmail_tool import GmailTool
+
+
+class FakeRequest:
+    def __init__(self, result, calls=None, name=None):
+        self._result = result
+        self._calls = calls
+        self._name = name
+
+    def execute(self):
+        if self._calls is not None:
+            self._calls.append(self._name)
+        return self._result() if callable(self._result) else self._result
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.calls.append("batch")
+        for request_id, request in self.requests:
+            self.callback(request_id, request._result, None)
+
+
+class FakeGmailService:
+    """Minimal stand-in for the object returned by googleapiclient's build()."""
+
+    def __init__(self, messages, history_id="100", batch=True):
+        self.messages_data = messages
+        self.history_id = history_id
+        self.history_records = []
+        self.calls = []
+        if batch:
+            self.new_batch_http_request = lambda callback: FakeBatch(self, callback)
+
+    # Resource accessors
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def history(self):
+        return _FakeHistory(self)
+
+    def getProfile(self, userId):
+        return FakeRequest(lambda: {"historyId": self.history_id}, self.calls, "profile")
+
+    def list(self, userId, q, maxResults, pageToken=None):
+        ids = sorted(self.messages_data)
+        start = int(pageToken or 0)
+        page = ids[start : start + maxResults]
+        result = {"messages": [{"id": i} for i in page]}
+        if start + maxResults < len(ids):
+            result["nextPageToken"] = str(start + maxResults)
+        return FakeRequest(result, self.calls, "list")
+
+    def get(self, userId, id, format, metadataHeaders=None):
+        subject, date = self.messages_data[id]
+        message = {
+            "id": id,
+            "threadId": f"t-{id}",
+            "snippet": f"snippet {id}",
+            "payload": {
+                "headers": [
+                    {"name": "Subject", "value": subject},
+                    {"name": "From", "value": "sender@example.com"},
+                    {"name": "Date", "value": date},
+                ]
+            },
+        }
+        return FakeRequest(message, self.calls, "get")
+
+
+class _FakeHistory:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, userId, startHistoryId, pageToken=None):
+        return FakeRequest(
+            {"history": self.service.history_records}, self.service.calls, "history"
+        )
+
+
+class _BrokenHistory:
+    def list(self, userId, startHistoryId, pageToken=None):
+        def fail():
+            raise RuntimeError("backend error")
+
+        return FakeRequest(fail)
+
+
+def make_messages(count):
+    return {
+        f"m{i:03d}": (f"Subject {i}", f"Mon, {1 + i % 28:02d} Jan 2024 10:00:00 +0000")
+        for i in range(count)
+    }
+
+
+@pytest.fixture
+def cache():
+    cache = GmailMessageCache(":memory:")
+    yield cache
+    cache.close()
+
+
+def test_search_uses_batch_requests(cache):
+    """Metadata for 50 results is fetched with one batch call, not 50 gets."""
+    service = FakeGmailService(make_messages(50))
+    tool = GmailTool(service=service, cache=cache)
+
+    result = tool.search_emails("in:inbox", max_results=50)
+
+    assert result["success"]
+    assert result["count"] == 50
+    assert service.calls.count("batch") == 1
+    assert "get" not in service.calls
+
+
+def test_repeated_search_hits_cache(cache):
+    """An unchanged mailbox answers a repeated search from the cache."""
+    service = FakeGmailService(make_messages(10))
+    tool = GmailTool(service=service, cache=cache)
+    first = tool.search_emails("in:inbox", max_results=10)
+    service.calls.clear()
+
+    second = tool.search_emails("in:inbox", max_results=10)
+
+    assert second["results"] == first["results"]
+    assert service.calls == ["profile"]
+
+
+def test_history_sync_evicts_changed_messages(cache):
+    """Messages reported by the history API are refetched on the next search."""
+    service = FakeGmailService(make_messages(5))
+    tool = GmailTool(service=service, cache=cache)
+    tool.search_emails("in:inbox", max_results=5)
+
+    service.messages_data["m001"] = ("Updated", "Mon, 01 Jan 2024 10:00:00 +0000")
+    service.history_id = "101"
+    service.history_records = [{"labelsAdded": [{"message": {"id": "m001"}}]}]
+    service.calls.clear()
+
+    result = tool.search_emails("in:inbox", max_results=5)
+
+    subjects = {email["id"]: email["subject"] for email in result["results"]}
+    assert subjects["m001"] == "Updated"
+    assert service.calls == ["profile", "history", "list", "batch"]
+    assert cache.get_sync_history_id() == "101"
+
+
+def test_failed_history_sync_bypasses_cached_queries(cache):
+    """If invalidation could not run, cached query results are not served."""
+    service = FakeGmailService(make_messages(5))
+    tool = GmailTool(service=service, cache=cache)
+    tool.search_emails("in:inbox", max_results=5)
+
+    service.history_id = "101"
+    service.history = _BrokenHistory
+    service.calls.clear()
+
+    tool.search_emails("in:inbox", max_results=5)
+    tool.search_emails("in:inbox", max_results=5)
+    assert service.calls.count("list") == 2
+    assert cache.get_sync_history_id() == "100"
+
+
+def test_time_relative_queries_expire(cache, monkeypatch):
+    """Date-relative results are reused only for the TTL, even in an unchanged mailbox."""
+    service = FakeGmailService(make_messages(3))
+    tool = GmailTool(service=service, cache=cache)
+    now = [1000.0]
+    monkeypatch.setattr("tools.gmail_cache.time.time", lambda: now[0])
+
+    for query in ("newer_than:2d", "in:inbox"):
+        tool.search_emails(query, max_results=3)
+    service.calls.clear()
+    now[0] += cache.time_relative_ttl + 1
+    tool.search_emails("newer_than:2d", max_results=3)
+    tool.search_emails("in:inbox", max_results=3)
+    assert service.calls == ["profile", "list", "profile"]
+
+
+def test_pool_fallback_without_batch_support():
+    """Services without batch support are fetched on a bounded pool."""
+    service = FakeGmailService(make_messages(8), batch=False)
+    tool = GmailTool(service=service, use_cache=False, max_workers=4)
+
+    result = tool.search_emails("in:inbox", max_results=8)
+
+    assert result["count"] == 8
+    assert service.calls.count("get") == 8
+    assert "profile" not in service.calls
+
+
+def test_iter_emails_streams_pages(cache):
+    """The streaming iterator walks pages and honours the limit."""
+    service = FakeGmailService(make_messages(25))
+    tool = GmailTool(service=service, cache=cache)
+
+    emails = list(tool.iter_emails("in:inbox", page_size=10, limit=23))
+
+    assert [email["id"] for email in emails] == sorted(service.messages_data)[:23]
+    assert service.calls.count("list") == 3
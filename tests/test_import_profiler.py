@@ -0,0 +1,92 @@
+"""Tests for import-time profiling, lazy imports and the import budgets."""
+
+import os
+import sys
+
+import pytest
+
+from performance.import_profiler import (
+    DEFERRED_DEPENDENCIES,
+    IMPORT_BUDGETS,
+    ImportProfile,
+    parse_importtime,
+    record_imports,
+)
+from utils import lazy_imports
+from utils.lazy_imports import (
+    LazyModule,
+    MissingOptionalDependency,
+    is_available,
+    lazy_module,
+)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _json
+import time:       400 |        500 |     urllib3
+import time:       300 |        800 |   requests
+import time:        50 |       1350 | core.alerting
+import time:        20 |       1370 | core
+"""
+
+
+def test_parse_and_attribute_to_atlas_modules():
+    records = parse_importtime(SAMPLE)
+    assert [(r.name, r.depth) for r in records] == [
+        ("_json", 1),
+        ("urllib3", 2),
+        ("requests", 1),
+        ("core.alerting", 0),
+        ("core", 0),
+    ]
+    profile = ImportProfile(records, packages=["core"])
+    assert profile.cumulative("core.alerting") == pytest.approx(0.00135)
+    # requests and everything it imported is charged to core.alerting
+    assert profile.by_module() == pytest.approx({"core.alerting": 0.00085, "core": 0.00002})
+    assert profile.by_package() == pytest.approx({"core": 0.00087})
+    assert profile.imported("urllib3") and not profile.imported("pandas")
+
+
+def test_lazy_module_imports_on_first_attribute_access(tmp_path, monkeypatch):
+    (tmp_path / "atlas_heavy_dep.py").write_text("LOADED = True\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "atlas_heavy_dep", raising=False)
+
+    proxy = lazy_module("atlas_heavy_dep")
+    assert isinstance(proxy, LazyModule) and not proxy.is_loaded
+    assert "atlas_heavy_dep" not in sys.modules
+    assert is_available("atlas_heavy_dep") and "atlas_heavy_dep" not in sys.modules
+
+    assert proxy.LOADED is True
+    assert proxy.is_loaded and "atlas_heavy_dep" in sys.modules
+    assert lazy_module("atlas_heavy_dep") is sys.modules["atlas_heavy_dep"]
+
+
+def test_missing_dependency_fails_on_use_not_import():
+    proxy = lazy_module("atlas_not_installed_dep")
+    assert not is_available("atlas_not_installed_dep")
+    with pytest.raises(MissingOptionalDependency):
+        _ = proxy.anything
+
+
+def test_module_level_getattr():
+    assert "pandas" in dir(lazy_imports)
+    with pytest.raises(AttributeError):
+        _ = lazy_imports.not_a_dependency
+    if is_available("numpy"):
+        import numpy
+
+        assert lazy_imports.numpy is numpy
+
+
+@pytest.mark.parametrize("package", sorted(IMPORT_BUDGETS))
+def test_import_budget(package):
+    scale = float(os.environ.get("ATLAS_IMPORT_BUDGET_SCALE", "1"))
+    profile = record_imports([package])
+    eager = [name for name in DEFERRED_DEPENDENCIES if profile.imported(name)]
+    assert not eager, f"import {package} pulls in {eager}; use utils.lazy_imports"
+    seconds = profile.cumulative(package)
+    assert seconds <= IMPORT_BUDGETS[package] * scale, (
+        f"import {package} took {seconds:.2f}s (budget {IMPORT_BUDGETS[package]:.2f}s)\n"
+        + profile.format_report(10)
+    )
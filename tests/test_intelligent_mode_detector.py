@@ -0,0 +1,140 @@
+"""Tests for the precompiled chat mode detector and the keyword automaton."""
+
+import logging
+import os
+import random
+
+import pytest
+
+from performance.mode_detector_benchmark import LATENCY_BUDGET_US, run_benchmark
+from utils.aho_corasick import AHOCORASICK_AVAILABLE, KeywordAutomaton
+from utils.intelligent_mode_detector import ChatMode, IntelligentModeDetector
+
+SIMPLE, ADVANCED = ChatMode.SIMPLE_COMMAND, ChatMode.ADVANCED_THINKING
+
+# (message, mode, confidence, reasoning) as produced by the original keyword-by-keyword detector
+EXPECTED = [
+    ("read file main.py", SIMPLE, 0.95, "Clear simple command: Simple command indicators: exact_match: read file"),
+    ("search for architecture patterns", SIMPLE, 0.95, None),
+    ("stats for today", SIMPLE, 0.95, None),
+    ("where is config.py", SIMPLE, 0.5, None),
+    ("hello", SIMPLE, 0.5, None),
+    ("", SIMPLE, 0.5, None),
+    ("read file a/b/c.py and explain why it is broken", SIMPLE, 0.95, None),
+    (
+        "Проаналізуй архітектуру пам'яті в Atlas",
+        ADVANCED,
+        1.0,
+        "Advanced thinking needed: Advanced thinking indicators: keyword: проаналізуй (+0.4), keyword: аналіз (+0.3), "
+        "keyword: архітектур (+0.4), pattern: analysis_request (+0.5), atlas_terms: 2",
+    ),
+    (
+        "Як можна покращити продуктивність Atlas?",
+        ADVANCED,
+        1.0,
+        "Advanced thinking needed: Advanced thinking indicators: keyword: покращи (+0.4), keyword: як можна (+0.4), "
+        "pattern: improvement_question (+0.4), complex_start: як можна",
+    ),
+    ("Порівняй різні стратегії мислення", ADVANCED, 0.4, None),
+    ("analyze file structure main.py", ADVANCED, 0.7, None),
+    ("how does memory manager work?", ADVANCED, 0.5, None),
+    ("show me how the system works", ADVANCED, 0.6, "Fallback to advanced: scores(simple=0.00, advanced=0.30)"),
+    (
+        "Give me a detailed, comprehensive and thorough in-depth analysis of the agent memory module design",
+        ADVANCED,
+        1.3,
+        None,
+    ),
+    ("how to optimize the implementation of this class method with a variable parameter", ADVANCED, 1.15, None),
+    ("what is the purpose of the thinking manager in atlas", ADVANCED, 0.67, None),
+    ("describe the system architecture and component integration strategy", ADVANCED, 0.76, None),
+    ("not working again", ADVANCED, 0.4, None),
+    ("порівняння та різниця між стратегіями", ADVANCED, 1.0, None),
+]
+
+
+@pytest.fixture(params=[True, False], ids=["c-extension", "pure-python"])
+def detector(request):
+    detector = IntelligentModeDetector()
+    if not request.param:
+        detector._compiled.automaton = _rebuilt(detector._compiled.automaton)
+    elif not AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick is not installed")
+    return detector
+
+
+def _rebuilt(automaton):
+    pure = KeywordAutomaton(use_c_extension=False)
+    for keyword, payloads in automaton._keywords.items():
+        for payload in payloads:
+            pure.add(keyword, payload)
+    return pure.build()
+
+
+@pytest.mark.parametrize("message,mode,confidence,reasoning", EXPECTED)
+def test_detection_matches_original_results(detector, message, mode, confidence, reasoning):
+    result = detector.detect_chat_mode(message)
+    assert result.mode == mode
+    assert result.confidence == pytest.approx(confidence, abs=1e-6)
+    assert result.should_use_advanced == (mode == ADVANCED)
+    if reasoning is not None:
+        assert result.reasoning == reasoning
+
+
+def test_automaton_finds_the_same_matches_as_substring_search():
+    rng = random.Random(7)
+    alphabet = "abcя "
+    keywords = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(40)}
+    automaton = KeywordAutomaton(use_c_extension=False)
+    for keyword in keywords:
+        automaton.add(keyword, keyword)
+    automaton.add("ab", "duplicate")
+
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        expected = {keyword: text.find(keyword) for keyword in keywords if keyword in text}
+        if "ab" in text:
+            expected["duplicate"] = text.find("ab")
+        assert automaton.find(text) == expected
+        matches = sorted(automaton.iter_matches(text), key=lambda match: (match[0], match[1]))
+        naive = sorted(
+            (start, keyword)
+            for keyword in keywords
+            for start in range(len(text))
+            if text.startswith(keyword, start)
+        )
+        assert [match for match in matches if match[1] != "duplicate"] == naive
+
+
+def test_automaton_rejects_empty_keywords():
+    with pytest.raises(ValueError):
+        KeywordAutomaton().add("", "empty")
+    assert KeywordAutomaton().find("anything") == {}
+
+
+def test_repeated_messages_are_served_from_the_cache():
+    detector = IntelligentModeDetector(cache_size=2)
+    first = detector.detect_chat_mode("read file main.py")
+    assert detector.detect_chat_mode("  read file main.py  ") is first
+    detector.detect_chat_mode("hello")
+    detector.detect_chat_mode("show tree")
+
+    stats = detector.get_detection_stats()
+    assert stats["cache"] == {"hits": 1, "misses": 3, "size": 2}
+    assert stats["total_detections"] == 4 and stats["mode_counts"] == {"simple_command": 4}
+
+    detector.clear_cache()
+    assert detector.get_detection_stats()["cache"]["size"] == 0
+    assert "cache" not in IntelligentModeDetector(cache_size=0).get_detection_stats()
+
+
+def test_detection_stays_within_latency_budget(caplog):
+    # Time detection, not debug log output left enabled by other tests
+    caplog.set_level(logging.INFO, logger="IntelligentModeDetector")
+    # ATLAS_BENCHMARK_SCALE loosens the budget on slow CI machines
+    scale = float(os.environ.get("ATLAS_BENCHMARK_SCALE", "1"))
+    uncached = run_benchmark(repeat=20)
+    cached = run_benchmark(repeat=20, cached=True)
+    assert uncached.messages == cached.messages == 20 * 30
+    assert uncached.p50_us < LATENCY_BUDGET_US * scale
+    assert cached.p50_us < uncached.p50_us
@@ -0,0 +1,154 @@
+"""
+Tests for the non-blocking logging pipeline.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from core.log_pipeline import (
+    BatchingRotatingFileHandler,
+    LogPipeline,
+    RateLimitFilter,
+    redact_sensitive_data,
+)
+
+
+class ListHandler(logging.Handler):
+    """Collects formatted records in memory."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+@pytest.fixture
+def pipeline():
+    """Create a pipeline and stop it after the test."""
+    pipeline = LogPipeline(queue_size=100, flush_interval=0.05)
+    yield pipeline
+    pipeline.stop()
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ("login password=hunter2&next=1", "login [REDACTED]&next=1"),
+        ("card 1234567812345678 used", "card [REDACTED] used"),
+        ("ssn 123-45-6789", "ssn [REDACTED]"),
+        ("API_KEY=abc", "[REDACTED]"),
+        ("nothing to see here", "nothing to see here"),
+    ],
+)
+def test_redaction(message, expected):
+    """The combined pattern redacts the same data as the individual patterns."""
+    assert redact_sensitive_data(message) == expected
+
+
+def test_routes_records_to_their_sinks(pipeline):
+    """Records only reach the sinks of the route they were logged on."""
+    first, second = ListHandler(), ListHandler()
+    pipeline.add_sink("first", first)
+    pipeline.add_sink("second", second)
+
+    make_logger("test.pipeline.first", pipeline.handler("first")).info("one")
+    make_logger("test.pipeline.second", pipeline.handler("second")).info("two %s", "args")
+    pipeline.stop()
+
+    assert first.messages == ["one"]
+    assert second.messages == ["two args"]
+    metrics = pipeline.get_metrics()
+    assert metrics["enqueued"] == 2
+    assert metrics["written"] == 2
+    assert metrics["queue_depth"] == 0
+
+
+def test_full_queue_drops_records():
+    """A full queue drops records instead of blocking the caller."""
+    pipeline = LogPipeline(queue_size=2)
+    handler = pipeline.handler("drop")
+    pipeline.stop()  # Nothing consumes the queue from here on
+
+    logger = make_logger("test.pipeline.drop", handler)
+    for i in range(5):
+        logger.info("record %d", i)
+
+    assert pipeline.get_metrics()["dropped"] == 3
+
+
+def test_rate_limit_and_sampling():
+    """Low-severity records are sampled and rate limited per logger."""
+    rate_limit = RateLimitFilter(rate=0.0, burst=3, sample_every={logging.DEBUG: 2})
+    records = [
+        logging.LogRecord("a", logging.DEBUG, __file__, 1, "m", None, None) for _ in range(10)
+    ]
+    passed = [record for record in records if rate_limit.filter(record)]
+
+    assert len(passed) == 3
+    assert rate_limit.sampled_out == 5
+    assert rate_limit.rate_limited == 2
+
+    warning = logging.LogRecord("a", logging.WARNING, __file__, 1, "m", None, None)
+    assert rate_limit.filter(warning)
+
+
+def test_batching_file_handler_rotates_by_size(tmp_path):
+    """The file handler rotates on size and writes everything on flush."""
+    log_file = tmp_path / "atlas.log"
+    handler = BatchingRotatingFileHandler(str(log_file), max_bytes=200, backup_count=2, flush_records=10)
+    logger = make_logger("test.pipeline.file", handler)
+    for i in range(20):
+        logger.info("line %02d with some padding", i)
+    handler.close()
+
+    assert (tmp_path / "atlas.log.1").exists()
+    assert "line 19" in log_file.read_text()
+
+
+def log_in_worker(value):
+    logging.getLogger("test.pipeline.fork").info("worker %d", value)
+    return value
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="fork only")
+def test_forked_workers_write_directly(pipeline, tmp_path):
+    """Records logged in forked pool workers reach the sinks, even while the parent is busy logging."""
+    sink = logging.FileHandler(tmp_path / "fork.log")
+    sink.setFormatter(logging.Formatter("%(message)s"))
+    pipeline.add_sink("fork", sink)
+    logger = make_logger("test.pipeline.fork", pipeline.handler("fork"))
+
+    stop = threading.Event()
+
+    def chatter():
+        while not stop.is_set():
+            logger.debug("parent")
+
+    thread = threading.Thread(target=chatter)
+    thread.start()
+    try:
+        with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("fork")) as pool:
+            assert sorted(pool.map(log_in_worker, range(8), timeout=30)) == list(range(8))
+    finally:
+        stop.set()
+        thread.join()
+    pipeline.stop()
+    sink.close()
+
+    lines = (tmp_path / "fork.log").read_text().splitlines()
+    assert sorted(line for line in lines if line != "parent") == [f"worker {i}" for i in range(8)]
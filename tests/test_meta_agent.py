@@ -0,0 +1,151 @@
+"""Tests for MetaAgent's priority task queue and concurrent dispatch."""
+
+import threading
+import time
+
+import pytest
+
+from core.agents.meta_agent import MetaAgent
+from core.agents.task_queue import PriorityTaskQueue, TaskState
+
+
+class RecordingAgent:
+    def __init__(self, task_types=None, gate=None, max_concurrency=None):
+        if task_types is not None:
+            self.task_types = task_types
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        self.gate = gate
+        self.seen = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def process_input(self, input_data):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        if self.gate is not None:
+            self.gate.wait(5)
+        with self._lock:
+            self.active -= 1
+            self.seen.append(input_data["name"])
+        return {"done": input_data["name"]}
+
+
+@pytest.fixture
+def meta():
+    meta = MetaAgent({"max_concurrent_tasks": 4, "task_aging_rate": 0})
+    yield meta
+    meta.shutdown()
+
+
+def test_queue_orders_by_priority_then_fifo():
+    queue = PriorityTaskQueue(aging_rate=0)
+    for name, priority in [("a", 0), ("b", 5), ("c", 0), ("d", 5), ("e", 1)]:
+        queue.push({"name": name}, priority)
+    cancelled = queue.push({"name": "f"}, 9)
+    assert queue.cancel(cancelled) and cancelled.future.cancelled()
+
+    assert len(queue) == 5
+    assert [entry.task["name"] for entry in queue.snapshot()] == ["b", "d", "e", "a", "c"]
+    assert [queue.pop().task["name"] for _ in range(5)] == ["b", "d", "e", "a", "c"]
+    assert queue.pop() is None
+
+
+def test_aging_lets_old_tasks_overtake(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.agents.task_queue.time.monotonic", lambda: now[0])
+    queue = PriorityTaskQueue(aging_rate=1.0)
+    old = queue.push({"name": "old"}, 0)
+    now[0] += 10
+    queue.push({"name": "new"}, 5)
+
+    assert queue.effective_priority(old) == 10
+    assert queue.pop().task["name"] == "old"
+
+
+def test_task_type_index_selects_without_scanning(meta):
+    calls = []
+
+    class Dynamic(RecordingAgent):
+        def can_handle_task(self, task_type):
+            calls.append(task_type)
+            return task_type == "search"
+
+    meta.register_agent("planner", RecordingAgent(task_types=["plan"]))
+    meta.register_agent("searcher", Dynamic())
+    for _ in range(3):
+        assert meta.select_agent_for_task("plan")[0] == "planner"
+        assert meta.select_agent_for_task("search")[0] == "searcher"
+        assert meta.select_agent_for_task("other")[0] == "planner"
+    assert calls == ["plan", "search", "other"]
+
+    meta.unregister_agent("planner")
+    assert meta.select_agent_for_task("plan")[0] == "searcher"
+
+
+def test_tasks_run_concurrently_within_agent_limits(meta):
+    gate = threading.Event()
+    wide = RecordingAgent(task_types=["wide"], gate=gate, max_concurrency=3)
+    narrow = RecordingAgent(task_types=["narrow"], gate=gate)
+    meta.register_agent("wide", wide)
+    meta.register_agent("narrow", narrow)
+
+    handles = [meta.enqueue_task({"type": "narrow", "name": f"n{i}"}) for i in range(3)]
+    handles += [meta.enqueue_task({"type": "wide", "name": f"w{i}"}) for i in range(5)]
+    assert meta.process_task_queue() == 4
+    metrics = meta.get_task_metrics()
+    assert metrics["running"] == 4 and metrics["agents"]["wide"]["active"] == 3
+
+    gate.set()
+    assert meta.wait_for_tasks(5)
+    assert [handle.future.result(1)["status"] for handle in handles] == ["success"] * 8
+    assert wide.peak <= 3 and narrow.peak == 1
+    assert narrow.seen == ["n0", "n1", "n2"]
+
+    metrics = meta.get_task_metrics()
+    assert metrics["completed"] == 8 and metrics["queued"] == metrics["running"] == 0
+    assert metrics["queue_latency"]["samples"] == 8
+    assert 0 < metrics["agents"]["wide"]["utilization"] <= 1
+
+
+def test_higher_priority_tasks_are_dispatched_first():
+    meta = MetaAgent({"max_concurrent_tasks": 1, "task_aging_rate": 0})
+    agent = RecordingAgent()
+    meta.register_agent("only", agent)
+    for i, priority in enumerate([0, 3, 1, 3]):
+        meta.enqueue_task({"type": "any", "name": f"t{i}"}, priority=priority)
+
+    assert [task["name"] for task in meta.task_queue] == ["t1", "t3", "t2", "t0"]
+    assert meta.wait_for_tasks(5)
+    assert agent.seen == ["t1", "t3", "t2", "t0"]
+    meta.shutdown()
+
+
+def test_cancel_queued_and_waiting_tasks(meta):
+    gate = threading.Event()
+    agent = RecordingAgent(gate=gate)
+    meta.register_agent("only", agent)
+    running = meta.enqueue_task({"type": "any", "name": "running"})
+    waiting = meta.enqueue_task({"type": "any", "name": "waiting"})
+    queued = meta.enqueue_task({"type": "any", "name": "queued"}, priority=-1)
+    meta.process_task_queue()
+    time.sleep(0.05)
+
+    assert waiting.state is TaskState.WAITING
+    assert meta.cancel_task(waiting.task_id) and meta.cancel_task(queued.task_id)
+    assert not meta.cancel_task(running.task_id)
+    gate.set()
+    assert meta.wait_for_tasks(5)
+
+    assert agent.seen == ["running"]
+    assert waiting.future.cancelled() and queued.future.cancelled()
+    assert meta.get_task_metrics()["cancelled"] == 2
+
+
+def test_unroutable_tasks_fail(meta):
+    handle = meta.enqueue_task({"type": "plan", "name": "orphan"})
+    assert meta.wait_for_tasks(5)
+    assert handle.future.result(1)["status"] == "error"
+    assert meta.get_task_metrics()["failed"] == 1
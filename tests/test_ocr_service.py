@@ -0,0 +1,151 @@
+"""
+Tests for the caching OCR service.
+"""
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from tools.ocr_service import OCRService  # noqa: E402
+
+CALLS = []
+
+
+def fake_engine(img, lang):
+    """Pretend OCR: report the image size and two words with boxes."""
+    CALLS.append(img.size)
+    width, height = img.size
+    return {
+        "text": f"{width}x{height}",
+        "words": [
+            [0, 0, width // 4, height // 4, "top-left", [1, 1, 1]],
+            [width // 2, height // 2, width // 4, height // 4, "bottom-right", [1, 1, 2]],
+        ],
+    }
+
+
+@pytest.fixture
+def service(tmp_path):
+    CALLS.clear()
+    return OCRService(cache_dir=tmp_path, engine=fake_engine, do_preprocess=False)
+
+
+def make_image(width, height, color=255):
+    return Image.new("L", (width, height), color)
+
+
+def test_results_are_cached_by_content(service, tmp_path):
+    """The same pixels are OCRed once, also across service instances via disk."""
+    assert service.ocr(make_image(400, 400)) == "400x400"
+    assert service.ocr(make_image(400, 400)) == "400x400"
+    assert len(CALLS) == 1
+
+    fresh = OCRService(cache_dir=tmp_path, engine=fake_engine, do_preprocess=False)
+    assert fresh.ocr(make_image(400, 400)) == "400x400"
+    assert len(CALLS) == 1
+    assert fresh.stats["disk_hits"] == 1
+
+
+def test_ocr_many_keeps_order_and_deduplicates(service):
+    """Batch results follow input order and duplicates are OCRed once."""
+    images = [make_image(320, 320), make_image(640, 480), make_image(320, 320)]
+
+    assert service.ocr_many(images) == ["320x320", "640x480", "320x320"]
+    assert len(CALLS) == 2
+
+
+def test_ocr_many_with_process_pool(tmp_path):
+    """Pooled OCR returns ordered results and fills the parent's cache."""
+    service = OCRService(cache_dir=tmp_path, engine=fake_engine, do_preprocess=False)
+    images = [make_image(300 + i, 300) for i in range(4)]
+
+    assert service.ocr_many(images, processes=2) == [f"{300 + i}x300" for i in range(4)]
+    assert service.ocr(images[2]) == "302x300"
+    assert service.stats["memory_hits"] == 1
+
+
+def test_region_reuses_full_frame_result(service):
+    """Region OCR filters cached word boxes instead of running OCR again."""
+    frame = make_image(800, 600)
+    service.ocr(frame)
+
+    assert service.ocr_region(frame, (400, 300, 800, 600)) == "bottom-right"
+    assert service.ocr_region(frame, (0, 0, 400, 300)) == "top-left"
+    assert len(CALLS) == 1
+
+
+def test_uncached_region_ocrs_only_the_crop(service):
+    """Without a cached full-frame result only the region is OCRed."""
+    assert service.ocr_region(make_image(800, 600), (0, 0, 400, 300)) == "400x300"
+    assert CALLS == [(400, 300)]
+
+
+def test_preprocessing_maps_boxes_back(tmp_path):
+    """Word boxes from a downscaled image are reported in original coordinates."""
+    CALLS.clear()
+    service = OCRService(cache_dir=None, engine=fake_engine)
+    frame = make_image(6000, 1500)
+
+    result = service.ocr_result(frame)
+
+    assert CALLS == [(3000, 750)]
+    assert result["words"][1][:2] == [3000, 750]
+
+
+def test_default_engine_prefers_vision(monkeypatch):
+    """Like ocr_image, the default engine uses Vision first unless a language needs Tesseract."""
+    import tools.ocr_service as ocr_service
+
+    monkeypatch.setattr(ocr_service, "_VISION_AVAILABLE", True)
+    monkeypatch.setattr(ocr_service, "_PYTESSERACT_AVAILABLE", True)
+    monkeypatch.setattr(ocr_service, "_vision_ocr", lambda img: "vision")
+    assert ocr_service._default_engine(make_image(10, 10), None) == {"text": "vision", "words": None}
+    assert not ocr_service._prefers_vision("ukr")
+
+
+def test_disk_cache_is_bounded(tmp_path):
+    """Expired and least recently used disk entries are pruned."""
+    import os
+    import time
+
+    service = OCRService(cache_dir=tmp_path, engine=fake_engine, do_preprocess=False, max_disk_bytes=10**9)
+    for i in range(4):
+        service.ocr(make_image(100 + i, 100))
+    entries = sorted(tmp_path.glob("*/*.json"))
+    assert len(entries) == 4
+
+    old = time.time() - 3600
+    os.utime(entries[0], (old, old))
+    service.max_disk_age = 60
+    assert service.prune_disk_cache() == 1
+
+    service.max_disk_bytes = max(path.stat().st_size for path in tmp_path.glob("*/*.json"))
+    assert service.prune_disk_cache() == 2
+    assert len(list(tmp_path.glob("*/*.json"))) == 1
+
+
+def test_ocr_screen_reuses_results_for_an_unchanged_screen(service, monkeypatch):
+    np = pytest.importorskip("numpy")
+    from tools import screen_capture
+
+    pixels = np.full((200, 400, 3), 255, dtype=np.uint8)
+    capture_service = screen_capture.ScreenCaptureService(lambda: pixels.copy(), channel_order="RGB")
+    monkeypatch.setattr(screen_capture, "_default_service", capture_service)
+
+    assert service.ocr_screen() == "400x200"
+    assert service.ocr_screen(box=(0, 0, 200, 100)) == "top-left"
+    assert len(CALLS) == 1 and capture_service.stats["unchanged"] == 1
+    # The second call was answered from the frame, without hashing the image
+    assert service.stats["misses"] == 1 and service.stats["memory_hits"] == 0
+
+
+def test_ocr_screen_box_on_a_fresh_frame_ocrs_only_the_box(service, monkeypatch):
+    np = pytest.importorskip("numpy")
+    from tools import screen_capture
+
+    pixels = np.full((200, 400, 3), 255, dtype=np.uint8)
+    capture_service = screen_capture.ScreenCaptureService(lambda: pixels.copy(), channel_order="RGB")
+    monkeypatch.setattr(screen_capture, "_default_service", capture_service)
+
+    assert service.ocr_screen(box=(0, 0, 200, 100)) == "200x100"
+    assert CALLS == [(200, 100)]
@@ -0,0 +1,122 @@
+"""Tests for streaming, cached PDF extraction."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from tools import pdf_extraction_tool  # noqa: E402
+from tools.pdf_extraction_tool import (  # noqa: E402
+    PDFPageCache,
+    extract_pdf_text,
+    iter_pdf_pages,
+    parse_page_spec,
+)
+
+
+def make_pdf(path, page_texts):
+    """Write a minimal PDF with one line of Helvetica text per page."""
+    count = len(page_texts)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(f"{4 + 2 * i} 0 R".encode() for i in range(count))
+        + f"] /Count {count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        data += f"{offset:010d} 00000 n \n".encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(data))
+    return str(path)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    page_cache = PDFPageCache(":memory:")
+    monkeypatch.setattr(pdf_extraction_tool, "_page_cache", page_cache)
+    return page_cache
+
+
+@pytest.fixture
+def manual(tmp_path):
+    return make_pdf(tmp_path / "manual.pdf", [f"Page {i} body" for i in range(40)])
+
+
+def test_parse_page_spec():
+    assert parse_page_spec("1-3, 5, 9-", 10) == [0, 1, 2, 4, 8, 9]
+    assert parse_page_spec("-2,20", 10) == [0, 1]
+
+
+def test_iter_pages_streams_in_order_and_caches(manual, cache, monkeypatch):
+    pages = list(iter_pdf_pages(manual, pages="2-4"))
+    assert [index for index, _ in pages] == [1, 2, 3]
+    assert pages[0][1].strip() == "Page 1 body"
+
+    # Cached pages are served without parsing the PDF again
+    monkeypatch.setattr(pdf_extraction_tool.PyPDF2, "PdfReader", None)
+    assert list(iter_pdf_pages(manual, pages=[3, 1, 2])) == pages
+
+
+def test_parallel_extraction_keeps_page_order(manual, cache):
+    sequential = list(iter_pdf_pages(manual, use_cache=False))
+    parallel = list(iter_pdf_pages(manual, processes=2))
+    assert parallel == sequential
+    assert [index for index, _ in parallel] == list(range(40))
+    assert len(cache.get_pages(cache.hash_file(manual), "text", list(range(40)))) == 40
+
+
+def test_stopping_early_does_not_wait_for_the_pool(manual, cache, monkeypatch):
+    shutdowns = []
+
+    class RecordingPool(ProcessPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            shutdowns.append((wait, cancel_futures))
+            super().shutdown(wait, cancel_futures=cancel_futures)
+
+    monkeypatch.setattr(pdf_extraction_tool, "ProcessPoolExecutor", RecordingPool)
+    pages = iter_pdf_pages(manual, processes=2)
+    assert next(pages)[0] == 0
+    pages.close()
+    assert shutdowns == [(False, True)]
+
+
+def test_partial_cache_fill_mixes_cached_and_new_pages(manual, cache):
+    list(iter_pdf_pages(manual, pages=[0, 5, 10]))
+    pages = list(iter_pdf_pages(manual, pages="1-12"))
+    assert [index for index, _ in pages] == list(range(12))
+    assert all(text.strip() == f"Page {index} body" for index, text in pages)
+
+
+def test_extract_pdf_text_ranges(manual, cache):
+    full = extract_pdf_text(manual)
+    assert full["status"] == "success"
+    assert full["pages"] == list(range(40))
+    assert full["text"].startswith("Page 0 body")
+
+    partial = extract_pdf_text(manual, byte_range=(0, 20))
+    assert partial["text"] == full["text"].encode()[:20].decode()
+    assert partial["truncated"] is True
+    assert len(partial["pages"]) < 5
+
+    middle = extract_pdf_text(manual, pages="3", byte_range=(5, None))
+    assert middle["text"] == "2 body"
+
+    missing = extract_pdf_text(manual + ".missing")
+    assert missing["status"] == "error"
@@ -0,0 +1,117 @@
+"""Tests for the single-pass static scanner and the sampling profiler."""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from tools.performance_profiler import (  # noqa: E402
+    PerformanceASTAnalyzer,
+    PerformanceProfiler,
+    SamplingProfiler,
+    StaticScanner,
+)
+
+SOURCE = '''import time
+
+def load(items, db):
+    for item in items:
+        results.append(item)
+        db.execute("SELECT * FROM t")
+    time.sleep(5)
+    results.append(1)
+'''
+
+
+def test_static_scanner_uses_ast_loop_context():
+    scanner = StaticScanner(PerformanceProfiler().performance_patterns)
+    issues = scanner.scan("mod.py", SOURCE)
+    by_line = {(i.line_number, i.issue_type): i for i in issues}
+
+    assert by_line[(5, "memory_inefficient")].severity == "high"
+    assert "(in loop context)" in by_line[(5, "memory_inefficient")].description
+    assert by_line[(8, "memory_inefficient")].severity == "medium"
+    assert by_line[(6, "database_antipatterns")].severity == "critical"
+    assert by_line[(7, "blocking_calls")].code_snippet == "time.sleep(5)"
+
+
+def test_ast_analyzer_single_walk_complexity_and_nesting():
+    body = "\n".join(f"    if x == {i}:\n        pass" for i in range(21))
+    source = (
+        f"def busy(x):\n{body}\n"
+        "def nested(a):\n"
+        "    for i in a:\n"
+        "        for j in a:\n"
+        "            for k in a:\n"
+        "                pass\n"
+    )
+    import ast
+
+    analyzer = PerformanceASTAnalyzer("m.py")
+    analyzer.visit(ast.parse(source))
+
+    assert analyzer.function_complexity["busy"] == 22
+    assert analyzer.function_complexity["nested"] == 4
+    types = sorted(issue.issue_type for issue in analyzer.issues)
+    assert types == ["high_complexity", "nested_loops"]
+    depths = analyzer.loop_depth_by_line(len(source.split("\n")))
+    assert depths[-2] == 3
+
+
+def test_static_analysis_over_tree(tmp_path):
+    for i in range(20):
+        (tmp_path / f"m{i}.py").write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "broken.py").write_text("for x in y:\n    out.append(x))\n", encoding="utf-8")
+
+    profiler = PerformanceProfiler(str(tmp_path))
+    issues = profiler._analyze_static_performance()
+    assert len([i for i in issues if i.file_path == "m3.py"]) == 4
+    assert [i.severity for i in issues if i.file_path == "broken.py"] == ["high"]
+    assert issues[0].severity == "critical"
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampling_profiler_collects_stacks(tmp_path):
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,))
+    worker.start()
+    try:
+        with SamplingProfiler(interval=0.002) as sampler:
+            time.sleep(0.3)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.samples > 10
+    profiles = sampler.function_profiles()
+    spin = next(p for p in profiles if p.name == "_spin")
+    assert spin.cumulative_time > 0.1
+    assert spin.cumulative_time >= spin.total_time
+
+    collapsed = sampler.collapsed_stacks()
+    assert any("_spin (" in stack for stack in collapsed)
+    out = tmp_path / "stacks.txt"
+    sampler.write_collapsed(str(out))
+    line = out.read_text(encoding="utf-8").splitlines()[0]
+    assert int(line.rsplit(" ", 1)[1]) > 0
+
+
+def test_signal_sampling_profiler():
+    signal = pytest.importorskip("signal")
+    if not hasattr(signal, "SIGPROF"):
+        pytest.skip("SIGPROF not available")
+
+    with SamplingProfiler(interval=0.001, mode="signal") as sampler:
+        deadline = time.process_time() + 0.2
+        while time.process_time() < deadline:
+            sum(i * i for i in range(1000))
+
+    assert sampler.samples > 0
+    names = {p.name for p in sampler.function_profiles()}
+    assert "test_signal_sampling_profiler" in names
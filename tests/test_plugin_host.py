@@ -0,0 +1,191 @@
+"""Tests for the out-of-process plugin host."""
+
+import os
+import sys
+import textwrap
+import time
+
+import pytest
+
+from core.plugin_host import (
+    PluginCrashedError,
+    PluginHost,
+    PluginLimits,
+    RemotePluginError,
+)
+from core.plugin_manifest import PluginManifest, read_manifest
+from core.plugin_worker import SHM_THRESHOLD, decode, encode
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="plugin workers use POSIX rlimits")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PLUGIN_SOURCE = textwrap.dedent(
+    """
+    import os
+
+
+    class ProbePlugin:
+        def __init__(self, name):
+            self.name = name
+            self.initialized = 0
+            self.events = []
+
+        def initialize(self):
+            self.initialized += 1
+            return True
+
+        def handle_event(self, event_type, data):
+            self.events.append([event_type, data])
+
+        def received(self):
+            return self.events
+
+        def echo(self, value):
+            return value
+
+        def pid(self):
+            return os.getpid()
+
+        def fail(self):
+            raise ValueError("boom")
+
+        def crash(self):
+            os._exit(3)
+
+        def spin(self):
+            while True:
+                pass
+
+        def allocate(self, megabytes):
+            return len(bytearray(megabytes * 1024 * 1024))
+    """
+)
+
+
+@pytest.fixture
+def probe(tmp_path, monkeypatch):
+    module = f"atlas_probe_plugin_{os.getpid()}"
+    (tmp_path / f"{module}.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(tmp_path), os.environ.get("PYTHONPATH", "")]))
+
+    def manifest(name="probe", **kwargs):
+        return PluginManifest(name, f"{module}:ProbePlugin", **kwargs)
+
+    return manifest
+
+
+@pytest.fixture
+def host():
+    host = PluginHost(pool_size=2, call_timeout=20.0, restart_window=60.0)
+    yield host
+    host.shutdown()
+
+
+@pytest.mark.parametrize("codec", ["pickle", "msgpack"])
+def test_codec_round_trip_moves_large_bytes_through_shared_memory(codec):
+    if codec == "msgpack":
+        pytest.importorskip("msgpack")
+    payload = {"small": b"abc", "large": [b"x" * SHM_THRESHOLD], "set": {1, 2}}
+    data = encode(payload, codec)
+    assert len(data) < SHM_THRESHOLD
+    assert decode(data, codec) == payload
+
+
+def test_sample_plugin_runs_out_of_process(host):
+    manifest = read_manifest(os.path.join(REPO_ROOT, "plugins", "sample_plugin"), "plugins")
+    plugin = host.load(manifest)
+
+    assert host.worker_pid("sample_plugin") != os.getpid()
+    assert plugin.initialize() is True and plugin.is_active
+    assert plugin.get_metadata()["name"] == "Sample Plugin"
+    host.broadcast_event("sample_event", {"value": 1})
+    host.flush_events()
+    plugin.shutdown()
+
+    metrics = host.metrics()["sample_plugin"]
+    assert metrics["count"] == 3 and metrics["errors"] == 0
+    assert 0 < metrics["p50_ms"] <= metrics["p95_ms"] <= metrics["max_ms"]
+
+
+def test_calls_return_results_and_remote_errors(host, probe):
+    plugin = host.load(probe())
+    assert plugin.echo({"a": [1, 2]}) == {"a": [1, 2]}
+    large = os.urandom(SHM_THRESHOLD + 1)
+    assert plugin.echo(large) == large
+
+    with pytest.raises(RemotePluginError) as info:
+        plugin.fail()
+    assert info.value.remote_type == "ValueError" and "boom" in info.value.remote_traceback
+    assert host.metrics()["probe"]["errors"] == 1
+
+
+def test_events_are_batched_per_worker(host, probe, monkeypatch):
+    host.batch_interval = 60.0
+    first, second = host.load(probe("first")), host.load(probe("second"))
+    assert host.worker_pid("first") != host.worker_pid("second")
+
+    sent = []
+    send = type(host._workers["pool:0"]).send
+
+    def counting_send(worker, op, *args, **kwargs):
+        sent.append((worker.key, op))
+        return send(worker, op, *args, **kwargs)
+
+    monkeypatch.setattr(type(host._workers["pool:0"]), "send", counting_send)
+    for i in range(50):
+        host.broadcast_event("tick", i)
+    host.broadcast_event("only_first", None, plugins=["first"])
+    host.flush_events()
+
+    assert sorted(key for key, op in sent if op == "events") == ["pool:0", "pool:1"]
+    assert first.received() == [["tick", i] for i in range(50)] + [["only_first", None]]
+    assert second.received() == [["tick", i] for i in range(50)]
+
+
+def test_crashed_worker_is_restarted_and_plugins_restored(host, probe):
+    plugin = host.load(probe())
+    plugin.initialize()
+    pid = plugin.pid()
+
+    with pytest.raises(PluginCrashedError):
+        plugin.crash()
+    assert plugin.pid() != pid
+    assert plugin.echo("again") == "again"
+    assert host.workers()["pool:0"]["restarts"] == 1
+
+
+def test_worker_gives_up_after_max_restarts(probe):
+    host = PluginHost(max_restarts=1, call_timeout=20.0)
+    try:
+        plugin = host.load(probe())
+        with pytest.raises(PluginCrashedError):
+            plugin.crash()
+        with pytest.raises(PluginCrashedError):
+            plugin.crash()
+        with pytest.raises(PluginCrashedError):
+            plugin.echo(1)
+        assert host.workers()["pool:0"]["failed"]
+    finally:
+        host.shutdown()
+
+
+def test_resource_limits_apply_to_dedicated_workers(host, probe):
+    pytest.importorskip("resource")
+    unlimited = host.load(probe("unlimited"))
+    limited = host.load(probe("limited", limits={"memory_mb": 64}))
+    spinner = host.load(probe("spinner"), limits=PluginLimits(cpu_seconds=1))
+    assert set(host.workers()) == {"pool:0", "plugin:limited", "plugin:spinner"}
+
+    assert limited.allocate(8) == 8 * 1024 * 1024
+    with pytest.raises(RemotePluginError) as info:
+        limited.allocate(512)
+    assert info.value.remote_type == "MemoryError"
+    assert limited.echo("still alive") == "still alive"
+
+    start = time.monotonic()
+    with pytest.raises(PluginCrashedError):
+        spinner.spin()
+    assert time.monotonic() - start < 15
+    assert spinner.echo("restarted") == "restarted"
+    assert unlimited.echo("unaffected") == "unaffected"
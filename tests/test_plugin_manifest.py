@@ -0,0 +1,192 @@
+"""Tests for manifest-based plugin discovery and lazy, concurrent activation."""
+
+import json
+import os
+import sys
+import textwrap
+import time
+
+import pytest
+
+from core import module_registry
+from core.plugin_manifest import PluginActivator, PluginIndex
+from core.plugin_system import PluginRegistry
+
+PLUGIN_SOURCE = """\
+\"\"\"{doc}\"\"\"
+import time
+
+PLUGIN_MANIFEST = {manifest!r}
+
+
+class {cls}:
+    def __init__(self, name, version):
+        self.name = name
+        self.active = False
+
+    def initialize(self):
+        time.sleep({delay})
+        self.active = True
+
+    def shutdown(self):
+        self.active = False
+"""
+
+
+@pytest.fixture
+def plugin_package(tmp_path, monkeypatch):
+    """A throw-away importable plugin package."""
+    package = f"atlas_test_plugins_{os.getpid()}_{int(time.time() * 1e6)}"
+    root = tmp_path / package
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def add(name, cls, manifest=None, delay=0.0, as_package=False, doc="Test plugin."):
+        source = PLUGIN_SOURCE.format(doc=doc, manifest=manifest or {}, cls=cls, delay=delay)
+        if as_package:
+            (root / name).mkdir()
+            (root / name / "__init__.py").write_text("")
+            (root / name / "main.py").write_text(source)
+        else:
+            (root / f"{name}.py").write_text(source)
+
+    yield package, root, add
+    for module in [m for m in sys.modules if m.startswith(package)]:
+        del sys.modules[module]
+
+
+def _imported(package):
+    return sorted(m[len(package) + 1 :] for m in sys.modules if m.startswith(package + "."))
+
+
+def test_discovery_reads_manifests_without_importing(plugin_package, tmp_path):
+    package, root, add = plugin_package
+    add("alpha", "AlphaPlugin", {"activation_events": ["onCommand:alpha"], "version": "2.0"})
+    add("beta", "AtlasPlugin", as_package=True, doc="Beta does things.\n\nMore.")
+    (root / "helpers.py").write_text("def helper():\n    return 1\n")
+    (root / "gamma").mkdir()
+    (root / "gamma" / "plugin.json").write_text(
+        json.dumps({"entry_point": f"{package}.gamma.impl:Gamma", "dependencies": ["alpha"]})
+    )
+
+    index = PluginIndex(str(root), package=package, cache_path=str(tmp_path / "index.json"))
+    manifests = index.manifests()
+    assert sorted(manifests) == ["alpha", "beta", "gamma"]
+    assert manifests["alpha"].entry_point == f"{package}.alpha:AlphaPlugin"
+    assert manifests["alpha"].version == "2.0"
+    assert manifests["beta"].entry_point == f"{package}.beta.main:AtlasPlugin"
+    assert manifests["beta"].description == "Beta does things."
+    assert manifests["gamma"].dependencies == ["alpha"]
+    assert _imported(package) == []
+
+
+def test_index_cache_is_invalidated_by_mtime(plugin_package, tmp_path):
+    package, root, add = plugin_package
+    add("alpha", "AlphaPlugin")
+    add("beta", "BetaPlugin")
+    cache = str(tmp_path / "index.json")
+
+    first = PluginIndex(str(root), package=package, cache_path=cache)
+    first.refresh()
+    assert first.reads == 2
+
+    second = PluginIndex(str(root), package=package, cache_path=cache)
+    assert sorted(second.refresh()) == ["alpha", "beta"] and second.reads == 0
+
+    add("beta", "BetaPlugin", {"activation_events": ["*"]}, doc="Changed, and longer.")
+    os.utime(root / "beta.py", ns=(time.time_ns(), time.time_ns() + 10**9))
+    (root / "alpha.py").unlink()
+    third = PluginIndex(str(root), package=package, cache_path=cache)
+    manifests = third.refresh()
+    assert third.reads == 1 and sorted(manifests) == ["beta"]
+    assert manifests["beta"].activation_events == ["*"]
+
+
+def test_plugins_activate_lazily_on_their_events(plugin_package):
+    package, root, add = plugin_package
+    add("alpha", "AlphaPlugin")
+    add("beta", "BetaPlugin", {"activation_events": ["onStartup"], "dependencies": ["alpha"]})
+    add("gamma", "GammaPlugin", {"activation_events": ["onCommand:gamma.*"]})
+    activator = PluginActivator(PluginIndex(str(root), package=package, cache_path=None).manifests)
+
+    results = activator.fire("onStartup")
+    assert {name: t.status for name, t in results.items()} == {"alpha": "active", "beta": "active"}
+    assert _imported(package) == ["alpha", "beta"]
+    assert activator.fire("onStartup") == {}
+
+    activator.fire("onCommand:gamma.run")
+    assert activator.active["gamma"].active
+    assert set(activator.timings) == {"alpha", "beta", "gamma"}
+    assert all(t.load_seconds > 0 for t in activator.timings.values())
+
+    assert activator.shutdown() == ["gamma", "beta", "alpha"]
+    assert not activator.active
+
+
+def test_independent_plugins_activate_concurrently_with_timeouts(plugin_package):
+    package, root, add = plugin_package
+    for name in ("one", "two", "three"):
+        add(name, f"{name.capitalize()}Plugin", {"activation_events": ["onStartup"]}, delay=0.3)
+    add("stuck", "StuckPlugin", {"activation_events": ["onStartup"], "timeout": 0.1}, delay=1.0)
+    add("after", "AfterPlugin", {"activation_events": ["onStartup"], "dependencies": ["stuck"]})
+    activator = PluginActivator(PluginIndex(str(root), package=package, cache_path=None).manifests)
+
+    start = time.perf_counter()
+    results = activator.fire("onStartup")
+    assert time.perf_counter() - start < 0.8  # not 3 x 0.3s + 1s
+    assert {name: t.status for name, t in results.items()} == {
+        "one": "active",
+        "two": "active",
+        "three": "active",
+        "stuck": "timeout",
+        "after": "skipped",
+    }
+    assert all(results[name].init_seconds >= 0.3 for name in ("one", "two", "three"))
+    assert "stuck" not in activator.active
+    activator.shutdown()
+
+
+def test_plugin_registry_uses_the_index(plugin_package):
+    package, root, add = plugin_package
+    add("startup", "StartupPlugin", {"activation_events": ["onStartup"]})
+    add("idle", "IdlePlugin", {"activation_events": ["onCommand:idle"]})
+    registry = PluginRegistry(plugin_dir=package, index=PluginIndex(str(root), package=package, cache_path=None))
+
+    assert registry.discover_plugins() == ["idle", "startup"]
+    assert registry.load_plugins([]) == ["idle", "startup"]
+    assert registry.start_all_plugins() == ["startup"]
+    assert _imported(package) == ["startup"]
+    assert registry.fire_event("onCommand:idle") == ["idle"]
+    assert set(registry.plugin_timings()) == {"idle", "startup"}
+    assert sorted(registry.unload_all_plugins()) == ["idle", "startup"]
+
+
+def test_load_all_modules_registers_classes_without_importing(tmp_path, monkeypatch):
+    package = f"atlas_test_modules_{os.getpid()}"
+    root = tmp_path / package
+    (root / "sub").mkdir(parents=True)
+    (root / "__init__.py").write_text("")
+    (root / "sub" / "__init__.py").write_text("")
+    (root / "sub" / "widgets.py").write_text(
+        textwrap.dedent(
+            """
+            class Widget:
+                pass
+
+
+            class _Helper:
+                pass
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(module_registry, "MODULES", {})
+
+    module_registry.load_all_modules(package)
+    assert sorted(module_registry.MODULES) == [f"{package}.sub.widgets.Widget", f"{package}.sub.widgets._Helper"]
+    assert f"{package}.sub.widgets" not in sys.modules
+
+    widget = module_registry.get_module(f"{package}.sub.widgets.Widget")
+    assert widget.__name__ == "Widget" and f"{package}.sub.widgets" in sys.modules
+    assert module_registry.get_module(f"{package}.sub.widgets.Widget") is widget
@@ -0,0 +1,166 @@
+"""Tests for the screen capture ring buffer with a synthetic frame source."""
+
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tools.screen_capture import (  # noqa: E402
+    ScreenCaptureService,
+    dirty_rectangles,
+    to_rgb,
+)
+
+
+class SyntheticScreen:
+    """A BGRA 'display' whose pixels tests can paint on."""
+
+    channel_order = "BGRA"
+
+    def __init__(self, width=320, height=200):
+        self.pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        self.pixels[..., 3] = 255
+        self.captures = 0
+
+    def paint(self, x, y, w, h, bgr=(0, 0, 255)):
+        self.pixels[y : y + h, x : x + w, :3] = bgr
+
+    def __call__(self):
+        self.captures += 1
+        return self.pixels.copy()
+
+
+def test_dirty_rectangles_merge_blocks():
+    before = np.zeros((100, 100, 3), dtype=np.uint8)
+    after = before.copy()
+    after[10:50, 5:20] = 255  # spans rows 0-1, column 0 of 32px blocks
+    after[90:95, 70:100] = 1
+    rects = dirty_rectangles(before, after, block_size=32)
+    assert sorted(rects) == [(0, 0, 32, 64), (64, 64, 36, 32)]
+    assert dirty_rectangles(before, before.copy()) == []
+    assert dirty_rectangles(None, after) == [(0, 0, 100, 100)]
+
+
+def test_to_rgb_views_and_compositing():
+    bgra = np.zeros((2, 2, 4), dtype=np.uint8)
+    bgra[..., 0] = 10  # blue
+    bgra[..., 2] = 200  # red
+    bgra[..., 3] = 255
+    rgb = to_rgb(bgra, "BGRA")
+    assert np.shares_memory(rgb, bgra)
+    assert rgb[0, 0].tolist() == [200, 0, 10]
+
+    bgra[0, 0, 3] = 0  # fully transparent pixel becomes white
+    assert to_rgb(bgra, "BGRA")[0, 0].tolist() == [255, 255, 255]
+
+
+def test_ring_buffer_tracks_changes_and_reuses_conversions():
+    screen = SyntheticScreen()
+    service = ScreenCaptureService(screen, capacity=3, block_size=16)
+
+    first = service.capture()
+    assert first.dirty == [(0, 0, 320, 200)]
+    image = first.to_image()
+
+    same = service.capture()
+    assert not same.changed
+    assert same.array is first.array and same.to_image() is image
+    assert service.stats["unchanged"] == 1
+
+    screen.paint(100, 40, 10, 10)
+    changed = service.capture()
+    assert changed.dirty == [(96, 32, 16, 32)]
+    assert changed.changed_in((90, 30, 20, 20)) and not changed.changed_in((0, 0, 50, 50))
+    assert changed.rgb[45, 105].tolist() == [255, 0, 0]
+
+    crop = changed.crop((100, 40, 10, 10))
+    assert np.shares_memory(crop, changed.array) and crop.shape == (10, 10, 4)
+
+    service.capture()
+    assert [f.sequence for f in service.frames()] == [2, 3, 4]
+
+
+def test_grab_reuses_fresh_frames():
+    screen = SyntheticScreen()
+    service = ScreenCaptureService(screen)
+    service.grab(max_age=10)
+    region = service.grab((10, 10, 5, 5), max_age=10)
+    assert screen.captures == 1 and region.shape == (5, 5, 3)
+
+
+def test_continuous_capture_is_rate_limited_and_notifies_on_change():
+    screen = SyntheticScreen()
+    service = ScreenCaptureService(screen)
+    changed_frames = []
+    service.subscribe(changed_frames.append)
+    service.start(fps=20)
+    try:
+        time.sleep(0.05)
+        threading.Timer(0.1, screen.paint, args=(200, 150, 20, 20)).start()
+        frame = service.wait_for_change(region=(190, 140, 40, 40), timeout=2)
+        assert frame is not None and frame.changed_in((200, 150, 20, 20))
+        time.sleep(0.3)
+    finally:
+        service.stop()
+    # ~0.45s at 20 fps; a busy loop would capture far more often
+    assert 4 <= screen.captures <= 15
+    # Only the first frame and the painted frame were changes
+    assert len(changed_frames) == 2
+
+
+def test_wait_for_change_polls_without_continuous_mode():
+    screen = SyntheticScreen()
+    service = ScreenCaptureService(screen)
+    service.capture()
+    assert service.wait_for_change(timeout=0.2, interval=0.05) is None
+    threading.Timer(0.05, screen.paint, args=(0, 0, 4, 4)).start()
+    frame = service.wait_for_change(region=(0, 0, 10, 10), timeout=2, interval=0.05)
+    assert frame is not None and frame.dirty == [(0, 0, 32, 32)]
+
+
+def test_region_grab_converts_only_the_region():
+    screen = SyntheticScreen()
+    screen.paint(12, 10, 4, 4)
+    service = ScreenCaptureService(screen)
+    region = service.grab((10, 10, 8, 8))
+    assert region.shape == (8, 8, 3) and region[2, 2].tolist() == [255, 0, 0]
+    assert "rgb" not in service.latest._cache
+
+
+def test_consumers_use_the_shared_service(monkeypatch):
+    from tools import screen_capture, screenshot_tool
+
+    screen = SyntheticScreen()
+    screen.paint(40, 30, 20, 10)
+    service = ScreenCaptureService(screen)
+    monkeypatch.setattr(screen_capture, "_default_service", service)
+
+    image = screenshot_tool.capture_screen(region=(40, 30, 20, 10))
+    assert image.size == (20, 10) and image.getpixel((0, 0)) == (255, 0, 0)
+    assert screen.captures == 1 and service.latest is not None
+
+    calls = []
+    frame = service.frame()
+    assert frame.cached("probe", calls.append) is None
+    assert service.capture().cached("probe", calls.append) is None
+    assert len(calls) == 1  # the unchanged frame shares the cache
+
+
+def test_template_matching_on_screen_frames(monkeypatch):
+    pytest.importorskip("cv2")
+    from tools import screen_capture
+    from tools.image_recognition_tool import find_template_on_screen
+
+    rng = np.random.default_rng(7)
+    screen = SyntheticScreen()
+    screen.pixels[..., :3] = (rng.random((200, 320, 1)) * 255).astype(np.uint8)
+    template = screen.pixels[50:80, 100:140, :3].copy()
+    service = ScreenCaptureService(screen)
+    monkeypatch.setattr(screen_capture, "_default_service", service)
+
+    assert find_template_on_screen(template, threshold=0.95) == (100, 50)
+    assert find_template_on_screen(template, threshold=0.95, max_age=10) == (100, 50)
+    assert screen.captures == 1
+    assert any(isinstance(key, tuple) and key[0] == "template_context" for key in service.latest._cache)
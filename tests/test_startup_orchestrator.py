@@ -0,0 +1,147 @@
+"""Tests for the staged startup orchestrator."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from performance.startup_optimization import (
+    PHASE_BACKGROUND,
+    PHASE_CRITICAL,
+    PHASE_ON_DEMAND,
+    StartupOrchestrator,
+)
+
+
+class RecordingMonitor:
+    def __init__(self):
+        self.metrics = {}
+
+    def record_metric(self, name, value):
+        self.metrics[name] = value
+
+
+def test_phases_only_build_their_own_components():
+    built = []
+    startup = StartupOrchestrator()
+    startup.register("config", lambda: built.append("config") or {"theme": "dark"}, phase=PHASE_CRITICAL)
+    startup.register("cache", lambda: built.append("cache") or "cache", phase=PHASE_BACKGROUND)
+    startup.register("engine", lambda: built.append("engine") or "engine", phase=PHASE_ON_DEMAND)
+
+    startup.run_phase(PHASE_CRITICAL)
+    assert built == ["config"]
+    startup.run_phase(PHASE_BACKGROUND)
+    assert built == ["config", "cache"]
+    assert not startup.is_ready("engine")
+
+    assert startup.get("engine") == "engine"
+    assert startup.get("engine") == "engine"
+    assert built == ["config", "cache", "engine"]
+    assert [entry.name for entry in startup.timeline] == ["config", "cache", "engine"]
+
+
+def test_independent_async_components_run_concurrently():
+    async def slow(value):
+        await asyncio.sleep(0.2)
+        return value
+
+    startup = StartupOrchestrator()
+    for name in ("a", "b", "c"):
+        startup.register(name, lambda name=name: slow(name))
+
+    start = time.perf_counter()
+    entries = startup.run_phase(PHASE_BACKGROUND)
+    assert time.perf_counter() - start < 0.5  # not 3 x 0.2s
+    assert {entry.name: entry.status for entry in entries} == {"a": "ready", "b": "ready", "c": "ready"}
+    assert [startup.get(name) for name in "abc"] == ["a", "b", "c"]
+
+
+def test_dependencies_are_ready_before_dependents():
+    order = []
+
+    async def database():
+        await asyncio.sleep(0.05)
+        order.append("database")
+        return "db"
+
+    def repository(database):
+        order.append("repository")
+        return f"repo({database})"
+
+    startup = StartupOrchestrator()
+    startup.register("repository", repository, depends_on=("database",), thread_safe=True)
+    startup.register("database", database)
+    startup.register(
+        "decisions", lambda repository: f"decisions({repository})", phase=PHASE_ON_DEMAND, depends_on=("repository",)
+    )
+
+    startup.run_phase(PHASE_BACKGROUND)
+    assert order == ["database", "repository"]
+    assert startup.get("decisions") == "decisions(repo(db))"
+
+
+def test_thread_unsafe_components_stay_on_the_calling_thread():
+    threads = {}
+    startup = StartupOrchestrator()
+    startup.register("widget", lambda: threads.setdefault("widget", threading.current_thread()))
+    startup.register("worker", lambda: threads.setdefault("worker", threading.current_thread()), thread_safe=True)
+    startup.run_phase(PHASE_BACKGROUND)
+    assert threads["widget"] is threading.current_thread()
+    assert threads["worker"] is not threading.current_thread()
+
+
+def test_failures_are_isolated_unless_required():
+    def broken():
+        raise RuntimeError("boom")
+
+    startup = StartupOrchestrator()
+    startup.register("optional", broken)
+    startup.register("fine", lambda: "ok")
+    entries = {entry.name: entry for entry in startup.run_phase(PHASE_BACKGROUND)}
+    assert entries["optional"].status == "failed" and "boom" in entries["optional"].error
+    assert startup.get("optional") is None and startup.get("fine") == "ok"
+
+    startup.register("config", broken, phase=PHASE_CRITICAL, required=True)
+    with pytest.raises(RuntimeError):
+        startup.run_phase(PHASE_CRITICAL)
+
+
+def test_async_initializer_and_cycle_detection():
+    class Cache:
+        ready = False
+
+        async def initialize(self):
+            self.ready = True
+
+    startup = StartupOrchestrator()
+    startup.register("cache", Cache, phase=PHASE_ON_DEMAND, initializer=lambda cache: cache.initialize())
+    assert startup.get("cache").ready
+
+    startup.register("a", lambda b: b, depends_on=("b",))
+    startup.register("b", lambda a: a, depends_on=("a",))
+    with pytest.raises(ValueError):
+        startup.run_phase(PHASE_BACKGROUND)
+
+
+def test_timeline_and_first_window_metric():
+    phases = []
+    startup = StartupOrchestrator()
+    startup.on_phase_complete(lambda phase, entries: phases.append((phase, [e.name for e in entries])))
+    startup.register("config", dict, phase=PHASE_CRITICAL)
+    startup.register("cache", list)
+
+    startup.run_phase(PHASE_CRITICAL)
+    first_window = startup.mark("time_to_first_window")
+    assert startup.mark("time_to_first_window") == first_window  # first mark wins
+    startup.run_phase(PHASE_BACKGROUND)
+
+    assert phases == [(PHASE_CRITICAL, ["config"]), (PHASE_BACKGROUND, ["cache"])]
+    report = startup.timeline_report()
+    assert [row["name"] for row in report] == ["config", "cache"]
+    assert report[0]["end_ms"] <= first_window * 1000 <= report[1]["start_ms"]
+
+    monitor = RecordingMonitor()
+    startup.publish_metrics(monitor)
+    assert monitor.metrics["startup.time_to_first_window"] == first_window
+    assert "startup.background_phase" in monitor.metrics
@@ -0,0 +1,125 @@
+"""Tests for the map-reduce summarization engine."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from tools.summarization_engine import (
+    SummarizationEngine,
+    SummaryCache,
+    chunk_text,
+    estimate_tokens,
+    extractive_summary,
+)
+from tools.summarize_text_tool import summarize_text
+
+
+def _document(sections=12, sentences=20, marker=""):
+    paragraphs = []
+    for s in range(sections):
+        body = " ".join(
+            f"Section {s} sentence {i} talks about topic{s} and widget{i % 3}{marker if s == 5 else ''}."
+            for i in range(sentences)
+        )
+        paragraphs.append(body)
+    return "\n\n".join(paragraphs)
+
+
+class FakeLLM:
+    """Counts calls and tracks the highest concurrency seen."""
+
+    def __init__(self, delay=0.01):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def chat(self, messages, max_tokens=None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        content = messages[0]["content"]
+        return SimpleNamespace(response_text=f"summary of {len(content)} chars")
+
+
+def test_chunks_respect_budget_and_overlap():
+    text = _document()
+    chunks = chunk_text(text, max_tokens=400, overlap_tokens=40)
+    assert len(chunks) > 3
+    assert all(estimate_tokens(chunk) <= 400 for chunk in chunks)
+    # The tail of each chunk is repeated at the start of the next
+    overlap = chunks[1].split("\n\n")[0]
+    assert overlap and chunks[0].endswith(overlap)
+
+
+def test_chunk_boundaries_resync_after_an_edit():
+    before = chunk_text(_document(), max_tokens=400, overlap_tokens=0)
+    after = chunk_text(_document(marker=" (edited)"), max_tokens=400, overlap_tokens=0)
+    changed = set(after) - set(before)
+    assert 0 < len(changed) <= 2
+
+
+def test_extractive_summary_picks_central_sentences():
+    text = (
+        "Python caching speeds up repeated lookups. "
+        "The weather was nice yesterday. "
+        "Caching results of repeated Python lookups avoids recomputation. "
+        "A cache keyed by content hash makes repeated lookups cheap. "
+        "My cat likes boxes."
+    )
+    summary = extractive_summary(text, max_sentences=2)
+    assert "weather" not in summary and "cat" not in summary
+    assert summary.count(".") == 2
+
+
+def test_map_reduce_with_bounded_concurrency_and_branch_cache():
+    llm = FakeLLM()
+    cache = SummaryCache(":memory:")
+    engine = SummarizationEngine(
+        llm, max_chunk_tokens=400, overlap_tokens=0, summary_tokens=50, max_concurrency=3, cache=cache
+    )
+
+    result = engine.summarize(_document())
+    assert result.mode == "abstractive"
+    assert result.chunks > 3 and result.levels >= 2
+    assert result.llm_calls == llm.calls
+    assert 1 < llm.max_active <= 3
+
+    # Editing one section recomputes only its chunk(s) and their ancestors
+    llm.calls = 0
+    edited = engine.summarize(_document(marker=" (edited)"))
+    assert edited.cache_hits >= result.chunks - 2
+    assert llm.calls < result.llm_calls
+
+
+def test_llm_failure_falls_back_to_extractive():
+    class Broken:
+        def chat(self, messages, max_tokens=None):
+            raise RuntimeError("provider down")
+
+    cache = SummaryCache(":memory:")
+    engine = SummarizationEngine(Broken(), cache=cache)
+    result = engine.summarize("First point here. Second point here. Third point here.")
+    assert result.summary == "First point here. Second point here. Third point here."
+    assert result.llm_calls == 0
+    # Nothing is cached for the failed call, so a recovered provider is retried
+    assert cache._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0] == 0
+
+
+def test_summarize_text_tool(monkeypatch):
+    from tools import summarization_engine
+
+    monkeypatch.setattr(
+        summarization_engine, "_default_engine", SummarizationEngine(cache=SummaryCache(":memory:"))
+    )
+    short = summarize_text("One. Two. Three.")
+    assert short == {"status": "success", "summary": "One. Two. Three.", "mode": "extractive", "chunks": 1}
+
+    long_result = summarize_text(_document(), max_sentences=2)
+    assert long_result["status"] == "success"
+    assert long_result["summary"].count(".") <= 2
@@ -0,0 +1,101 @@
+"""
+Tests for the cached multi-scale template matcher.
+"""
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from tools.template_matcher import TemplateMatch, TemplateMatcher, non_max_suppression  # noqa: E402
+
+
+@pytest.fixture
+def scene():
+    """A textured frame with one template pasted twice."""
+    rng = np.random.default_rng(42)
+    frame = cv2.GaussianBlur((rng.random((480, 640)) * 255).astype(np.uint8), (5, 5), 0)
+    template = frame[40:90, 60:140].copy()
+    frame[300:350, 400:480] = template
+    return frame, template
+
+
+def test_finds_all_occurrences(scene):
+    """Both occurrences are returned, best first, without duplicates."""
+    frame, template = scene
+    matches = TemplateMatcher().match(frame, template, threshold=0.9)
+
+    assert sorted((m.x, m.y) for m in matches) == [(60, 40), (400, 300)]
+    assert all(m.score >= 0.9 for m in matches)
+
+
+def test_roi_limits_search(scene):
+    """A region hint restricts matches to that region, in frame coordinates."""
+    frame, template = scene
+    matches = TemplateMatcher().match(frame, template, threshold=0.9, roi=(350, 250, 200, 150))
+
+    assert [(m.x, m.y) for m in matches] == [(400, 300)]
+
+
+def test_templates_are_cached(scene):
+    """A template is prepared once and reused across frames."""
+    frame, template = scene
+    matcher = TemplateMatcher()
+    matcher.match(frame, template)
+    matcher.match(frame.copy(), template)
+
+    stats = matcher.get_stats()
+    assert stats["cached_templates"] == 1
+    assert stats["hits"] == 1
+
+
+def test_match_many_with_process_pool(scene):
+    """Pooled matching returns the same results as in-process matching."""
+    frame, template = scene
+    other = frame[200:240, 500:560].copy()
+    matcher = TemplateMatcher()
+    templates = {"button": template, "icon": other}
+
+    local = matcher.match_many(frame, templates, threshold=0.9)
+    pooled = matcher.match_many(frame, templates, threshold=0.9, processes=2)
+
+    for name in templates:
+        assert sorted((m.x, m.y) for m in pooled[name]) == sorted((m.x, m.y) for m in local[name])
+    assert [(m.x, m.y) for m in local["icon"]] == [(500, 200)]
+
+
+def test_non_max_suppression_keeps_best():
+    """Overlapping boxes collapse to the highest-scoring one."""
+    matches = [
+        TemplateMatch("t", 10, 10, 20, 20, 0.90),
+        TemplateMatch("t", 12, 11, 20, 20, 0.95),
+        TemplateMatch("t", 100, 100, 20, 20, 0.85),
+    ]
+    kept = non_max_suppression(matches)
+
+    assert [(m.x, m.y) for m in kept] == [(12, 11), (100, 100)]
+
+
+def test_returns_every_instance_above_threshold():
+    """Matches are not capped: all 30 instances of an icon are found."""
+    rng = np.random.default_rng(7)
+    icon = cv2.GaussianBlur((rng.random((24, 24)) * 255).astype(np.uint8), (3, 3), 0)
+    frame = np.full((400, 640), 128, np.uint8)
+    positions = [(20 + col * 100, 20 + row * 70) for row in range(5) for col in range(6)]
+    for x, y in positions:
+        frame[y : y + 24, x : x + 24] = icon
+
+    for levels in (0, 1):
+        matches = TemplateMatcher(pyramid_levels=levels).match(frame, icon, threshold=0.9)
+        assert sorted((m.x, m.y) for m in matches) == sorted(positions)
+
+
+def test_array_cache_follows_content(scene):
+    """An array with new content is never served a stale cached template."""
+    frame, template = scene
+    matcher = TemplateMatcher()
+    first = matcher.get_template(template)
+    assert matcher.get_template(template.copy()) is first
+
+    template[:] = 255 - template
+    assert matcher.get_template(template) is not first
@@ -0,0 +1,142 @@
+"""Tests for persistent shell sessions and streaming command output."""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from tools.terminal_sessions import (
+    OutputRingBuffer,
+    TerminalSession,
+    TerminalSessionManager,
+)
+from tools.terminal_tool import execute_command
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="POSIX shells only")
+
+
+@pytest.fixture
+def manager():
+    sessions = TerminalSessionManager(max_concurrent=2)
+    yield sessions
+    sessions.close_all()
+
+
+def test_ring_buffer_keeps_the_tail():
+    buffer = OutputRingBuffer(max_chars=10)
+    for part in ("abcdef", "ghij", "klmno"):
+        buffer.append(part)
+    assert buffer.getvalue() == "fghijklmno"
+    assert buffer.truncated and buffer.dropped == 5
+
+
+def test_session_reuses_one_shell_and_splits_streams():
+    session = TerminalSession()
+    try:
+        first = session.run("echo out; echo err >&2; exit 3", isolated=True)
+        assert (first.stdout, first.stderr, first.return_code) == ("out\n", "err\n", 3)
+        second = session.run("echo $$")
+        assert second.success and second.stdout.strip() == str(session.pid)
+    finally:
+        session.close()
+    assert not session.alive
+
+
+def test_named_sessions_keep_state(manager, tmp_path):
+    manager.run(f"cd {tmp_path} && export GREETING=hello", session_id="work")
+    result = manager.run("pwd; echo $GREETING", session_id="work")
+    assert result.stdout.split() == [str(tmp_path.resolve()), "hello"]
+    # Anonymous commands are isolated from that state
+    assert manager.run("echo ${GREETING:-unset}").stdout == "unset\n"
+
+
+def test_timeout_kills_the_process_group(manager, tmp_path):
+    marker = tmp_path / "child-survived"
+    start = time.monotonic()
+    result = manager.run(f"(sleep 2; touch {marker}) & sleep 30", timeout=0.3)
+    assert not result.success and "timed out" in result.error
+    assert time.monotonic() - start < 5
+    time.sleep(2.5)
+    assert not marker.exists()
+    assert manager.run("echo ok").stdout == "ok\n"
+
+
+def test_timeout_keeps_named_session_state(manager, tmp_path):
+    manager.run(f"cd {tmp_path} && export GREETING=hello", session_id="work")
+    shell = manager.session("work").pid
+    result = manager.run("sleep 30", session_id="work", timeout=0.3)
+    assert not result.success and "timed out" in result.error
+
+    after = manager.run("pwd; echo $GREETING", session_id="work")
+    assert after.stdout.split() == [str(tmp_path.resolve()), "hello"]
+    assert manager.session("work").pid == shell
+
+
+def test_stream_sync_and_async(manager):
+    stream = manager.stream("for i in 1 2 3; do echo $i; done; echo done >&2")
+    chunks = list(stream)
+    assert "".join(c.text for c in chunks if c.stream == "stdout") == "1\n2\n3\n"
+    assert stream.result.success
+
+    async def collect():
+        return [chunk.text async for chunk in manager.stream("echo async")]
+
+    assert "".join(asyncio.run(collect())) == "async\n"
+
+
+def test_concurrency_limit(manager):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def track(stream, text):
+        nonlocal running, peak
+        with lock:
+            running += 1 if text.startswith("start") else -1
+            peak = max(peak, running)
+
+    futures = [
+        manager.submit("echo start; sleep 0.2; echo stop", on_output=track) for _ in range(5)
+    ]
+    assert all(f.result(timeout=10).success for f in futures)
+    assert peak == 2
+
+
+def test_execute_command_streams_and_bounds_output():
+    seen = []
+    result = execute_command(
+        "echo first; sleep 0.1; echo second", on_output=lambda s, t: seen.append(t)
+    )
+    assert result.success and result.stdout == "first\nsecond\n"
+    assert "".join(seen) == result.stdout
+
+    timed_out = execute_command("sleep 10", timeout=0.2)
+    assert not timed_out.success and "timed out" in timed_out.error
+    assert timed_out.execution_time < 5
+
+
+def test_execute_command_reuses_pooled_shells(tmp_path):
+    first = execute_command("cd / && export LEAKED=1")
+    second = execute_command('echo "[$LEAKED]"; pwd', working_dir=str(tmp_path))
+    assert first.success and second.success
+    assert first.process_id == second.process_id
+    assert second.stdout == f"[]\n{tmp_path.resolve()}\n"
+
+
+def test_captured_output_is_plain_and_complete(manager, tmp_path):
+    git = "git -c user.name=atlas -c user.email=atlas@example.com -c color.ui=auto"
+    setup = f"{git} init -q && for i in $(seq 60); do {git} commit -q --allow-empty -m \"commit $i\"; done"
+    assert execute_command(setup, working_dir=str(tmp_path), timeout=60).success
+
+    tty = execute_command('python3 -c "import sys; print(sys.stdout.isatty())"')
+    assert tty.stdout == "False\n"
+    log = execute_command(f"{git} log --oneline", working_dir=str(tmp_path))
+    assert log.success and len(log.stdout.splitlines()) == 60
+    assert "\x1b" not in log.stdout and "\r" not in log.stdout
+
+    # Named sessions see a terminal but still get unpaged, uncoloured output
+    named = manager.run(f"{git} log --oneline", session_id="tty", working_dir=str(tmp_path))
+    assert named.success and len(named.stdout.splitlines()) == 60
+    assert "\x1b" not in named.stdout and "\r" not in named.stdout
@@ -0,0 +1,115 @@
+"""Tests for the translation memory and batched translation."""
+
+import json
+import re
+from types import SimpleNamespace
+
+from tools.translation_memory import (
+    TranslationEngine,
+    TranslationMemory,
+    detect_language_fast,
+    segment_text,
+)
+from tools.translation_tool import TranslationTool
+
+
+class FakeTranslator:
+    """Upper-cases text; answers batch prompts with a JSON array."""
+
+    def __init__(self, broken_batches=False):
+        self.prompts = []
+        self.broken_batches = broken_batches
+
+    def chat(self, messages):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        if "JSON array" in prompt:
+            if self.broken_batches:
+                return SimpleNamespace(response_text="sorry, no JSON today")
+            segments = json.loads(prompt[prompt.index("{") :])
+            return SimpleNamespace(response_text=json.dumps([s.upper() for s in segments.values()]))
+        text = re.search(r"Text to translate: (.*)\n\nProvide", prompt, re.DOTALL).group(1)
+        return SimpleNamespace(response_text=text.upper())
+
+
+def test_segments_round_trip():
+    text = "Привіт! Як справи?\n\n  Відкрий файл.  12345\n"
+    pieces = segment_text(text)
+    assert "".join(segment + separator for segment, separator in pieces) == text
+    assert [segment.strip() for segment, _ in pieces] == ["Привіт!", "Як справи?", "Відкрий файл.", "12345"]
+
+
+def test_fast_language_id():
+    assert detect_language_fast("Відкрий, будь ласка, браузер")[0] == "uk"
+    assert detect_language_fast("Открой, пожалуйста, браузер")[0] == "ru"
+    assert detect_language_fast("Open the browser please") == ("en", 1.0)
+    assert detect_language_fast("12345") is None
+
+
+def test_only_new_sentences_reach_the_llm_in_one_batch():
+    llm = FakeTranslator()
+    engine = TranslationEngine(llm, TranslationMemory(":memory:"))
+
+    first = engine.translate("Привіт! Як справи? Відкрий файл.", "uk", "en")
+    assert first == "ПРИВІТ! ЯК СПРАВИ? ВІДКРИЙ ФАЙЛ."
+    assert engine.last_stats.llm_calls == 1 and engine.last_stats.translated == 3
+
+    second = engine.translate("Привіт! Закрий файл.", "uk", "en")
+    assert second == "ПРИВІТ! ЗАКРИЙ ФАЙЛ."
+    assert engine.last_stats.memory_hits == 1 and engine.last_stats.translated == 1
+    assert len(llm.prompts) == 2
+
+    engine.translate("Привіт! Закрий файл.", "uk", "en")
+    assert len(llm.prompts) == 2
+
+
+def test_translate_many_batches_across_texts():
+    llm = FakeTranslator()
+    engine = TranslationEngine(llm, TranslationMemory(":memory:"), max_batch_segments=3)
+    strings = [f"Кнопка {i}." for i in range(7)] + ["Кнопка 0."]
+    result = engine.translate_many(strings, "uk", "en")
+    assert result[0] == result[-1] == "КНОПКА 0."
+    assert engine.last_stats.segments == 7
+    assert len(llm.prompts) == 3  # 3 + 3 + 1 segments
+
+
+def test_unparseable_batch_falls_back_to_single_segments():
+    llm = FakeTranslator(broken_batches=True)
+    engine = TranslationEngine(llm, TranslationMemory(":memory:"))
+    assert engine.translate("Один. Два.", "uk", "en") == "ОДИН. ДВА."
+    assert engine.last_stats.llm_calls == 3
+
+
+def test_implausible_batch_items_are_not_stored():
+    class SloppyTranslator(FakeTranslator):
+        def chat(self, messages):
+            if "JSON array" in messages[0]["content"]:
+                self.prompts.append(messages[0]["content"])
+                return SimpleNamespace(response_text=json.dumps([None, "ДВА.", "ТРИ. " * 100]))
+            return super().chat(messages)
+
+    memory = TranslationMemory(":memory:")
+    engine = TranslationEngine(SloppyTranslator(), memory)
+    assert engine.translate("Один. Два. Три.", "uk", "en") == "ОДИН. ДВА. ТРИ."
+    assert engine.last_stats.llm_calls == 3
+    assert memory.get("Один.", "uk", "en") == "ОДИН." and memory.get("Три.", "uk", "en") == "ТРИ."
+
+
+def test_memory_persists_between_instances(tmp_path):
+    path = str(tmp_path / "tm.sqlite3")
+    TranslationEngine(FakeTranslator(), TranslationMemory(path)).translate("Дякую.", "uk", "en")
+
+    reopened = TranslationMemory(path)
+    assert reopened.get("Дякую.", "uk", "en") == "ДЯКУЮ."
+    assert reopened.get("Дякую.", "uk", "ru") is None
+
+
+def test_translation_tool_uses_memory_and_memoized_detection():
+    llm = FakeTranslator()
+    tool = TranslationTool(llm, memory=TranslationMemory(":memory:"))
+    result = tool.translate_to_english("Привіт, як справи?")
+    assert result.source_language == "uk" and result.text == "ПРИВІТ, ЯК СПРАВИ?"
+    assert tool.translate_to_english("Привіт, як справи?").text == result.text
+    assert len(llm.prompts) == 1
+    assert tool.should_translate_message("Привіт") and not tool.should_translate_message("Hello")
+    assert tool.translate_from_english("Hello", "en").text == "Hello"
@@ -20,6 +20,7 @@ __all__ = [
     "BaseTool",
     "ClipboardResult",
     "clear_clipboard",
+    "get_clipboard_history",
     "get_clipboard_image",
     "get_clipboard_text",
     "set_clipboard_image",
@@ -38,6 +39,7 @@ from .browser import BrowserTool
 from .clipboard_tool import (
     ClipboardResult,
     clear_clipboard,
+    get_clipboard_history,
     get_clipboard_image,
     get_clipboard_text,
     set_clipboard_image,
@@ -51,7 +53,12 @@ from .email.automation import EmailAutomation
 from .email.filtering import EmailFilter
 from .email.signature import EmailSignatureManager
 from .email.templates import EmailTemplateManager
-from .image_recognition_tool import find_object_in_image, find_template_in_image
+from .image_recognition_tool import (
+    find_object_in_image,
+    find_template_in_image,
+    find_template_on_screen,
+    find_templates_in_image,
+)
 from .macro_suggestion_tool import macro_suggestion
 from .mouse_keyboard_tool import (
     MouseButton,
@@ -61,7 +68,7 @@ from .mouse_keyboard_tool import (
     press_key,
     type_text,
 )
-from .ocr_tool import ocr_file, ocr_image
+from .ocr_tool import ocr_file, ocr_image, ocr_many, ocr_region, ocr_screen
 from .pdf_extraction_tool import extract_pdf_text
 from .playful_tool import PlayfulTool
 from .proactive_tool import ProactiveTool
@@ -191,8 +198,13 @@ __all__ = [
     # OCR
     "ocr_image",
     "ocr_file",
+    "ocr_many",
+    "ocr_region",
+    "ocr_screen",
     # Image recognition
     "find_template_in_image",
+    "find_template_on_screen",
+    "find_templates_in_image",
     "find_object_in_image",
     # Mouse & Keyboard
     "MouseButton",
@@ -0,0 +1,470 @@
+"""Shared clipboard watcher for Atlas.
+
+A single background watcher follows the clipboard. Any number of waiters and
+subscribers share it, so they no longer each run their own polling loop.
+The watcher picks the cheapest change signal the backend offers:
+
+1. Notifications. With the Qt backend, ``QClipboard.dataChanged`` fires when
+   the selection owner changes (XFixes on X11). The watcher sleeps until
+   then. The signal is delivered on the GUI thread, so a waiter on that
+   thread polls the clipboard itself instead of waiting for it.
+2. A change counter. On macOS, ``NSPasteboard.changeCount()`` is an integer
+   read. The clipboard contents are only fetched when the counter moves.
+3. Hash polling. pyperclip may spawn a subprocess per read. The watcher keeps
+   a short digest of the last contents instead of the contents themselves,
+   and the poll interval backs off from ``min_interval`` to ``max_interval``
+   while nothing changes. A new waiter resets it to ``min_interval``.
+
+Recent changes are kept in a bounded history ring.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Hashable, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "AppKitClipboardBackend",
+    "ClipboardBackend",
+    "ClipboardChange",
+    "ClipboardMonitor",
+    "FakeClipboardBackend",
+    "PyperclipClipboardBackend",
+    "QtClipboardBackend",
+    "content_hash",
+    "detect_backend",
+    "get_clipboard_monitor",
+]
+
+
+def content_hash(text: Optional[str]) -> str:
+    """Short digest used to compare clipboard contents."""
+    return hashlib.blake2b((text or "").encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+@dataclass
+class ClipboardChange:
+    """One observed clipboard change."""
+
+    text: str
+    content_hash: str
+    timestamp: float
+    sequence: int
+
+
+class ClipboardBackend:
+    """Access to the system clipboard.
+
+    Subclasses implement ``read_text`` and may provide a cheaper change
+    signal: either ``change_token`` or, with ``supports_notifications``,
+    a blocking ``wait_for_change`` that ``interrupt`` cuts short.
+    """
+
+    name = "base"
+    supports_notifications = False
+
+    def read_text(self) -> str:
+        raise NotImplementedError
+
+    def change_token(self) -> Optional[Hashable]:
+        """Return a value that changes whenever the clipboard does, or None."""
+        return None
+
+    def wait_for_change(self, timeout: float) -> bool:
+        """Block until the clipboard changes; returns False on timeout or interrupt."""
+        raise NotImplementedError
+
+    def interrupt(self) -> None:
+        """Wake every thread blocked in ``wait_for_change``."""
+
+    def notifies_current_thread(self) -> bool:
+        """Whether notifications still arrive while the calling thread is blocked."""
+        return True
+
+
+class _ChangeSignal:
+    """Change counter that threads can wait on until it moves or they are interrupted."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.count = 0
+        self._interrupts = 0
+
+    def changed(self) -> None:
+        """Count a change; the caller holds ``condition``."""
+        self.count += 1
+        self.condition.notify_all()
+
+    def interrupt(self) -> None:
+        with self.condition:
+            self._interrupts += 1
+            self.condition.notify_all()
+
+    def wait(self, timeout: float) -> bool:
+        with self.condition:
+            count, interrupts = self.count, self._interrupts
+            self.condition.wait_for(lambda: self.count != count or self._interrupts != interrupts, timeout)
+            return self.count != count
+
+
+class AppKitClipboardBackend(ClipboardBackend):
+    """macOS pasteboard; ``changeCount`` makes change checks nearly free."""
+
+    name = "appkit"
+
+    def __init__(self):
+        from AppKit import NSPasteboard  # type: ignore
+
+        self._pasteboard = NSPasteboard.generalPasteboard()
+
+    def read_text(self) -> str:
+        from AppKit import NSStringPboardType  # type: ignore
+
+        return self._pasteboard.stringForType_(NSStringPboardType) or ""
+
+    def change_token(self) -> Optional[Hashable]:
+        return int(self._pasteboard.changeCount())
+
+
+class PyperclipClipboardBackend(ClipboardBackend):
+    """Portable fallback; every read may spawn a helper process."""
+
+    name = "pyperclip"
+
+    def __init__(self):
+        import pyperclip  # type: ignore
+
+        self._pyperclip = pyperclip
+
+    def read_text(self) -> str:
+        return self._pyperclip.paste() or ""
+
+
+class QtClipboardBackend(ClipboardBackend):
+    """Qt clipboard driven by ``dataChanged`` notifications.
+
+    Must be created on the GUI thread. The contents are captured there when
+    the signal fires, so the watcher thread never calls into Qt. On the GUI
+    thread itself the clipboard is read directly, since the signal cannot
+    fire while that thread is busy.
+    """
+
+    name = "qt"
+    supports_notifications = True
+
+    def __init__(self, clipboard=None):
+        if clipboard is None:
+            from PySide6.QtGui import QGuiApplication
+
+            clipboard = QGuiApplication.clipboard()
+        self._clipboard = clipboard
+        self._gui_thread = threading.current_thread()
+        self._signal = _ChangeSignal()
+        self._text = clipboard.text() or ""
+        clipboard.dataChanged.connect(self._on_changed)
+
+    def _on_changed(self) -> None:
+        text = self._clipboard.text() or ""
+        with self._signal.condition:
+            self._text = text
+            self._signal.changed()
+
+    def read_text(self) -> str:
+        if threading.current_thread() is self._gui_thread:
+            return self._clipboard.text() or ""
+        with self._signal.condition:
+            return self._text
+
+    def change_token(self) -> Optional[Hashable]:
+        if threading.current_thread() is self._gui_thread:
+            return None
+        with self._signal.condition:
+            return self._signal.count
+
+    def wait_for_change(self, timeout: float) -> bool:
+        return self._signal.wait(timeout)
+
+    def interrupt(self) -> None:
+        self._signal.interrupt()
+
+    def notifies_current_thread(self) -> bool:
+        return threading.current_thread() is not self._gui_thread
+
+
+class FakeClipboardBackend(ClipboardBackend):
+    """In-memory clipboard for tests and headless runs.
+
+    Args:
+        text: Initial contents.
+        change_counter: Expose a change counter, like macOS.
+        notifications: Deliver change notifications, like Qt.
+    """
+
+    name = "fake"
+
+    def __init__(self, text: str = "", change_counter: bool = False, notifications: bool = False):
+        self._text = text
+        self._change_counter = change_counter
+        self.supports_notifications = notifications
+        self._signal = _ChangeSignal()
+        self.reads = 0
+
+    def set_text(self, text: str) -> None:
+        with self._signal.condition:
+            self._text = text
+            self._signal.changed()
+
+    def read_text(self) -> str:
+        with self._signal.condition:
+            self.reads += 1
+            return self._text
+
+    def change_token(self) -> Optional[Hashable]:
+        if not self._change_counter:
+            return None
+        with self._signal.condition:
+            return self._signal.count
+
+    def wait_for_change(self, timeout: float) -> bool:
+        return self._signal.wait(timeout)
+
+    def interrupt(self) -> None:
+        self._signal.interrupt()
+
+
+def detect_backend() -> Optional[ClipboardBackend]:
+    """Pick the cheapest clipboard backend available in this process."""
+    try:
+        from PySide6.QtCore import QThread
+        from PySide6.QtGui import QGuiApplication
+
+        app = QGuiApplication.instance()
+        if app is not None and QThread.currentThread() == app.thread():
+            return QtClipboardBackend()
+    except Exception:
+        pass
+    for backend_class in (AppKitClipboardBackend, PyperclipClipboardBackend):
+        try:
+            return backend_class()
+        except Exception:
+            continue
+    return None
+
+
+ChangeCallback = Callable[[ClipboardChange], None]
+
+
+class ClipboardMonitor:
+    """One watcher thread shared by every clipboard subscriber and waiter.
+
+    The thread runs only while something is listening. It starts with the
+    first subscriber or waiter and exits after the last one leaves.
+
+    Args:
+        backend: Clipboard backend; detected automatically when None.
+        history_size: Number of recent changes kept.
+        min_interval: Fastest poll interval in seconds.
+        max_interval: Slowest poll interval reached while idle.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[ClipboardBackend] = None,
+        history_size: int = 50,
+        min_interval: float = 0.05,
+        max_interval: float = 1.0,
+        backoff: float = 1.5,
+    ):
+        self.backend = backend if backend is not None else detect_backend()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._history: Deque[ClipboardChange] = deque(maxlen=history_size)
+        self._subscribers: List[ChangeCallback] = []
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._listeners = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._last_token: Optional[Hashable] = None
+        self._last_hash: Optional[str] = None
+        self.interval = min_interval
+        self.polls = 0
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def history(self, limit: Optional[int] = None) -> List[ClipboardChange]:
+        """Recent changes, newest last."""
+        with self._condition:
+            items = list(self._history)
+        return items[-limit:] if limit else items
+
+    # -- listener bookkeeping --------------------------------------------
+    def _acquire(self) -> None:
+        with self._condition:
+            self._listeners += 1
+            if self.running:
+                self.interval = self.min_interval
+                self._wake.set()
+                return
+            self._snapshot()
+            # Each thread gets its own stop event so a quick restart cannot
+            # revive a thread that is still shutting down
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stop,), name="clipboard-monitor", daemon=True
+            )
+            self._thread.start()
+
+    def _release(self) -> None:
+        with self._condition:
+            self._listeners = max(0, self._listeners - 1)
+            if self._listeners:
+                return
+            thread, self._thread = self._thread, None
+            self._stop.set()
+            self._wake.set()
+        self.backend.interrupt()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.max_interval + 1.0)
+
+    def subscribe(self, callback: ChangeCallback) -> Callable[[], None]:
+        """Call ``callback`` on every change; returns an unsubscribe function."""
+        if not self.available:
+            raise RuntimeError("No clipboard backend available")
+        with self._condition:
+            self._subscribers.append(callback)
+        self._acquire()
+
+        def unsubscribe() -> None:
+            with self._condition:
+                if callback not in self._subscribers:
+                    return
+                self._subscribers.remove(callback)
+            self._release()
+
+        return unsubscribe
+
+    def wait_for_change(self, timeout: float = 5.0) -> Optional[ClipboardChange]:
+        """Block until the clipboard changes; returns None on timeout."""
+        if not self.available:
+            raise RuntimeError("No clipboard backend available")
+        if self.backend.supports_notifications and not self.backend.notifies_current_thread():
+            return self._poll_for_change(timeout)
+        self._acquire()
+        try:
+            with self._condition:
+                start = self._sequence
+                if not self._condition.wait_for(lambda: self._sequence != start, timeout):
+                    return None
+                return self._history[-1]
+        finally:
+            self._release()
+
+    def _poll_for_change(self, timeout: float) -> Optional[ClipboardChange]:
+        """Wait by polling on the calling thread, which would otherwise block the notifications."""
+        deadline = time.monotonic() + timeout
+        baseline = content_hash(self.backend.read_text())
+        interval = self.min_interval
+        while True:
+            text = self.backend.read_text()
+            digest = content_hash(text)
+            if digest != baseline:
+                self._last_hash = digest
+                return self._publish(text, digest)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(interval, remaining))
+            interval = min(self.max_interval, interval * self.backoff)
+
+    def stop(self) -> None:
+        """Stop the watcher regardless of remaining listeners."""
+        with self._condition:
+            self._listeners = 0
+            self._subscribers.clear()
+        self._release()
+
+    # -- watching ----------------------------------------------------------
+    def _snapshot(self) -> None:
+        """Record the current state as the baseline for change detection."""
+        try:
+            self._last_token = self.backend.change_token()
+            self._last_hash = content_hash(self.backend.read_text())
+        except Exception as e:
+            logger.debug("Clipboard baseline read failed: %s", e)
+
+    def _check(self) -> None:
+        self.polls += 1
+        token = self.backend.change_token()
+        if token is not None:
+            if token == self._last_token:
+                return
+            self._last_token = token
+        text = self.backend.read_text()
+        digest = content_hash(text)
+        if digest == self._last_hash:
+            return
+        self._last_hash = digest
+        self._publish(text, digest)
+
+    def _publish(self, text: str, digest: str) -> ClipboardChange:
+        with self._condition:
+            self._sequence += 1
+            change = ClipboardChange(text, digest, time.time(), self._sequence)
+            self._history.append(change)
+            subscribers = list(self._subscribers)
+            self._condition.notify_all()
+        self.interval = self.min_interval
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error("Clipboard subscriber failed: %s", e)
+        return change
+
+    def _run(self, stop: threading.Event) -> None:
+        notifications = self.backend.supports_notifications
+        while not stop.is_set():
+            try:
+                if notifications:
+                    if self.backend.wait_for_change(self.max_interval):
+                        self._check()
+                    continue
+                sequence = self._sequence
+                self._check()
+                if self._sequence == sequence:
+                    self.interval = min(self.max_interval, self.interval * self.backoff)
+            except Exception as e:
+                logger.warning("Clipboard check failed: %s", e)
+                self.interval = self.max_interval
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_default_monitor: Optional[ClipboardMonitor] = None
+_default_monitor_lock = threading.Lock()
+
+
+def get_clipboard_monitor() -> ClipboardMonitor:
+    """Return the process-wide clipboard monitor."""
+    global _default_monitor
+    with _default_monitor_lock:
+        if _default_monitor is None:
+            _default_monitor = ClipboardMonitor()
+        return _default_monitor
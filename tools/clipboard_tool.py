@@ -32,10 +32,12 @@ logger = get_logger(__name__)
 __all__ = [
     "ClipboardResult",
     "clear_clipboard",
+    "get_clipboard_history",
     "get_clipboard_image",
     "get_clipboard_text",
     "set_clipboard_image",
     "set_clipboard_text",
+    "wait_for_clipboard_change",
 ]
 
 
@@ -299,46 +301,78 @@ def clear_clipboard() -> ClipboardResult:
 def wait_for_clipboard_change(timeout: float = 5.0) -> ClipboardResult:
     """Wait for clipboard content to change.
 
+    Waiters share the process-wide clipboard monitor instead of polling the
+    clipboard themselves.
+
     Args:
         timeout: Maximum time to wait in seconds
 
     Returns:
         ClipboardResult with new clipboard content or error
     """
+    from tools.clipboard_monitor import get_clipboard_monitor
+
     start_time = time.time()
-    initial_content = get_clipboard_text()
+    monitor = get_clipboard_monitor()
 
-    if not initial_content.success:
+    if not monitor.available:
+        return ClipboardResult(
+            success=False,
+            action="wait_for_change",
+            error="No clipboard access available (missing pyperclip and AppKit)",
+            execution_time=time.time() - start_time,
+        )
+
+    try:
+        change = monitor.wait_for_change(timeout)
+    except Exception as e:
+        return ClipboardResult(
+            success=False,
+            action="wait_for_change",
+            error=f"Failed to watch clipboard: {e!s}",
+            execution_time=time.time() - start_time,
+        )
+
+    if change is None:
         return ClipboardResult(
             success=False,
             action="wait_for_change",
             content=None,
             content_type=None,
-            error=initial_content.error,
+            error="Timeout waiting for clipboard change",
             execution_time=time.time() - start_time,
         )
 
-    while time.time() - start_time < timeout:
-        current_content = get_clipboard_text()
-        if (
-            current_content.success
-            and current_content.content != initial_content.content
-        ):
-            return ClipboardResult(
-                success=True,
-                action="wait_for_change",
-                content=current_content.content,
-                content_type="text",
-                error=None,
-                execution_time=time.time() - start_time,
-            )
-        time.sleep(0.1)
-
     return ClipboardResult(
-        success=False,
+        success=True,
         action="wait_for_change",
-        content=None,
-        content_type=None,
-        error="Timeout waiting for clipboard change",
-        execution_time=timeout,
+        content=change.text,
+        content_type="text",
+        error=None,
+        execution_time=time.time() - start_time,
+    )
+
+
+def get_clipboard_history(limit: Optional[int] = None) -> ClipboardResult:
+    """Get recent clipboard changes seen by the clipboard monitor.
+
+    Args:
+        limit: Maximum number of entries to return (newest last)
+
+    Returns:
+        ClipboardResult whose content is a list of change dicts
+    """
+    from tools.clipboard_monitor import get_clipboard_monitor
+
+    start_time = time.time()
+    history = get_clipboard_monitor().history(limit)
+    return ClipboardResult(
+        success=True,
+        action="get_history",
+        content=[
+            {"text": c.text, "timestamp": c.timestamp, "sequence": c.sequence}
+            for c in history
+        ],
+        content_type="history",
+        execution_time=time.time() - start_time,
     )
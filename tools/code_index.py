@@ -0,0 +1,807 @@
+"""
+Incremental code index storage for the Atlas code reader.
+
+Provides a persistent SQLite store of per-file analyses, an in-memory symbol
+name index (sorted name array plus trigram postings) for substring and fuzzy
+lookups, a persistent trigram full-text index over the project's text files,
+an incremental indexer that re-parses only changed files across a process
+pool, and an optional file-system watcher.
+"""
+
+import bisect
+import fnmatch
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+
+logger = logging.getLogger(__name__)
+
+# Below this many changed files parsing runs in-process
+PARALLEL_PARSE_THRESHOLD = 16
+
+# Per-project index databases live here, outside the analysed project
+PROJECT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".atlas", "cache", "projects")
+
+
+def project_cache_path(root: str, name: str) -> str:
+    """Return the path of the ``name`` database for the project at ``root``.
+
+    Each project gets its own directory under ``PROJECT_CACHE_DIR``, keyed by a
+    hash of its absolute path, so caches never end up in the project tree.
+    """
+    root = os.path.abspath(root)
+    digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+    directory = os.path.join(PROJECT_CACHE_DIR, f"{os.path.basename(root) or 'root'}-{digest}")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{name}.sqlite3")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of 3-character substrings of ``text``."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def content_hash(data: bytes) -> str:
+    """Return the content hash used to detect changed files."""
+    return hashlib.md5(data).hexdigest()
+
+
+class TrigramIndex:
+    """Index of names supporting prefix, substring and fuzzy lookups.
+
+    Names are reference counted so the same name can be added by several files.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._sorted: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, name: str) -> None:
+        """Add a (lowercase) name."""
+        count = self._counts.get(name, 0)
+        self._counts[name] = count + 1
+        if count == 0:
+            for gram in trigrams(name):
+                self._postings[gram].add(name)
+            self._sorted = None
+
+    def discard(self, name: str) -> None:
+        """Remove one reference to a name."""
+        count = self._counts.get(name, 0)
+        if count > 1:
+            self._counts[name] = count - 1
+            return
+        if count == 1:
+            del self._counts[name]
+            for gram in trigrams(name):
+                names = self._postings.get(gram)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del self._postings[gram]
+            self._sorted = None
+
+    def sorted_names(self) -> List[str]:
+        """Return all names in sorted order."""
+        if self._sorted is None:
+            self._sorted = sorted(self._counts)
+        return self._sorted
+
+    def prefix(self, query: str) -> List[str]:
+        """Return names starting with ``query`` using binary search."""
+        names = self.sorted_names()
+        start = bisect.bisect_left(names, query)
+        end = bisect.bisect_left(names, query + "\uffff")
+        return names[start:end]
+
+    def search(self, query: str) -> List[str]:
+        """Return names containing ``query`` as a substring."""
+        if not query:
+            return list(self.sorted_names())
+        if len(query) < 3:
+            return [name for name in self.sorted_names() if query in name]
+
+        grams = sorted(trigrams(query), key=lambda g: len(self._postings.get(g, ())))
+        candidates: Optional[Set[str]] = None
+        for gram in grams:
+            names = self._postings.get(gram)
+            if not names:
+                return []
+            candidates = set(names) if candidates is None else candidates & names
+            if not candidates:
+                return []
+        return [name for name in candidates if query in name]
+
+    def fuzzy(self, query: str, limit: int = 20, min_score: float = 0.3) -> List[Tuple[str, float]]:
+        """
+        Return names sharing the most trigrams with ``query``.
+
+        Args:
+            query: Lowercase query
+            limit: Maximum number of results
+            min_score: Minimum Dice similarity of trigram sets
+
+        Returns:
+            List[Tuple[str, float]]: (name, score) pairs, best first
+        """
+        query_grams = trigrams(f"  {query} ")
+        if not query_grams:
+            return []
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for name in self._postings.get(gram, ()):
+                shared[name] += 1
+        # Padded trigrams for names are computed on the fly for the candidates only
+        scored = []
+        for name, _ in sorted(shared.items(), key=lambda item: item[1], reverse=True)[: limit * 20]:
+            name_grams = trigrams(f"  {name} ")
+            score = 2 * len(query_grams & name_grams) / (len(query_grams) + len(name_grams))
+            if score >= min_score:
+                scored.append((name, score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+
+class CodeIndexStore:
+    """SQLite persistence for per-file analyses.
+
+    Each file is one row holding its metadata and a compact JSON encoding of its
+    elements, so loading the index is a single table scan.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    hash TEXT,
+                    size INTEGER,
+                    last_modified REAL,
+                    data TEXT
+                )
+                """
+            )
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Return every stored file analysis as a dict."""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM files").fetchall()
+        analyses = []
+        for (data,) in rows:
+            try:
+                analyses.append(json.loads(data))
+            except ValueError:
+                continue
+        return analyses
+
+    def save(self, analyses: Iterable[Dict[str, Any]], removed: Iterable[str] = ()) -> None:
+        """Upsert analyses and delete removed paths in one transaction."""
+        rows = [
+            (
+                analysis["path"],
+                analysis["hash"],
+                analysis["size"],
+                analysis["last_modified"],
+                json.dumps(analysis, separators=(",", ":")),
+            )
+            for analysis in analyses
+        ]
+        with self._lock, self._conn:
+            if rows:
+                self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+
+    def clear(self) -> None:
+        """Delete all stored analyses."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class IncrementalIndexer:
+    """Finds changed files by mtime/size/hash and analyzes them in parallel.
+
+    ``analyze`` is a picklable callable ``(root, relative_path, known_hash)`` that
+    returns ``("analysis", dict)``, ``("unchanged", (path, mtime, size))`` or
+    ``("skipped", path)``.
+    """
+
+    def __init__(
+        self,
+        root_path: Path,
+        analyze: Callable[[str, str, Optional[str]], Tuple[str, Any]],
+        excluded_dirs: Iterable[str] = (),
+        extensions: Iterable[str] = (".py",),
+        max_workers: Optional[int] = None,
+    ):
+        self.root_path = Path(root_path)
+        self.analyze = analyze
+        self.excluded_dirs = set(excluded_dirs)
+        self.extensions = tuple(extensions)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def is_excluded(self, relative_path: str) -> bool:
+        """Whether a relative path lies in an excluded or hidden directory."""
+        parts = Path(relative_path).parts[:-1]
+        return any(part in self.excluded_dirs or part.startswith(".") for part in parts)
+
+    def scan(self) -> Dict[str, Tuple[float, int]]:
+        """Return ``{relative_path: (mtime, size)}`` for every indexable file."""
+        found: Dict[str, Tuple[float, int]] = {}
+        root = str(self.root_path)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in self.excluded_dirs and not d.startswith(".")]
+            for filename in filenames:
+                if not filename.endswith(self.extensions):
+                    continue
+                full_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(full_path)
+                except OSError:
+                    continue
+                found[os.path.relpath(full_path, root)] = (stat.st_mtime, stat.st_size)
+        return found
+
+    def plan(
+        self, known: Dict[str, Tuple[float, int, str]], paths: Optional[Iterable[str]] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Work out which files need analysis.
+
+        Args:
+            known: ``{relative_path: (mtime, size, hash)}`` of indexed files
+            paths: Optional relative paths to check instead of scanning the tree
+
+        Returns:
+            Tuple[List[str], List[str]]: Changed (or new) paths and removed paths
+        """
+        if paths is None:
+            current = self.scan()
+            removed = [path for path in known if path not in current]
+        else:
+            current = {}
+            removed = []
+            for path in paths:
+                if self.is_excluded(path) or not path.endswith(self.extensions):
+                    continue
+                try:
+                    stat = os.stat(self.root_path / path)
+                except OSError:
+                    if path in known:
+                        removed.append(path)
+                    continue
+                current[path] = (stat.st_mtime, stat.st_size)
+
+        changed = [
+            path
+            for path, (mtime, size) in current.items()
+            if path not in known or known[path][0] != mtime or known[path][1] != size
+        ]
+        return sorted(changed), removed
+
+    def run(self, changed: List[str], known_hashes: Dict[str, str]) -> List[Tuple[str, Any]]:
+        """Analyze changed files, in a process pool when there are many."""
+        jobs = [(str(self.root_path), path, known_hashes.get(path)) for path in changed]
+        if len(jobs) < PARALLEL_PARSE_THRESHOLD or self.max_workers <= 1:
+            return [self.analyze(*job) for job in jobs]
+
+        chunksize = max(1, len(jobs) // (self.max_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(_call_analyze, [(self.analyze, job) for job in jobs], chunksize=chunksize))
+
+
+def _call_analyze(item):
+    analyze, job = item
+    return analyze(*job)
+
+
+# Text files larger than this are not indexed for full-text search
+MAX_TEXT_FILE_SIZE = 1024 * 1024  # 1MB
+
+_REGEX_SPECIAL = set(".^$*+?{}[]()|\\")
+
+
+def byte_trigrams(data: bytes) -> Set[bytes]:
+    """Return the set of 3-byte substrings of ``data``."""
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+# Escapes and the arguments they consume: hex, Unicode, named, octal and group references
+_ESCAPE = re.compile(
+    r"\\(?:x[0-9a-fA-F]{0,2}|u[0-9a-fA-F]{0,4}|U[0-9a-fA-F]{0,8}|N\{[^}]*\}?|[0-7]{1,3}|[0-9]{1,2}|.)",
+    re.DOTALL,
+)
+
+
+def _class_end(pattern: str, i: int) -> int:
+    """Return the index just past the character class opening at ``pattern[i]``."""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _regex_token(pattern: str, i: int) -> Tuple[str, bool, int]:
+    """
+    Read the regular expression token starting at ``pattern[i]``.
+
+    Returns:
+        Tuple[str, bool, int]: The token's character, whether it matches itself
+        literally, and the index just past the token. Character classes and
+        escapes other than escaped punctuation yield an empty character.
+    """
+    char = pattern[i]
+    if char == "\\" and i + 1 < len(pattern):
+        end = _ESCAPE.match(pattern, i).end()
+        escaped = pattern[i + 1]
+        return ("", False, end) if escaped.isalnum() else (escaped, True, end)
+    if char == "[":
+        return "", False, _class_end(pattern, i)
+    if char == "{":
+        close = pattern.find("}", i)
+        return char, False, (close if close != -1 else i) + 1
+    return char, char not in _REGEX_SPECIAL, i + 1
+
+
+def required_literals(pattern: str) -> Optional[List[str]]:
+    """
+    Extract literal runs that every match of a regular expression must contain.
+
+    Only top-level literal characters are considered: group contents, character
+    classes, escapes other than escaped punctuation and characters made optional
+    by a quantifier all end the current run.
+
+    Args:
+        pattern: Regular expression
+
+    Returns:
+        Optional[List[str]]: Required literals (possibly empty), or None if the
+        pattern has a top-level alternation and no literal is required
+    """
+    literals: List[str] = []
+    current: List[str] = []
+    depth = 0
+    i = 0
+
+    def end_run():
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    while i < len(pattern):
+        token, literal, i = _regex_token(pattern, i)
+        if literal:
+            if depth == 0:
+                current.append(token)
+        elif token == "(":
+            end_run()
+            depth += 1
+        elif token == ")":
+            depth = max(0, depth - 1)
+        elif token == "|" and depth == 0:
+            return None
+        elif token in ("?", "*", "{") and current:
+            # The previous character is optional (or repeated zero times)
+            current.pop()
+            end_run()
+        else:
+            end_run()
+    end_run()
+    return literals
+
+
+def _text_index_worker(root: str, relative_path: str, known_hash: Optional[str]) -> Tuple[str, Any]:
+    """Compute the trigram set of one text file (runs in worker processes)."""
+    full_path = os.path.join(root, relative_path)
+    try:
+        stat = os.stat(full_path)
+        if stat.st_size > MAX_TEXT_FILE_SIZE:
+            return "skipped", relative_path
+        with open(full_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return "skipped", relative_path
+    if b"\0" in data:
+        return "skipped", relative_path
+    # Lowercase as text so non-ASCII letters fold the same way as query literals
+    grams = b"".join(sorted(byte_trigrams(data.decode("utf-8", "replace").lower().encode("utf-8"))))
+    return "analysis", {
+        "path": relative_path,
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "grams": grams,
+    }
+
+
+@dataclass
+class SearchHit:
+    """Matching lines of one file."""
+
+    path: str
+    matches: List[Tuple[int, str]] = field(default_factory=list)
+    total: int = 0
+    score: float = 0.0
+
+
+class TextSearchIndex:
+    """Persistent trigram index over a project's text files.
+
+    Each file's set of (lowercased) byte trigrams is stored in SQLite and loaded
+    into in-memory posting sets. A query only reads files whose trigram sets
+    contain every trigram of the query's required literals; matching lines are
+    then verified against the memory-mapped file.
+    """
+
+    def __init__(
+        self,
+        root_path: Path,
+        db_path: str,
+        excluded_dirs: Iterable[str] = (),
+        extensions: Iterable[str] = (".py",),
+        refresh_interval: float = 2.0,
+        max_workers: Optional[int] = None,
+    ):
+        self.root_path = Path(root_path)
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self._indexer = IncrementalIndexer(
+            self.root_path,
+            _text_index_worker,
+            excluded_dirs=excluded_dirs,
+            extensions=extensions,
+            max_workers=max_workers,
+        )
+        self._lock = threading.RLock()
+        self._files: Dict[str, Tuple[float, int]] = {}
+        self._grams: Dict[str, bytes] = {}
+        self._postings: Dict[bytes, Set[str]] = defaultdict(set)
+        self._last_refresh = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS text_files (
+                        path TEXT PRIMARY KEY,
+                        mtime REAL,
+                        size INTEGER,
+                        grams BLOB
+                    )
+                    """
+                )
+        return self._conn
+
+    def _load(self) -> None:
+        if not os.path.exists(self.db_path):
+            return
+        try:
+            rows = self._connect().execute("SELECT path, mtime, size, grams FROM text_files").fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Cannot load search index {self.db_path}: {e}")
+            return
+        with self._lock:
+            for path, mtime, size, grams in rows:
+                self._add(path, mtime, size, bytes(grams))
+
+    def _add(self, path: str, mtime: float, size: int, grams: bytes) -> None:
+        self._remove(path)
+        self._files[path] = (mtime, size)
+        self._grams[path] = grams
+        for i in range(0, len(grams), 3):
+            self._postings[grams[i : i + 3]].add(path)
+
+    def _remove(self, path: str) -> None:
+        grams = self._grams.pop(path, None)
+        self._files.pop(path, None)
+        if grams is None:
+            return
+        for i in range(0, len(grams), 3):
+            gram = grams[i : i + 3]
+            paths = self._postings.get(gram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._postings[gram]
+
+    def refresh(self, paths: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the index up to date with the file system by mtime and size.
+
+        Args:
+            paths: Optional relative paths to check instead of scanning the tree
+            force: Scan even if the last scan was within ``refresh_interval``
+
+        Returns:
+            Dict[str, int]: Counts of updated and removed files
+        """
+        with self._lock:
+            if paths is None and not force and time.time() - self._last_refresh < self.refresh_interval:
+                return {"updated": 0, "removed": 0}
+            known = {path: (mtime, size, None) for path, (mtime, size) in self._files.items()}
+            changed, removed = self._indexer.plan(known, paths)
+            results = self._indexer.run(changed, {})
+
+            upserts = []
+            for kind, payload in results:
+                if kind == "analysis":
+                    self._add(payload["path"], payload["mtime"], payload["size"], payload["grams"])
+                    upserts.append((payload["path"], payload["mtime"], payload["size"], payload["grams"]))
+                elif payload in self._files:
+                    removed.append(payload)
+            for path in removed:
+                self._remove(path)
+
+            if upserts or removed:
+                try:
+                    with self._connect() as conn:
+                        conn.executemany("INSERT OR REPLACE INTO text_files VALUES (?, ?, ?, ?)", upserts)
+                        conn.executemany("DELETE FROM text_files WHERE path = ?", [(p,) for p in removed])
+                except sqlite3.Error as e:
+                    logger.warning(f"Cannot save search index {self.db_path}: {e}")
+            if paths is None:
+                self._last_refresh = time.time()
+            return {"updated": len(upserts), "removed": len(removed)}
+
+    def candidates(self, literals: Optional[List[str]]) -> List[str]:
+        """Return indexed paths that contain every trigram of ``literals``."""
+        with self._lock:
+            grams: Set[bytes] = set()
+            for literal in literals or ():
+                grams |= byte_trigrams(literal.lower().encode("utf-8"))
+            if not grams:
+                return sorted(self._files)
+            result: Optional[Set[str]] = None
+            for gram in sorted(grams, key=lambda g: len(self._postings.get(g, ()))):
+                paths = self._postings.get(gram)
+                if not paths:
+                    return []
+                result = set(paths) if result is None else result & paths
+                if not result:
+                    return []
+            return sorted(result)
+
+    def iter_search(
+        self,
+        query: str,
+        file_pattern: Optional[str] = None,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        max_lines_per_file: int = 5,
+    ) -> Iterator[SearchHit]:
+        """
+        Yield files with matching lines as they are verified.
+
+        Args:
+            query: Text (or regular expression when ``regex`` is set)
+            file_pattern: Optional glob the relative path must match
+            regex: Treat ``query`` as a regular expression
+            case_sensitive: Match case exactly
+            max_lines_per_file: Matching lines kept per file (all are counted)
+
+        Yields:
+            SearchHit: One hit per file with at least one matching line
+        """
+        self.refresh()
+        flags = 0 if case_sensitive else re.IGNORECASE
+        # Bytes patterns only fold ASCII case, so non-ASCII queries are matched against decoded text
+        needle = query if not case_sensitive and not query.isascii() else query.encode("utf-8")
+        if regex:
+            compiled = re.compile(needle, flags | re.MULTILINE)
+            literals = required_literals(query)
+        else:
+            compiled = re.compile(re.escape(needle), flags)
+            literals = [query]
+        # Ranking: whole-word and exact-case occurrences score higher
+        bonuses = []
+        if not regex:
+            literal = re.escape(needle)
+            boundary = r"\b" if isinstance(literal, str) else rb"\b"
+            bonuses.append(re.compile(boundary + literal + boundary, flags))
+            if not case_sensitive:
+                bonuses.append(re.compile(literal))
+
+        for path in self.candidates(literals):
+            if file_pattern and not match_path(path, file_pattern):
+                continue
+            hit = self._verify(path, compiled, bonuses, max_lines_per_file)
+            if hit is not None:
+                yield hit
+
+    def search(
+        self,
+        query: str,
+        file_pattern: Optional[str] = None,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        max_results: int = 20,
+        max_lines_per_file: int = 5,
+    ) -> List[SearchHit]:
+        """Return the ``max_results`` best-ranked hits (see :meth:`iter_search`)."""
+        hits = list(self.iter_search(query, file_pattern, regex, case_sensitive, max_lines_per_file))
+        needle = query.lower()
+        for hit in hits:
+            if not regex and needle in os.path.basename(hit.path).lower():
+                hit.score += 10
+        hits.sort(key=lambda h: (-h.score, h.path))
+        return hits[:max_results]
+
+    def _verify(self, path: str, compiled, bonuses, max_lines: int) -> Optional[SearchHit]:
+        try:
+            with open(self.root_path / path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                if isinstance(compiled.pattern, str):
+                    return self._scan(path, f.read().decode("utf-8", "replace"), compiled, bonuses, max_lines)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return self._scan(path, mm, compiled, bonuses, max_lines)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _scan(path: str, data, compiled, bonuses, max_lines: int) -> Optional[SearchHit]:
+        hit = SearchHit(path=path)
+        newline = "\n" if isinstance(data, str) else b"\n"
+        line_number = 1
+        counted_to = 0
+        last_line_start = -1
+        for match in compiled.finditer(data):
+            start = match.start()
+            line_start = data.rfind(newline, 0, start) + 1
+            if line_start == last_line_start:
+                continue
+            line_number += data[counted_to:line_start].count(newline)
+            counted_to = line_start
+            last_line_start = line_start
+            line_end = data.find(newline, start)
+            if line_end == -1:
+                line_end = len(data)
+            line = data[line_start:line_end]
+            hit.total += 1
+            hit.score += 1 + sum(1 for bonus in bonuses if bonus.search(line))
+            if len(hit.matches) < max_lines:
+                text = line if isinstance(line, str) else line.decode("utf-8", "replace")
+                hit.matches.append((line_number, text.strip()))
+        if not hit.total:
+            return None
+        # Favour concentrated matches over long files with scattered hits
+        hit.score = hit.score / (1 + len(data) / 100_000)
+        return hit
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def match_path(relative_path: str, pattern: str) -> bool:
+    """Match a relative path against a glob, treating a leading ``**/`` as optional."""
+    relative_path = relative_path.replace(os.sep, "/")
+    if fnmatch.fnmatch(relative_path, pattern):
+        return True
+    return pattern.startswith("**/") and fnmatch.fnmatch(relative_path, pattern[3:])
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "CodeIndexWatcher"):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        if getattr(event, "is_directory", False):
+            return
+        for attr in ("src_path", "dest_path"):
+            path = getattr(event, attr, None)
+            if path:
+                self._watcher.notify(path)
+
+
+class CodeIndexWatcher:
+    """Debounced file-system watcher (inotify on Linux via watchdog)."""
+
+    def __init__(
+        self,
+        root_path: Path,
+        on_change: Callable[[List[str]], None],
+        extensions: Iterable[str] = (".py",),
+        debounce: float = 0.5,
+    ):
+        self.root_path = Path(root_path)
+        self.on_change = on_change
+        self.extensions = tuple(extensions)
+        self.debounce = debounce
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._observer = None
+
+    def start(self) -> bool:
+        """Start watching; returns False if watchdog is not installed."""
+        if not WATCHDOG_AVAILABLE:
+            logger.info("watchdog not installed; code index file watching disabled")
+            return False
+        if self._observer is None:
+            self._observer = Observer()
+            self._observer.schedule(_ChangeHandler(self), str(self.root_path), recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+        return True
+
+    def stop(self) -> None:
+        """Stop watching and flush pending changes."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        self._flush()
+
+    def notify(self, path: str) -> None:
+        """Record a changed path and (re)arm the debounce timer."""
+        if not path.endswith(self.extensions):
+            return
+        try:
+            relative = os.path.relpath(path, self.root_path)
+        except ValueError:
+            return
+        with self._lock:
+            self._pending.add(relative)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            paths, self._pending = sorted(self._pending), set()
+            self._timer = None
+        if paths:
+            try:
+                self.on_change(paths)
+            except Exception as e:
+                logger.error(f"Code index update failed: {e}")
+
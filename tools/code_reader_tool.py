@@ -3,15 +3,31 @@ Advanced code reader tool for Atlas Help mode - provides comprehensive code anal
 """
 
 import ast
-import hashlib
-import json
 import logging
 import os
+import re
+import sys
+import threading
 import time
 from collections import defaultdict
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.code_index import (
+    CodeIndexStore,
+    CodeIndexWatcher,
+    IncrementalIndexer,
+    SearchHit,
+    TextSearchIndex,
+    TrigramIndex,
+    content_hash,
+    project_cache_path,
+)
+
+# Files larger than this are not indexed
+MAX_INDEXED_FILE_SIZE = 1024 * 1024  # 1MB
+MAX_INDEXED_FILE_LINES = 10000
 
 
 @dataclass
@@ -51,36 +67,85 @@ class FileAnalysis:
 
 
 class CodeIndex:
-    """Maintains an index of all code elements for fast searching"""
+    """Maintains an index of all code elements for fast searching.
+
+    File analyses are persisted in a SQLite store; element names are kept in a
+    sorted array with trigram postings so substring and fuzzy lookups only touch
+    candidate names.
+    """
 
     def __init__(self, cache_file: str = None):
         self.elements: Dict[str, List[CodeElement]] = defaultdict(list)
         self.files: Dict[str, FileAnalysis] = {}
-        self.cache_file = cache_file or ".atlas_code_cache.json"
+        self.cache_file = cache_file or project_cache_path(os.getcwd(), "code_index")
+        self.names = TrigramIndex()
+        self._lock = threading.RLock()
+        self._dirty: Dict[str, FileAnalysis] = {}
+        self._removed: set = set()
+        self._store: Optional[CodeIndexStore] = None
         self.load_cache()
 
     def add_file_analysis(self, analysis: FileAnalysis):
-        """Add file analysis to index"""
-        self.files[analysis.path] = analysis
-
-        # Index all elements
+        """Add (or replace) a file analysis in the index"""
+        with self._lock:
+            if analysis.path in self.files:
+                self._unindex(self.files[analysis.path])
+            self.files[analysis.path] = analysis
+            self._dirty[analysis.path] = analysis
+            self._removed.discard(analysis.path)
+
+            # Index all elements
+            for element in analysis.elements:
+                key = element.name.lower()
+                self.elements[key].append(element)
+                self.names.add(key)
+
+    def remove_file(self, path: str):
+        """Remove a file and its elements from the index"""
+        with self._lock:
+            analysis = self.files.pop(path, None)
+            if analysis is not None:
+                self._unindex(analysis)
+            self._dirty.pop(path, None)
+            self._removed.add(path)
+
+    def _unindex(self, analysis: FileAnalysis):
         for element in analysis.elements:
-            self.elements[element.name.lower()].append(element)
+            key = element.name.lower()
+            bucket = self.elements.get(key)
+            if bucket is None:
+                continue
+            bucket[:] = [e for e in bucket if e.file_path != element.file_path or e is not element]
+            if not bucket:
+                del self.elements[key]
+            self.names.discard(key)
 
     def search_elements(
         self, query: str, element_type: str = None
     ) -> List[CodeElement]:
-        """Search for code elements by name"""
+        """Search for code elements by name (substring match)"""
         query = query.lower()
         results = []
 
-        for name, elements in self.elements.items():
-            if query in name:
-                for element in elements:
+        with self._lock:
+            for name in self.names.search(query):
+                for element in self.elements.get(name, ()):
                     if element_type is None or element.type == element_type:
                         results.append(element)
 
-        return sorted(results, key=lambda x: x.name.lower().find(query))
+        return sorted(results, key=lambda x: (x.name.lower().find(query), len(x.name), x.name))
+
+    def fuzzy_search(
+        self, query: str, element_type: str = None, limit: int = 20
+    ) -> List[CodeElement]:
+        """Search for code elements with names similar to the query"""
+        results = []
+        with self._lock:
+            for name, _score in self.names.fuzzy(query.lower(), limit=limit):
+                for element in self.elements.get(name, ()):
+                    if element_type is None or element.type == element_type:
+                        results.append(element)
+        return results[:limit]
 
     def get_file_elements(
         self, file_path: str, element_type: str = None
@@ -95,37 +160,163 @@ class CodeIndex:
 
         return elements
 
+    def known_files(self) -> Dict[str, Tuple[float, int, str]]:
+        """Get (mtime, size, hash) of every indexed file"""
+        with self._lock:
+            return {
+                path: (analysis.last_modified, analysis.size, analysis.hash)
+                for path, analysis in self.files.items()
+            }
+
+    def _get_store(self) -> CodeIndexStore:
+        if self._store is None:
+            self._store = CodeIndexStore(self.cache_file)
+        return self._store
+
     def save_cache(self):
-        """Save index to cache file"""
+        """Persist changed file analyses to the cache store"""
         try:
-            cache_data = {
-                "files": {
-                    path: asdict(analysis) for path, analysis in self.files.items()
-                },
-                "timestamp": time.time(),
-            }
-            with open(self.cache_file, "w") as f:
-                json.dump(cache_data, f, indent=2)
+            with self._lock:
+                dirty = [asdict(analysis) for analysis in self._dirty.values()]
+                removed = list(self._removed)
+                self._dirty.clear()
+                self._removed.clear()
+            if dirty or removed:
+                self._get_store().save(dirty, removed)
         except Exception as e:
             logging.exception(f"Failed to save cache: {e}")
 
+    def clear(self):
+        """Remove everything from the index and its cache store"""
+        with self._lock:
+            self.elements.clear()
+            self.files.clear()
+            self.names = TrigramIndex()
+            self._dirty.clear()
+            self._removed.clear()
+        try:
+            self._get_store().clear()
+        except Exception as e:
+            logging.exception(f"Failed to clear cache: {e}")
+
     def load_cache(self):
-        """Load index from cache file"""
+        """Load index from cache store"""
         try:
             if os.path.exists(self.cache_file):
-                with open(self.cache_file) as f:
-                    cache_data = json.load(f)
-
-                for _path, file_data in cache_data.get("files", {}).items():
+                for file_data in self._get_store().load_all():
                     # Convert dict back to dataclass
                     elements = [CodeElement(**elem) for elem in file_data["elements"]]
                     file_data["elements"] = elements
                     analysis = FileAnalysis(**file_data)
                     self.add_file_analysis(analysis)
+                self._dirty.clear()
         except Exception as e:
             logging.exception(f"Failed to load cache: {e}")
 
 
+def analyze_python_file(root_path: Path, file_path: Path) -> Optional[FileAnalysis]:
+    """Analyze a Python file using AST and extract code elements"""
+    logger = logging.getLogger("CodeReaderTool")
+
+    # Verification розміру файлу (максимум 1MB)
+    stat = file_path.stat()
+    if stat.st_size > MAX_INDEXED_FILE_SIZE:
+        logger.warning(f"Skipping large file {file_path} ({stat.st_size} bytes)")
+        return None
+
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    content = raw.decode("utf-8")
+
+    # Verification кількості рядків (максимум 10000)
+    lines = content.count("\n") + 1
+    if lines > MAX_INDEXED_FILE_LINES:
+        logger.warning(f"Skipping large file {file_path} ({lines} lines)")
+        return None
+
+    # Parse AST з обмеженням глибини рекурсії
+    old_limit = sys.getrecursionlimit()
+    try:
+        sys.setrecursionlimit(500)  # Обмежуємо рекурсію
+        tree = ast.parse(content, filename=str(file_path))
+    except (SyntaxError, RecursionError, ValueError) as e:
+        logger.warning(f"Cannot parse {file_path}: {e}")
+        return None
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+    # Extract elements
+    analyzer = ASTAnalyzer(str(file_path))
+    analyzer.visit(tree)
+
+    return FileAnalysis(
+        path=str(file_path.relative_to(root_path)),
+        hash=content_hash(raw),
+        size=stat.st_size,
+        lines=lines,
+        last_modified=stat.st_mtime,
+        elements=analyzer.elements,
+        imports=analyzer.imports,
+        dependencies=extract_dependencies(content),
+        complexity=calculate_file_complexity(analyzer.elements),
+    )
+
+
+def index_worker(root: str, relative_path: str, known_hash: Optional[str]) -> Tuple[str, Any]:
+    """Analyze one file for the incremental indexer (runs in worker processes).
+
+    Returns ``("unchanged", (path, mtime, size))`` when the content hash matches
+    the indexed version, ``("analysis", dict)`` for a fresh analysis, or
+    ``("skipped", path)`` if the file cannot be indexed.
+    """
+    root_path = Path(root)
+    file_path = root_path / relative_path
+    try:
+        if known_hash is not None:
+            stat = file_path.stat()
+            with open(file_path, "rb") as f:
+                if content_hash(f.read()) == known_hash:
+                    return "unchanged", (relative_path, stat.st_mtime, stat.st_size)
+        analysis = analyze_python_file(root_path, file_path)
+    except (OSError, UnicodeDecodeError) as e:
+        logging.getLogger("CodeReaderTool").warning(f"Cannot index {file_path}: {e}")
+        return "skipped", relative_path
+    if analysis is None:
+        return "skipped", relative_path
+    return "analysis", asdict(analysis)
+
+
+def extract_dependencies(content: str) -> List[str]:
+    """Extract dependencies from import statements"""
+    dependencies = set()
+
+    for line in content.split("\n"):
+        line = line.strip()
+        if line.startswith("import ") or line.startswith("from "):
+            # Extract module name
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            module = parts[1].split(".")[0]
+
+            # Filter out local imports (starting with .)
+            if module and not parts[1].startswith("."):
+                dependencies.add(module)
+
+    return sorted(dependencies)
+
+
+def calculate_file_complexity(elements: List[CodeElement]) -> int:
+    """Calculate file complexity based on elements"""
+    complexity = 0
+    for element in elements:
+        if element.type in ["function", "method"]:
+            complexity += max(1, element.complexity)
+        elif element.type == "class":
+            complexity += 2
+    return complexity
+
+
 class CodeReaderTool:
     """Advanced tool for reading and analyzing Atlas codebase in Help mode."""
 
@@ -167,10 +358,16 @@ class CodeReaderTool:
 
         # Initialize code index for advanced analysis
         self.index = CodeIndex(
-            cache_file=str(self.root_path / ".atlas_code_cache.json")
+            cache_file=project_cache_path(str(self.root_path), "code_index")
         )
         self._last_index_update = 0
         self._index_update_interval = 300  # 5 minutes
+        self._index_lock = threading.Lock()
+        self._indexer = IncrementalIndexer(
+            self.root_path, index_worker, excluded_dirs=self.excluded_dirs
+        )
+        self._watcher: Optional[CodeIndexWatcher] = None
+        self._text_index: Optional[TextSearchIndex] = None
 
         # Запускаємо індексацію в фоні, щоб не блокувати запуск
         # Можна відключити через змінну середовища
@@ -179,8 +376,6 @@ class CodeReaderTool:
             "1",
             "yes",
         ):
-            import threading
-
             self._indexing_thread = threading.Thread(
                 target=self._ensure_index_updated, daemon=True
             )
@@ -283,60 +478,87 @@ class CodeReaderTool:
             self.logger.error(f"Error reading file {file_path}: {e}")
             return f"❌ Error reading file: {e!s}"
 
+    @property
+    def text_index(self) -> TextSearchIndex:
+        """Full-text trigram index over the allowed text files (created lazily)"""
+        if self._text_index is None:
+            self._text_index = TextSearchIndex(
+                self.root_path,
+                project_cache_path(str(self.root_path), "search_index"),
+                excluded_dirs=self.excluded_dirs,
+                extensions=sorted(self.allowed_extensions),
+            )
+        return self._text_index
+
+    def iter_search_in_files(
+        self,
+        search_term: str,
+        file_pattern: str = "**/*.py",
+        max_results: int = 20,
+        regex: bool = False,
+        case_sensitive: bool = False,
+    ):
+        """
+        Stream search results file by file as soon as they are found.
+
+        Args:
+            search_term: Text (or regular expression when ``regex`` is set)
+            file_pattern: Glob the file path must match
+            max_results: Maximum number of files to yield
+            regex: Treat ``search_term`` as a regular expression
+            case_sensitive: Match case exactly
+
+        Yields:
+            str: Formatted matches of one file
+        """
+        hits = self.text_index.iter_search(
+            search_term, file_pattern, regex=regex, case_sensitive=case_sensitive
+        )
+        for count, hit in enumerate(hits, 1):
+            yield self._format_search_hit(hit)
+            if count >= max_results:
+                break
+
     def search_in_files(
-        self, search_term: str, file_pattern: str = "**/*.py", max_results: int = 20
+        self,
+        search_term: str,
+        file_pattern: str = "**/*.py",
+        max_results: int = 20,
+        regex: bool = False,
+        case_sensitive: bool = False,
     ) -> str:
         """Search for text across Atlas codebase files."""
         try:
-            results = []
-            search_count = 0
-
-            # Use glob to find matching files
-            for file_path in self.root_path.glob(file_pattern):
-                if search_count >= max_results:
-                    break
-
-                # Skip excluded directories
-                if any(excluded in file_path.parts for excluded in self.excluded_dirs):
-                    continue
-
-                # Skip non-allowed extensions
-                if file_path.suffix not in self.allowed_extensions:
-                    continue
-
-                try:
-                    with open(file_path, encoding="utf-8") as f:
-                        content = f.read()
-                        lines = content.split("\n")
-
-                    # Search for term in file
-                    matches = []
-                    for line_num, line in enumerate(lines, 1):
-                        if search_term.lower() in line.lower():
-                            matches.append(f"  Line {line_num}: {line.strip()}")
-
-                    if matches:
-                        relative_path = file_path.relative_to(self.root_path)
-                        results.append(f"📄 **{relative_path}**:")
-                        results.extend(matches[:5])  # Limit matches per file
-                        if len(matches) > 5:
-                            results.append(f"  ... and {len(matches) - 5} more matches")
-                        results.append("")
-                        search_count += 1
-
-                except (UnicodeDecodeError, PermissionError):
-                    continue
+            hits = self.text_index.search(
+                search_term,
+                file_pattern,
+                regex=regex,
+                case_sensitive=case_sensitive,
+                max_results=max_results,
+            )
 
-            if not results:
+            if not hits:
                 return f"🔍 No results found for '{search_term}' in pattern '{file_pattern}'"
 
-            header = f"🔍 **Search Results for '{search_term}'**\n\nFound {search_count} files with matches:\n\n"
+            results = [self._format_search_hit(hit) for hit in hits]
+            header = f"🔍 **Search Results for '{search_term}'**\n\nFound {len(hits)} files with matches:\n\n"
             return header + "\n".join(results)
 
+        except re.error as e:
+            return f"❌ Invalid regular expression: {e!s}"
         except Exception as e:
             self.logger.error(f"Error searching files: {e}")
             return f"❌ Error searching files: {e!s}"
 
+    def _format_search_hit(self, hit: SearchHit) -> str:
+        """Format the matching lines of one file"""
+        lines = [f"📄 **{hit.path}**:"]
+        lines.extend(f"  Line {line_num}: {line}" for line_num, line in hit.matches)
+        if hit.total > len(hit.matches):
+            lines.append(f"  ... and {hit.total - len(hit.matches)} more matches")
+        lines.append("")
+        return "\n".join(lines)
+
     def get_file_info(self, file_path: str) -> str:
         """Get information about a specific file."""
         try:
@@ -454,69 +676,73 @@ class CodeReaderTool:
     def _ensure_index_updated(self):
         """Ensure code index is up to date"""
         try:
-            # Спочатку спробуємо завантажити існуючий cache
-            cache_file = self.root_path / ".atlas_code_cache.json"
-            if cache_file.exists():
-                cache_age = time.time() - cache_file.stat().st_mtime
-                if cache_age < self._index_update_interval:
-                    self.logger.info("Using existing code index cache")
-                    return
-
             current_time = time.time()
             if current_time - self._last_index_update > self._index_update_interval:
-                self.rebuild_index()
+                self.update_index()
         except Exception as e:
             self.logger.error(f"Error updating index: {e}")
 
+    def update_index(self, paths: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Incrementally update the code index.
+
+        Only files whose mtime or size changed since they were indexed are
+        read; of those, files whose content hash is unchanged are not re-parsed.
+        Parsing runs in a process pool when many files changed.
+
+        Args:
+            paths: Optional paths (relative to the root) to check instead of
+                scanning the whole tree
+
+        Returns:
+            Dict[str, int]: Counts of updated, unchanged, skipped and removed files
+        """
+        with self._index_lock:
+            start_time = time.time()
+            known = self.index.known_files()
+            changed, removed = self._indexer.plan(known, paths)
+            stats = {"updated": 0, "unchanged": 0, "skipped": 0, "removed": len(removed)}
+
+            for path in removed:
+                self.index.remove_file(path)
+
+            known_hashes = {path: known[path][2] for path in changed if path in known}
+            for kind, payload in self._indexer.run(changed, known_hashes):
+                if kind == "analysis":
+                    payload["elements"] = [CodeElement(**elem) for elem in payload["elements"]]
+                    self.index.add_file_analysis(FileAnalysis(**payload))
+                    stats["updated"] += 1
+                elif kind == "unchanged":
+                    path, mtime, size = payload
+                    analysis = self.index.files.get(path)
+                    if analysis is not None:
+                        analysis.last_modified = mtime
+                        analysis.size = size
+                        self.index.add_file_analysis(analysis)
+                    stats["unchanged"] += 1
+                else:
+                    if payload in self.index.files:
+                        self.index.remove_file(payload)
+                    stats["skipped"] += 1
+
+            self.index.save_cache()
+            self._last_index_update = time.time()
+
+        if changed or removed:
+            self.logger.info(
+                f"Index updated: {stats['updated']} parsed, {stats['unchanged']} unchanged, "
+                f"{stats['removed']} removed in {time.time() - start_time:.2f}s"
+            )
+        return stats
+
     def rebuild_index(self):
         """Rebuild the entire code index from scratch"""
         self.logger.info("Rebuilding code index...")
         start_time = time.time()
-        max_indexing_time = 30  # Максимум 30 секунд на індексацію
 
-        # Clear existing index
-        self.index = CodeIndex(
-            cache_file=str(self.root_path / ".atlas_code_cache.json")
-        )
-
-        # Index only Atlas Python files (not venv)
-        python_files = []
-        for pattern in [
-            "*.py",
-            "agents/*.py",
-            "tools/*.py",
-            "ui/*.py",
-            "utils/*.py",
-            "tests/*.py",
-        ]:
-            python_files.extend(self.root_path.glob(pattern))
-
-        # Обмежуємо кількість файлів
-        python_files = python_files[:200]  # Максимум 200 файлів
-
-        files_processed = 0
-        for file_path in python_files:
-            # Verification таймауту
-            if time.time() - start_time > max_indexing_time:
-                self.logger.info(
-                    f"Indexing timeout reached, processed {files_processed} files"
-                )
-                break
-
-            if any(excluded in file_path.parts for excluded in self.excluded_dirs):
-                continue
-
-            try:
-                analysis = self._analyze_python_file(file_path)
-                if analysis:
-                    self.index.add_file_analysis(analysis)
-                    files_processed += 1
-            except Exception as e:
-                self.logger.error(f"Error analyzing file {file_path}: {e}")
-                continue
-
-        self.index.save_cache()
-        self._last_index_update = time.time()
+        with self._index_lock:
+            self.index.clear()
+        self.update_index()
 
         elapsed = time.time() - start_time
         file_count = len(self.index.files)
@@ -526,68 +752,44 @@ class CodeReaderTool:
             f"Index rebuilt: {file_count} files, {element_count} elements in {elapsed:.2f}s"
         )
 
+    def start_watching(self, debounce: float = 0.5) -> bool:
+        """
+        Keep the index updated from file-system events.
+
+        Args:
+            debounce: Seconds to wait for further changes before re-indexing
+
+        Returns:
+            bool: True if watching started (requires watchdog)
+        """
+        if self._watcher is None:
+            self._watcher = CodeIndexWatcher(
+                self.root_path,
+                self._on_files_changed,
+                extensions=sorted(self.allowed_extensions),
+                debounce=debounce,
+            )
+        return self._watcher.start()
+
+    def _on_files_changed(self, paths: List[str]):
+        """Update the code and full-text indexes for changed files"""
+        self.update_index(paths)
+        if self._text_index is not None:
+            self._text_index.refresh(paths)
+
+    def stop_watching(self):
+        """Stop file-system watching started by start_watching"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
     def _analyze_python_file(self, file_path: Path) -> Optional[FileAnalysis]:
         """Analyze a Python file using AST and extract code elements"""
         try:
             # Verification на виключені директорії
             if any(excluded in file_path.parts for excluded in self.excluded_dirs):
                 return None
-
-            # Verification розміру файлу (максимум 1MB)
-            stat = file_path.stat()
-            max_size = 1024 * 1024  # 1MB
-            if stat.st_size > max_size:
-                self.logger.warning(
-                    f"Skipping large file {file_path} ({stat.st_size} bytes)"
-                )
-                return None
-
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
-
-            # Verification кількості рядків (максимум 10000)
-            lines = content.count("\n") + 1
-            if lines > 10000:
-                self.logger.warning(f"Skipping large file {file_path} ({lines} lines)")
-                return None
-
-            # Basic file info
-            file_hash = hashlib.md5(content.encode()).hexdigest()
-
-            # Parse AST з обмеженням глибини рекурсії
-            try:
-                import sys
-
-                old_limit = sys.getrecursionlimit()
-                sys.setrecursionlimit(500)  # Обмежуємо рекурсію
-                tree = ast.parse(content, filename=str(file_path))
-                sys.setrecursionlimit(old_limit)
-            except (SyntaxError, RecursionError) as e:
-                self.logger.warning(f"Cannot parse {file_path}: {e}")
-                return None
-
-            # Extract elements
-            analyzer = ASTAnalyzer(str(file_path))
-            analyzer.visit(tree)
-
-            # Calculate dependencies
-            dependencies = self._extract_dependencies(content)
-
-            # Calculate file complexity
-            complexity = self._calculate_file_complexity(analyzer.elements)
-
-            return FileAnalysis(
-                path=str(file_path.relative_to(self.root_path)),
-                hash=file_hash,
-                size=stat.st_size,
-                lines=lines,
-                last_modified=stat.st_mtime,
-                elements=analyzer.elements,
-                imports=analyzer.imports,
-                dependencies=dependencies,
-                complexity=complexity,
-            )
-
+            return analyze_python_file(self.root_path, file_path)
         except Exception as e:
             self.logger.error(f"Error analyzing file {file_path}: {e}")
             return None
@@ -1018,32 +1220,11 @@ class CodeReaderTool:
 
     def _extract_dependencies(self, content: str) -> List[str]:
         """Extract dependencies from import statements"""
-        dependencies = set()
-
-        for line in content.split("\n"):
-            line = line.strip()
-            if line.startswith("import ") or line.startswith("from "):
-                # Extract module name
-                if line.startswith("import "):
-                    module = line[7:].split()[0].split(".")[0]
-                elif line.startswith("from "):
-                    module = line[5:].split()[0].split(".")[0]
-
-                # Filter out local imports (starting with .)
-                if not module.startswith("."):
-                    dependencies.add(module)
-
-        return sorted(dependencies)
+        return extract_dependencies(content)
 
     def _calculate_file_complexity(self, elements: List[CodeElement]) -> int:
         """Calculate file complexity based on elements"""
-        complexity = 0
-        for element in elements:
-            if element.type in ["function", "method"]:
-                complexity += max(1, element.complexity)
-            elif element.type == "class":
-                complexity += 2
-        return complexity
+        return calculate_file_complexity(elements)
 
     def _get_file_icon(self, file_path: Path) -> str:
         """Get appropriate icon for file type"""
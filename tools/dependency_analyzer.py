@@ -3,18 +3,33 @@
 Dependency Analyzer Tool for Atlas
 
 This script analyzes the codebase to identify import dependencies and detect potential circular imports.
+
+Files are parsed in a process pool and the per-file results are cached by
+content hash across runs, so repeated analyses only re-parse changed files.
+Cycles are found as strongly connected components (iterative Tarjan) and
+layers are topological levels of the component graph.
 """
 
 import ast
 import logging
 import os
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from tools.code_index import (
+    CodeIndexStore,
+    IncrementalIndexer,
+    content_hash,
+    project_cache_path,
+)
 
 logger = logging.getLogger(__name__)
 
+# Bump when the cached per-file data changes shape
+CACHE_VERSION = 1
+
 
 @dataclass
 class DependencyInfo:
@@ -55,12 +70,19 @@ class ArchitecturalAnalysis:
     internal_dependencies: Set[str]
     dependency_layers: Dict[int, List[str]]
     metrics: Dict[str, Any]
+    strongly_connected_components: List[List[str]] = field(default_factory=list)
 
 
 class DependencyAnalyzer:
     """Advanced dependency and architectural analyzer for Atlas codebase."""
 
-    def __init__(self, root_path: str = None):
+    def __init__(
+        self,
+        root_path: str = None,
+        cache_path: Optional[str] = None,
+        use_cache: bool = True,
+        max_workers: Optional[int] = None,
+    ):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.root_path = Path(root_path) if root_path else Path(__file__).parent.parent
         self.excluded_dirs = {
@@ -90,30 +112,38 @@ class DependencyAnalyzer:
         self.dependency_graph = defaultdict(list)
         self.modules = {}
 
+        self.use_cache = use_cache
+        self.cache_path = cache_path or project_cache_path(str(self.root_path), "dependency_cache")
+        self._parsed: Dict[str, Dict[str, Any]] = {}
+        self._store: Optional[CodeIndexStore] = None
+        self._indexer = IncrementalIndexer(
+            self.root_path,
+            parse_module_file,
+            excluded_dirs=self.excluded_dirs,
+            max_workers=max_workers,
+        )
+        self._load_cache()
+
     def analyze_project_architecture(self) -> ArchitecturalAnalysis:
         """Perform comprehensive architectural analysis."""
         self.logger.info("Starting architectural analysis...")
 
-        # 1. Discover all Python modules
-        python_files = self._find_python_files()
-
-        # 2. Analyze each module
-        for file_path in python_files:
-            module_info = self._analyze_module(file_path)
-            if module_info:
-                self.modules[module_info.module_name] = module_info
+        # 1-2. Discover and (re-)analyze changed Python modules
+        self.update()
 
         # 3. Build dependency graph
         self._build_dependency_graph()
 
         # 4. Detect circular dependencies
-        circular_deps = self._find_circular_dependencies()
+        internal_graph = self._internal_graph()
+        components = strongly_connected_components(internal_graph)
+        circular_deps = find_cycles(internal_graph, components)
 
         # 5. Categorize dependencies
         external_deps, internal_deps = self._categorize_dependencies()
 
         # 6. Calculate dependency layers
-        dependency_layers = self._calculate_dependency_layers()
+        dependency_layers = topological_layers(internal_graph, components)
 
         # 7. Calculate metrics
         metrics = self._calculate_architectural_metrics()
@@ -126,53 +156,137 @@ class DependencyAnalyzer:
             internal_dependencies=internal_deps,
             dependency_layers=dependency_layers,
             metrics=metrics,
+            strongly_connected_components=[c for c in components if len(c) > 1],
         )
 
-    def _find_python_files(self) -> List[Path]:
-        """Find all Python files in the project."""
-        python_files = []
+    def update(self, paths: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Re-analyze only the files that changed since the last run.
 
-        for file_path in self.root_path.rglob("*.py"):
-            if any(excluded in file_path.parts for excluded in self.excluded_dirs):
-                continue
-            python_files.append(file_path)
+        Files are checked by mtime and size; changed files whose content hash
+        matches the cached analysis are not re-parsed. Parsing runs in a
+        process pool when many files changed.
 
-        return python_files
+        Args:
+            paths: Optional paths (relative to the root) to check instead of
+                scanning the whole tree
 
-    def _analyze_module(self, file_path: Path) -> Optional[ModuleInfo]:
-        """Analyze a single Python module."""
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
-
-            tree = ast.parse(content)
-            relative_path = file_path.relative_to(self.root_path)
-            module_name = str(relative_path).replace("/", ".").replace(".py", "")
-
-            analyzer = ModuleASTAnalyzer(str(file_path), module_name)
-            analyzer.visit(tree)
-
-            return ModuleInfo(
-                file_path=str(relative_path),
-                module_name=module_name,
-                imports=analyzer.imports,
-                exports=analyzer.exports,
-                classes=analyzer.classes,
-                functions=analyzer.functions,
-                dependencies=analyzer.dependencies,
-                dependents=[],  # Will be filled later
-                complexity_score=len(analyzer.classes) + len(analyzer.functions),
+        Returns:
+            Dict[str, int]: Counts of parsed, unchanged, skipped and removed files
+        """
+        known = {
+            path: (data["last_modified"], data["size"], data["hash"])
+            for path, data in self._parsed.items()
+        }
+        changed, removed = self._indexer.plan(known, paths)
+        known_hashes = {path: known[path][2] for path in changed if path in known}
+        stats = {"parsed": 0, "unchanged": 0, "skipped": 0, "removed": len(removed)}
+
+        dirty = []
+        for kind, payload in self._indexer.run(changed, known_hashes):
+            if kind == "analysis":
+                self._parsed[payload["path"]] = payload
+                dirty.append(payload)
+                stats["parsed"] += 1
+            elif kind == "unchanged":
+                path, mtime, size = payload
+                data = self._parsed[path]
+                data["last_modified"], data["size"] = mtime, size
+                dirty.append(data)
+                stats["unchanged"] += 1
+            else:
+                if payload in self._parsed:
+                    removed.append(payload)
+                stats["skipped"] += 1
+
+        for path in removed:
+            self._parsed.pop(path, None)
+        if (dirty or removed) and self.use_cache:
+            try:
+                self._get_store().save(dirty, removed)
+            except Exception as e:
+                self.logger.warning(f"Could not save dependency cache: {e}")
+
+        self.modules = {}
+        for data in self._parsed.values():
+            module_info = self._module_info(data)
+            self.modules[module_info.module_name] = module_info
+        self._resolve_dependencies()
+
+        if changed or removed:
+            self.logger.info(
+                f"Dependency analysis updated: {stats['parsed']} parsed, "
+                f"{stats['unchanged']} unchanged, {stats['removed']} removed"
             )
+        return stats
+
+    def _get_store(self) -> CodeIndexStore:
+        if self._store is None:
+            self._store = CodeIndexStore(self.cache_path)
+        return self._store
 
+    def _load_cache(self):
+        """Load cached per-file analyses from previous runs."""
+        if not self.use_cache or not os.path.exists(self.cache_path):
+            return
+        try:
+            for data in self._get_store().load_all():
+                if data.get("version") == CACHE_VERSION:
+                    self._parsed[data["path"]] = data
         except Exception as e:
-            self.logger.warning(f"Could not analyze module {file_path}: {e}")
+            self.logger.warning(f"Could not load dependency cache: {e}")
+
+    def _find_python_files(self) -> List[Path]:
+        """Find all Python files in the project."""
+        return [self.root_path / path for path in sorted(self._indexer.scan())]
+
+    def _analyze_module(self, file_path: Path) -> Optional[ModuleInfo]:
+        """Analyze a single Python module."""
+        relative_path = os.path.relpath(file_path, self.root_path)
+        kind, payload = parse_module_file(str(self.root_path), relative_path, None)
+        if kind != "analysis":
+            self.logger.warning(f"Could not analyze module {file_path}")
             return None
+        return self._module_info(payload)
+
+    @staticmethod
+    def _module_info(data: Dict[str, Any]) -> ModuleInfo:
+        return ModuleInfo(
+            file_path=data["path"],
+            module_name=data["module_name"],
+            imports=list(data["imports"]),
+            exports=list(data["exports"]),
+            classes=list(data["classes"]),
+            functions=list(data["functions"]),
+            dependencies=[],  # Resolved against the module set
+            dependents=[],  # Will be filled later
+            complexity_score=data["complexity_score"],
+        )
+
+    def _resolve_dependencies(self):
+        """Resolve raw import records to internal module names or external packages."""
+        module_names = set(self.modules)
+        for data in self._parsed.values():
+            module_info = self.modules.get(data["module_name"])
+            if module_info is None:
+                continue
+            resolved = []
+            for record in data["import_records"]:
+                for dependency in resolve_import(
+                    data["module_name"], data["is_package"], record, module_names
+                ):
+                    if dependency not in resolved and dependency != data["module_name"]:
+                        resolved.append(dependency)
+            module_info.dependencies = resolved
 
     def _build_dependency_graph(self):
         """Build dependency graph."""
+        self.dependency_graph = defaultdict(list)
+
         # Add all modules as nodes
         for module_name, module_info in self.modules.items():
             self.dependency_graph[module_name] = module_info.dependencies
+            module_info.dependents = []
 
         # Add dependency edges
         for module_name, module_info in self.modules.items():
@@ -181,38 +295,16 @@ class DependencyAnalyzer:
                     # Add to dependents list
                     self.modules[dependency].dependents.append(module_name)
 
+    def _internal_graph(self) -> Dict[str, List[str]]:
+        """Dependency graph restricted to modules of the project."""
+        return {
+            module_name: [dep for dep in module_info.dependencies if dep in self.modules]
+            for module_name, module_info in self.modules.items()
+        }
+
     def _find_circular_dependencies(self) -> List[List[str]]:
-        """Find circular dependencies in the project."""
-        try:
-            circular_deps = []
-            visited = set()
-            path = set()
-
-            def dfs(module, current_path):
-                visited.add(module)
-                path.add(module)
-                current_path.append(module)
-                for dep in self.dependency_graph[module]:
-                    if dep not in visited:
-                        if (
-                            dfs(dep, current_path)
-                            and current_path[-1] == current_path[0]
-                        ):
-                            circular_deps.append(current_path[:])
-                    elif dep in path:
-                        cycle_start = current_path.index(dep)
-                        circular_deps.append(current_path[cycle_start:])
-                path.remove(module)
-                current_path.pop()
-                return False
-
-            for module in self.dependency_graph:
-                if module not in visited:
-                    dfs(module, [])
-            return circular_deps
-        except Exception as e:
-            self.logger.error(f"Error finding circular dependencies: {e}")
-            return []
+        """Find circular dependencies in the project (one cycle per SCC)."""
+        return find_cycles(self._internal_graph())
 
     def _categorize_dependencies(self) -> Tuple[Set[str], Set[str]]:
         """Categorize dependencies as external or internal."""
@@ -271,54 +363,8 @@ class DependencyAnalyzer:
 
     def _calculate_dependency_layers(self) -> Dict[int, List[str]]:
         """Calculate dependency layers (architectural levels)."""
-        layers = defaultdict(list)
-
-        try:
-            # Calculate topological sort to determine layers
-            topo_order = []
-            visited = set()
-            temp_visited = set()
-
-            def dfs(module):
-                if module in temp_visited:
-                    raise ValueError("Circular dependency detected")
-                if module in visited:
-                    return
-                temp_visited.add(module)
-                for dep in self.dependency_graph[module]:
-                    dfs(dep)
-                temp_visited.remove(module)
-                visited.add(module)
-                topo_order.append(module)
-
-            for module in self.dependency_graph:
-                dfs(module)
-
-            # Assign layers based on longest path from nodes with no dependencies
-            for node in topo_order:
-                predecessors = self.dependency_graph[node]
-                if not predecessors:
-                    layers[0].append(node)
-                else:
-                    max_pred_layer = max(
-                        self._get_node_layer(pred, layers) for pred in predecessors
-                    )
-                    layers[max_pred_layer + 1].append(node)
-
-        except Exception:
-            # If graph has cycles, fall back to simple approach
-            for node in self.dependency_graph:
-                in_degree = len(self.dependency_graph[node])
-                layers[in_degree].append(node)
-
-        return dict(layers)
-
-    def _get_node_layer(self, node: str, layers: Dict[int, List[str]]) -> int:
-        """Get the layer of a node."""
-        for layer, nodes in layers.items():
-            if node in nodes:
-                return layer
-        return 0
+        graph = self._internal_graph()
+        return topological_layers(graph, strongly_connected_components(graph))
 
     def _calculate_architectural_metrics(self) -> Dict[str, Any]:
         """Calculate various architectural metrics."""
@@ -515,21 +561,28 @@ class ModuleASTAnalyzer(ast.NodeVisitor):
         self.classes = []
         self.functions = []
         self.dependencies = []
+        # (module, level, imported names) for every import statement
+        self.import_records: List[Tuple[str, int, List[str]]] = []
 
     def visit_Import(self, node):
         """Visit import statements."""
         for alias in node.names:
             self.imports.append(f"import {alias.name}")
             self.dependencies.append(alias.name.split(".")[0])
+            self.import_records.append((alias.name, 0, []))
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
         """Visit from...import statements."""
+        names = [alias.name for alias in node.names]
         if node.module:
             module = node.module
-            names = ", ".join(alias.name for alias in node.names)
-            self.imports.append(f"from {module} import {names}")
-            self.dependencies.append(module.split(".")[0])
+            self.imports.append(f"from {'.' * node.level}{module} import {', '.join(names)}")
+            if not node.level:
+                self.dependencies.append(module.split(".")[0])
+        elif node.level:
+            self.imports.append(f"from {'.' * node.level} import {', '.join(names)}")
+        self.import_records.append((node.module or "", node.level or 0, names))
         self.generic_visit(node)
 
     def visit_ClassDef(self, node):
@@ -551,6 +604,246 @@ class ModuleASTAnalyzer(ast.NodeVisitor):
         self.generic_visit(node)
 
 
+def module_name_for(relative_path: str) -> Tuple[str, bool]:
+    """Return the dotted module name for a relative path and whether it is a package."""
+    parts = list(Path(relative_path).with_suffix("").parts)
+    is_package = parts[-1] == "__init__"
+    if is_package:
+        parts = parts[:-1]
+    return ".".join(parts) or "__init__", is_package
+
+
+def parse_module_file(root: str, relative_path: str, known_hash: Optional[str]) -> Tuple[str, Any]:
+    """
+    Parse one module for the dependency analyzer (runs in worker processes).
+
+    Args:
+        root: Project root
+        relative_path: Path of the module relative to ``root``
+        known_hash: Content hash of the cached analysis, if any
+
+    Returns:
+        Tuple[str, Any]: ``("analysis", dict)``, ``("unchanged", (path, mtime,
+        size))`` when the content hash matches, or ``("skipped", path)``
+    """
+    file_path = os.path.join(root, relative_path)
+    try:
+        stat = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        file_hash = content_hash(raw)
+        if file_hash == known_hash:
+            return "unchanged", (relative_path, stat.st_mtime, stat.st_size)
+        tree = ast.parse(raw.decode("utf-8"), filename=file_path)
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError, RecursionError) as e:
+        logger.warning(f"Could not analyze module {file_path}: {e}")
+        return "skipped", relative_path
+
+    module_name, is_package = module_name_for(relative_path)
+    analyzer = ModuleASTAnalyzer(file_path, module_name)
+    analyzer.visit(tree)
+    return "analysis", {
+        "version": CACHE_VERSION,
+        "path": relative_path,
+        "hash": file_hash,
+        "size": stat.st_size,
+        "last_modified": stat.st_mtime,
+        "module_name": module_name,
+        "is_package": is_package,
+        "imports": analyzer.imports,
+        "exports": analyzer.exports,
+        "classes": analyzer.classes,
+        "functions": analyzer.functions,
+        "import_records": analyzer.import_records,
+        "complexity_score": len(analyzer.classes) + len(analyzer.functions),
+    }
+
+
+def resolve_import(
+    module_name: str, is_package: bool, record: Iterable[Any], modules: Set[str]
+) -> List[str]:
+    """
+    Resolve an import record to the modules it depends on.
+
+    Internal imports resolve to the most specific project module; external ones
+    to their top-level package name.
+
+    Args:
+        module_name: Importing module
+        is_package: Whether the importing module is a package ``__init__``
+        record: ``(module, level, names)`` as collected by ModuleASTAnalyzer
+        modules: Names of all project modules
+
+    Returns:
+        List[str]: Dependency names
+    """
+    target, level, names = record
+    if level:
+        package = module_name.split(".") if is_package else module_name.split(".")[:-1]
+        if level > 1:
+            package = package[: len(package) - (level - 1)]
+        base = ".".join(package + ([target] if target else []))
+    else:
+        base = target
+
+    resolved = [f"{base}.{name}" for name in names if f"{base}.{name}" in modules]
+    if resolved:
+        return resolved
+
+    # Longest project module prefix of the imported name
+    parts = base.split(".") if base else []
+    while parts:
+        candidate = ".".join(parts)
+        if candidate in modules:
+            return [candidate]
+        parts.pop()
+
+    if level or not base:
+        return []
+    return [base.split(".")[0]]
+
+
+def strongly_connected_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Find strongly connected components with an iterative Tarjan algorithm.
+
+    Components are returned in reverse topological order: every component comes
+    after all components it depends on. Edges to unknown nodes are ignored.
+
+    Args:
+        graph: Adjacency lists
+
+    Returns:
+        List[List[str]]: Components with their members sorted
+    """
+    tarjan = _Tarjan(graph)
+    for start in graph:
+        if start not in tarjan.index_of:
+            tarjan.visit(start)
+    return tarjan.components
+
+
+class _Tarjan:
+    """State of an iterative Tarjan SCC search (see ``strongly_connected_components``)."""
+
+    def __init__(self, graph: Dict[str, List[str]]):
+        self.graph = graph
+        self.index_of: Dict[str, int] = {}
+        self.lowlink: Dict[str, int] = {}
+        self.on_stack: Set[str] = set()
+        self.stack: List[str] = []
+        self.components: List[List[str]] = []
+
+    def _push(self, node: str) -> Tuple[str, Iterator[str]]:
+        self.index_of[node] = self.lowlink[node] = len(self.index_of)
+        self.stack.append(node)
+        self.on_stack.add(node)
+        # Each frame is (node, iterator over its successors)
+        return node, iter(self.graph[node])
+
+    def _next_unvisited(self, node: str, successors: Iterator[str]) -> Optional[str]:
+        """Advance ``successors`` to the next unvisited node, updating ``node``'s lowlink."""
+        for successor in successors:
+            if successor not in self.graph:
+                continue
+            if successor not in self.index_of:
+                return successor
+            if successor in self.on_stack:
+                self.lowlink[node] = min(self.lowlink[node], self.index_of[successor])
+        return None
+
+    def _pop_component(self, node: str) -> None:
+        component = []
+        while True:
+            member = self.stack.pop()
+            self.on_stack.discard(member)
+            component.append(member)
+            if member == node:
+                break
+        self.components.append(sorted(component))
+
+    def visit(self, start: str) -> None:
+        work = [self._push(start)]
+        while work:
+            node, successors = work[-1]
+            successor = self._next_unvisited(node, successors)
+            if successor is not None:
+                work.append(self._push(successor))
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                self.lowlink[parent] = min(self.lowlink[parent], self.lowlink[node])
+            if self.lowlink[node] == self.index_of[node]:
+                self._pop_component(node)
+
+
+def find_cycle(graph: Dict[str, List[str]], component: List[str]) -> List[str]:
+    """Return the shortest cycle through the first member of a component."""
+    members = set(component)
+    start = component[0]
+    parents: Dict[str, Optional[str]] = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for successor in graph.get(node, ()):
+            if successor == start:
+                cycle = [node]
+                while parents[cycle[-1]] is not None:
+                    cycle.append(parents[cycle[-1]])
+                return list(reversed(cycle))
+            if successor in members and successor not in parents:
+                parents[successor] = node
+                queue.append(successor)
+    return list(component)
+
+
+def find_cycles(
+    graph: Dict[str, List[str]], components: Optional[List[List[str]]] = None
+) -> List[List[str]]:
+    """Return one representative cycle per cyclic strongly connected component."""
+    if components is None:
+        components = strongly_connected_components(graph)
+    return [
+        find_cycle(graph, component)
+        for component in components
+        if len(component) > 1 or component[0] in graph.get(component[0], ())
+    ]
+
+
+def topological_layers(
+    graph: Dict[str, List[str]], components: List[List[str]]
+) -> Dict[int, List[str]]:
+    """
+    Assign layers as topological levels of the component graph.
+
+    Modules without project dependencies are layer 0; every other module sits
+    one layer above its highest dependency. Members of a cycle share a layer.
+
+    Args:
+        graph: Adjacency lists
+        components: Output of :func:`strongly_connected_components`
+
+    Returns:
+        Dict[int, List[str]]: Modules per layer
+    """
+    component_of = {member: i for i, component in enumerate(components) for member in component}
+    level = [0] * len(components)
+    # Components arrive dependencies-first, so one pass suffices
+    for i, component in enumerate(components):
+        for member in component:
+            for dependency in graph.get(member, ()):
+                j = component_of.get(dependency)
+                if j is not None and j != i:
+                    level[i] = max(level[i], level[j] + 1)
+
+    layers: Dict[int, List[str]] = defaultdict(list)
+    for i, component in enumerate(components):
+        layers[level[i]].extend(component)
+    return {layer: sorted(modules) for layer, modules in sorted(layers.items())}
+
+
 def analyze_imports(file_path):
     """Analyze imports in a given Python file."""
     # Avoid conflict with standard library 'email' module
@@ -572,48 +865,15 @@ def analyze_imports(file_path):
 
 def build_dependency_graph(root_dir):
     """Build a dependency graph for all Python files in the root directory."""
-    dependency_graph = defaultdict(list)
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith(".py"):
-                file_path = os.path.join(root, file)
-                module_name = os.path.relpath(file_path, root_dir).replace(os.sep, ".")[
-                    :-3
-                ]
-                imports = analyze_imports(file_path)
-                dependency_graph[module_name] = imports
-    return dependency_graph
+    analyzer = DependencyAnalyzer(str(root_dir))
+    analyzer.update()
+    analyzer._build_dependency_graph()
+    return analyzer.dependency_graph
 
 
 def detect_circular_dependencies(dependency_graph):
-    """Detect circular dependencies in the dependency graph."""
-    visited = set()
-    path = set()
-    cycles = []
-
-    def dfs(module, current_path):
-        visited.add(module)
-        path.add(module)
-        current_path.append(module)
-        # Create a copy of dependencies to avoid runtime modification issues
-        deps = list(dependency_graph.get(module, []))
-        for dep in deps:
-            if dep not in visited:
-                if dfs(dep, current_path) and current_path[-1] == current_path[0]:
-                    cycles.append(current_path[:])
-            elif dep in path:
-                cycle_start = current_path.index(dep)
-                cycles.append(current_path[cycle_start:])
-        path.remove(module)
-        current_path.pop()
-        return False
-
-    # Create a list of keys to avoid runtime modification issues
-    modules = list(dependency_graph.keys())
-    for module in modules:
-        if module not in visited:
-            dfs(module, [])
-    return cycles
+    """Detect circular dependencies in the dependency graph (one cycle per SCC)."""
+    return find_cycles({module: list(deps) for module, deps in dependency_graph.items()})
 
 
 def find_circular_dependencies() -> str:
@@ -14,9 +14,10 @@ except ImportError:
         "PyAutoGUI not installed. Terminal interaction functionality will be limited."
     )
 
-from PySide6.QtCore import QProcess
+from PySide6.QtCore import Signal
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
+    QHBoxLayout,
     QLineEdit,
     QPushButton,
     QTextEdit,
@@ -24,9 +25,19 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from tools.terminal_sessions import CommandStream, get_session_manager
+
 
 class EnhancedTerminal(QWidget):
-    """An enhanced terminal tool for Atlas with advanced command execution and history management."""
+    """An enhanced terminal tool for Atlas with advanced command execution and history management.
+
+    Commands run in a persistent shell session, so ``cd`` and ``export`` carry
+    over between commands, and output is appended as it streams in.
+    """
+
+    # Emitted from the session reader thread; delivered on the GUI thread
+    output_received = Signal(str, str)
+    command_finished = Signal(int)
 
     def __init__(
         self, config: Optional[Dict[str, Any]] = None, parent: Optional[QWidget] = None
@@ -36,13 +47,12 @@ class EnhancedTerminal(QWidget):
         self.logger = logging.getLogger(__name__)
         self.history: List[str] = []
         self.history_index = -1
-        try:
-            self.process = QProcess(self)
-            self.process.readyReadStandardOutput.connect(self.on_output_ready)
-            self.process.readyReadStandardError.connect(self.on_error_ready)
-        except Exception as e:
-            self.logger.error(f"Failed to initialize QProcess: {str(e)}")
-            self.process = None
+        self.session_id = self.config.get("session_id", f"enhanced-terminal-{id(self)}")
+        self.timeout = self.config.get("timeout", 300.0)
+        # The command currently streaming output, if any
+        self.process: Optional[CommandStream] = None
+        self.output_received.connect(self.on_output_ready)
+        self.command_finished.connect(self.on_command_finished)
         self.init_ui()
         self.initialize()
 
@@ -106,18 +116,8 @@ class EnhancedTerminal(QWidget):
         if not command:
             return
 
-        if not PYAUTOGUI_AVAILABLE:
-            logging.error(
-                "PyAutoGUI not installed. Cannot execute terminal commands interactively."
-            )
-            self.output_area.append(
-                "Error: Terminal interaction not available without PyAutoGUI."
-            )
-            return
-
-        if self.process is None:
-            self.logger.error("QProcess not initialized. Cannot execute command.")
-            self.output_area.append("Error: QProcess not initialized.")
+        if self.process is not None and not self.process.future.done():
+            self.output_area.append("Error: A command is already running.")
             return
 
         self.history.append(command)
@@ -127,30 +127,41 @@ class EnhancedTerminal(QWidget):
         self.logger.info("Executing command: %s", command)
 
         try:
-            self.process.start(self.default_shell, ["-c", command])
+            self.process = get_session_manager().stream(
+                command,
+                session_id=self.session_id,
+                timeout=self.timeout,
+                on_output=self.output_received.emit,
+            )
+            self.process.future.add_done_callback(self._emit_finished)
         except Exception as e:
             self.logger.error("Failed to execute command: %s", e)
             self.output_area.append(f"Error: {str(e)}")
 
-    def on_output_ready(self) -> None:
-        """Handle standard output from the process."""
-        if self.process is None:
-            self.logger.error("QProcess not initialized. Cannot read output.")
-            return
-
-        output = self.process.readAllStandardOutput().data().decode()
-        self.output_area.append(output)
-        self.logger.debug("Command output: %s", output)
-
-    def on_error_ready(self) -> None:
-        """Handle error output from the process."""
-        if self.process is None:
-            self.logger.error("QProcess not initialized. Cannot read error.")
-            return
-
-        error = self.process.readAllStandardError().data().decode()
-        self.output_area.append(f"Error: {error}")
-        self.logger.error("Command error: %s", error)
+    def _emit_finished(self, future) -> None:
+        try:
+            result = future.result()
+            self.command_finished.emit(result.return_code)
+        except Exception as e:
+            self.logger.error("Command failed: %s", e)
+            self.command_finished.emit(-1)
+
+    def on_output_ready(self, stream: str, text: str) -> None:
+        """Append a chunk of streamed output."""
+        if stream == "stderr":
+            self.output_area.append(f"Error: {text.rstrip()}")
+            self.logger.error("Command error: %s", text)
+        else:
+            self.output_area.append(text.rstrip("\n"))
+            self.logger.debug("Command output: %s", text)
+
+    def on_command_finished(self, return_code: int) -> None:
+        """Report how the last command ended."""
+        result = self.process.result if self.process is not None else None
+        if result is not None and result.error:
+            self.output_area.append(f"Error: {result.error}")
+        elif return_code != 0:
+            self.output_area.append(f"[exit {return_code}]")
 
     def clear_output(self) -> None:
         """Clear the output area."""
@@ -0,0 +1,257 @@
+"""
+Local Gmail metadata cache for Atlas
+
+Stores message headers and snippets in SQLite keyed by message id together
+with the mailbox historyId they were fetched at, plus the message ids returned
+for recent search queries. The history API is used to evict entries that changed
+since the last sync so repeated searches can be answered locally.
+
+Queries relative to the current time (``newer_than:``, ``older_than:``,
+``after:``, ``before:``) can change without any mailbox change, so their
+cached results also expire after ``time_relative_ttl`` seconds.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.atlas/cache/gmail_cache.sqlite3")
+
+# Seconds a cached result of a time-relative query stays valid
+DEFAULT_TIME_RELATIVE_TTL = 300.0
+
+# Search operators whose matches depend on the current date
+_TIME_RELATIVE_QUERY = re.compile(r"\b(?:newer_than|older_than|after|before|newer|older):", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    history_id TEXT,
+    subject TEXT,
+    sender TEXT,
+    recipient TEXT,
+    date TEXT,
+    snippet TEXT,
+    fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    message_ids TEXT NOT NULL,
+    history_id TEXT,
+    created_at REAL,
+    PRIMARY KEY (query, max_results)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class GmailMessageCache:
+    """SQLite cache of Gmail message metadata and search results."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, time_relative_ttl: float = DEFAULT_TIME_RELATIVE_TTL):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Database file path, or ":memory:" for an in-memory cache
+            time_relative_ttl: Seconds results of date-relative queries are reused
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.time_relative_ttl = time_relative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get_many(self, message_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up cached metadata for several messages.
+
+        Args:
+            message_ids: Message ids to look up
+
+        Returns:
+            Dict mapping cached message ids to their email dicts
+        """
+        ids = list(message_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            # Stay well below SQLite's host parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT * FROM messages WHERE id IN ({placeholders})", chunk
+                ).fetchall()
+                for row in rows:
+                    found[row["id"]] = self._row_to_email(row)
+        self.hits += len(found)
+        self.misses += len(ids) - len(found)
+        return found
+
+    def put_many(self, emails: Iterable[Dict[str, Any]], history_id: Optional[str] = None) -> None:
+        """
+        Store metadata for several messages.
+
+        Args:
+            emails: Email dicts as produced by GmailTool
+            history_id: Mailbox historyId the messages were fetched at
+        """
+        now = time.time()
+        rows = [
+            (
+                email["id"],
+                email.get("threadId", ""),
+                email.get("historyId") or history_id,
+                email.get("subject", ""),
+                email.get("from", ""),
+                email.get("to", ""),
+                email.get("date", ""),
+                email.get("snippet", ""),
+                now,
+            )
+            for email in emails
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def invalidate(self, message_ids: Iterable[str]) -> int:
+        """
+        Drop cached metadata for messages.
+
+        Args:
+            message_ids: Message ids to drop
+
+        Returns:
+            int: Number of rows removed
+        """
+        ids = [(message_id,) for message_id in message_ids]
+        if not ids:
+            return 0
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("DELETE FROM messages WHERE id = ?", ids)
+            return self._conn.total_changes - before
+
+    def get_query(self, query: str, max_results: int, history_id: Optional[str]) -> Optional[List[str]]:
+        """
+        Get cached message ids for a query if the mailbox has not changed since.
+
+        Results of time-relative queries are also dropped once they are older
+        than ``time_relative_ttl``.
+
+        Args:
+            query: Gmail search query
+            max_results: Result limit used for the query
+            history_id: Current mailbox historyId
+
+        Returns:
+            Optional[List[str]]: Cached message ids, or None if stale or missing
+        """
+        if not history_id:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT message_ids, history_id, created_at FROM queries WHERE query = ? AND max_results = ?",
+                (query, max_results),
+            ).fetchone()
+        if row is None or row["history_id"] != history_id:
+            return None
+        if _TIME_RELATIVE_QUERY.search(query) and time.time() - (row["created_at"] or 0) > self.time_relative_ttl:
+            return None
+        return json.loads(row["message_ids"])
+
+    def put_query(self, query: str, max_results: int, message_ids: List[str], history_id: Optional[str]) -> None:
+        """
+        Remember the message ids a query returned at a mailbox historyId.
+
+        Args:
+            query: Gmail search query
+            max_results: Result limit used for the query
+            message_ids: Message ids in result order
+            history_id: Mailbox historyId at query time
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?, ?)",
+                (query, max_results, json.dumps(message_ids), history_id, time.time()),
+            )
+
+    def get_sync_history_id(self) -> Optional[str]:
+        """Get the historyId the cache was last synchronised to."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = 'history_id'"
+            ).fetchone()
+        return row["value"] if row else None
+
+    def set_sync_history_id(self, history_id: str) -> None:
+        """Record the historyId the cache is synchronised to."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('history_id', ?)", (str(history_id),)
+            )
+
+    def clear(self) -> None:
+        """Remove all cached data."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages")
+            self._conn.execute("DELETE FROM queries")
+            self._conn.execute("DELETE FROM sync_state")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with cached message/query counts and hit/miss counters
+        """
+        with self._lock:
+            messages = self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+            queries = self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+        return {
+            "messages": messages,
+            "queries": queries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "history_id": self.get_sync_history_id(),
+        }
+
+    @staticmethod
+    def _row_to_email(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "subject": row["subject"],
+            "from": row["sender"],
+            "to": row["recipient"],
+            "date": row["date"],
+            "snippet": row["snippet"],
+            "threadId": row["thread_id"],
+            "historyId": row["history_id"],
+        }
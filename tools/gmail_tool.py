@@ -10,8 +10,11 @@ import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from tools.gmail_cache import GmailMessageCache
 
 try:
     from google.auth.transport.requests import Request
@@ -23,6 +26,7 @@ try:
     GMAIL_AVAILABLE = True
 except ImportError:
     GMAIL_AVAILABLE = False
+    HttpError = Exception
     logging.warning(
         "Gmail API libraries not available. Install with: pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client"
     )
@@ -39,14 +43,289 @@ SCOPES = [
     "https://www.googleapis.com/auth/gmail.modify",
 ]
 
+# Headers requested for message metadata
+METADATA_HEADERS = ["Subject", "From", "Date", "To"]
+
+# Gmail recommends at most 50 requests per batch HTTP call
+BATCH_SIZE = 50
+
 
 class GmailTool:
-    """Gmail API integration tool for Atlas."""
+    """Gmail API integration tool for Atlas.
+
+    Message metadata is fetched with batch HTTP requests (or a bounded thread pool
+    when the service has no batch support) and cached locally; the history API
+    keeps the cache in sync so repeated searches avoid refetching.
+    """
+
+    def __init__(
+        self,
+        service: Any = None,
+        cache: Optional[GmailMessageCache] = None,
+        use_cache: bool = True,
+        batch_size: int = BATCH_SIZE,
+        max_workers: int = 8,
+    ):
+        """
+        Initialize the Gmail tool.
 
-    def __init__(self):
-        self.service = None
+        Args:
+            service: Pre-built Gmail service object (skips authentication)
+            cache: Metadata cache, defaults to ~/.atlas/cache/gmail_cache.sqlite3
+            use_cache: Whether to cache message metadata and search results
+            batch_size: Number of requests per batch HTTP call
+            max_workers: Thread pool size when batch requests are unavailable
+        """
+        self.service = service
         self.credentials = None
-        self.is_authenticated = False
+        self.is_authenticated = service is not None
+        self.use_cache = use_cache
+        self.batch_size = max(1, min(batch_size, 100))
+        self.max_workers = max(1, max_workers)
+        self._cache = cache
+
+    @property
+    def cache(self) -> Optional[GmailMessageCache]:
+        """Optional[GmailMessageCache]: Metadata cache, created on first use."""
+        if not self.use_cache:
+            return None
+        if self._cache is None:
+            self._cache = GmailMessageCache()
+        return self._cache
+
+    def _ensure_service(self) -> Optional[Dict[str, Any]]:
+        """Authenticate if needed, returning the failed auth result or None."""
+        if not self.is_authenticated or not self.service:
+            auth_result = self.authenticate()
+            if not auth_result["success"]:
+                return auth_result
+        return None
+
+    def _metadata_request(self, message_id: str):
+        return (
+            self.service.users()
+            .messages()
+            .get(
+                userId="me",
+                id=message_id,
+                format="metadata",
+                metadataHeaders=METADATA_HEADERS,
+            )
+        )
+
+    @staticmethod
+    def _format_date(date: str) -> str:
+        try:
+            parsed_date = datetime.strptime(date, "%a, %d %b %Y %H:%M:%S %z")
+            return parsed_date.strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            return date
+
+    def _parse_metadata(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a metadata-format message into an email dict."""
+        headers = {h["name"]: h["value"] for h in msg.get("payload", {}).get("headers", [])}
+        return {
+            "id": msg["id"],
+            "subject": headers.get("Subject", "No Subject"),
+            "from": headers.get("From", "Unknown Sender"),
+            "to": headers.get("To", ""),
+            "date": self._format_date(headers.get("Date", "Unknown Date")),
+            "snippet": msg.get("snippet", ""),
+            "threadId": msg.get("threadId", ""),
+            "historyId": msg.get("historyId", ""),
+        }
+
+    def _fetch_metadata(self, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch metadata for messages from the API.
+
+        Uses batch HTTP requests when the service supports them, otherwise a
+        bounded thread pool. Messages that fail to load are skipped.
+        """
+        if not message_ids:
+            return {}
+        if hasattr(self.service, "new_batch_http_request"):
+            return self._fetch_metadata_batched(message_ids)
+        return self._fetch_metadata_pooled(message_ids)
+
+    def _fetch_metadata_batched(self, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch metadata with batch HTTP requests of ``batch_size`` messages."""
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                logger.warning(f"Failed to fetch message {request_id}: {exception}")
+                return
+            results[request_id] = self._parse_metadata(response)
+
+        for start in range(0, len(message_ids), self.batch_size):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for message_id in message_ids[start : start + self.batch_size]:
+                batch.add(self._metadata_request(message_id), request_id=message_id)
+            batch.execute()
+        return results
+
+    def _fetch_metadata_pooled(self, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch metadata one request per message on a bounded thread pool."""
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def fetch(message_id):
+            try:
+                return self._parse_metadata(self._metadata_request(message_id).execute())
+            except Exception as e:
+                logger.warning(f"Failed to fetch message {message_id}: {e}")
+                return None
+
+        workers = min(self.max_workers, len(message_ids))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gmail-fetch") as pool:
+            for email in pool.map(fetch, message_ids):
+                if email is not None:
+                    results[email["id"]] = email
+        return results
+
+    def _get_metadata(self, message_ids: List[str], history_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get metadata for messages in order, serving cached entries locally."""
+        cache = self.cache
+        found = cache.get_many(message_ids) if cache else {}
+        missing = [message_id for message_id in message_ids if message_id not in found]
+        if missing:
+            fetched = self._fetch_metadata(missing)
+            for email in fetched.values():
+                email["historyId"] = email["historyId"] or (history_id or "")
+            if cache:
+                cache.put_many(fetched.values(), history_id)
+            found.update(fetched)
+        return [found[message_id] for message_id in message_ids if message_id in found]
+
+    def _current_history_id(self) -> Optional[str]:
+        try:
+            profile = self.service.users().getProfile(userId="me").execute()
+            return str(profile.get("historyId")) if profile.get("historyId") else None
+        except Exception as e:
+            logger.warning(f"Failed to read Gmail profile: {e}")
+            return None
+
+    def sync_cache(self) -> Optional[str]:
+        """
+        Bring the metadata cache up to date using the Gmail history API.
+
+        Messages that were added, deleted or relabelled since the last sync are
+        evicted; if the stored historyId is too old the cache is cleared.
+
+        Returns:
+            Optional[str]: Current mailbox historyId, or None if it is unavailable or
+            the cache could not be synchronised (cached query results are then bypassed)
+        """
+        cache = self.cache
+        if cache is None:
+            return None
+        history_id = self._current_history_id()
+        if history_id is None:
+            return None
+
+        start_history_id = cache.get_sync_history_id()
+        if start_history_id == history_id:
+            return history_id
+        if start_history_id is None:
+            cache.set_sync_history_id(history_id)
+            return history_id
+
+        try:
+            changed = self._changed_message_ids(start_history_id)
+        except Exception as e:
+            status = getattr(getattr(e, "resp", None), "status", None)
+            if status != 404:
+                # Nothing was invalidated, so results cached at this historyId cannot be trusted
+                logger.warning(f"Gmail history sync failed: {e}")
+                return None
+            # startHistoryId is too old to be served incrementally
+            logger.info("Gmail history expired, clearing local cache")
+            cache.clear()
+            cache.set_sync_history_id(history_id)
+            return history_id
+
+        cache.invalidate(changed)
+        cache.set_sync_history_id(history_id)
+        logger.debug(f"Gmail cache synced to {history_id}, {len(changed)} message(s) changed")
+        return history_id
+
+    def _changed_message_ids(self, start_history_id: str) -> Set[str]:
+        """Ids of messages added, deleted or relabelled since ``start_history_id``."""
+        changed: Set[str] = set()
+        page_token = None
+        while True:
+            kwargs = {"userId": "me", "startHistoryId": start_history_id}
+            if page_token:
+                kwargs["pageToken"] = page_token
+            response = self.service.users().history().list(**kwargs).execute()
+            for record in response.get("history", []):
+                for msg in record.get("messages", []):
+                    changed.add(msg["id"])
+                for key in ("messagesAdded", "messagesDeleted", "labelsAdded", "labelsRemoved"):
+                    for item in record.get(key, []):
+                        changed.add(item["message"]["id"])
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return changed
+
+    def _list_message_ids(self, query: str, max_results: int, history_id: Optional[str]) -> List[str]:
+        """List message ids for a query, reusing cached ids if the mailbox is unchanged."""
+        cache = self.cache
+        if cache:
+            cached_ids = cache.get_query(query, max_results, history_id)
+            if cached_ids is not None:
+                return cached_ids
+
+        results = (
+            self.service.users()
+            .messages()
+            .list(userId="me", q=query, maxResults=max_results)
+            .execute()
+        )
+        message_ids = [message["id"] for message in results.get("messages", [])]
+        if cache:
+            cache.put_query(query, max_results, message_ids, history_id)
+        return message_ids
+
+    def iter_emails(self, query: str, page_size: int = 100, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream email metadata for a query page by page.
+
+        Each page of ids is resolved against the cache and the remainder fetched
+        in batches before its emails are yielded, so callers see the first
+        results without waiting for the whole query.
+
+        Args:
+            query: Gmail search query
+            page_size: Number of message ids per list call (max 500)
+            limit: Optional maximum number of emails to yield
+
+        Yields:
+            Dict[str, Any]: Email metadata in the API's result order
+        """
+        auth_error = self._ensure_service()
+        if auth_error:
+            raise RuntimeError(auth_error.get("error", "Gmail authentication failed"))
+
+        history_id = self.sync_cache()
+        page_token = None
+        yielded = 0
+        while True:
+            kwargs = {"userId": "me", "q": query, "maxResults": min(page_size, 500)}
+            if page_token:
+                kwargs["pageToken"] = page_token
+            response = self.service.users().messages().list(**kwargs).execute()
+            message_ids = [message["id"] for message in response.get("messages", [])]
+            if limit is not None:
+                message_ids = message_ids[: limit - yielded]
+
+            for email in self._get_metadata(message_ids, history_id):
+                yield email
+                yielded += 1
+
+            page_token = response.get("nextPageToken")
+            if not page_token or (limit is not None and yielded >= limit):
+                return
 
     def authenticate(self, credentials_path: str = None) -> Dict[str, Any]:
         """
@@ -138,23 +417,15 @@ class GmailTool:
         Returns:
             Dict with search results
         """
-        if not self.is_authenticated or not self.service:
-            auth_result = self.authenticate()
-            if not auth_result["success"]:
-                return auth_result
+        auth_error = self._ensure_service()
+        if auth_error:
+            return auth_error
 
         try:
-            # Search for emails
-            results = (
-                self.service.users()
-                .messages()
-                .list(userId="me", q=query, maxResults=max_results)
-                .execute()
-            )
-
-            messages = results.get("messages", [])
+            history_id = self.sync_cache()
+            message_ids = self._list_message_ids(query, max_results, history_id)
 
-            if not messages:
+            if not message_ids:
                 return {
                     "success": True,
                     "results": [],
@@ -163,51 +434,8 @@ class GmailTool:
                     "message": f"No emails found for query: {query}",
                 }
 
-            # Get detailed information for each email
-            email_details = []
-            for message in messages:
-                msg = (
-                    self.service.users()
-                    .messages()
-                    .get(
-                        userId="me",
-                        id=message["id"],
-                        format="metadata",
-                        metadataHeaders=["Subject", "From", "Date", "To"],
-                    )
-                    .execute()
-                )
-
-                headers = msg["payload"]["headers"]
-                subject = next(
-                    (h["value"] for h in headers if h["name"] == "Subject"),
-                    "No Subject",
-                )
-                sender = next(
-                    (h["value"] for h in headers if h["name"] == "From"),
-                    "Unknown Sender",
-                )
-                date = next(
-                    (h["value"] for h in headers if h["name"] == "Date"), "Unknown Date"
-                )
-
-                # Parse date
-                try:
-                    parsed_date = datetime.strptime(date, "%a, %d %b %Y %H:%M:%S %z")
-                    formatted_date = parsed_date.strftime("%Y-%m-%d %H:%M")
-                except ValueError:
-                    formatted_date = date
-
-                email_details.append(
-                    {
-                        "id": message["id"],
-                        "subject": subject,
-                        "from": sender,
-                        "date": formatted_date,
-                        "snippet": msg.get("snippet", ""),
-                        "threadId": msg.get("threadId", ""),
-                    }
-                )
+            # Get detailed information for all emails (cached or batched)
+            email_details = self._get_metadata(message_ids, history_id)
 
             # Sort by date (newest first)
             email_details.sort(key=lambda x: x["date"], reverse=True)
@@ -343,12 +571,25 @@ class GmailTool:
             f"{date_filter} (Google Account OR Gmail security OR account security)",
         ]
 
-        all_results = []
+        auth_error = self._ensure_service()
+        if auth_error:
+            return auth_error
 
-        for query in security_queries:
-            result = self.search_emails(query, max_results=20)
-            if result["success"] and result["results"]:
-                all_results.extend(result["results"])
+        # Collect ids for all queries first so overlapping messages are fetched once
+        try:
+            history_id = self.sync_cache()
+            message_ids: List[str] = []
+            for query in security_queries:
+                message_ids.extend(self._list_message_ids(query, 20, history_id))
+            message_ids = list(dict.fromkeys(message_ids))
+            all_results = self._get_metadata(message_ids, history_id)
+        except Exception as e:
+            logger.error(f"Security email search failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to search security emails",
+            }
 
         # Remove duplicates based on email ID
         unique_emails = {}
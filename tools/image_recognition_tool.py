@@ -13,23 +13,31 @@ try:
 except ImportError:
     _CV2_AVAILABLE = False
 
-from typing import Optional, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
 
+from tools.template_matcher import ImageSource, Region, get_template_matcher
 from utils.logger import get_logger
 
 logger = get_logger()
 
 
 def find_template_in_image(
-    template_path: str, image_path: str, threshold: float = 0.8
+    template_path: ImageSource,
+    image_path: ImageSource,
+    threshold: float = 0.8,
+    roi: Optional[Region] = None,
 ) -> Optional[Tuple[int, int]]:
     """
     Find a template image within a larger image using template matching.
 
+    Templates are decoded once and cached by the shared TemplateMatcher, so
+    repeated lookups of the same template only pay for the match itself.
+
     Args:
-        template_path (str): Path to the template image file.
-        image_path (str): Path to the larger image file to search in.
+        template_path (str | np.ndarray): Template image file path or array.
+        image_path (str | np.ndarray): Image file path or array to search in.
         threshold (float): Matching threshold (0.0 to 1.0). Higher values mean stricter matching.
+        roi (tuple, optional): (x, y, width, height) region to restrict the search to.
 
     Returns:
         Optional[Tuple[int, int]]: Top-left coordinates (x, y) of the matched template if found, None otherwise.
@@ -39,32 +47,83 @@ def find_template_in_image(
         return None
 
     try:
-        # Read images
-        template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-
-        if template is None or image is None:
-            logger.error(
-                f"Failed to load images: template={template_path}, image={image_path}"
-            )
-            return None
-
-        # Perform template matching
-        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-        if max_val >= threshold:
-            logger.info(f"Template found at {max_loc} with confidence {max_val}")
-            return max_loc
-        logger.info(
-            f"No match found above threshold {threshold}. Best match confidence: {max_val}"
-        )
+        match = get_template_matcher().best_match(image_path, template_path, threshold, roi=roi)
+        if match is not None:
+            logger.info(f"Template found at {(match.x, match.y)} with confidence {match.score}")
+            return match.x, match.y
+        logger.info(f"No match found above threshold {threshold}.")
         return None
     except Exception as e:
         logger.error(f"Error in template matching: {e!s}")
         return None
 
 
+def find_template_on_screen(
+    template_path: ImageSource,
+    threshold: float = 0.8,
+    roi: Optional[Region] = None,
+    max_age: float = 0.0,
+) -> Optional[Tuple[int, int]]:
+    """
+    Find a template on the current screen.
+
+    The screen comes from the shared capture service, so a frame captured
+    within ``max_age`` seconds is reused, and the grayscale pyramid of an
+    unchanged screen is built only once.
+
+    Args:
+        template_path (str | np.ndarray): Template image file path or array.
+        threshold (float): Matching threshold (0.0 to 1.0).
+        roi (tuple, optional): (x, y, width, height) region to restrict the search to.
+        max_age (float): Seconds a buffered frame may be old and still be used.
+
+    Returns:
+        Optional[Tuple[int, int]]: Top-left coordinates (x, y) of the match, None otherwise.
+    """
+    from tools.screen_capture import get_capture_service
+
+    try:
+        frame = get_capture_service().frame(max_age)
+    except Exception as e:
+        logger.error(f"Screen capture failed: {e!s}")
+        return None
+    return find_template_in_image(template_path, frame, threshold, roi)
+
+
+def find_templates_in_image(
+    templates: Mapping[str, ImageSource],
+    image: ImageSource,
+    threshold: float = 0.8,
+    rois: Optional[Mapping[str, Region]] = None,
+    processes: Optional[int] = None,
+) -> Dict[str, List[Dict[str, object]]]:
+    """
+    Find several templates in one image, decoding the image only once.
+
+    Args:
+        templates (Mapping[str, str | np.ndarray]): Template name to file path or array.
+        image (str | np.ndarray): Image file path or array to search in.
+        threshold (float): Matching threshold (0.0 to 1.0).
+        rois (Mapping[str, tuple], optional): Per-template (x, y, width, height) regions.
+        processes (int, optional): Number of worker processes for large batches.
+
+    Returns:
+        Dict[str, List[Dict[str, object]]]: Matches per template name, best first.
+    """
+    if not _CV2_AVAILABLE:
+        logger.error("OpenCV (cv2) is not available. Cannot perform image recognition.")
+        return {name: [] for name in templates}
+
+    try:
+        results = get_template_matcher().match_many(
+            image, templates, threshold, rois=rois, processes=processes
+        )
+        return {name: [m.to_dict() for m in matches] for name, matches in results.items()}
+    except Exception as e:
+        logger.error(f"Error in template matching: {e!s}")
+        return {name: [] for name in templates}
+
+
 def find_object_in_image(image_path: str, object_cascade_path: str) -> list:
     """
     Detect objects in an image using a pre-trained Haar or LBP cascade classifier.
@@ -0,0 +1,421 @@
+"""OCR service with result caching and batch processing for Atlas.
+
+Results are cached in memory and on disk keyed by a hash of the image content
+(optionally a perceptual hash), the language and the preprocessing applied, so
+re-OCRing an unchanged window or page is a lookup. Full-frame results keep word
+boxes, which lets region-of-interest requests be answered from the cached frame.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    from PIL import Image, ImageOps
+
+    _PIL_AVAILABLE = True
+except ImportError:
+    _PIL_AVAILABLE = False
+
+from tools.ocr_tool import (
+    _PYTESSERACT_AVAILABLE,
+    _VISION_AVAILABLE,
+    _vision_ocr,
+    ocr_image,
+)
+
+if _PYTESSERACT_AVAILABLE:
+    import pytesseract  # type: ignore
+
+__all__ = ["OCRResult", "OCRService", "get_ocr_service"]
+
+DEFAULT_CACHE_DIR = Path.home() / ".atlas" / "cache" / "ocr"
+
+# Images larger than this (longest side, px) are downscaled before OCR
+MAX_OCR_SIDE = 3000
+# Images shorter than this (px) are upscaled; Tesseract struggles with small text
+MIN_OCR_HEIGHT = 300
+
+# Disk cache limits: total size and age of entries
+MAX_DISK_CACHE_BYTES = 128 * 1024 * 1024
+MAX_DISK_CACHE_AGE = 30 * 24 * 3600
+# The disk cache is pruned after this many writes
+PRUNE_EVERY = 64
+
+ImageInput = Union["Image.Image", str, Path]
+Box = Tuple[int, int, int, int]
+OCRResult = Dict[str, Any]
+Engine = Callable[["Image.Image", Optional[str]], OCRResult]
+
+
+def _prefers_vision(lang: Optional[str]) -> bool:
+    """Whether the default engine uses macOS Vision for *lang*.
+
+    Like :func:`tools.ocr_tool.ocr_image`, Vision is preferred when available;
+    an explicit language goes to Tesseract when it is installed.
+    """
+    return _VISION_AVAILABLE and (not lang or not _PYTESSERACT_AVAILABLE)
+
+
+def _default_engine(img: "Image.Image", lang: Optional[str]) -> OCRResult:
+    """Run OCR, returning text and (with Tesseract) word boxes."""
+    if not _PYTESSERACT_AVAILABLE:
+        return {"text": ocr_image(img), "words": None}
+    if _prefers_vision(lang):
+        try:
+            return {"text": _vision_ocr(img), "words": None}
+        except Exception:
+            pass  # fall back to Tesseract
+
+    kwargs = {"lang": lang} if lang else {}
+    data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT, **kwargs)
+    words = []
+    lines: "OrderedDict[Tuple[int, int, int], List[str]]" = OrderedDict()
+    for i, word in enumerate(data["text"]):
+        word = (word or "").strip()
+        if not word:
+            continue
+        line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(line_key, []).append(word)
+        words.append(
+            [data["left"][i], data["top"][i], data["width"][i], data["height"][i], word, list(line_key)]
+        )
+    text = "\n".join(" ".join(line) for line in lines.values())
+    return {"text": text, "words": words}
+
+
+def _load_image(image: ImageInput) -> "Image.Image":
+    if isinstance(image, (str, Path)):
+        img = Image.open(Path(image))
+        img.load()
+        return img
+    return image
+
+
+def content_hash(img: "Image.Image") -> str:
+    """Return a hash of the exact pixel content of *img*."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+def perceptual_hash(img: "Image.Image", hash_size: int = 16) -> str:
+    """Return a difference hash (dHash) of *img*, stable under tiny pixel noise."""
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"p{img.size[0]}x{img.size[1]}-{bits:0{hash_size * hash_size // 4}x}"
+
+
+def preprocess(img: "Image.Image") -> Tuple["Image.Image", float, str]:
+    """Choose and apply preprocessing based on image size.
+
+    Returns the processed image, the scale factor applied and a short name of
+    the steps (part of the cache key).
+    """
+    width, height = img.size
+    scale = 1.0
+    steps = []
+    if max(width, height) > MAX_OCR_SIDE:
+        scale = MAX_OCR_SIDE / max(width, height)
+        steps.append("down")
+    elif height < MIN_OCR_HEIGHT:
+        scale = min(3.0, MIN_OCR_HEIGHT / max(height, 1))
+        steps.append("up")
+    if scale != 1.0:
+        img = img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+    img = ImageOps.autocontrast(img.convert("L"))
+    # Large frames (screenshots, scans) are binarized; small crops keep greyscale
+    # anti-aliasing which Tesseract reads better
+    if width * height >= 1_000_000:
+        img = img.point(lambda p: 255 if p > 140 else 0, mode="1").convert("L")
+        steps.append("bin")
+    return img, scale, "+".join(steps) or "none"
+
+
+def _run_ocr(img: "Image.Image", lang: Optional[str], engine: Optional[Engine], do_preprocess: bool) -> OCRResult:
+    """OCR *img* and map word boxes back to original image coordinates."""
+    scale = 1.0
+    # Preprocessing is tuned for Tesseract; Vision gets the image as is
+    if do_preprocess and (engine is not None or not _prefers_vision(lang)):
+        img, scale, _ = preprocess(img)
+    result = (engine or _default_engine)(img, lang)
+    words = result.get("words")
+    if words and scale != 1.0:
+        result["words"] = [
+            [round(x / scale), round(y / scale), round(w / scale), round(h / scale), text, line]
+            for x, y, w, h, text, line in words
+        ]
+    return {"text": result.get("text", ""), "words": result.get("words")}
+
+
+def _ocr_worker(args: Tuple[Any, Optional[str], Optional[Engine], bool]) -> OCRResult:
+    image, lang, engine, do_preprocess = args
+    return _run_ocr(_load_image(image), lang, engine, do_preprocess)
+
+
+class OCRService:
+    """OCR front-end with memory/disk result caching and batch processing."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = DEFAULT_CACHE_DIR,
+        memory_size: int = 256,
+        engine: Optional[Engine] = None,
+        perceptual: bool = False,
+        do_preprocess: bool = True,
+        max_disk_bytes: int = MAX_DISK_CACHE_BYTES,
+        max_disk_age: float = MAX_DISK_CACHE_AGE,
+    ):
+        """Create the service.
+
+        Args:
+            cache_dir: Directory for the disk cache, or None for memory only.
+            memory_size: Number of results kept in memory.
+            engine: OCR callable ``(image, lang) -> {"text", "words"}``; defaults to
+                Tesseract with word boxes, or the best available backend.
+            perceptual: Key the cache by perceptual hash instead of exact content,
+                so visually identical frames with pixel noise share results.
+            do_preprocess: Apply size-dependent downscaling and binarization.
+            max_disk_bytes: Size limit of the disk cache; least recently used entries go first.
+            max_disk_age: Seconds after which an unused disk entry expires.
+        """
+        if not _PIL_AVAILABLE:
+            raise RuntimeError("PIL (Pillow) is not available. Cannot perform OCR.")
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_size = memory_size
+        self.engine = engine
+        self.perceptual = perceptual
+        self.do_preprocess = do_preprocess
+        self.max_disk_bytes = max_disk_bytes
+        self.max_disk_age = max_disk_age
+        self._writes_since_prune = 0
+        self._memory: "OrderedDict[str, OCRResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    # -- cache ---------------------------------------------------------
+
+    def cache_key(self, img: "Image.Image", lang: Optional[str] = None) -> str:
+        """Return the cache key for *img* OCRed in *lang*."""
+        image_hash = perceptual_hash(img) if self.perceptual else content_hash(img)
+        return f"{image_hash}-{lang or 'default'}-{'pre' if self.do_preprocess else 'raw'}"
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _cache_get(self, key: str) -> Optional[OCRResult]:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return result
+
+        path = self._disk_path(key)
+        if path is not None and path.exists():
+            try:
+                if time.time() - path.stat().st_mtime > self.max_disk_age:
+                    path.unlink()
+                    return None
+                result = json.loads(path.read_text(encoding="utf-8"))
+                # The modification time doubles as the last-use time for pruning
+                os.utime(path)
+            except (OSError, ValueError):
+                return None
+            self._remember(key, result)
+            with self._lock:
+                self.stats["disk_hits"] += 1
+            return result
+        return None
+
+    def _remember(self, key: str, result: OCRResult) -> None:
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _cache_put(self, key: str, result: OCRResult) -> None:
+        self._remember(key, result)
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(result), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            self._writes_since_prune += 1
+            due = self._writes_since_prune >= PRUNE_EVERY
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune_disk_cache()
+
+    def prune_disk_cache(self) -> int:
+        """Delete expired disk entries, then the least recently used beyond the size limit.
+
+        Returns:
+            The number of entries deleted.
+        """
+        if self.cache_dir is None or not self.cache_dir.is_dir():
+            return 0
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_disk_age and total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear_cache(self) -> None:
+        """Drop the in-memory cache (disk entries are kept)."""
+        with self._lock:
+            self._memory.clear()
+
+    # -- OCR -----------------------------------------------------------
+
+    def ocr_result(self, image: ImageInput, lang: Optional[str] = None) -> OCRResult:
+        """OCR *image* and return ``{"text", "words"}``, using the cache."""
+        img = _load_image(image)
+        key = self.cache_key(img, lang)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            self.stats["misses"] += 1
+        result = _run_ocr(img, lang, self.engine, self.do_preprocess)
+        self._cache_put(key, result)
+        return result
+
+    def ocr(self, image: ImageInput, lang: Optional[str] = None) -> str:
+        """Return recognized text for *image* (PIL image or file path)."""
+        return self.ocr_result(image, lang)["text"]
+
+    def ocr_many(
+        self,
+        images: Sequence[ImageInput],
+        lang: Optional[str] = None,
+        processes: Optional[int] = None,
+    ) -> List[str]:
+        """OCR several images, returning texts in input order.
+
+        Cached images are answered immediately; the rest are OCRed on a process
+        pool when *processes* > 1 (the engine must then be picklable).
+        """
+        loaded = [_load_image(image) for image in images]
+        keys = [self.cache_key(img, lang) for img in loaded]
+        results: List[Optional[OCRResult]] = [self._cache_get(key) for key in keys]
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        # Identical images in one batch are OCRed once
+        unique: "OrderedDict[str, int]" = OrderedDict()
+        for i in pending:
+            unique.setdefault(keys[i], i)
+
+        with self._lock:
+            self.stats["misses"] += len(unique)
+        jobs = [(loaded[i], lang, self.engine, self.do_preprocess) for i in unique.values()]
+        if processes and processes > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(processes, len(jobs))) as pool:
+                computed = list(pool.map(_ocr_worker, jobs))
+        else:
+            computed = [_ocr_worker(job) for job in jobs]
+
+        by_key = dict(zip(unique, computed))
+        for key, result in by_key.items():
+            self._cache_put(key, result)
+        return [(result if result is not None else by_key[keys[i]])["text"] for i, result in enumerate(results)]
+
+    def ocr_region(self, image: ImageInput, box: Box, lang: Optional[str] = None) -> str:
+        """Return text inside *box* ``(left, top, right, bottom)`` of *image*.
+
+        If the full frame is already cached with word boxes, words whose centre
+        falls inside the box are returned without another OCR pass; otherwise
+        only the crop is OCRed (and cached) on its own.
+        """
+        img = _load_image(image)
+        full = self._cache_get(self.cache_key(img, lang))
+        if full is None:
+            return self.ocr(img.crop(box), lang)
+        return self._region_text(img, full, box, lang)
+
+    def ocr_screen(self, box: Optional[Box] = None, lang: Optional[str] = None, max_age: float = 0.0) -> str:
+        """Return the text on the screen, or inside *box* ``(left, top, right, bottom)``.
+
+        The screen comes from the shared capture service; a frame captured
+        within *max_age* seconds is reused. The full-screen result is kept on
+        the frame, and unchanged successor frames share it, so a static screen
+        is neither hashed nor OCRed again. A *box* is answered from that result
+        when the frame has one; otherwise only the box is OCRed.
+        """
+        from tools.screen_capture import get_capture_service
+
+        frame = get_capture_service().frame(max_age)
+        key = ("ocr", lang, id(self))
+        if box is None:
+            return frame.cached(key, lambda f: self.ocr_result(f.to_image(), lang))["text"]
+        full = frame.peek(key)
+        if full is None:
+            return self.ocr(frame.to_image().crop(box), lang)
+        return self._region_text(frame.to_image(), full, box, lang)
+
+    def _region_text(self, img: "Image.Image", full: OCRResult, box: Box, lang: Optional[str]) -> str:
+        words = full.get("words")
+        if words is None:
+            return self.ocr(img.crop(box), lang)
+
+        left, top, right, bottom = box
+        lines: "OrderedDict[Tuple[int, ...], List[str]]" = OrderedDict()
+        for x, y, w, h, text, line in words:
+            cx, cy = x + w / 2, y + h / 2
+            if left <= cx < right and top <= cy < bottom:
+                lines.setdefault(tuple(line), []).append(text)
+        return "\n".join(" ".join(line) for line in lines.values())
+
+
+_ocr_service: Optional[OCRService] = None
+
+
+def get_ocr_service() -> OCRService:
+    """Return the shared OCR service."""
+    global _ocr_service
+    if _ocr_service is None:
+        _ocr_service = OCRService()
+    return _ocr_service
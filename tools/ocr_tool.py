@@ -1,12 +1,14 @@
 """OCR utilities for Atlas.
 
 Uses Vision framework on macOS when available, falling back to pytesseract.
+File, batch and region OCR go through :mod:`tools.ocr_service`, which caches
+results by image content.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 
 # Try to import PIL safely
 try:
@@ -31,7 +33,7 @@ try:
 except ImportError:
     _PYTESSERACT_AVAILABLE = False
 
-__all__ = ["ocr_file", "ocr_image"]
+__all__ = ["ocr_file", "ocr_image", "ocr_many", "ocr_region", "ocr_screen"]
 
 
 def _vision_ocr(img: Image.Image) -> str:
@@ -69,13 +71,61 @@ def ocr_image(img: Image.Image) -> str:
 
 
 def ocr_file(path: Path | str, *, lang: Optional[str] = None) -> str:
-    """OCR an image file at *path* and return text."""
+    """OCR an image file at *path* and return text (cached by content)."""
     if not _PIL_AVAILABLE:
         raise RuntimeError(
             "PIL (Pillow) is not available. Cannot open image files for OCR."
         )
 
-    img = Image.open(Path(path))
-    if lang and _PYTESSERACT_AVAILABLE:
-        return pytesseract.image_to_string(img, lang=lang)
-    return ocr_image(img)
+    from tools.ocr_service import get_ocr_service
+
+    return get_ocr_service().ocr(Path(path), lang)
+
+
+def ocr_many(
+    images: Sequence[Image.Image | Path | str],
+    *,
+    lang: Optional[str] = None,
+    processes: Optional[int] = None,
+) -> List[str]:
+    """OCR several images or files, returning texts in input order."""
+    if not _PIL_AVAILABLE:
+        raise RuntimeError("PIL (Pillow) is not available. Cannot perform OCR.")
+
+    from tools.ocr_service import get_ocr_service
+
+    return get_ocr_service().ocr_many(images, lang, processes)
+
+
+def ocr_region(
+    image: Image.Image | Path | str,
+    box: Tuple[int, int, int, int],
+    *,
+    lang: Optional[str] = None,
+) -> str:
+    """Return text inside *box* (left, top, right, bottom), reusing a cached full-frame OCR if there is one."""
+    if not _PIL_AVAILABLE:
+        raise RuntimeError("PIL (Pillow) is not available. Cannot perform OCR.")
+
+    from tools.ocr_service import get_ocr_service
+
+    return get_ocr_service().ocr_region(image, box, lang)
+
+
+def ocr_screen(
+    box: Optional[Tuple[int, int, int, int]] = None,
+    *,
+    lang: Optional[str] = None,
+    max_age: float = 0.0,
+) -> str:
+    """Return text on the screen or inside *box* (left, top, right, bottom).
+
+    Uses the shared screen capture service; results are reused while the
+    screen does not change.
+    """
+    if not _PIL_AVAILABLE:
+        raise RuntimeError("PIL (Pillow) is not available. Cannot perform OCR.")
+
+    from tools.ocr_service import get_ocr_service
+
+    return get_ocr_service().ocr_screen(box, lang, max_age)
@@ -1,18 +1,387 @@
+"""
+PDF text extraction for Atlas.
+
+Pages are streamed one at a time (optionally across a process pool, keeping
+page order) and their text is cached on disk per (file hash, page), so
+re-reading a document or part of it does not parse the PDF again.
+"""
+
+import contextlib
+import functools
+import hashlib
 import os
-from typing import Any, Dict
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 try:
     import PyPDF2
 except ImportError:
     PyPDF2 = None
 
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.atlas/cache/pdf_pages.sqlite3")
+
+# Below this many uncached pages extraction stays in-process
+PARALLEL_PAGE_THRESHOLD = 32
 
-def extract_pdf_text(file_path: str) -> Dict[str, Any]:
+PageSelection = Union[str, Iterable[int], None]
+
+
+def _page_images(page) -> List[Any]:
+    """Return embedded images of *page* as PIL images (empty if unsupported)."""
+    try:
+        return [image.image for image in page.images if getattr(image, "image", None) is not None]
+    except Exception:
+        return []
+
+
+def parse_page_spec(spec: str, page_count: int) -> List[int]:
+    """
+    Parse a 1-based page specification such as ``"1-5,8,10-"``.
+
+    Args:
+        spec: Comma separated page numbers and ranges (open ends allowed)
+        page_count: Number of pages in the document
+
+    Returns:
+        List[int]: Sorted 0-based page indexes within the document
+    """
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, _, end = part.partition("-")
+            first = int(start) if start.strip() else 1
+            last = int(end) if end.strip() else page_count
+        else:
+            first = last = int(part)
+        pages.update(range(max(first, 1) - 1, min(last, page_count)))
+    return sorted(pages)
+
+
+def file_hash(file_path: str) -> str:
+    """Hash a file's content without loading it into memory at once."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PDFPageCache:
+    """SQLite cache of extracted page text keyed by (file hash, page, variant)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Database file path, or ":memory:" for an in-memory cache
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    file_hash TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    variant TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (file_hash, page, variant)
+                );
+                CREATE TABLE IF NOT EXISTS documents (
+                    file_hash TEXT PRIMARY KEY,
+                    page_count INTEGER NOT NULL
+                );
+                """
+            )
+        # (path, mtime, size) -> content hash, so unchanged files are hashed once
+        self._hashes: Dict[Tuple[str, float, int], str] = {}
+
+    def hash_file(self, file_path: str) -> str:
+        """Return the content hash of a file, memoized by path, mtime and size."""
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime, stat.st_size)
+        digest = self._hashes.get(key)
+        if digest is None:
+            digest = self._hashes[key] = file_hash(file_path)
+        return digest
+
+    def get_page_count(self, digest: str) -> Optional[int]:
+        """Get the cached page count of a document."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_count FROM documents WHERE file_hash = ?", (digest,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, digest: str, page_count: int) -> None:
+        """Remember the page count of a document."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?)", (digest, page_count))
+
+    def get_pages(self, digest: str, variant: str, pages: Sequence[int]) -> Dict[int, str]:
+        """Return cached text of the requested pages that are present."""
+        found: Dict[int, str] = {}
+        with self._lock:
+            # Stay well below SQLite's host parameter limit
+            for start in range(0, len(pages), 500):
+                chunk = list(pages[start : start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT page, text FROM pages WHERE file_hash = ? AND variant = ? AND page IN ({placeholders})",
+                    [digest, variant, *chunk],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_pages(self, digest: str, variant: str, texts: Iterable[Tuple[int, str]]) -> None:
+        """Store extracted page text."""
+        rows = [(digest, page, variant, text) for page, text in texts]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", rows)
+
+    def clear(self) -> None:
+        """Remove all cached pages."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM documents")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_page_cache: Optional[PDFPageCache] = None
+
+
+def get_pdf_page_cache() -> PDFPageCache:
+    """Return the shared page cache."""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PDFPageCache()
+    return _page_cache
+
+
+def _extract_page_range(file_path: str, pages: Sequence[int]) -> List[str]:
+    """Extract the text of *pages* (runs in worker processes)."""
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[index].extract_text() or "" for index in pages]
+
+
+def _ocr_pages(file_path: str, texts: Dict[int, str], ocr_lang: Optional[str]) -> None:
+    """Replace the text of pages without a text layer by OCR of their images."""
+    empty = [index for index, text in texts.items() if not text.strip()]
+    if not empty:
+        return
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        scanned = {index: _page_images(reader.pages[index]) for index in empty}
+    images = [image for page_images in scanned.values() for image in page_images]
+    if not images:
+        return
+
+    from tools.ocr_service import get_ocr_service
+
+    ocr_texts = iter(get_ocr_service().ocr_many(images, ocr_lang))
+    for index, page_images in scanned.items():
+        texts[index] = "\n".join(next(ocr_texts) for _ in page_images)
+
+
+def _chunks(pages: List[int], count: int) -> List[List[int]]:
+    size = max(1, -(-len(pages) // count))
+    return [pages[i : i + size] for i in range(0, len(pages), size)]
+
+
+def _select_pages(pages: PageSelection, page_count: int) -> List[int]:
+    """Resolve a page selection to sorted 0-based indexes within the document."""
+    if pages is None:
+        return list(range(page_count))
+    if isinstance(pages, str):
+        return parse_page_spec(pages, page_count)
+    return sorted({index for index in pages if 0 <= index < page_count})
+
+
+def _page_count(file_path: str, cache: Optional[PDFPageCache], digest: Optional[str]) -> int:
+    """Return the number of pages, from the cache when it is known."""
+    page_count = cache.get_page_count(digest) if cache else None
+    if page_count is None:
+        with open(file_path, "rb") as f:
+            page_count = len(PyPDF2.PdfReader(f).pages)
+        if cache:
+            cache.set_page_count(digest, page_count)
+    return page_count
+
+
+def _read_pages(reader, pages: Sequence[int]) -> List[str]:
+    return [reader.pages[index].extract_text() or "" for index in pages]
+
+
+def _extract_batches(
+    file_path: str, batches: List[List[int]], processes: int
+) -> Iterator[Tuple[List[int], Callable[[], List[str]]]]:
+    """
+    Yield each batch in order with a callable returning the text of its pages.
+
+    With ``processes`` > 1 every batch is submitted to a process pool up front;
+    otherwise the PDF is opened once and batches are read on demand.
+    """
+    if not batches:
+        return
+    if processes <= 1:
+        with open(file_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            for batch in batches:
+                yield batch, functools.partial(_read_pages, reader, batch)
+        return
+
+    # Not a ``with`` block: leaving one waits for the running extractions, and
+    # a consumer that stops early should not have to
+    pool = ProcessPoolExecutor(max_workers=processes)
+    try:
+        futures = [pool.submit(_extract_page_range, file_path, batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            yield batch, future.result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pdf_pages(
+    file_path: str,
+    pages: PageSelection = None,
+    processes: Optional[int] = None,
+    use_cache: bool = True,
+    cache: Optional[PDFPageCache] = None,
+    ocr_scanned: bool = False,
+    ocr_lang: Optional[str] = None,
+    batch_size: int = 16,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield ``(page_index, text)`` for the selected pages, in page order.
+
+    Pages are extracted in batches: cached pages are returned without opening
+    the PDF, and with ``processes`` > 1 uncached pages are split into ranges
+    extracted on a process pool. Batches are yielded as soon as they are ready,
+    so the first pages are available before the document is finished.
+
+    Args:
+        file_path: Path to the PDF file.
+        pages: 0-based page indexes, a 1-based spec such as ``"1-5,8"``, or
+            None for all pages.
+        processes: Worker processes for uncached pages (None or 1: in-process).
+        use_cache: Read and write the per-page disk cache.
+        cache: Page cache to use instead of the shared one.
+        ocr_scanned: OCR embedded images of pages that have no text layer.
+        ocr_lang: Optional Tesseract language for scanned pages.
+        batch_size: Pages extracted per batch in sequential mode.
+    """
+    if PyPDF2 is None:
+        raise RuntimeError("PyPDF2 is not installed.")
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    cache = (cache or get_pdf_page_cache()) if use_cache else None
+    variant = f"ocr:{ocr_lang or 'default'}" if ocr_scanned else "text"
+    digest = cache.hash_file(file_path) if cache else None
+
+    selected = _select_pages(pages, _page_count(file_path, cache, digest))
+    cached = cache.get_pages(digest, variant, selected) if cache else {}
+    missing = [index for index in selected if index not in cached]
+
+    def finish(batch: List[int], texts: List[str]) -> Dict[int, str]:
+        extracted = dict(zip(batch, texts))
+        if ocr_scanned:
+            _ocr_pages(file_path, extracted, ocr_lang)
+        if cache:
+            cache.put_pages(digest, variant, extracted.items())
+        return extracted
+
+    def emit_until(limit: Optional[int], ready: Dict[int, str]) -> Iterator[Tuple[int, str]]:
+        # Yield selected pages in order up to (excluding) the first missing page >= limit
+        nonlocal position
+        while position < len(selected) and (limit is None or selected[position] < limit):
+            index = selected[position]
+            yield index, ready.pop(index) if index in ready else cached.pop(index)
+            position += 1
+
+    position = 0
+    ready: Dict[int, str] = {}
+    if processes and processes > 1 and len(missing) >= PARALLEL_PAGE_THRESHOLD:
+        batches = _chunks(missing, processes * 2)
+    else:
+        processes = 1
+        batches = [missing[start : start + batch_size] for start in range(0, len(missing), batch_size)]
+    with contextlib.closing(_extract_batches(file_path, batches, processes)) as extracted:
+        for batch, texts in extracted:
+            yield from emit_until(batch[0], ready)
+            ready.update(finish(batch, texts()))
+    yield from emit_until(None, ready)
+
+
+def _slice_bytes(
+    chunks: Iterator[str], start: int, end: Optional[int]
+) -> Tuple[str, bool]:
+    """Join a stream of text, keeping only UTF-8 bytes ``[start, end)``.
+
+    Returns the text and whether the stream was stopped early.
+    """
+    parts: List[bytes] = []
+    offset = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        chunk_end = offset + len(data)
+        if chunk_end > start:
+            parts.append(data[max(0, start - offset) : None if end is None else max(0, end - offset)])
+        offset = chunk_end
+        if end is not None and offset >= end:
+            return b"".join(parts).decode("utf-8", "ignore"), True
+    return b"".join(parts).decode("utf-8", "ignore"), False
+
+
+def extract_pdf_text(
+    file_path: str,
+    ocr_scanned: bool = False,
+    ocr_lang: Optional[str] = None,
+    pages: PageSelection = None,
+    byte_range: Optional[Tuple[int, Optional[int]]] = None,
+    processes: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
     """
     Extract text from a PDF file using PyPDF2.
 
     Args:
         file_path: Path to the PDF file.
+        ocr_scanned: OCR embedded images of pages that have no text layer
+            (scanned pages) through the cached OCR service.
+        ocr_lang: Optional Tesseract language for scanned pages.
+        pages: 0-based page indexes or a 1-based spec such as ``"1-5,8"``.
+        byte_range: ``(start, end)`` UTF-8 byte offsets into the extracted text
+            (``end`` may be None); pages after ``end`` are not extracted.
+        processes: Worker processes for page-parallel extraction.
+        use_cache: Use the per-page disk cache.
     Returns:
         A dict with 'status', 'text', and 'error' (if any).
     """
@@ -21,9 +390,25 @@ def extract_pdf_text(file_path: str) -> Dict[str, Any]:
     if not os.path.exists(file_path):
         return {"status": "error", "error": f"File not found: {file_path}"}
     try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            text = "\n".join(page.extract_text() or "" for page in reader.pages)
-        return {"status": "success", "text": text}
+        page_iter = iter_pdf_pages(
+            file_path,
+            pages=pages,
+            processes=processes,
+            use_cache=use_cache,
+            ocr_scanned=ocr_scanned,
+            ocr_lang=ocr_lang,
+        )
+        returned = []
+
+        def texts() -> Iterator[str]:
+            for number, (index, text) in enumerate(page_iter):
+                returned.append(index)
+                yield text if number == 0 else "\n" + text
+
+        start, end = byte_range or (0, None)
+        text, truncated = _slice_bytes(texts(), start, end)
+        page_iter.close()
+
+        return {"status": "success", "text": text, "pages": returned, "truncated": truncated}
     except Exception as e:
         return {"status": "error", "error": str(e)}
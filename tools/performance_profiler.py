@@ -2,19 +2,32 @@
 """
 Performance Profiler Tool for Atlas
 Analyzes code performance, bottlenecks, and optimization opportunities
+
+The static pass runs one combined regular expression and one AST walk per
+file across a process pool. The runtime mode is a sampling profiler that
+periodically captures the interpreter's stacks and aggregates them into
+flame-graph compatible collapsed stacks and FunctionProfile records.
 """
 
 import ast
+import functools
 import logging
+import os
 import re
+import signal
+import sys
+import threading
+import time
 import tracemalloc
-from collections import defaultdict
+from collections import Counter, defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import psutil
 
+from tools.code_index import IncrementalIndexer
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,6 +99,10 @@ class PerformanceProfiler:
             "unused",
             "monitoring/logs",
         }
+        self.max_workers = None  # Defaults to the CPU count
+        self.sampling_interval = 0.005
+        self.runtime_profile_duration = 5.0
+        self.last_runtime_profile: Optional["SamplingProfiler"] = None
 
         # Performance issue patterns
         self.performance_patterns = {
@@ -183,18 +200,18 @@ class PerformanceProfiler:
 
     def _analyze_static_performance(self) -> List[PerformanceIssue]:
         """Analyze code for static performance issues."""
-        issues = []
-
-        # Find all Python files
-        python_files = [
-            f
-            for f in self.root_path.rglob("*.py")
-            if not any(excluded in f.parts for excluded in self.excluded_dirs)
-        ]
+        indexer = IncrementalIndexer(
+            self.root_path,
+            functools.partial(scan_file_worker, StaticScanner(self.performance_patterns)),
+            excluded_dirs=self.excluded_dirs,
+            max_workers=self.max_workers,
+        )
 
-        for file_path in python_files:
-            file_issues = self._analyze_file_performance(file_path)
-            issues.extend(file_issues)
+        # Every file is scanned; the indexer provides the walk and the process pool
+        issues = []
+        for kind, payload in indexer.run(sorted(indexer.scan()), {}):
+            if kind == "analysis":
+                issues.extend(payload)
 
         return sorted(
             issues,
@@ -203,89 +220,22 @@ class PerformanceProfiler:
 
     def _analyze_file_performance(self, file_path: Path) -> List[PerformanceIssue]:
         """Analyze a single file for performance issues."""
-        issues = []
-
         try:
             with open(file_path, encoding="utf-8") as f:
                 content = f.read()
-                lines = content.split("\n")
-
-            # Pattern-based analysis
-            for category, config in self.performance_patterns.items():
-                for pattern in config["patterns"]:
-                    for line_num, line in enumerate(lines, 1):
-                        if re.search(pattern, line):
-                            # Check if it's in a loop context for certain patterns
-                            in_loop = self._is_in_loop_context(lines, line_num)
-
-                            # Adjust severity based on context
-                            severity = config["severity"]
-                            description = config["description"]
-                            if (
-                                category
-                                in ["memory_inefficient", "expensive_operations"]
-                                and in_loop
-                            ):
-                                severity = "critical" if severity == "high" else "high"
-                                description += " (in loop context)"
-
-                            issue = PerformanceIssue(
-                                file_path=str(file_path.relative_to(self.root_path)),
-                                line_number=line_num,
-                                issue_type=category,
-                                severity=severity,
-                                description=description,
-                                suggestion=config["suggestion"],
-                                impact_estimate=self._estimate_impact(
-                                    category, in_loop
-                                ),
-                                code_snippet=line.strip(),
-                            )
-                            issues.append(issue)
-
-            # AST-based analysis for more complex patterns
-            ast_issues = self._analyze_ast_performance(file_path, content)
-            issues.extend(ast_issues)
-
+            relative_path = str(file_path.relative_to(self.root_path))
+            return StaticScanner(self.performance_patterns).scan(relative_path, content)
         except Exception as e:
             self.logger.warning(f"Could not analyze performance for {file_path}: {e}")
-
-        return issues
+            return []
 
     def _is_in_loop_context(self, lines: List[str], line_num: int) -> bool:
         """Check if a line is within a loop context."""
-        # Look backwards for loop keywords
-        loop_keywords = ["for ", "while "]
-        indent_level = len(lines[line_num - 1]) - len(lines[line_num - 1].lstrip())
-
-        for i in range(max(0, line_num - 20), line_num):
-            line = lines[i]
-            line_indent = len(line) - len(line.lstrip())
-
-            if line_indent < indent_level and any(
-                keyword in line for keyword in loop_keywords
-            ):
-                return True
-
-        return False
+        return indentation_loop_context(lines, line_num)
 
     def _estimate_impact(self, category: str, in_loop: bool) -> str:
         """Estimate the performance impact of an issue."""
-        impact_map = {
-            "blocking_calls": "High - Can freeze application",
-            "inefficient_loops": "Medium - O(n) to O(n²) increase",
-            "memory_inefficient": "Medium - Increased memory usage",
-            "expensive_operations": "High - CPU intensive",
-            "database_antipatterns": "Critical - Database performance",
-        }
-
-        base_impact = impact_map.get(category, "Unknown")
-        if in_loop:
-            base_impact = (
-                "Critical - " + base_impact + " (multiplied by loop iterations)"
-            )
-
-        return base_impact
+        return estimate_impact(category, in_loop)
 
     def _analyze_ast_performance(
         self, file_path: Path, content: str
@@ -389,19 +339,47 @@ class PerformanceProfiler:
             return {"error": str(e)}
 
     def _profile_runtime_performance(self) -> List[FunctionProfile]:
-        """Profile runtime performance of key functions."""
+        """Profile runtime performance of the running process by stack sampling."""
         profiles = []
 
         try:
-            # This would need to be integrated with actual Atlas runtime
-            # For now, return empty list as it requires runtime execution
-            self.logger.info("Runtime profiling requires actual execution context")
-
+            sampler = self.profile_runtime(self.runtime_profile_duration)
+            profiles = sampler.function_profiles(limit=50)
         except Exception as e:
             self.logger.error(f"Error in runtime profiling: {e}")
 
         return profiles
 
+    def profile_runtime(
+        self, duration: float = 5.0, output_path: Optional[str] = None, mode: str = "thread"
+    ) -> "SamplingProfiler":
+        """
+        Sample the stacks of the running process for a while.
+
+        The calling thread waits while the others are sampled.
+
+        Args:
+            duration: Seconds to sample for
+            output_path: Optional file to write collapsed stacks to
+            mode: Sampling mode (see SamplingProfiler)
+
+        Returns:
+            SamplingProfiler: The stopped profiler with the collected samples
+        """
+        sampler = SamplingProfiler(
+            interval=self.sampling_interval,
+            mode=mode,
+            exclude_threads={threading.get_ident()},
+        )
+        with sampler:
+            time.sleep(duration)
+        self.last_runtime_profile = sampler
+
+        if output_path:
+            sampler.write_collapsed(output_path)
+            self.logger.info(f"Collapsed stacks written to {output_path}")
+        return sampler
+
     def _generate_performance_recommendations(
         self, issues: List[PerformanceIssue], system_metrics: Dict[str, Any]
     ) -> List[str]:
@@ -515,9 +493,9 @@ Process Memory: {system_metrics.get("process", {}).get("memory_mb", "N/A"):.1f}
             return "Moderate performance. Optimization recommended."
         return "Poor performance. Immediate optimization required."
 
-    def generate_performance_report(self) -> str:
+    def generate_performance_report(self, profile_runtime: bool = False) -> str:
         """Generate comprehensive performance report."""
-        analysis = self.analyze_performance()
+        analysis = self.analyze_performance(profile_runtime=profile_runtime)
 
         report = []
         report.append("⚡ **Atlas Performance Analysis Report**\n")
@@ -539,28 +517,7 @@ Process Memory: {system_metrics.get("process", {}).get("memory_mb", "N/A"):.1f}
                 report.append("")
 
         # Performance Hotspots
-        issue_categories = defaultdict(list)
-        for issue in analysis.issues:
-            issue_categories[issue.issue_type].append(issue)
-
-        if issue_categories:
-            report.append("## 🔥 **Performance Hotspots**")
-            for category, issues in sorted(
-                issue_categories.items(), key=lambda x: len(x[1]), reverse=True
-            ):
-                report.append(
-                    f"**{category.replace('_', ' ').title()}**: {len(issues)} issues"
-                )
-                # Show top 3 files with most issues in this category
-                file_counts = defaultdict(int)
-                for issue in issues:
-                    file_counts[issue.file_path] += 1
-
-                for file_path, count in sorted(
-                    file_counts.items(), key=lambda x: x[1], reverse=True
-                )[:3]:
-                    report.append(f"  - `{file_path}`: {count} issues")
-            report.append("")
+        report.extend(self._format_hotspots(analysis.issues))
 
         # System Performance
         if analysis.system_metrics:
@@ -580,6 +537,9 @@ Process Memory: {system_metrics.get("process", {}).get("memory_mb", "N/A"):.1f}
             )
             report.append("")
 
+        # Runtime hot spots (when runtime profiling was requested)
+        report.extend(self._format_runtime_hotspots(analysis.function_profiles))
+
         # Recommendations
         if analysis.recommendations:
             report.append("## 💡 **Performance Optimization Recommendations**")
@@ -590,51 +550,131 @@ Process Memory: {system_metrics.get("process", {}).get("memory_mb", "N/A"):.1f}
         return "\n".join(report)
 
 
+    def _format_hotspots(self, issues: List[PerformanceIssue]) -> List[str]:
+        """Format issue counts per category with the files that have the most of them."""
+        issue_categories = defaultdict(list)
+        for issue in issues:
+            issue_categories[issue.issue_type].append(issue)
+        if not issue_categories:
+            return []
+
+        lines = ["## 🔥 **Performance Hotspots**"]
+        for category, category_issues in sorted(issue_categories.items(), key=lambda x: len(x[1]), reverse=True):
+            lines.append(f"**{category.replace('_', ' ').title()}**: {len(category_issues)} issues")
+            # Show top 3 files with most issues in this category
+            file_counts = defaultdict(int)
+            for issue in category_issues:
+                file_counts[issue.file_path] += 1
+            for file_path, count in sorted(file_counts.items(), key=lambda x: x[1], reverse=True)[:3]:
+                lines.append(f"  - `{file_path}`: {count} issues")
+        lines.append("")
+        return lines
+
+    def _format_runtime_hotspots(self, profiles: List[FunctionProfile]) -> List[str]:
+        """Format the functions with the highest cumulative runtime."""
+        if not profiles:
+            return []
+        lines = ["## ⏱️ **Runtime Hot Spots**"]
+        for profile in profiles[:10]:
+            lines.append(
+                f"- `{profile.name}` ({profile.file_path}:{profile.line_number}): "
+                f"{profile.cumulative_time:.3f}s cumulative, {profile.total_time:.3f}s self"
+            )
+        lines.append("")
+        return lines
+
+
 class PerformanceASTAnalyzer(ast.NodeVisitor):
-    """AST analyzer for complex performance patterns."""
+    """AST analyzer for complex performance patterns.
+
+    A single walk tracks loop depth, records the line span of every loop body
+    and accumulates the decision points of all enclosing functions.
+    """
 
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.issues = []
         self.loop_depth = 0
         self.function_complexity = defaultdict(int)
+        self.loop_spans: List[Tuple[int, int]] = []
+        # [function node, complexity] for every enclosing function
+        self._function_stack: List[List[Any]] = []
+
+    def _count_decision(self):
+        for frame in self._function_stack:
+            frame[1] += 1
+
+    def _visit_loop(self, node):
+        self.loop_depth += 1
+        if node.body:
+            end = getattr(node.body[-1], "end_lineno", None) or node.body[-1].lineno
+            self.loop_spans.append((node.body[0].lineno, end))
+        self.generic_visit(node)
+        self.loop_depth -= 1
+
+    def loop_depth_by_line(self, line_count: int) -> List[int]:
+        """Return the loop nesting depth of every line (index 0 is line 1)."""
+        delta = [0] * (line_count + 2)
+        for start, end in self.loop_spans:
+            delta[min(start, line_count + 1) - 1] += 1
+            delta[min(end, line_count + 1)] -= 1
+        depths = []
+        depth = 0
+        for i in range(line_count):
+            depth += delta[i]
+            depths.append(depth)
+        return depths
 
     def visit_For(self, node):
         """Analyze for loops."""
-        self.loop_depth += 1
+        self._count_decision()
 
         # Check for nested loops
-        if self.loop_depth > 2:
+        if self.loop_depth + 1 > 2:
             self.issues.append(
                 PerformanceIssue(
                     file_path=self.file_path,
                     line_number=node.lineno,
                     issue_type="nested_loops",
                     severity="high",
-                    description=f"Deeply nested loop (depth: {self.loop_depth})",
+                    description=f"Deeply nested loop (depth: {self.loop_depth + 1})",
                     suggestion="Consider breaking into separate functions or using more efficient algorithms",
                     impact_estimate="High - O(n³) or worse complexity",
-                    code_snippet=f"Nested loop at depth {self.loop_depth}",
+                    code_snippet=f"Nested loop at depth {self.loop_depth + 1}",
                 )
             )
 
-        self.generic_visit(node)
-        self.loop_depth -= 1
+        self._visit_loop(node)
+
+    def visit_AsyncFor(self, node):
+        """Analyze async for loops."""
+        self._visit_loop(node)
 
     def visit_While(self, node):
         """Analyze while loops."""
-        self.loop_depth += 1
+        self._count_decision()
+        self._visit_loop(node)
+
+    def visit_If(self, node):
+        """Count branches towards function complexity."""
+        self._count_decision()
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        """Count exception handlers towards function complexity."""
+        self._count_decision()
         self.generic_visit(node)
-        self.loop_depth -= 1
 
     def visit_FunctionDef(self, node):
         """Analyze function complexity."""
-        # Count decision points
-        complexity = 1
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                complexity += 1
+        # Decision points are counted while the body is walked
+        frame = [node, 1]
+        self._function_stack.append(frame)
+        self.generic_visit(node)
+        self._function_stack.pop()
 
+        complexity = frame[1]
+        self.function_complexity[node.name] = complexity
         if complexity > 20:
             self.issues.append(
                 PerformanceIssue(
@@ -649,7 +689,339 @@ class PerformanceASTAnalyzer(ast.NodeVisitor):
                 )
             )
 
-        self.generic_visit(node)
+
+def indentation_loop_context(lines: List[str], line_num: int) -> bool:
+    """Check if a line is within a loop context using indentation only."""
+    # Look backwards for loop keywords
+    loop_keywords = ["for ", "while "]
+    indent_level = len(lines[line_num - 1]) - len(lines[line_num - 1].lstrip())
+
+    for i in range(max(0, line_num - 20), line_num):
+        line = lines[i]
+        line_indent = len(line) - len(line.lstrip())
+
+        if line_indent < indent_level and any(
+            keyword in line for keyword in loop_keywords
+        ):
+            return True
+
+    return False
+
+
+class StaticScanner:
+    """Finds pattern and AST performance issues with one pass of each per file.
+
+    All patterns are merged into one compiled alternation that is run over the
+    whole file; only lines it hits are checked against the individual patterns.
+    Loop context comes from the AST walk instead of re-scanning lines.
+    """
+
+    def __init__(self, performance_patterns: Dict[str, Dict[str, Any]]):
+        self.rules: List[Tuple[str, Dict[str, Any], "re.Pattern"]] = []
+        for category, config in performance_patterns.items():
+            for pattern in config["patterns"]:
+                self.rules.append((category, config, re.compile(pattern)))
+        self.combined = re.compile(
+            "|".join(f"(?:{rule[2].pattern})" for rule in self.rules), re.MULTILINE
+        )
+
+    def candidate_lines(self, content: str) -> List[int]:
+        """Return the (1-based) numbers of lines any pattern may match."""
+        line_numbers = []
+        line_num = 1
+        position = 0
+        for match in self.combined.finditer(content):
+            line_num += content.count("\n", position, match.start())
+            position = match.start()
+            if not line_numbers or line_numbers[-1] != line_num:
+                line_numbers.append(line_num)
+        return line_numbers
+
+    def scan(self, relative_path: str, content: str) -> List[PerformanceIssue]:
+        """Return the performance issues of one file."""
+        lines = content.split("\n")
+
+        loop_depths: Optional[List[int]] = None
+        ast_issues: List[PerformanceIssue] = []
+        try:
+            tree = ast.parse(content)
+            analyzer = PerformanceASTAnalyzer(relative_path)
+            analyzer.visit(tree)
+            ast_issues = analyzer.issues
+            loop_depths = analyzer.loop_depth_by_line(len(lines))
+        except (SyntaxError, ValueError, RecursionError):
+            pass  # Pattern checks still apply; loop context falls back to indentation
+
+        found = []
+        for line_num in self.candidate_lines(content):
+            line = lines[line_num - 1]
+            for rule_index, (category, config, pattern) in enumerate(self.rules):
+                if not pattern.search(line):
+                    continue
+                if loop_depths is not None:
+                    in_loop = loop_depths[line_num - 1] > 0
+                else:
+                    in_loop = indentation_loop_context(lines, line_num)
+
+                # Adjust severity based on context
+                severity = config["severity"]
+                description = config["description"]
+                if category in ["memory_inefficient", "expensive_operations"] and in_loop:
+                    severity = "critical" if severity == "high" else "high"
+                    description += " (in loop context)"
+
+                found.append(
+                    (
+                        rule_index,
+                        PerformanceIssue(
+                            file_path=relative_path,
+                            line_number=line_num,
+                            issue_type=category,
+                            severity=severity,
+                            description=description,
+                            suggestion=config["suggestion"],
+                            impact_estimate=estimate_impact(category, in_loop),
+                            code_snippet=line.strip(),
+                        ),
+                    )
+                )
+
+        # Same order as checking pattern by pattern
+        found.sort(key=lambda item: (item[0], item[1].line_number))
+        return [issue for _, issue in found] + ast_issues
+
+
+def estimate_impact(category: str, in_loop: bool) -> str:
+    """Estimate the performance impact of an issue."""
+    impact_map = {
+        "blocking_calls": "High - Can freeze application",
+        "inefficient_loops": "Medium - O(n) to O(n²) increase",
+        "memory_inefficient": "Medium - Increased memory usage",
+        "expensive_operations": "High - CPU intensive",
+        "database_antipatterns": "Critical - Database performance",
+    }
+
+    base_impact = impact_map.get(category, "Unknown")
+    if in_loop:
+        base_impact = "Critical - " + base_impact + " (multiplied by loop iterations)"
+
+    return base_impact
+
+
+def scan_file_worker(
+    scanner: StaticScanner, root: str, relative_path: str, known_hash: Optional[str] = None
+) -> Tuple[str, Any]:
+    """Scan one file (runs in worker processes)."""
+    try:
+        with open(os.path.join(root, relative_path), encoding="utf-8") as f:
+            content = f.read()
+        return "analysis", scanner.scan(relative_path, content)
+    except Exception as e:
+        logger.warning(f"Could not analyze performance for {relative_path}: {e}")
+        return "skipped", relative_path
+
+
+class SamplingProfiler:
+    """Low-overhead statistical profiler for the running process.
+
+    Stacks are captured every ``interval`` seconds and counted; nothing is
+    traced between samples. Two modes are available:
+
+    - ``"thread"``: a daemon thread samples every thread of the process via
+      ``sys._current_frames()`` (wall-clock time, works everywhere).
+    - ``"signal"``: ``SIGPROF`` driven by ``ITIMER_PROF`` samples the main thread
+      on CPU time (Unix only, must be started from the main thread; falls back
+      to thread mode otherwise).
+
+    Results are available as flame-graph compatible collapsed stacks and as
+    FunctionProfile records.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        mode: str = "thread",
+        max_depth: int = 128,
+        exclude_threads: Iterable[int] = (),
+    ):
+        if mode not in ("thread", "signal"):
+            raise ValueError(f"Unknown sampling mode: {mode}")
+        self.interval = interval
+        self.mode = mode
+        self.max_depth = max_depth
+        self.exclude_threads: Set[int] = set(exclude_threads)
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._previous_handler = None
+        self._started_at: Optional[float] = None
+        self._elapsed = 0.0
+        self.running = False
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self) -> None:
+        """Start sampling."""
+        if self.running:
+            return
+        if self.mode == "signal" and (
+            not hasattr(signal, "SIGPROF")
+            or threading.current_thread() is not threading.main_thread()
+        ):
+            logger.warning("Signal sampling unavailable here; using thread sampling")
+            self.mode = "thread"
+
+        self._started_at = time.perf_counter()
+        self.running = True
+        if self.mode == "signal":
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._sample_loop, name="SamplingProfiler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling (collected samples are kept)."""
+        if not self.running:
+            return
+        if self.mode == "signal":
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        else:
+            self._stop_event.set()
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+        self._elapsed += time.perf_counter() - self._started_at
+        self.running = False
+
+    def reset(self) -> None:
+        """Discard collected samples."""
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self._elapsed = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent sampling."""
+        if self.running:
+            return self._elapsed + time.perf_counter() - self._started_at
+        return self._elapsed
+
+    def _stack_of(self, frame) -> Tuple[Any, ...]:
+        codes = []
+        while frame is not None and len(codes) < self.max_depth:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        return tuple(codes)
+
+    def _on_signal(self, signum, frame):
+        # Runs between bytecodes of the main thread; no locking needed
+        if frame is not None:
+            self._stacks[self._stack_of(frame)] += 1
+        self.samples += 1
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        next_sample = time.perf_counter()
+        while not self._stop_event.is_set():
+            stacks = [
+                self._stack_of(frame)
+                for ident, frame in sys._current_frames().items()
+                if ident != own and ident not in self.exclude_threads
+            ]
+            with self._lock:
+                for stack in stacks:
+                    self._stacks[stack] += 1
+                self.samples += 1
+
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay < 0:
+                # Fell behind; do not try to catch up with a burst of samples
+                next_sample = time.perf_counter()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def _snapshot(self) -> Dict[Tuple[Any, ...], int]:
+        with self._lock:
+            return dict(self._stacks)
+
+    def _sample_period(self) -> float:
+        """Effective seconds represented by one sample."""
+        if self.samples and self.elapsed:
+            return self.elapsed / self.samples
+        return self.interval
+
+    @staticmethod
+    def _label(code) -> str:
+        name = getattr(code, "co_qualname", code.co_name)
+        return f"{name} ({code.co_filename}:{code.co_firstlineno})"
+
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """Return ``{"root;...;leaf": count}`` in flame-graph collapsed format."""
+        collapsed: Counter = Counter()
+        for stack, count in self._snapshot().items():
+            collapsed[";".join(self._label(code) for code in stack)] += count
+        return dict(collapsed)
+
+    def write_collapsed(self, path: str) -> None:
+        """Write collapsed stacks (input for flamegraph.pl / speedscope)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.collapsed_stacks().items()):
+                f.write(f"{stack} {count}\n")
+
+    def function_profiles(self, limit: Optional[int] = None) -> List[FunctionProfile]:
+        """
+        Aggregate samples per function.
+
+        ``total_time`` is the estimated self time (function at the top of the
+        stack) and ``cumulative_time`` includes callees. Sampling cannot count
+        calls, so ``call_count`` holds the number of samples containing the
+        function.
+
+        Args:
+            limit: Maximum number of profiles, by cumulative time
+
+        Returns:
+            List[FunctionProfile]: Profiles ordered by cumulative time
+        """
+        self_counts: Counter = Counter()
+        cumulative_counts: Counter = Counter()
+        for stack, count in self._snapshot().items():
+            if not stack:
+                continue
+            self_counts[stack[-1]] += count
+            for code in set(stack):
+                cumulative_counts[code] += count
+
+        period = self._sample_period()
+        profiles = [
+            FunctionProfile(
+                name=getattr(code, "co_qualname", code.co_name),
+                file_path=code.co_filename,
+                line_number=code.co_firstlineno,
+                call_count=count,
+                total_time=self_counts[code] * period,
+                cumulative_time=count * period,
+                per_call_time=period,
+                complexity_score=0,
+            )
+            for code, count in cumulative_counts.most_common(limit)
+        ]
+        return profiles
 
 
 # Integration functions
@@ -684,6 +1056,26 @@ def find_performance_issues(severity: str = "all") -> str:
     return "\n".join(report)
 
 
+def profile_runtime(duration: float = 10.0, output_path: Optional[str] = None) -> str:
+    """Sample the running Atlas process and report its hot spots."""
+    profiler = PerformanceProfiler()
+    sampler = profiler.profile_runtime(duration, output_path=output_path)
+    profiles = sampler.function_profiles(limit=20)
+
+    if not profiles:
+        return "⏱️ No samples collected."
+
+    report = [f"⏱️ **Runtime Hot Spots** ({sampler.samples} samples over {sampler.elapsed:.1f}s)\n"]
+    for profile in profiles:
+        report.append(
+            f"- `{profile.name}` ({profile.file_path}:{profile.line_number}): "
+            f"{profile.cumulative_time:.3f}s cumulative, {profile.total_time:.3f}s self"
+        )
+    if output_path:
+        report.append(f"\nCollapsed stacks written to `{output_path}`")
+    return "\n".join(report)
+
+
 if __name__ == "__main__":
     # Test the profiler
     profiler = PerformanceProfiler()
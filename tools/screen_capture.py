@@ -0,0 +1,461 @@
+"""Screen capture service with a frame ring buffer and dirty-region tracking.
+
+Automation loops (OCR, template matching, "wait until this changes") capture
+the screen over and over, although most frames differ from the previous one
+in a small area, if at all. This service keeps the most recent frames as
+NumPy arrays in a ring buffer and records:
+
+* a cheap CRC32 frame hash. A frame identical to its predecessor shares the
+  predecessor's array and cached conversions, so nothing is converted twice;
+* dirty rectangles, computed with a vectorized block diff against the
+  previous frame. Consumers can ignore regions that did not change;
+* region crops, which are zero-copy slices of the stored frame.
+
+Colour conversion (BGRA to RGB, alpha compositing, PIL images) is lazy and
+cached per frame, so it only happens for frames somebody actually looks at.
+``start()`` runs a rate-limited background capture loop that feeds
+subscribers such as OCR or template matching.
+
+Frame sources are callables that return an ``(H, W, 3|4)`` uint8 array. The
+channel order (``"RGB"``, ``"RGBA"`` or ``"BGRA"``) is declared through a
+``channel_order`` attribute on the source.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from PIL import Image
+
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "Frame",
+    "ScreenCaptureService",
+    "default_frame_source",
+    "dirty_rectangles",
+    "frame_hash",
+    "get_capture_service",
+    "pyautogui_frame_source",
+    "quartz_frame_source",
+    "to_rgb",
+]
+
+Region = Tuple[int, int, int, int]  # (x, y, width, height)
+FrameSource = Callable[[], "np.ndarray"]
+
+# Side length in pixels of the blocks compared when diffing frames
+DEFAULT_BLOCK_SIZE = 32
+
+
+def frame_hash(array: "np.ndarray") -> int:
+    """CRC32 of the frame's pixels (fast enough to run on every capture)."""
+    if not array.flags.c_contiguous:
+        array = np.ascontiguousarray(array)
+    return zlib.crc32(memoryview(array).cast("B"))
+
+
+def to_rgb(array: "np.ndarray", channel_order: str = "RGB") -> "np.ndarray":
+    """Convert a frame to an RGB array, avoiding copies where possible.
+
+    Opaque RGBA/BGRA frames (the normal case for screen captures) become
+    strided views. Translucent pixels are composited onto white, as the
+    previous PIL-based path did.
+    """
+    order = channel_order.upper()
+    if array.ndim == 2 or order == "RGB":
+        return array
+    rgb = array[..., 2::-1] if order.startswith("BGR") else array[..., :3]
+    if array.shape[2] < 4:
+        return rgb
+    alpha = array[..., 3]
+    if alpha.min() == 255:
+        return rgb
+    weight = alpha[..., None].astype(np.float32) / 255.0
+    return (rgb * weight + 255.0 * (1.0 - weight)).astype(np.uint8)
+
+
+def dirty_rectangles(
+    previous: Optional["np.ndarray"],
+    current: "np.ndarray",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> List[Region]:
+    """Rectangles (x, y, width, height) that differ between two frames.
+
+    Pixels are compared in one vectorized pass and reduced to a block grid.
+    Runs of dirty blocks in a row become spans, and identical spans in
+    consecutive rows are merged into one rectangle.
+    """
+    height, width = current.shape[:2]
+    if previous is None or previous.shape != current.shape:
+        return [(0, 0, width, height)]
+
+    changed = previous != current
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+    rows = -(-height // block_size)
+    cols = -(-width // block_size)
+    padded = np.zeros((rows * block_size, cols * block_size), dtype=bool)
+    padded[:height, :width] = changed
+    blocks = padded.reshape(rows, block_size, cols, block_size).any(axis=(1, 3))
+    if not blocks.any():
+        return []
+
+    rects: List[List[int]] = []  # [col_start, row_start, col_end, row_end]
+    open_spans: Dict[Tuple[int, int], List[int]] = {}
+    for row in range(rows):
+        line = blocks[row]
+        if not line.any():
+            open_spans = {}
+            continue
+        # Start/end columns of each run of dirty blocks in this row
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], line.view(np.int8), [0]))))
+        spans = list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+        next_spans = {}
+        for span in spans:
+            rect = open_spans.get(span)
+            if rect is not None:
+                rect[3] = row + 1
+            else:
+                rect = [span[0], row, span[1], row + 1]
+                rects.append(rect)
+            next_spans[span] = rect
+        open_spans = next_spans
+
+    result = []
+    for col0, row0, col1, row1 in rects:
+        x, y = col0 * block_size, row0 * block_size
+        result.append((x, y, min(col1 * block_size, width) - x, min(row1 * block_size, height) - y))
+    return result
+
+
+def _intersects(a: Region, b: Region) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+@dataclass
+class Frame:
+    """A captured frame; the pixel array is shared and must not be modified."""
+
+    array: "np.ndarray"
+    sequence: int
+    timestamp: float
+    frame_hash: int
+    channel_order: str = "RGB"
+    dirty: List[Region] = field(default_factory=list)
+    _cache: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def width(self) -> int:
+        return self.array.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.array.shape[0]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.dirty)
+
+    def changed_in(self, region: Region) -> bool:
+        """Whether any dirty rectangle overlaps ``region``."""
+        return any(_intersects(rect, region) for rect in self.dirty)
+
+    def crop(self, region: Region) -> "np.ndarray":
+        """Zero-copy view of ``region`` in the frame's native channel order."""
+        x, y, w, h = region
+        return self.array[max(0, y) : y + h, max(0, x) : x + w]
+
+    @property
+    def rgb(self) -> "np.ndarray":
+        """The frame as RGB, converted on first use."""
+        return self.cached("rgb", lambda frame: to_rgb(frame.array, frame.channel_order))
+
+    def rgb_crop(self, region: Region) -> "np.ndarray":
+        """RGB pixels of ``region``; only the region is converted unless the whole frame already was."""
+        if "rgb" in self._cache:
+            x, y, w, h = region
+            return self.rgb[max(0, y) : y + h, max(0, x) : x + w]
+        return to_rgb(self.crop(region), self.channel_order)
+
+    def cached(self, key: Hashable, factory: Callable[["Frame"], Any]) -> Any:
+        """Value derived from the pixels, computed once.
+
+        An unchanged successor frame shares this cache, so consumers such as
+        OCR or template matching do not redo work on a static screen.
+        """
+        if key not in self._cache:
+            self._cache[key] = factory(self)
+        return self._cache[key]
+
+    def peek(self, key: Hashable) -> Any:
+        """Value cached under *key* by ``cached``, or None if it was never computed."""
+        return self._cache.get(key)
+
+    def to_image(self, region: Optional[Region] = None) -> "Image.Image":
+        """PIL image of the frame or a region (full-frame images are cached)."""
+        if region is not None:
+            return Image.fromarray(np.ascontiguousarray(self.rgb_crop(region)))
+        return self.cached("image", lambda frame: Image.fromarray(np.ascontiguousarray(frame.rgb)))
+
+
+def quartz_frame_source() -> Optional[FrameSource]:
+    """Frame source reading the macOS display through Quartz (BGRA)."""
+    try:
+        import Quartz  # type: ignore
+    except ImportError:
+        return None
+
+    def capture() -> "np.ndarray":
+        image_ref = Quartz.CGWindowListCreateImage(
+            Quartz.CGRectInfinite,
+            Quartz.kCGWindowListOptionOnScreenOnly,
+            Quartz.CGMainDisplayID(),
+            Quartz.kCGWindowImageDefault,
+        )
+        if not image_ref:
+            raise RuntimeError("Failed to create CGImage")
+        width = Quartz.CGImageGetWidth(image_ref)
+        height = Quartz.CGImageGetHeight(image_ref)
+        bytes_per_row = Quartz.CGImageGetBytesPerRow(image_ref)
+        data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(image_ref))
+        buffer = np.frombuffer(data.bytes() if hasattr(data, "bytes") else bytes(data), dtype=np.uint8)
+        # Rows may be padded; keep a strided view instead of repacking
+        return buffer.reshape(height, bytes_per_row)[:, : width * 4].reshape(height, width, 4)
+
+    capture.channel_order = "BGRA"  # type: ignore[attr-defined]
+    return capture
+
+
+def pyautogui_frame_source() -> Optional[FrameSource]:
+    """Portable frame source built on ``pyautogui.screenshot`` (RGB)."""
+    try:
+        import pyautogui  # type: ignore
+    except Exception:
+        return None
+
+    def capture() -> "np.ndarray":
+        pyautogui.FAILSAFE = False
+        return np.asarray(pyautogui.screenshot().convert("RGB"))
+
+    capture.channel_order = "RGB"  # type: ignore[attr-defined]
+    return capture
+
+
+def default_frame_source() -> Optional[FrameSource]:
+    """Best available native frame source, or None in headless setups."""
+    if not NUMPY_AVAILABLE:
+        return None
+    return quartz_frame_source() or pyautogui_frame_source()
+
+
+FrameCallback = Callable[[Frame], None]
+
+
+class ScreenCaptureService:
+    """Captures frames into a ring buffer and tracks what changed.
+
+    Args:
+        source: Frame source callable; ``default_frame_source()`` when None.
+        capacity: Number of frames retained.
+        block_size: Block size in pixels for dirty-region detection.
+        channel_order: Channel order of ``source`` frames when the source
+            does not declare one.
+    """
+
+    def __init__(
+        self,
+        source: Optional[FrameSource] = None,
+        capacity: int = 8,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        channel_order: Optional[str] = None,
+    ):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for the screen capture service")
+        self.source = source if source is not None else default_frame_source()
+        self.channel_order = channel_order or getattr(self.source, "channel_order", "RGB")
+        self.block_size = block_size
+        self._frames: Deque[Frame] = deque(maxlen=capacity)
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._sequence = 0
+        self._subscribers: List[Tuple[FrameCallback, bool]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.fps = 0.0
+        self.stats = {"captures": 0, "unchanged": 0}
+
+    @property
+    def available(self) -> bool:
+        return self.source is not None
+
+    @property
+    def latest(self) -> Optional[Frame]:
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def frames(self) -> List[Frame]:
+        """Buffered frames, oldest first."""
+        with self._lock:
+            return list(self._frames)
+
+    def capture(self) -> Frame:
+        """Grab a frame, diff it against the previous one and buffer it."""
+        if self.source is None:
+            raise RuntimeError("No screen capture source available")
+        array = self.source()
+        timestamp = time.time()
+        digest = frame_hash(array)
+
+        with self._lock:
+            previous = self._frames[-1] if self._frames else None
+            self._sequence += 1
+            self.stats["captures"] += 1
+            if previous is not None and previous.frame_hash == digest and previous.array.shape == array.shape:
+                # Unchanged: share pixels and any conversions already made
+                self.stats["unchanged"] += 1
+                frame = Frame(
+                    previous.array, self._sequence, timestamp, digest, previous.channel_order, [], previous._cache
+                )
+            else:
+                array.setflags(write=False)
+                dirty = dirty_rectangles(previous.array if previous is not None else None, array, self.block_size)
+                frame = Frame(array, self._sequence, timestamp, digest, self.channel_order, dirty)
+            self._frames.append(frame)
+            subscribers = list(self._subscribers)
+            self._changed.notify_all()
+
+        for callback, only_changed in subscribers:
+            if only_changed and not frame.changed:
+                continue
+            try:
+                callback(frame)
+            except Exception as e:
+                logger.error("Screen capture subscriber failed: %s", e)
+        return frame
+
+    def frame(self, max_age: float = 0.0) -> Frame:
+        """The latest frame if it is younger than ``max_age`` seconds, else a new capture."""
+        frame = self.latest
+        if frame is None or time.time() - frame.timestamp > max_age:
+            frame = self.capture()
+        return frame
+
+    def grab(self, region: Optional[Region] = None, max_age: float = 0.0) -> "np.ndarray":
+        """RGB pixels of ``region`` (or the whole screen).
+
+        A buffered frame younger than ``max_age`` seconds is reused instead of
+        capturing again. Only the region is converted to RGB unless the whole
+        frame already has been.
+        """
+        frame = self.frame(max_age)
+        return frame.rgb if region is None else frame.rgb_crop(region)
+
+    def wait_for_change(
+        self, region: Optional[Region] = None, timeout: float = 10.0, interval: float = 0.2
+    ) -> Optional[Frame]:
+        """Wait for a frame whose dirty regions overlap ``region``.
+
+        Uses the continuous capture loop when it is running and otherwise
+        captures every ``interval`` seconds itself.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            seen = self._sequence
+        if self.latest is None:
+            self.capture()
+            seen = self._sequence
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self.running:
+                with self._changed:
+                    self._changed.wait_for(lambda seen=seen: self._sequence != seen, remaining)
+                    new_frames = [f for f in self._frames if f.sequence > seen]
+                    seen = self._sequence
+            else:
+                time.sleep(min(interval, remaining))
+                new_frames = [self.capture()]
+                seen = new_frames[-1].sequence
+            for frame in new_frames:
+                if frame.changed and (region is None or frame.changed_in(region)):
+                    return frame
+
+    # -- continuous capture ----------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, callback: FrameCallback, only_changed: bool = True) -> Callable[[], None]:
+        """Call ``callback`` for captured frames; returns an unsubscribe function."""
+        entry = (callback, only_changed)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+
+        return unsubscribe
+
+    def start(self, fps: float = 2.0) -> None:
+        """Capture continuously at no more than ``fps`` frames per second."""
+        self.fps = fps
+        if self.running:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stop,), name="screen-capture", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+
+    def _run(self, stop: threading.Event) -> None:
+        next_due = time.monotonic()
+        while not stop.is_set():
+            try:
+                self.capture()
+            except Exception as e:
+                logger.warning("Continuous capture failed: %s", e)
+            # Fixed-rate schedule; a slow capture delays but never bursts
+            next_due = max(next_due + 1.0 / self.fps, time.monotonic())
+            stop.wait(next_due - time.monotonic())
+
+
+_default_service: Optional[ScreenCaptureService] = None
+_default_service_lock = threading.Lock()
+
+
+def get_capture_service() -> ScreenCaptureService:
+    """Return the process-wide screen capture service."""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = ScreenCaptureService()
+        return _default_service
@@ -6,9 +6,10 @@ Uses platform-specific capture methods with fallbacks.
 from __future__ import annotations
 
 import datetime
+import importlib.util
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 
 try:
     from PIL import Image
@@ -35,19 +36,12 @@ else:
     _MACOS_NATIVE_AVAILABLE = False
 
 # Platform-specific imports
-_QUARTZ_AVAILABLE = False
 _PYAUTOGUI_AVAILABLE = False
 
-if IS_MACOS:
-    try:
-        import Quartz
-
-        _QUARTZ_AVAILABLE = True
-    except ImportError:
-        _QUARTZ_AVAILABLE = False
-        logging.warning(
-            "Quartz not installed. Screenshot functionality on macOS will be limited."
-        )
+if IS_MACOS and importlib.util.find_spec("Quartz") is None:
+    logging.warning(
+        "Quartz not installed. Screenshot functionality on macOS will be limited."
+    )
 
 try:
     import pyautogui
@@ -59,52 +53,21 @@ except ImportError:
         "PyAutoGUI not installed. Screenshot functionality will be limited."
     )
 
-__all__ = ["capture_screen"]
-
-
-def _capture_quartz() -> Image.Image:
-    """Capture the full screen via Quartz and return a PIL Image."""
-    try:
-        # Create screenshot using Quartz API
-        image_ref = Quartz.CGWindowListCreateImage(
-            Quartz.CGRectInfinite,
-            Quartz.kCGWindowListOptionOnScreenOnly,
-            Quartz.CGMainDisplayID(),
-            Quartz.kCGWindowImageDefault,
-        )
-
-        if not image_ref:
-            raise Exception("Failed to create CGImage")
-
-        # Use modern pyobjc API
+from tools.screen_capture import NUMPY_AVAILABLE, Region, get_capture_service
 
-        width = Quartz.CGImageGetWidth(image_ref)
-        height = Quartz.CGImageGetHeight(image_ref)
-        bytes_per_row = Quartz.CGImageGetBytesPerRow(image_ref)
-        data_provider = Quartz.CGImageGetDataProvider(image_ref)
-        data = Quartz.CGDataProviderCopyData(data_provider)
-
-        # Convert CFData to bytes - use bytes() method if available, else convert directly
-        buffer = data.bytes() if hasattr(data, "bytes") else bytes(data)
+__all__ = ["capture_screen"]
 
-        # Create PIL Image from buffer
-        # Note: Quartz returns BGRA format typically
-        img = Image.frombuffer(
-            "RGBA", (width, height), buffer, "raw", "BGRA", bytes_per_row, 1
-        )
 
-        # Convert to RGB for consistency
-        if img.mode == "RGBA":
-            # Create a white background and composite
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
-            return rgb_img
+def _capture_service(region: Optional[Region]) -> Image.Image:
+    """Capture through the shared capture service (Quartz or PyAutoGUI source).
 
-        return img
-
-    except Exception as e:
-        # If Quartz fails, raise exception to trigger fallback
-        raise Exception(f"Quartz capture failed: {e}") from e
+    The frame goes into the service's ring buffer, and only *region* is
+    converted to RGB.
+    """
+    service = get_capture_service()
+    if not service.available:
+        raise Exception("No screen capture source available")
+    return service.capture().to_image(region)
 
 
 def _capture_pyautogui() -> Image.Image:
@@ -120,86 +83,112 @@ def _capture_pyautogui() -> Image.Image:
         raise Exception(f"PyAutoGUI capture failed: {e}") from e
 
 
-def capture_screen(save_to: Optional[Path] = None) -> Image.Image:
+def _fallback_methods() -> List[Tuple[str, Callable[[], Image.Image]]]:
+    """Full-screen capture methods tried when the capture service fails."""
+    methods = []
+    # PyAutoGUI works cross-platform; tests patch this path
+    if _PYAUTOGUI_AVAILABLE:
+        methods.append(("PyAutoGUI capture", _capture_pyautogui))
+    # macOS native screencapture / AppleScript
+    if IS_MACOS and _MACOS_NATIVE_AVAILABLE:
+        methods.append(("Native screencapture", lambda: capture_screen_native_macos(None)))
+        methods.append(("AppleScript", capture_screen_applescript))
+    return methods
+
+
+def _capture_fallback(last_error: Optional[str]) -> Image.Image:
+    """Full screen from the first fallback method that works, else a placeholder."""
+    for name, method in _fallback_methods():
+        try:
+            img = method()
+        except Exception as e:
+            last_error = f"{name} failed: {e}"
+            if not IS_HEADLESS:
+                print(last_error)
+            continue
+        if img is not None:
+            return img
+    return _dummy_screenshot(last_error)
+
+
+def _dummy_screenshot(last_error: Optional[str]) -> Image.Image:
+    """Placeholder image used when no capture method works."""
+    print(
+        f"Creating dummy screenshot - no capture method available. Last error: {last_error}"
+    )
+    img = Image.new("RGB", (800, 600), color="lightgray")
+    # Add some text to indicate this is a dummy
+    try:
+        from PIL import ImageDraw
+
+        draw = ImageDraw.Draw(img)
+        draw.text((50, 250), "Screenshot not available", fill="black")
+        draw.text((50, 300), f"(Error: {last_error})", fill="red")
+        draw.text(
+            (50, 350),
+            f"Platform: {'macOS' if IS_MACOS else 'Linux' if IS_LINUX else 'Unknown'}",
+            fill="blue",
+        )
+    except Exception:
+        pass  # Font issues, just use plain gray
+    return img
+
+
+def _save_screenshot(img: Image.Image, save_to: Path) -> None:
+    """Save *img*, adding a timestamp to a plain ``screenshot.png`` name."""
+    save_to = Path(save_to)
+    # Create parent directory if it doesn't exist
+    save_to.parent.mkdir(parents=True, exist_ok=True)
+
+    # Append timestamp before extension if exactly 'screenshot.png'
+    timestamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+    if save_to.stem == "screenshot":
+        save_to = save_to.with_name(f"{save_to.stem}_{timestamp}{save_to.suffix}")
+
+    try:
+        img.save(save_to)
+    except Exception as e:
+        print(f"Failed to save screenshot: {e}")
+
+
+def capture_screen(
+    save_to: Optional[Path] = None, region: Optional[Tuple[int, int, int, int]] = None
+) -> Image.Image:
     """Capture the current screen and optionally save to *save_to*.
 
+    Captures go through :func:`tools.screen_capture.get_capture_service`, so
+    they land in its frame ring buffer and a *region* is cropped before any
+    colour conversion. Loops that capture repeatedly should use the service
+    directly; it tracks dirty regions and reuses conversions of unchanged
+    frames.
+
     Parameters
     ----------
     save_to: pathlib.Path | None
         If provided, the resulting PNG screenshot is written to this path.
+    region: tuple | None
+        Optional ``(x, y, width, height)`` area to return instead of the
+        whole screen.
     """
     img = None
     last_error = None
 
-    # Ordered attempt list ------------------------------------------------
-
-    # 1. Quartz (only if available)
-    if img is None and _QUARTZ_AVAILABLE:
-        try:
-            img = _capture_quartz()
-        except Exception as e:
-            last_error = f"Quartz capture failed: {e}"
-            print(last_error)
-
-    # 2. PyAutoGUI (works cross-platform; tests patch this path)
-    if img is None and _PYAUTOGUI_AVAILABLE:
+    if NUMPY_AVAILABLE:
         try:
-            img = _capture_pyautogui()
+            img = _capture_service(region)
         except Exception as e:
-            last_error = f"PyAutoGUI capture failed: {e}"
+            last_error = f"Screen capture service failed: {e}"
             if not IS_HEADLESS:
                 print(last_error)
 
-    # 3. macOS native screencapture / AppleScript fallbacks
-    if img is None and IS_MACOS and _MACOS_NATIVE_AVAILABLE:
-        try:
-            img = capture_screen_native_macos(None)
-        except Exception as e:
-            last_error = f"Native screencapture failed: {e}"
-            print(last_error)
-
-        if img is None:
-            try:
-                img = capture_screen_applescript()
-            except Exception as e:
-                last_error = f"AppleScript failed: {e}"
-                print(last_error)
-
-    # Last resort: create a dummy image
     if img is None:
-        print(
-            f"Creating dummy screenshot - no capture method available. Last error: {last_error}"
-        )
-        img = Image.new("RGB", (800, 600), color="lightgray")
-        # Add some text to indicate this is a dummy
-        try:
-            from PIL import ImageDraw
-
-            draw = ImageDraw.Draw(img)
-            draw.text((50, 250), "Screenshot not available", fill="black")
-            draw.text((50, 300), f"(Error: {last_error})", fill="red")
-            draw.text(
-                (50, 350),
-                f"Platform: {'macOS' if IS_MACOS else 'Linux' if IS_LINUX else 'Unknown'}",
-                fill="blue",
-            )
-        except Exception:
-            pass  # Font issues, just use plain gray
+        img = _capture_fallback(last_error)
+        if region is not None:
+            x, y, width, height = region
+            img = img.crop((x, y, x + width, y + height))
 
     # Save if requested (adding timestamp & ensuring directory)
     if save_to and img:
-        save_to = Path(save_to)
-        # Create parent directory if it doesn't exist
-        save_to.parent.mkdir(parents=True, exist_ok=True)
-
-        # Append timestamp before extension if exactly 'screenshot.png'
-        timestamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
-        if save_to.stem == "screenshot":
-            save_to = save_to.with_name(f"{save_to.stem}_{timestamp}{save_to.suffix}")
-
-        try:
-            img.save(save_to)
-        except Exception as e:
-            print(f"Failed to save screenshot: {e}")
+        _save_screenshot(img, save_to)
 
     return img
@@ -0,0 +1,529 @@
+"""
+Map-reduce summarization for long documents.
+
+Text is split into token-budgeted chunks at content-defined paragraph
+boundaries (so an edit only changes the chunks around it), each chunk is
+summarized concurrently through an ``LLMManager`` with bounded parallelism,
+and the partial summaries are reduced hierarchically until one summary fits
+the budget. Every chunk and reduce-group summary is cached by content hash,
+so editing one section only recomputes that branch of the tree.
+
+A local extractive mode (TF-IDF sentence vectors ranked with TextRank) works
+offline and can be used as a first pass to shrink chunks before the LLM.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.atlas/cache/summaries.sqlite3")
+
+# Bump when prompts change so stale summaries are not reused
+PROMPT_VERSION = 1
+
+MAP_PROMPT = (
+    "Summarize the following part of a longer document. Keep key facts, names, "
+    "numbers and conclusions; omit filler.\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "Combine these partial summaries of consecutive parts of one document into a "
+    "single coherent summary without repetition.\n\n{text}"
+)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=\S)")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Very common English words carry no signal for sentence ranking
+STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "he", "her", "his", "i",
+        "in", "is", "it", "its", "of", "on", "or", "she", "that", "the", "their", "them", "they", "this", "to", "was",
+        "we", "were", "which", "with", "you", "your", "not", "these", "those", "there", "been", "will", "would",
+        "can", "could", "should", "than", "then", "so", "if", "into", "also",
+    }
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the LLM token count of ``text`` (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences."""
+    return [s.strip() for s in _SENTENCE_RE.split(text.strip()) if s.strip()]
+
+
+def content_hash(*parts: str) -> str:
+    """Return a stable hash of the given strings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    """Split a paragraph that exceeds the budget at sentence, then word, boundaries."""
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in split_sentences(paragraph):
+        sentence_tokens = estimate_tokens(sentence)
+        if sentence_tokens > max_tokens:
+            words = sentence.split()
+            step = max(1, len(words) * max_tokens // sentence_tokens)
+            parts = [" ".join(words[i : i + step]) for i in range(0, len(words), step)]
+        else:
+            parts = [sentence]
+        for part in parts:
+            part_tokens = estimate_tokens(part)
+            if current and current_tokens + part_tokens > max_tokens:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens + 1
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int = 1500, overlap_tokens: int = 100) -> List[str]:
+    """
+    Split text into chunks of at most ``max_tokens`` estimated tokens.
+
+    Chunks end at paragraph boundaries. Once a chunk is half full it is also
+    closed after any paragraph whose hash hits a fixed pattern, so boundaries
+    depend on content rather than position and resynchronize right after an
+    edited section. Each chunk after the first starts with the last sentences
+    (up to ``overlap_tokens``) of the previous one for context.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk (including overlap)
+        overlap_tokens: Tokens of context carried over from the previous chunk
+
+    Returns:
+        List[str]: Chunks in document order
+    """
+    overlap_tokens = min(overlap_tokens, max_tokens // 4)
+    budget = max_tokens - overlap_tokens
+    chunks = []
+    previous_tail = ""
+    for group in _group_paragraphs(_paragraphs(text, budget), budget):
+        body = "\n\n".join(group)
+        chunks.append(f"{previous_tail}\n\n{body}" if previous_tail else body)
+        previous_tail = _tail(group[-1], overlap_tokens)
+    return chunks
+
+
+def _paragraphs(text: str, budget: int) -> List[str]:
+    """Split text into non-empty paragraphs, none over ``budget`` tokens."""
+    paragraphs: List[str] = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) > budget:
+            paragraphs.extend(_split_oversized(paragraph, budget))
+        else:
+            paragraphs.append(paragraph)
+    return paragraphs
+
+
+def _group_paragraphs(paragraphs: List[str], budget: int) -> List[List[str]]:
+    """Group paragraphs into chunks at content-defined boundaries (see :func:`chunk_text`)."""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph)
+        if current and current_tokens + tokens > budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens + 1
+        if current_tokens >= budget // 2 and hashlib.blake2b(paragraph.encode("utf-8")).digest()[0] % 4 == 0:
+            groups.append(current)
+            current, current_tokens = [], 0
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _tail(paragraph: str, max_tokens: int) -> str:
+    """Return the last sentences of ``paragraph`` that fit in ``max_tokens``."""
+    tail: List[str] = []
+    tail_tokens = 0
+    for sentence in reversed(split_sentences(paragraph)):
+        tail_tokens += estimate_tokens(sentence) + 1
+        if tail_tokens > max_tokens:
+            break
+        tail.insert(0, sentence)
+    return " ".join(tail)
+
+
+def _tokenize(sentence: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(sentence.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+def _textrank_numpy(tokens: List[List[str]], damping: float, iterations: int) -> List[float]:
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for i, words in enumerate(tokens):
+        for word in words:
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    n = len(tokens)
+    if not vocabulary:
+        return [1.0] * n
+
+    tf = np.zeros((n, len(vocabulary)), dtype=np.float32)
+    np.add.at(tf, (np.array(rows), np.array(cols)), 1.0)
+    document_frequency = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1.0
+    vectors = tf * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n), where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores.tolist()
+
+
+def _textrank_python(tokens: List[List[str]], damping: float, iterations: int) -> List[float]:
+    n = len(tokens)
+    document_frequency = Counter(word for words in tokens for word in set(words))
+    vectors = []
+    for words in tokens:
+        counts = Counter(words)
+        vector = {w: c * (math.log((1 + n) / (1 + document_frequency[w])) + 1.0) for w, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        vectors.append({w: v / norm for w, v in vector.items()})
+
+    similarity = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            small, large = sorted((vectors[i], vectors[j]), key=len)
+            value = sum(v * large.get(w, 0.0) for w, v in small.items())
+            similarity[i][j] = similarity[j][i] = value
+
+    scores = [1.0 / n] * n
+    row_sums = [sum(row) for row in similarity]
+    for _ in range(iterations):
+        scores = [
+            (1 - damping) / n
+            + damping
+            * sum(
+                scores[j] * (similarity[j][i] / row_sums[j] if row_sums[j] else 1.0 / n)
+                for j in range(n)
+            )
+            for i in range(n)
+        ]
+    return scores
+
+
+def rank_sentences(sentences: Sequence[str], damping: float = 0.85, iterations: int = 50) -> List[float]:
+    """
+    Score sentences with TextRank over TF-IDF sentence vectors.
+
+    Args:
+        sentences: Sentences to rank
+        damping: PageRank damping factor
+        iterations: Maximum power iterations
+
+    Returns:
+        List[float]: One score per sentence (higher is more central)
+    """
+    if not sentences:
+        return []
+    tokens = [_tokenize(sentence) for sentence in sentences]
+    if NUMPY_AVAILABLE:
+        return _textrank_numpy(tokens, damping, iterations)
+    return _textrank_python(tokens, damping, iterations)
+
+
+def extractive_summary(text: str, max_sentences: int = 3, max_tokens: Optional[int] = None) -> str:
+    """
+    Summarize by picking the most central sentences, kept in document order.
+
+    Args:
+        text: Text to summarize
+        max_sentences: Maximum number of sentences
+        max_tokens: Optional token budget for the summary
+
+    Returns:
+        str: The selected sentences joined by spaces
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences and (max_tokens is None or estimate_tokens(text) <= max_tokens):
+        return " ".join(sentences)
+
+    scores = rank_sentences(sentences)
+    ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+    chosen = []
+    used_tokens = 0
+    for index in ranked:
+        if len(chosen) >= max_sentences:
+            break
+        tokens = estimate_tokens(sentences[index])
+        if max_tokens is not None and chosen and used_tokens + tokens > max_tokens:
+            continue
+        chosen.append(index)
+        used_tokens += tokens
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+class SummaryCache:
+    """SQLite cache of summaries keyed by content hash."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Database file path, or ":memory:" for an in-memory cache
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL)")
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached summary."""
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, summary: str) -> None:
+        """Store a summary."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO summaries VALUES (?, ?)", (key, summary))
+
+    def clear(self) -> None:
+        """Remove all cached summaries."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM summaries")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class SummaryResult:
+    """Result of a summarization run."""
+
+    summary: str
+    mode: str
+    chunks: int
+    levels: int
+    llm_calls: int = 0
+    cache_hits: int = 0
+
+
+class SummarizationEngine:
+    """Chunked map-reduce summarizer with extractive and LLM-backed modes."""
+
+    def __init__(
+        self,
+        llm_manager: Any = None,
+        max_chunk_tokens: int = 1500,
+        overlap_tokens: int = 100,
+        summary_tokens: int = 300,
+        max_concurrency: int = 4,
+        extractive_first_pass: bool = False,
+        cache: Optional[SummaryCache] = None,
+        use_cache: bool = True,
+    ):
+        """
+        Create the engine.
+
+        Args:
+            llm_manager: ``LLMManager`` (or anything with a compatible ``chat``);
+                without it only the extractive mode is available
+            max_chunk_tokens: Token budget per chunk and per reduce step input
+            overlap_tokens: Context carried between consecutive chunks
+            summary_tokens: Target length of each partial and the final summary
+            max_concurrency: Maximum concurrent LLM calls
+            extractive_first_pass: Shrink chunks extractively before the LLM
+            cache: Summary cache (defaults to the shared disk cache)
+            use_cache: Read and write the summary cache
+        """
+        self.llm_manager = llm_manager
+        self.max_chunk_tokens = max_chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.summary_tokens = summary_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.extractive_first_pass = extractive_first_pass
+        self.use_cache = use_cache
+        self._cache = cache
+        self._stats_lock = threading.Lock()
+
+    @property
+    def cache(self) -> Optional[SummaryCache]:
+        if not self.use_cache:
+            return None
+        if self._cache is None:
+            self._cache = SummaryCache()
+        return self._cache
+
+    def summarize(self, text: str, mode: str = "auto", max_sentences: int = 5) -> SummaryResult:
+        """
+        Summarize ``text``.
+
+        Args:
+            text: Text of any length
+            mode: ``"extractive"``, ``"abstractive"`` (LLM) or ``"auto"``
+                (abstractive when an LLM manager is available)
+            max_sentences: Sentences per summary in extractive mode
+
+        Returns:
+            SummaryResult: The summary and run statistics
+        """
+        if mode == "auto":
+            mode = "abstractive" if self.llm_manager is not None else "extractive"
+        if mode not in ("extractive", "abstractive"):
+            raise ValueError(f"Unknown summarization mode: {mode}")
+        if mode == "abstractive" and self.llm_manager is None:
+            raise ValueError("Abstractive summarization requires an LLM manager")
+
+        stats = {"llm_calls": 0, "cache_hits": 0}
+        chunks = chunk_text(text, self.max_chunk_tokens, self.overlap_tokens)
+        if not chunks:
+            return SummaryResult(summary="", mode=mode, chunks=0, levels=0)
+
+        summaries = self._map(chunks, mode, "map", max_sentences, stats)
+        levels = 1
+        while len(summaries) > 1:
+            groups = self._group(summaries)
+            summaries = self._map(groups, mode, "reduce", max_sentences, stats)
+            levels += 1
+
+        return SummaryResult(
+            summary=summaries[0],
+            mode=mode,
+            chunks=len(chunks),
+            levels=levels,
+            llm_calls=stats["llm_calls"],
+            cache_hits=stats["cache_hits"],
+        )
+
+    def _group(self, summaries: List[str]) -> List[str]:
+        """Pack consecutive summaries into reduce inputs within the token budget."""
+        groups: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for summary in summaries:
+            tokens = estimate_tokens(summary)
+            if current and current_tokens + tokens > self.max_chunk_tokens:
+                groups.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens + 1
+        groups.append("\n\n".join(current))
+        if len(groups) == len(summaries) and len(groups) > 1:
+            # Summaries too long to pack; always merge at least pairs to converge
+            groups = ["\n\n".join(summaries[i : i + 2]) for i in range(0, len(summaries), 2)]
+        return groups
+
+    def _map(
+        self, texts: List[str], mode: str, stage: str, max_sentences: int, stats: Dict[str, int]
+    ) -> List[str]:
+        """Summarize texts concurrently, in order, using the cache."""
+        if len(texts) == 1 or (mode == "extractive" and len(texts) < 8):
+            return [self._summarize_one(t, mode, stage, max_sentences, stats) for t in texts]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(texts))) as pool:
+            return list(pool.map(lambda t: self._summarize_one(t, mode, stage, max_sentences, stats), texts))
+
+    def _summarize_one(
+        self, text: str, mode: str, stage: str, max_sentences: int, stats: Dict[str, int]
+    ) -> str:
+        key = content_hash(
+            str(PROMPT_VERSION),
+            mode,
+            stage,
+            str(max_sentences if mode == "extractive" else self.summary_tokens),
+            str(self.extractive_first_pass),
+            text,
+        )
+        cache = self.cache
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                with self._stats_lock:
+                    stats["cache_hits"] += 1
+                return cached
+
+        if mode == "extractive":
+            summary = extractive_summary(text, max_sentences, self.summary_tokens)
+        else:
+            summary = self._llm_summary(text, stage, stats)
+            if summary is None:
+                # Provider failure: fall back locally and do not cache the result
+                return extractive_summary(text, max_sentences, self.summary_tokens)
+
+        if cache is not None:
+            cache.put(key, summary)
+        return summary
+
+    def _llm_summary(self, text: str, stage: str, stats: Dict[str, int]) -> Optional[str]:
+        if self.extractive_first_pass and stage == "map":
+            text = extractive_summary(
+                text, max_sentences=len(split_sentences(text)), max_tokens=self.max_chunk_tokens // 2
+            )
+        prompt = (MAP_PROMPT if stage == "map" else REDUCE_PROMPT).format(text=text)
+        try:
+            response = self.llm_manager.chat(
+                [{"role": "user", "content": prompt}], max_tokens=self.summary_tokens
+            )
+        except Exception as e:
+            logger.error(f"LLM summarization failed: {e}")
+            return None
+        with self._stats_lock:
+            stats["llm_calls"] += 1
+        summary = (getattr(response, "response_text", None) or "").strip()
+        return summary or None
+
+
+_default_engine: Optional[SummarizationEngine] = None
+
+
+def get_summarization_engine() -> SummarizationEngine:
+    """Return the shared extractive summarization engine."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = SummarizationEngine()
+    return _default_engine
@@ -1,19 +1,42 @@
-import re
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+from tools.summarization_engine import SummarizationEngine, get_summarization_engine
 
-def summarize_text(text: str) -> Dict[str, Any]:
+
+def summarize_text(
+    text: str,
+    max_sentences: int = 3,
+    mode: str = "extractive",
+    llm_manager: Optional[Any] = None,
+) -> Dict[str, Any]:
     """
-    Summarize the input text by extracting the first 3 sentences.
+    Summarize the input text.
+
+    Long inputs are chunked and summarized map-reduce style. The default
+    extractive mode picks the most central sentences (TF-IDF + TextRank) and
+    works offline; with an ``llm_manager`` the ``"abstractive"`` or ``"auto"``
+    modes summarize chunks through the LLM.
 
     Args:
         text: The text to summarize.
+        max_sentences: Sentences per summary in extractive mode.
+        mode: "extractive", "abstractive" or "auto".
+        llm_manager: Optional LLMManager for abstractive summaries.
     Returns:
         A dict with 'status', 'summary', and 'error' (if any).
     """
     try:
-        sentences = re.split(r"(?<=[.!?]) +", text)
-        summary = " ".join(sentences[:3])
-        return {"status": "success", "summary": summary}
+        engine = (
+            SummarizationEngine(llm_manager=llm_manager)
+            if llm_manager is not None
+            else get_summarization_engine()
+        )
+        result = engine.summarize(text, mode=mode, max_sentences=max_sentences)
+        return {
+            "status": "success",
+            "summary": result.summary,
+            "mode": result.mode,
+            "chunks": result.chunks,
+        }
     except Exception as e:
         return {"status": "error", "error": str(e)}
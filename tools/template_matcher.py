@@ -0,0 +1,611 @@
+"""
+Template Matching Engine for Atlas
+
+Multi-template, multi-scale template matching for UI automation loops. Frames
+and templates may be given as file paths or in-memory arrays; decoded and
+preprocessed templates are kept in an LRU cache, frames are converted to
+grayscale and downsampled once per call, and each template is matched
+coarse-to-fine on an image pyramid. All matches above the threshold are
+returned after non-maximum suppression.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    import cv2
+    import numpy as np
+
+    _CV2_AVAILABLE = True
+except ImportError:
+    _CV2_AVAILABLE = False
+
+from tools.screen_capture import Frame
+from utils.logger import get_logger
+
+logger = get_logger()
+
+ImageSource = Union[str, "np.ndarray"]
+Region = Tuple[int, int, int, int]
+
+# Templates whose smaller side drops below this at a pyramid level are matched
+# at full resolution only
+MIN_PYRAMID_TEMPLATE_SIDE = 12
+
+
+@dataclass
+class TemplateMatch:
+    """A template match in frame coordinates."""
+
+    name: str
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float
+    scale: float = 1.0
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        """Tuple[int, int]: Center point of the match."""
+        return self.x + self.width // 2, self.y + self.height // 2
+
+    def to_dict(self) -> Dict[str, object]:
+        """Convert the match to a dictionary."""
+        return {
+            "name": self.name,
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "score": self.score,
+            "scale": self.scale,
+        }
+
+
+@dataclass
+class PreparedTemplate:
+    """A grayscale template with its downsampled pyramid levels."""
+
+    gray: "np.ndarray"
+    pyramid: List["np.ndarray"] = field(default_factory=list)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.gray.shape[:2]
+
+
+def to_gray(image: "np.ndarray") -> "np.ndarray":
+    """
+    Convert a BGR, BGRA or grayscale array to a contiguous grayscale array.
+
+    Args:
+        image: Image array
+
+    Returns:
+        np.ndarray: Grayscale uint8 image
+    """
+    if image.ndim == 2:
+        gray = image
+    elif image.shape[2] == 4:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    else:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if gray.dtype != np.uint8:
+        gray = gray.astype(np.uint8)
+    return np.ascontiguousarray(gray)
+
+
+def build_pyramid(gray: "np.ndarray", levels: int) -> List["np.ndarray"]:
+    """
+    Build a Gaussian pyramid, excluding the full-resolution level.
+
+    Args:
+        gray: Grayscale image
+        levels: Number of downsampled levels
+
+    Returns:
+        List[np.ndarray]: Images at 1/2, 1/4, ... resolution
+    """
+    pyramid = []
+    current = gray
+    for _ in range(levels):
+        if min(current.shape[:2]) < 2:
+            break
+        current = cv2.pyrDown(current)
+        pyramid.append(current)
+    return pyramid
+
+
+def non_max_suppression(matches: List[TemplateMatch], iou_threshold: float = 0.3) -> List[TemplateMatch]:
+    """
+    Drop matches that overlap a higher-scoring match.
+
+    Args:
+        matches: Candidate matches
+        iou_threshold: Maximum intersection-over-union between kept matches
+
+    Returns:
+        List[TemplateMatch]: Kept matches, highest score first
+    """
+    if len(matches) < 2:
+        return list(matches)
+
+    ordered = sorted(matches, key=lambda m: m.score, reverse=True)
+    boxes = np.array([[m.x, m.y, m.x + m.width, m.y + m.height] for m in ordered], dtype=np.float64)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    remaining = np.arange(len(ordered))
+    keep = []
+    while remaining.size:
+        best = remaining[0]
+        keep.append(best)
+        rest = remaining[1:]
+        xx1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        yy1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        xx2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        yy2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        intersection = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = intersection / (areas[best] + areas[rest] - intersection)
+        remaining = rest[iou <= iou_threshold]
+    return [ordered[i] for i in keep]
+
+
+def _peak_locations(
+    result: "np.ndarray", threshold: float, radius: int = 1, limit: Optional[int] = None
+) -> List[Tuple[int, int, float]]:
+    """
+    Return the local maxima of a match map above ``threshold``, best first.
+
+    Args:
+        result: Match map from ``cv2.matchTemplate``
+        threshold: Minimum score
+        radius: A peak must be the maximum within this many pixels
+        limit: Optional maximum number of peaks returned
+
+    Returns:
+        List[Tuple[int, int, float]]: (x, y, score) peaks
+    """
+    above = result >= threshold
+    if not above.any():
+        return []
+    size = 2 * max(1, radius) + 1
+    local_max = cv2.dilate(result, np.ones((size, size), np.uint8))
+    ys, xs = np.nonzero(above & (result >= local_max))
+    scores = result[ys, xs]
+    order = np.argsort(scores)[::-1]
+    if limit is not None:
+        order = order[:limit]
+    return [(int(xs[i]), int(ys[i]), float(scores[i])) for i in order]
+
+
+def _array_key(image: "np.ndarray") -> Tuple[Tuple[int, ...], str, bytes]:
+    """Cache key for an image array derived from its content."""
+    digest = hashlib.blake2b(np.ascontiguousarray(image).data, digest_size=16).digest()
+    return image.shape, image.dtype.str, digest
+
+
+class FrameContext:
+    """A frame converted to grayscale with its pyramid, shared by all templates."""
+
+    def __init__(self, frame: "np.ndarray", pyramid_levels: int):
+        self.gray = to_gray(frame)
+        self.pyramid = build_pyramid(self.gray, pyramid_levels)
+
+
+class TemplateMatcher:
+    """Cached, coarse-to-fine, multi-template matching engine."""
+
+    def __init__(
+        self,
+        cache_size: int = 128,
+        pyramid_levels: int = 2,
+        coarse_ratio: float = 0.85,
+        max_candidates: int = 256,
+        iou_threshold: float = 0.3,
+    ):
+        """
+        Initialize the matcher.
+
+        Args:
+            cache_size: Number of prepared templates kept in the LRU cache
+            pyramid_levels: Number of downsampled levels used for the coarse search
+            coarse_ratio: Fraction of the threshold a coarse-level score must reach
+                          for a location to be refined at full resolution
+            max_candidates: Maximum coarse candidates refined per template and scale; this bounds
+                            the work on degenerate (flat) match maps, not the number of matches
+            iou_threshold: Overlap threshold for non-maximum suppression
+        """
+        self.cache_size = cache_size
+        self.pyramid_levels = max(0, pyramid_levels)
+        self.coarse_ratio = coarse_ratio
+        self.max_candidates = max_candidates
+        self.iou_threshold = iou_threshold
+        self._templates: "OrderedDict[object, PreparedTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # ------------------------------------------------------------------
+    # Loading and caching
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key) -> Optional[PreparedTemplate]:
+        with self._lock:
+            prepared = self._templates.get(key)
+            if prepared is not None:
+                self._templates.move_to_end(key)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+            return prepared
+
+    def _cache_put(self, key, prepared: PreparedTemplate) -> None:
+        with self._lock:
+            self._templates[key] = prepared
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.cache_size:
+                self._templates.popitem(last=False)
+
+    def _prepare(self, gray: "np.ndarray", scale: float = 1.0) -> PreparedTemplate:
+        if scale != 1.0:
+            height, width = gray.shape[:2]
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+        return PreparedTemplate(gray=gray, pyramid=build_pyramid(gray, self.pyramid_levels))
+
+    def get_template(self, template: ImageSource, scale: float = 1.0) -> Optional[PreparedTemplate]:
+        """
+        Get a prepared template, decoding and preprocessing it on first use.
+
+        Path templates are cached by path, modification time and size; array
+        templates by a hash of their content.
+
+        Args:
+            template: Template file path or image array
+            scale: Scale factor applied to the template
+
+        Returns:
+            Optional[PreparedTemplate]: Prepared template, or None if it cannot be loaded
+        """
+        if isinstance(template, str):
+            try:
+                stat = os.stat(template)
+            except OSError:
+                logger.error(f"Template not found: {template}")
+                return None
+            key = ("path", template, stat.st_mtime_ns, stat.st_size, scale)
+        else:
+            key = ("array", _array_key(template), scale)
+
+        prepared = self._cache_get(key)
+        if prepared is not None:
+            return prepared
+
+        if isinstance(template, str):
+            gray = cv2.imread(template, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                logger.error(f"Failed to load template: {template}")
+                return None
+        else:
+            # Copy so later mutation of the caller's array cannot corrupt the cache
+            gray = to_gray(template).copy()
+
+        prepared = self._prepare(gray, scale)
+        self._cache_put(key, prepared)
+        return prepared
+
+    def clear_cache(self) -> None:
+        """Drop all cached templates."""
+        with self._lock:
+            self._templates.clear()
+
+    def prepare_frame(self, frame: ImageSource) -> Optional[FrameContext]:
+        """
+        Convert a frame to grayscale and build its pyramid once.
+
+        Screen capture frames keep their prepared context in the frame cache,
+        which unchanged successor frames share.
+
+        Args:
+            frame: Frame file path, image array or screen capture Frame
+
+        Returns:
+            Optional[FrameContext]: Prepared frame, or None if it cannot be loaded
+        """
+        if isinstance(frame, FrameContext):
+            return frame
+        if isinstance(frame, Frame):
+            return frame.cached(("template_context", self.pyramid_levels), self._screen_context)
+        if isinstance(frame, str):
+            image = cv2.imread(frame, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                logger.error(f"Failed to load image: {frame}")
+                return None
+            frame = image
+        return FrameContext(frame, self.pyramid_levels)
+
+    def _screen_context(self, frame: Frame) -> FrameContext:
+        # Matching works on BGR(A) like cv2.imread; flip RGB sources
+        pixels = frame.array if frame.channel_order.upper().startswith("BGR") else frame.rgb[..., ::-1]
+        return FrameContext(np.ascontiguousarray(pixels), self.pyramid_levels)
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def _match_prepared(
+        self,
+        context: FrameContext,
+        prepared: PreparedTemplate,
+        name: str,
+        threshold: float,
+        scale: float,
+        roi: Optional[Region],
+    ) -> List[TemplateMatch]:
+        """Match one prepared template against a frame, coarse-to-fine."""
+        frame_gray, frame_pyramid, offset = _crop(context, roi)
+        template_h, template_w = prepared.shape
+        if template_h > frame_gray.shape[0] or template_w > frame_gray.shape[1]:
+            return []
+
+        level = _coarse_level(prepared, frame_pyramid)
+        if level == 0:
+            result = cv2.matchTemplate(frame_gray, prepared.gray, cv2.TM_CCOEFF_NORMED)
+            peaks = _peak_locations(result, threshold, min(template_w, template_h) // 2)
+            matches = [
+                TemplateMatch(name, px + offset[0], py + offset[1], template_w, template_h, score, scale)
+                for px, py, score in peaks
+            ]
+            return non_max_suppression(matches, self.iou_threshold)
+
+        matches = []
+        for x0, y0, window in self._refinement_windows(frame_gray, frame_pyramid, prepared, name, threshold, level):
+            refined = cv2.matchTemplate(window, prepared.gray, cv2.TM_CCOEFF_NORMED)
+            _, score, _, location = cv2.minMaxLoc(refined)
+            if score >= threshold:
+                x, y = x0 + location[0] + offset[0], y0 + location[1] + offset[1]
+                matches.append(TemplateMatch(name, x, y, template_w, template_h, float(score), scale))
+        return matches
+
+    def _refinement_windows(
+        self,
+        frame_gray: "np.ndarray",
+        frame_pyramid: List["np.ndarray"],
+        prepared: PreparedTemplate,
+        name: str,
+        threshold: float,
+        level: int,
+    ) -> List[Tuple[int, int, "np.ndarray"]]:
+        """Full-resolution windows around the coarse-level candidates, as (x, y, window)."""
+        template_h, template_w = prepared.shape
+        frame_h, frame_w = frame_gray.shape[:2]
+        factor = 1 << level
+        pad = factor * 2
+        coarse_w, coarse_h = max(1, template_w // factor), max(1, template_h // factor)
+        coarse = cv2.matchTemplate(frame_pyramid[level - 1], prepared.pyramid[level - 1], cv2.TM_CCOEFF_NORMED)
+        peaks = _peak_locations(
+            coarse, threshold * self.coarse_ratio, min(coarse_w, coarse_h) // 2, limit=self.max_candidates
+        )
+        candidates = non_max_suppression(
+            [TemplateMatch(name, cx, cy, coarse_w, coarse_h, score) for cx, cy, score in peaks], self.iou_threshold
+        )
+
+        windows = []
+        for candidate in candidates:
+            x0 = max(0, candidate.x * factor - pad)
+            y0 = max(0, candidate.y * factor - pad)
+            x1 = min(frame_w, candidate.x * factor + template_w + pad)
+            y1 = min(frame_h, candidate.y * factor + template_h + pad)
+            window = frame_gray[y0:y1, x0:x1]
+            if window.shape[0] >= template_h and window.shape[1] >= template_w:
+                windows.append((x0, y0, window))
+        return windows
+
+    def match(
+        self,
+        frame: ImageSource,
+        template: ImageSource,
+        threshold: float = 0.8,
+        roi: Optional[Region] = None,
+        scales: Sequence[float] = (1.0,),
+        name: str = "template",
+    ) -> List[TemplateMatch]:
+        """
+        Find all occurrences of a template in a frame.
+
+        Args:
+            frame: Frame file path, image array, screen capture Frame or prepared FrameContext
+            template: Template file path or image array
+            threshold: Minimum normalized correlation score (0.0 to 1.0)
+            roi: Optional (x, y, width, height) region hint to search in
+            scales: Template scale factors to try
+            name: Name reported in the matches
+
+        Returns:
+            List[TemplateMatch]: Matches above threshold, highest score first
+        """
+        if not _CV2_AVAILABLE:
+            logger.error("OpenCV (cv2) is not available. Cannot perform image recognition.")
+            return []
+
+        context = self.prepare_frame(frame)
+        if context is None:
+            return []
+
+        matches: List[TemplateMatch] = []
+        for scale in scales:
+            prepared = self.get_template(template, scale)
+            if prepared is None:
+                return []
+            matches.extend(self._match_prepared(context, prepared, name, threshold, scale, roi))
+        return non_max_suppression(matches, self.iou_threshold)
+
+    def match_many(
+        self,
+        frame: ImageSource,
+        templates: Mapping[str, ImageSource],
+        threshold: float = 0.8,
+        rois: Optional[Mapping[str, Region]] = None,
+        scales: Sequence[float] = (1.0,),
+        processes: Optional[int] = None,
+    ) -> Dict[str, List[TemplateMatch]]:
+        """
+        Match many templates against one frame.
+
+        The frame is decoded, converted and downsampled once. With ``processes``
+        the templates are distributed over a process pool, which pays off for
+        many large templates on large frames.
+
+        Args:
+            frame: Frame file path, image array or screen capture Frame
+            templates: Mapping of template name to file path or image array
+            threshold: Minimum normalized correlation score (0.0 to 1.0)
+            rois: Optional per-template (x, y, width, height) region hints
+            scales: Template scale factors to try
+            processes: Number of worker processes; None or 1 matches in-process
+
+        Returns:
+            Dict[str, List[TemplateMatch]]: Matches per template name
+        """
+        if not _CV2_AVAILABLE:
+            logger.error("OpenCV (cv2) is not available. Cannot perform image recognition.")
+            return {name: [] for name in templates}
+
+        context = self.prepare_frame(frame)
+        if context is None:
+            return {name: [] for name in templates}
+        rois = rois or {}
+
+        if processes and processes > 1 and len(templates) > 1:
+            jobs = []
+            for name, template in templates.items():
+                prepared = [self.get_template(template, scale) for scale in scales]
+                if any(p is None for p in prepared):
+                    continue
+                jobs.append((name, [p.gray for p in prepared], list(scales), rois.get(name)))
+            results = {name: [] for name in templates}
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_worker,
+                initargs=(
+                    context.gray,
+                    self.pyramid_levels,
+                    self.coarse_ratio,
+                    self.max_candidates,
+                    self.iou_threshold,
+                    threshold,
+                ),
+            ) as pool:
+                for name, matches in pool.map(_match_in_worker, jobs):
+                    results[name] = matches
+            return results
+
+        return {
+            name: self.match(context, template, threshold, rois.get(name), scales, name)
+            for name, template in templates.items()
+        }
+
+    def best_match(
+        self, frame: ImageSource, template: ImageSource, threshold: float = 0.8, **kwargs
+    ) -> Optional[TemplateMatch]:
+        """
+        Find the highest-scoring occurrence of a template.
+
+        Args:
+            frame: Frame file path, image array or screen capture Frame
+            template: Template file path or image array
+            threshold: Minimum normalized correlation score (0.0 to 1.0)
+            **kwargs: Passed to ``match``
+
+        Returns:
+            Optional[TemplateMatch]: Best match, or None if nothing reaches the threshold
+        """
+        matches = self.match(frame, template, threshold, **kwargs)
+        return matches[0] if matches else None
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get template cache statistics.
+
+        Returns:
+            Dict[str, int]: Cached template count and hit/miss counters
+        """
+        with self._lock:
+            return {
+                "cached_templates": len(self._templates),
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+            }
+
+
+def _crop(
+    context: FrameContext, roi: Optional[Region]
+) -> Tuple["np.ndarray", List["np.ndarray"], Tuple[int, int]]:
+    """The frame and its pyramid cropped to ``roi``, with the crop offset."""
+    if roi is None:
+        return context.gray, context.pyramid, (0, 0)
+    x, y, w, h = roi
+    x, y = max(0, x), max(0, y)
+    pyramid = [
+        level[y >> (i + 1) : (y + h) >> (i + 1), x >> (i + 1) : (x + w) >> (i + 1)]
+        for i, level in enumerate(context.pyramid)
+    ]
+    return context.gray[y : y + h, x : x + w], pyramid, (x, y)
+
+
+def _coarse_level(prepared: PreparedTemplate, frame_pyramid: List["np.ndarray"]) -> int:
+    """The coarsest pyramid level where the template is still meaningful (0 for full resolution)."""
+    level = 0
+    for i, template_level in enumerate(prepared.pyramid[: len(frame_pyramid)]):
+        level_frame = frame_pyramid[i]
+        if min(template_level.shape[:2]) < MIN_PYRAMID_TEMPLATE_SIDE:
+            break
+        if template_level.shape[0] > level_frame.shape[0] or template_level.shape[1] > level_frame.shape[1]:
+            break
+        level = i + 1
+    return level
+
+
+# Per-process state for pooled matching
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(frame_gray, pyramid_levels, coarse_ratio, max_candidates, iou_threshold, threshold) -> None:
+    matcher = TemplateMatcher(
+        pyramid_levels=pyramid_levels,
+        coarse_ratio=coarse_ratio,
+        max_candidates=max_candidates,
+        iou_threshold=iou_threshold,
+    )
+    _worker_state["matcher"] = matcher
+    _worker_state["context"] = FrameContext(frame_gray, pyramid_levels)
+    _worker_state["threshold"] = threshold
+
+
+def _match_in_worker(job) -> Tuple[str, List[TemplateMatch]]:
+    name, grays, scales, roi = job
+    matcher: TemplateMatcher = _worker_state["matcher"]
+    context: FrameContext = _worker_state["context"]
+    threshold: float = _worker_state["threshold"]
+    matches = []
+    for gray, scale in zip(grays, scales):
+        prepared = PreparedTemplate(gray=gray, pyramid=build_pyramid(gray, matcher.pyramid_levels))
+        matches.extend(matcher._match_prepared(context, prepared, name, threshold, scale, roi))
+    return name, non_max_suppression(matches, matcher.iou_threshold)
+
+
+# Global matcher instance
+_template_matcher: Optional[TemplateMatcher] = None
+
+
+def get_template_matcher() -> TemplateMatcher:
+    """Get or create the shared template matcher."""
+    global _template_matcher
+    if _template_matcher is None:
+        _template_matcher = TemplateMatcher()
+    return _template_matcher
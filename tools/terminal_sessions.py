@@ -0,0 +1,758 @@
+"""Persistent shell sessions and streaming command execution.
+
+Agents tend to run many short commands in a row. Starting a new shell for each
+one costs a fork/exec plus shell start-up, and ``subprocess.run`` holds every
+byte of output until the command ends. This module keeps long-lived shells
+around instead:
+
+* ``TerminalSession`` wraps one shell process. Named sessions give stdout a
+  PTY, so programs line-buffer as they would in a real terminal; they also
+  export ``TERM=dumb`` and disable pagers and colour, and carriage returns
+  are dropped from their output. Pooled sessions use plain pipes, so
+  captured output is exactly what ``subprocess.run`` would return. stderr is
+  always a separate pipe. Each command ends with a unique marker, which is
+  how the reader thread knows the command finished and what its exit code
+  was.
+* Output is streamed as it arrives to an optional ``on_output(stream, text)``
+  callback. It is also kept in a bounded ``OutputRingBuffer``, so a chatty
+  command cannot exhaust memory; only the tail is kept.
+* ``TerminalSessionManager`` pools idle sessions for anonymous commands and
+  keeps named sessions whose state (cwd, exported variables) persists across
+  calls. It caps the number of concurrently executing commands and exposes
+  ``stream()`` results that work with both ``for`` and ``async for``.
+* On timeout the command's processes are killed: SIGTERM first, then
+  SIGKILL. The session's shell survives with its cwd and variables, unless
+  the command was running inside the shell itself (a builtin loop), in which
+  case the whole session goes down.
+
+``tools.terminal_tool.execute_command`` runs shell commands through
+``get_session_manager()``. ``run_process`` gives commands that bypass the
+shell (``shell=False``) the same streaming and process-group handling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import contextlib
+import os
+import queue
+import selectors
+import shlex
+import shutil
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+import psutil
+
+from tools.terminal_tool import TerminalResult
+from utils.logger import get_logger
+
+try:
+    import pty
+    import termios
+
+    PTY_AVAILABLE = True
+except ImportError:  # pragma: no cover - Windows
+    PTY_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "CommandStream",
+    "OutputChunk",
+    "OutputRingBuffer",
+    "TerminalSession",
+    "TerminalSessionManager",
+    "get_session_manager",
+    "kill_children",
+    "kill_process_group",
+    "run_process",
+]
+
+# Characters of output retained per stream; older output is dropped first
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+# Seconds between SIGTERM and SIGKILL when tearing down a process group
+KILL_GRACE_PERIOD = 1.0
+# Exported by PTY sessions so programs that see a terminal still print plain, unpaged output
+PTY_ENV = {"TERM": "dumb", "PAGER": "cat", "GIT_PAGER": "cat", "NO_COLOR": "1"}
+
+OutputCallback = Callable[[str, str], None]
+
+
+@dataclass
+class OutputChunk:
+    """A piece of command output as it was read."""
+
+    stream: str  # "stdout" or "stderr"
+    text: str
+
+
+class OutputRingBuffer:
+    """Keeps the most recent ``max_chars`` characters of a stream."""
+
+    def __init__(self, max_chars: int = DEFAULT_BUFFER_SIZE):
+        self.max_chars = max_chars
+        self._chunks: Deque[str] = deque()
+        self._size = 0
+        self.dropped = 0
+
+    def append(self, text: str) -> None:
+        if not text:
+            return
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size > self.max_chars:
+            overflow = self._size - self.max_chars
+            head = self._chunks[0]
+            if len(head) <= overflow:
+                self._chunks.popleft()
+                self._size -= len(head)
+                self.dropped += len(head)
+            else:
+                self._chunks[0] = head[overflow:]
+                self._size -= overflow
+                self.dropped += overflow
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped > 0
+
+    def getvalue(self) -> str:
+        return "".join(self._chunks)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def kill_process_group(process: subprocess.Popen, grace: float = KILL_GRACE_PERIOD) -> None:
+    """Terminate ``process`` and everything in its process group.
+
+    The process must have been started with ``start_new_session=True`` so its
+    pid is also its process group id.
+    """
+    for sig, wait in ((signal.SIGTERM, grace), (signal.SIGKILL, None)):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+        except OSError as e:
+            logger.debug("killpg(%s) failed: %s", process.pid, e)
+        try:
+            process.wait(timeout=wait)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def kill_children(process: subprocess.Popen, grace: float = KILL_GRACE_PERIOD) -> bool:
+    """Terminate every descendant of ``process`` but not ``process`` itself.
+
+    Returns:
+        False if ``process`` had no children, so there was nothing to kill.
+    """
+    try:
+        children = psutil.Process(process.pid).children(recursive=True)
+    except psutil.Error:
+        return False
+    if not children:
+        return False
+    for child in children:
+        with contextlib.suppress(psutil.Error):
+            child.terminate()
+    _, alive = psutil.wait_procs(children, timeout=grace)
+    with contextlib.suppress(psutil.Error):
+        # Anything forked while the first batch was shutting down
+        alive += psutil.Process(process.pid).children(recursive=True)
+    for child in alive:
+        with contextlib.suppress(psutil.Error):
+            child.kill()
+    return True
+
+
+def _emit(callback: Optional[OutputCallback], stream: str, text: str) -> None:
+    if callback is None or not text:
+        return
+    try:
+        callback(stream, text)
+    except Exception as e:
+        logger.error("Output callback failed: %s", e)
+
+
+def _default_shell() -> str:
+    for candidate in ("/bin/bash", shutil.which("bash"), "/bin/sh"):
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return "sh"
+
+
+def run_process(
+    command,
+    shell: bool = True,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = 30.0,
+    on_output: Optional[OutputCallback] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> TerminalResult:
+    """Run a one-shot command and stream its output.
+
+    Both pipes are multiplexed on the calling thread. Output goes to
+    ``on_output`` as it arrives and into ring buffers for the result. On
+    timeout the command's whole process group is killed.
+
+    Args:
+        command: Command string (``shell=True``) or argument list.
+        shell: Whether to run the command through the shell.
+        cwd: Working directory.
+        env: Complete environment for the child, or None to inherit.
+        timeout: Seconds before the process group is killed.
+        on_output: Called with ``(stream, text)`` for every chunk read.
+        buffer_size: Characters retained per stream in the result.
+
+    Returns:
+        TerminalResult with the captured (possibly truncated) output.
+    """
+    start = time.monotonic()
+    command_str = command if isinstance(command, str) else shlex.join(command)
+    process = subprocess.Popen(
+        command,
+        shell=shell,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    buffers = {"stdout": OutputRingBuffer(buffer_size), "stderr": OutputRingBuffer(buffer_size)}
+    decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in buffers}
+    deadline = None if timeout is None else start + timeout
+    timed_out = False
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(process.stderr, selectors.EVENT_READ, "stderr")
+        try:
+            while selector.get_map():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    timed_out = True
+                    break
+                for key, _ in selector.select(remaining):
+                    data = os.read(key.fd, 65536)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        text = decoders[key.data].decode(b"", final=True)
+                    else:
+                        text = decoders[key.data].decode(data)
+                    buffers[key.data].append(text)
+                    _emit(on_output, key.data, text)
+        finally:
+            if timed_out:
+                kill_process_group(process)
+            process.stdout.close()
+            process.stderr.close()
+
+    if not timed_out:
+        try:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            process.wait(timeout=remaining)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            kill_process_group(process)
+
+    return TerminalResult(
+        success=not timed_out and process.returncode == 0,
+        command=command_str,
+        stdout=buffers["stdout"].getvalue(),
+        stderr=buffers["stderr"].getvalue(),
+        return_code=process.returncode if process.returncode is not None else -1,
+        execution_time=time.monotonic() - start,
+        process_id=process.pid,
+        working_directory=cwd,
+        error=f"Command timed out after {timeout} seconds" if timed_out else None,
+        truncated=buffers["stdout"].truncated or buffers["stderr"].truncated,
+    )
+
+
+class _PendingCommand:
+    """Book-keeping for the command currently running in a session."""
+
+    def __init__(self, marker: str, on_output: Optional[OutputCallback], buffer_size: int):
+        self.marker = marker
+        self.on_output = on_output
+        self.buffers = {"stdout": OutputRingBuffer(buffer_size), "stderr": OutputRingBuffer(buffer_size)}
+        self.pending = {"stdout": "", "stderr": ""}
+        self.finished = {"stdout": False, "stderr": False}
+        self.return_code: Optional[int] = None
+        self.done = threading.Event()
+        self.error: Optional[str] = None
+
+    def output(self, stream: str, text: str) -> None:
+        self.buffers[stream].append(text)
+        _emit(self.on_output, stream, text)
+
+    def feed(self, stream: str, text: str) -> None:
+        """Forward output, holding back anything that may be the end marker."""
+        if self.finished[stream]:
+            return
+        data = self.pending[stream] + text
+        index = data.find(self.marker)
+        if index >= 0:
+            end = data.find("\n", index)
+            self.output(stream, data[:index])
+            if end < 0:
+                # The exit code has not fully arrived yet
+                self.pending[stream] = data[index:]
+                return
+            if stream == "stdout":
+                try:
+                    self.return_code = int(data[index + len(self.marker) : end])
+                except ValueError:
+                    self.return_code = -1
+            self.pending[stream] = ""
+            self.finished[stream] = True
+            if all(self.finished.values()):
+                self.done.set()
+            return
+
+        # Keep the longest suffix that could still grow into the marker
+        keep = 0
+        for size in range(min(len(self.marker) - 1, len(data)), 0, -1):
+            if self.marker.startswith(data[-size:]):
+                keep = size
+                break
+        self.output(stream, data[: len(data) - keep])
+        self.pending[stream] = data[len(data) - keep :]
+
+    def abort(self, error: str) -> None:
+        for stream, text in self.pending.items():
+            self.output(stream, text)
+            self.pending[stream] = ""
+        self.error = error
+        self.done.set()
+
+
+class TerminalSession:
+    """A long-lived shell that runs commands one at a time.
+
+    Commands run in the shell itself, so ``cd`` and ``export`` persist
+    between calls (pass ``isolated=True`` to run in a subshell instead). A
+    command that times out has its processes killed; the shell keeps its
+    state. Only a command running inside the shell itself (with no child
+    process to kill) takes the session down, and ``alive`` turns False.
+    """
+
+    def __init__(
+        self,
+        shell: Optional[str] = None,
+        working_dir: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        name: Optional[str] = None,
+        use_pty: bool = True,
+    ):
+        self.shell = shell or _default_shell()
+        self.name = name or f"session-{uuid.uuid4().hex[:8]}"
+        self.buffer_size = buffer_size
+        self.last_used = time.monotonic()
+        self.commands_run = 0
+        self._lock = threading.Lock()
+        self._current: Optional[_PendingCommand] = None
+        self._state_lock = threading.Lock()
+
+        args = [self.shell]
+        if os.path.basename(self.shell) == "bash":
+            args += ["--noprofile", "--norc"]
+        stdout_target, master_fd = subprocess.PIPE, None
+        self.use_pty = use_pty and PTY_AVAILABLE
+        if self.use_pty:
+            env = {**(os.environ if env is None else env), **PTY_ENV}
+            master_fd, slave_fd = pty.openpty()
+            attrs = termios.tcgetattr(slave_fd)
+            attrs[1] &= ~termios.OPOST  # keep "\n" instead of "\r\n"
+            termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+            stdout_target = slave_fd
+        try:
+            self._process = subprocess.Popen(
+                args,
+                stdin=subprocess.PIPE,
+                stdout=stdout_target,
+                stderr=subprocess.PIPE,
+                cwd=working_dir,
+                env=env,
+                start_new_session=True,
+            )
+        finally:
+            if master_fd is not None:
+                os.close(slave_fd)
+        self._stdout_fd = master_fd if master_fd is not None else self._process.stdout.fileno()
+        self._stderr_fd = self._process.stderr.fileno()
+        self._reader = threading.Thread(
+            target=self._read_loop, name=f"terminal-{self.name}", daemon=True
+        )
+        self._reader.start()
+        logger.debug("Started shell session %s (pid %s)", self.name, self._process.pid)
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def _read_loop(self) -> None:
+        decoders = {
+            "stdout": codecs.getincrementaldecoder("utf-8")(errors="replace"),
+            "stderr": codecs.getincrementaldecoder("utf-8")(errors="replace"),
+        }
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._stdout_fd, selectors.EVENT_READ, "stdout")
+            selector.register(self._stderr_fd, selectors.EVENT_READ, "stderr")
+            while selector.get_map():
+                for key, _ in selector.select():
+                    try:
+                        data = os.read(key.fd, 65536)
+                    except OSError:  # EIO once the PTY's other end is gone
+                        data = b""
+                    if not data:
+                        selector.unregister(key.fd)
+                        continue
+                    text = decoders[key.data].decode(data)
+                    if self.use_pty and key.data == "stdout":
+                        text = text.replace("\r", "")
+                    with self._state_lock:
+                        current = self._current
+                    if current is not None:
+                        current.feed(key.data, text)
+
+        with self._state_lock:
+            current = self._current
+        if current is not None and not current.done.is_set():
+            current.abort("Shell session exited")
+        if self._stdout_fd != self._stderr_fd and self._process.stdout is None:
+            with contextlib.suppress(OSError):
+                os.close(self._stdout_fd)
+        self._process.wait()
+        logger.debug("Shell session %s exited with %s", self.name, self._process.returncode)
+
+    def run(
+        self,
+        command: str,
+        timeout: Optional[float] = 30.0,
+        on_output: Optional[OutputCallback] = None,
+        working_dir: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        isolated: bool = False,
+    ) -> TerminalResult:
+        """Run ``command`` in this session and wait for it to finish.
+
+        Args:
+            command: Shell command line.
+            timeout: Seconds before the command's processes are killed.
+            on_output: Called with ``(stream, text)`` as output arrives.
+            working_dir: Directory to ``cd`` into before running.
+            env: Variables to export before running.
+            isolated: Run in a subshell so cd/export do not persist.
+
+        Returns:
+            TerminalResult for the command.
+        """
+        start = time.monotonic()
+        with self._lock:
+            if not self.alive:
+                return TerminalResult(
+                    success=False,
+                    command=command,
+                    working_directory=working_dir,
+                    error=f"Shell session {self.name} is not running",
+                )
+
+            steps = []
+            if working_dir:
+                steps.append(f"cd {shlex.quote(working_dir)}")
+            for key, value in (env or {}).items():
+                if key.isidentifier():
+                    steps.append(f"export {key}={shlex.quote(value)}")
+            steps.append(f"eval {shlex.quote(command)}")
+            body = " && ".join(steps)
+            if isolated:
+                body = f"( {body} )"
+            marker = f"__ATLAS_DONE_{uuid.uuid4().hex}__"
+            script = (
+                f"{body} </dev/null\n"
+                f"printf '%s%d\\n' '{marker}' \"$?\"\n"
+                f"printf '%s\\n' '{marker}' >&2\n"
+            )
+
+            pending = _PendingCommand(marker, on_output, self.buffer_size)
+            with self._state_lock:
+                self._current = pending
+            try:
+                self._process.stdin.write(script.encode())
+                self._process.stdin.flush()
+                finished = pending.done.wait(timeout)
+            except (BrokenPipeError, OSError) as e:
+                pending.abort(f"Shell session exited: {e}")
+                finished = True
+            if not finished:
+                logger.warning("Command timed out in %s, killing it", self.name)
+                if not kill_children(self._process):
+                    # Nothing but the shell is running the command
+                    kill_process_group(self._process)
+                pending.done.wait(KILL_GRACE_PERIOD)
+                pending.error = f"Command timed out after {timeout} seconds"
+            with self._state_lock:
+                self._current = None
+            self.commands_run += 1
+            self.last_used = time.monotonic()
+
+        return_code = pending.return_code if pending.return_code is not None else -1
+        stdout, stderr = pending.buffers["stdout"], pending.buffers["stderr"]
+        return TerminalResult(
+            success=pending.error is None and return_code == 0,
+            command=command,
+            stdout=stdout.getvalue(),
+            stderr=stderr.getvalue(),
+            return_code=return_code,
+            execution_time=time.monotonic() - start,
+            process_id=self.pid,
+            working_directory=working_dir,
+            error=pending.error,
+            truncated=stdout.truncated or stderr.truncated,
+        )
+
+    def close(self) -> None:
+        """Shut the shell down and wait for the reader thread."""
+        if self.alive:
+            with contextlib.suppress(OSError):
+                self._process.stdin.close()
+            try:
+                self._process.wait(timeout=KILL_GRACE_PERIOD)
+            except subprocess.TimeoutExpired:
+                kill_process_group(self._process)
+        elif self._process.stdin and not self._process.stdin.closed:
+            self._process.stdin.close()
+        self._reader.join(timeout=KILL_GRACE_PERIOD)
+
+
+_DONE = object()
+
+
+class CommandStream:
+    """Output of a command that is still running.
+
+    Iterate with ``for`` or ``async for`` to receive ``OutputChunk`` objects
+    as they are produced. Once iteration ends, ``result`` holds the final
+    TerminalResult. ``wait()`` blocks for the result without consuming
+    chunks.
+    """
+
+    def __init__(self, command: str):
+        self.command = command
+        self.future: Future = Future()
+        self._queue: "queue.Queue" = queue.Queue()
+
+    def _push(self, stream: str, text: str) -> None:
+        self._queue.put(OutputChunk(stream, text))
+
+    def _finish(self, future: Future) -> None:
+        self._queue.put(_DONE)
+
+    @property
+    def result(self) -> Optional[TerminalResult]:
+        return self.future.result() if self.future.done() else None
+
+    def wait(self, timeout: Optional[float] = None) -> TerminalResult:
+        return self.future.result(timeout)
+
+    def __iter__(self) -> Iterator[OutputChunk]:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._queue.get)
+            if item is _DONE:
+                return
+            yield item
+
+
+class TerminalSessionManager:
+    """Pools shell sessions and bounds how many commands run at once.
+
+    Anonymous commands borrow an idle session and run isolated in a subshell
+    of it, so they behave like ``subprocess.run`` without the start-up cost.
+    Pooled sessions use plain pipes rather than a PTY. Named sessions
+    (``session_id``) get a PTY and keep their shell state between calls.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_idle_sessions: int = 4,
+        shell: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_idle_sessions = max_idle_sessions
+        self.shell = shell
+        self.buffer_size = buffer_size
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._idle: List[TerminalSession] = []
+        self._named: Dict[str, TerminalSession] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def session(self, session_id: str, working_dir: Optional[str] = None) -> TerminalSession:
+        """Return the named session, starting (or restarting) it if needed."""
+        with self._lock:
+            session = self._named.get(session_id)
+            if session is None or not session.alive:
+                session = TerminalSession(
+                    shell=self.shell, working_dir=working_dir, buffer_size=self.buffer_size, name=session_id
+                )
+                self._named[session_id] = session
+            return session
+
+    def _acquire(self) -> TerminalSession:
+        with self._lock:
+            while self._idle:
+                session = self._idle.pop()
+                if session.alive:
+                    return session
+        return TerminalSession(shell=self.shell, buffer_size=self.buffer_size, use_pty=False)
+
+    def _release(self, session: TerminalSession) -> None:
+        with self._lock:
+            if session.alive and len(self._idle) < self.max_idle_sessions:
+                self._idle.append(session)
+                return
+        session.close()
+
+    def run(
+        self,
+        command: str,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = 30.0,
+        on_output: Optional[OutputCallback] = None,
+        working_dir: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> TerminalResult:
+        """Run a command, blocking while ``max_concurrent`` others are running.
+
+        Args:
+            command: Shell command line.
+            session_id: Named session to run in; None borrows a pooled one.
+            timeout: Seconds before the command's processes are killed.
+            on_output: Called with ``(stream, text)`` as output arrives.
+            working_dir: Directory for the command (defaults to the current
+                directory for anonymous commands).
+            env: Extra environment variables.
+
+        Returns:
+            TerminalResult for the command.
+        """
+        with self._slots:
+            if session_id is not None:
+                return self.session(session_id).run(
+                    command, timeout=timeout, on_output=on_output, working_dir=working_dir, env=env
+                )
+            session = self._acquire()
+            try:
+                return session.run(
+                    command,
+                    timeout=timeout,
+                    on_output=on_output,
+                    working_dir=working_dir or os.getcwd(),
+                    env=env,
+                    isolated=True,
+                )
+            finally:
+                self._release(session)
+
+    def submit(self, command: str, **kwargs) -> Future:
+        """Run a command in the background; returns a Future of its result."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent, thread_name_prefix="terminal"
+                )
+            executor = self._executor
+        return executor.submit(self.run, command, **kwargs)
+
+    def stream(self, command: str, **kwargs) -> CommandStream:
+        """Start a command and return a CommandStream of its output."""
+        stream = CommandStream(command)
+        user_callback = kwargs.pop("on_output", None)
+
+        def forward(name: str, text: str) -> None:
+            stream._push(name, text)
+            _emit(user_callback, name, text)
+
+        future = self.submit(command, on_output=forward, **kwargs)
+        stream.future = future
+        future.add_done_callback(stream._finish)
+        return stream
+
+    def close_session(self, session_id: str) -> bool:
+        with self._lock:
+            session = self._named.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+    def list_sessions(self) -> List[Dict[str, object]]:
+        with self._lock:
+            sessions = list(self._named.values())
+            idle = len(self._idle)
+        listing = [
+            {"name": s.name, "pid": s.pid, "alive": s.alive, "busy": s.busy, "commands_run": s.commands_run}
+            for s in sessions
+        ]
+        return listing + [{"name": "<pool>", "idle": idle}]
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._named.values()) + self._idle
+            self._named.clear()
+            self._idle = []
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for session in sessions:
+            session.close()
+
+
+_default_manager: Optional[TerminalSessionManager] = None
+_default_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> TerminalSessionManager:
+    """Return the process-wide session manager."""
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = TerminalSessionManager()
+        return _default_manager
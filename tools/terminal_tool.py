@@ -9,10 +9,11 @@ from __future__ import annotations
 import os
 import signal
 import subprocess
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 from utils.logger import get_logger
 
@@ -41,6 +42,20 @@ class TerminalResult:
     process_id: Optional[int] = None
     working_directory: Optional[str] = None
     error: Optional[str] = None
+    truncated: bool = False
+
+
+# Fire-and-forget processes, kept so they can be reaped instead of lingering
+# as zombies (and so their Popen handles are not leaked)
+_detached: Dict[int, subprocess.Popen] = {}
+_detached_lock = threading.Lock()
+
+
+def _reap_detached() -> None:
+    with _detached_lock:
+        for pid, process in list(_detached.items()):
+            if process.poll() is not None:
+                del _detached[pid]
 
 
 def execute_command(
@@ -50,9 +65,15 @@ def execute_command(
     capture_output: bool = True,
     shell: bool = True,
     env: Optional[Dict[str, str]] = None,
+    on_output: Optional[Callable[[str, str], None]] = None,
+    session: Optional[str] = None,
 ) -> TerminalResult:
     """Execute a terminal command.
 
+    Output is streamed to ``on_output`` while the command runs. Only the tail
+    of very large outputs is kept in the result (see ``truncated``). On
+    timeout the command and its child processes are killed.
+
     Args:
         command: Command to execute
         working_dir: Working directory for command execution
@@ -60,16 +81,21 @@ def execute_command(
         capture_output: Whether to capture stdout/stderr
         shell: Whether to run command through shell
         env: Environment variables to set
+        on_output: Callback receiving ``(stream, text)`` chunks as they arrive
+        session: Name of a persistent shell session to run in; cd/export
+            state carries over between commands in the same session
 
     Returns:
         TerminalResult with execution details
     """
     start_time = time.time()
+    _reap_detached()
 
     try:
-        # Prepare environment
-        exec_env = os.environ.copy()
+        # Only copy the environment when it is actually modified
+        exec_env = None
         if env:
+            exec_env = os.environ.copy()
             exec_env.update(env)
 
         # Change working directory if specified
@@ -84,23 +110,31 @@ def execute_command(
         if working_dir:
             logger.info(f"Working directory: {working_dir}")
 
-        # Execute command
-        if capture_output:
-            result = subprocess.run(
+        # Execute command. Shell commands run in a pooled shell (isolated in a
+        # subshell unless a named session is given) instead of a new process.
+        if session is not None or (capture_output and shell):
+            from tools.terminal_sessions import get_session_manager
+
+            result = get_session_manager().run(
+                command,
+                session_id=session,
+                timeout=timeout,
+                on_output=on_output,
+                working_dir=working_dir,
+                env=env,
+            )
+        elif capture_output:
+            # Argument-style commands (shell=False) bypass the shell pool
+            from tools.terminal_sessions import run_process
+
+            result = run_process(
                 command,
-                check=False,
                 shell=shell,
                 cwd=working_dir,
                 env=exec_env,
-                capture_output=True,
-                text=True,
                 timeout=timeout,
+                on_output=on_output,
             )
-
-            stdout = result.stdout
-            stderr = result.stderr
-            return_code = result.returncode
-            process_id = None
         else:
             # For non-capturing execution (fire and forget)
             process = subprocess.Popen(
@@ -108,11 +142,23 @@ def execute_command(
                 shell=shell,
                 cwd=working_dir,
                 env=exec_env,
+                start_new_session=True,
+            )
+            with _detached_lock:
+                _detached[process.pid] = process
+            result = TerminalResult(
+                success=True, command=command, process_id=process.pid
             )
-            stdout = ""
-            stderr = ""
-            return_code = 0
-            process_id = process.pid
+
+        if result.error:
+            logger.error(result.error)
+            result.execution_time = time.time() - start_time
+            result.working_directory = working_dir
+            return result
+        stdout = result.stdout
+        stderr = result.stderr
+        return_code = result.return_code
+        process_id = result.process_id
 
         execution_time = time.time() - start_time
         success = return_code == 0
@@ -133,19 +179,7 @@ def execute_command(
             execution_time=execution_time,
             process_id=process_id,
             working_directory=working_dir,
-        )
-
-    except subprocess.TimeoutExpired:
-        execution_time = time.time() - start_time
-        error_msg = f"Command timed out after {timeout} seconds"
-        logger.error(error_msg)
-
-        return TerminalResult(
-            success=False,
-            command=command,
-            execution_time=execution_time,
-            working_directory=working_dir,
-            error=error_msg,
+            truncated=result.truncated,
         )
 
     except Exception as e:
@@ -276,6 +310,7 @@ def kill_process(process_id: int, force: bool = False) -> TerminalResult:
     try:
         sig = signal.SIGKILL if force else signal.SIGTERM
         os.kill(process_id, sig)
+        _reap_detached()
 
         execution_time = time.time() - start_time
 
@@ -0,0 +1,463 @@
+"""
+Translation memory and batched, incremental translation for Atlas.
+
+Chat translation mostly sees text it has seen before, such as UI strings,
+greetings, and replies that repeat earlier sentences. This module translates
+at sentence level and remembers every segment:
+
+* ``segment_text`` splits text into sentences and lines and keeps the
+  separators, so the translation is reassembled with the original layout.
+* ``TranslationMemory`` is a persistent SQLite store keyed by (text hash,
+  source, target), with a small in-process LRU in front of it.
+* ``TranslationEngine`` looks every segment up in the memory. Only the
+  misses go to the LLM, many at a time as a numbered JSON batch. Reply
+  items that are missing or implausible are never stored; those segments
+  fall back to per-segment calls.
+* ``detect_language_fast`` is a single-pass, character- and stopword-based
+  language ID for English, Ukrainian and Russian. It decides almost every
+  message without any pattern matching or model call.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_PATH = os.path.join(
+    os.path.expanduser("~"), ".atlas", "cache", "translation_memory.sqlite3"
+)
+
+LANGUAGE_NAMES = {"uk": "Ukrainian", "ru": "Russian", "en": "English"}
+
+# Sentence ends, or line breaks; the separator is kept so text can be rebuilt
+_SEGMENT_RE = re.compile(r"(?<=[.!?…])\s+|\n+")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)?")
+
+# Batched reply items longer than this many times their segment (plus slack) are not trusted
+_MAX_LENGTH_RATIO = 4
+_LENGTH_SLACK = 40
+
+_UK_LETTERS = frozenset("іїєґ")
+_RU_LETTERS = frozenset("ыъэё")
+_UK_WORDS = frozenset(
+    {
+        "і", "й", "що", "як", "де", "коли", "чому", "хто", "це", "ти", "ви", "він", "вона", "ми", "вони", "мені",
+        "тобі", "будь", "ласка", "дякую", "привіт", "добрий", "потрібно", "треба", "хочу", "можеш", "можете",
+        "зроби", "відкрий", "покажи", "допоможи", "розкажи", "поясни", "так", "ні", "але", "або", "для", "від",
+        "при", "про", "щоб", "також",
+    }
+)
+_RU_WORDS = frozenset(
+    {
+        "и", "что", "как", "где", "когда", "почему", "кто", "это", "ты", "вы", "он", "она", "мы", "они", "мне",
+        "тебе", "пожалуйста", "спасибо", "привет", "добрый", "нужно", "надо", "хочу", "можешь", "можете", "сделай",
+        "открой", "покажи", "помоги", "расскажи", "объясни", "да", "нет", "но", "или", "для", "от", "при", "про",
+        "чтобы", "тоже", "также",
+    }
+)
+
+
+def segment_text(text: str) -> List[Tuple[str, str]]:
+    """Split text into ``(segment, separator)`` pairs.
+
+    ``"".join(s + sep for s, sep in segment_text(text)) == text`` always holds.
+    """
+    pieces: List[Tuple[str, str]] = []
+    position = 0
+    for match in _SEGMENT_RE.finditer(text):
+        pieces.append((text[position : match.start()], match.group()))
+        position = match.end()
+    pieces.append((text[position:], ""))
+    if pieces and not pieces[-1][0] and len(pieces) > 1:
+        segment, separator = pieces.pop()
+        previous, previous_sep = pieces.pop()
+        pieces.append((previous, previous_sep + separator))
+    return pieces
+
+
+def needs_translation(segment: str) -> bool:
+    """Whether a segment contains any letters (numbers, symbols and blanks pass through)."""
+    return bool(_LETTER_RE.search(segment))
+
+
+def memory_key(text: str, source: str, target: str) -> str:
+    """Stable key for a segment translation."""
+    digest = hashlib.sha256()
+    for part in (text.strip(), source, target):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _count_letters(text: str) -> Tuple[int, int, int, int]:
+    """Count letters, Cyrillic letters and letters specific to Ukrainian and Russian."""
+    letters = cyrillic = uk_marks = ru_marks = 0
+    for char in text.lower():
+        if not char.isalpha():
+            continue
+        letters += 1
+        if "Ѐ" <= char <= "ӿ":
+            cyrillic += 1
+            if char in _UK_LETTERS:
+                uk_marks += 1
+            elif char in _RU_LETTERS:
+                ru_marks += 1
+    return letters, cyrillic, uk_marks, ru_marks
+
+
+def detect_language_fast(text: str) -> Optional[Tuple[str, float]]:
+    """
+    Identify English, Ukrainian or Russian from letters and stopwords.
+
+    Returns:
+        ``(language_code, confidence)``, or None when the text is ambiguous
+        (for example Cyrillic without any distinguishing letter or word).
+    """
+    letters, cyrillic, uk_marks, ru_marks = _count_letters(text)
+    if letters == 0:
+        return None
+    ratio = cyrillic / letters
+    if ratio < 0.2:
+        return "en", round(1.0 - ratio, 2)
+    if uk_marks and not ru_marks:
+        return "uk", round(min(1.0, 0.8 + 0.05 * uk_marks), 2)
+    if ru_marks and not uk_marks:
+        return "ru", round(min(1.0, 0.8 + 0.05 * ru_marks), 2)
+
+    words = _WORD_RE.findall(text.lower())
+    uk_words = sum(word in _UK_WORDS for word in words)
+    ru_words = sum(word in _RU_WORDS for word in words)
+    uk_score, ru_score = uk_words + 2 * uk_marks, ru_words + 2 * ru_marks
+    if uk_score == ru_score:
+        return None
+    language = "uk" if uk_score > ru_score else "ru"
+    confidence = max(uk_score, ru_score) / (uk_score + ru_score)
+    return language, round(min(1.0, confidence), 2)
+
+
+class TranslationMemory:
+    """Persistent segment translations with an in-process LRU front."""
+
+    def __init__(self, path: str = DEFAULT_MEMORY_PATH, lru_size: int = 4096):
+        """
+        Open (and create if needed) the memory database.
+
+        Args:
+            path: Database file path, or ":memory:" for an in-memory store
+            lru_size: Number of translations kept in process memory
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, source TEXT NOT NULL, target TEXT NOT NULL, "
+                "translation TEXT NOT NULL, hits INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL)"
+            )
+
+    def _remember(self, key: str, translation: str) -> None:
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, texts: Iterable[str], source: str, target: str) -> Dict[str, str]:
+        """Look up translations; returns only the texts that were found."""
+        keys = {memory_key(text, source, target): text for text in texts}
+        found: Dict[str, str] = {}
+        with self._lock:
+            missing = []
+            for key, text in keys.items():
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[text] = self._lru[key]
+                else:
+                    missing.append(key)
+            loaded = []
+            for start in range(0, len(missing), 500):
+                batch = missing[start : start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, translation in rows:
+                    found[keys[key]] = translation
+                    self._remember(key, translation)
+                    loaded.append((key,))
+            if loaded:
+                # Only disk hits are counted; LRU hits never touch the database
+                with self._conn:
+                    self._conn.executemany("UPDATE translations SET hits = hits + 1 WHERE key = ?", loaded)
+        return found
+
+    def get(self, text: str, source: str, target: str) -> Optional[str]:
+        """Look up a single translation."""
+        return self.get_many([text], source, target).get(text)
+
+    def put_many(self, pairs: Dict[str, str], source: str, target: str) -> None:
+        """Store translations for ``{text: translation}``."""
+        now = time.time()
+        rows = [
+            (memory_key(text, source, target), source, target, translation, now)
+            for text, translation in pairs.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, source, target, translation, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            for key, _, _, translation, _ in rows:
+                self._remember(key, translation)
+
+    def put(self, text: str, translation: str, source: str, target: str) -> None:
+        """Store one translation."""
+        self.put_many({text: translation}, source, target)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all stored translations."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM translations")
+            self._lru.clear()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class TranslationStats:
+    """Counters for one ``translate_many`` call."""
+
+    segments: int = 0
+    memory_hits: int = 0
+    llm_calls: int = 0
+    translated: int = 0
+
+
+class TranslationEngine:
+    """Segment-level translator backed by a translation memory."""
+
+    def __init__(
+        self,
+        llm_manager: Any = None,
+        memory: Optional[TranslationMemory] = None,
+        max_batch_segments: int = 40,
+        max_batch_chars: int = 4000,
+        max_concurrency: int = 2,
+    ):
+        """
+        Create the engine.
+
+        Args:
+            llm_manager: ``LLMManager`` (or anything with a compatible ``chat``)
+            memory: Translation memory; a per-process default when None
+            max_batch_segments: Segments sent in one LLM call
+            max_batch_chars: Approximate character budget of one LLM call
+            max_concurrency: Concurrent LLM calls when several batches are needed
+        """
+        self.llm_manager = llm_manager
+        self.memory = memory if memory is not None else get_translation_memory()
+        self.max_batch_segments = max_batch_segments
+        self.max_batch_chars = max_batch_chars
+        self.max_concurrency = max_concurrency
+        self.last_stats = TranslationStats()
+
+    def _chat(self, prompt: str) -> Optional[str]:
+        result = self.llm_manager.chat([{"role": "user", "content": prompt}])
+        if result and result.response_text:
+            return result.response_text.strip()
+        return None
+
+    def _translate_one(self, text: str, source: str, target: str) -> Optional[str]:
+        source_name = LANGUAGE_NAMES.get(source, source)
+        target_name = LANGUAGE_NAMES.get(target, target)
+        prompt = (
+            f"You are a professional translator. Translate the following text from {source_name} to {target_name}."
+        )
+        prompt += f"""
+
+Preserve the original meaning, tone, and intent. If the text contains technical terms or commands, keep them accurate.
+If the text is already in {target_name}, return it unchanged.
+
+Text to translate: {text}
+
+Provide only the translation, no additional explanation."""
+        return self._chat(prompt)
+
+    def _translate_batch(self, segments: Sequence[str], source: str, target: str) -> Tuple[Dict[str, str], int]:
+        """Translate a batch of segments; returns (translations, llm_calls)."""
+        if len(segments) == 1:
+            translation = self._translate_one(segments[0], source, target)
+            return ({segments[0]: translation} if translation else {}), 1
+
+        source_name = LANGUAGE_NAMES.get(source, source)
+        target_name = LANGUAGE_NAMES.get(target, target)
+        prompt = (
+            f"You are a professional translator. Translate each numbered segment from {source_name} "
+            f"to {target_name}. Preserve meaning, tone and technical terms; leave segments already "
+            f"in {target_name} unchanged.\n\n"
+            f"Reply with only a JSON array of {len(segments)} strings, one translation per segment, "
+            "in the same order.\n\n"
+            + json.dumps({str(i + 1): s for i, s in enumerate(segments)}, ensure_ascii=False, indent=0)
+        )
+        result = _parse_batch_reply(self._chat(prompt), segments)
+        calls = 1
+        rejected = [segment for segment in segments if segment not in result]
+        if rejected:
+            logger.warning(
+                "Batched translation reply was unusable for %d of %d segments; translating them individually",
+                len(rejected),
+                len(segments),
+            )
+        for segment in rejected:
+            translation = self._translate_one(segment, source, target)
+            calls += 1
+            if translation:
+                result[segment] = translation
+        return result, calls
+
+    def _batches(self, segments: List[str]) -> List[List[str]]:
+        batches: List[List[str]] = []
+        current: List[str] = []
+        size = 0
+        for segment in segments:
+            if current and (len(current) >= self.max_batch_segments or size + len(segment) > self.max_batch_chars):
+                batches.append(current)
+                current, size = [], 0
+            current.append(segment)
+            size += len(segment)
+        if current:
+            batches.append(current)
+        return batches
+
+    def translate_many(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        """
+        Translate several texts, sharing memory lookups and LLM batches.
+
+        Without an LLM (or if it fails) untranslated segments are returned
+        unchanged and nothing is stored for them.
+        """
+        stats = TranslationStats()
+        self.last_stats = stats
+        if source == target:
+            return list(texts)
+
+        segmented = [segment_text(text) for text in texts]
+        unique = list(
+            dict.fromkeys(
+                segment.strip()
+                for pieces in segmented
+                for segment, _ in pieces
+                if needs_translation(segment)
+            )
+        )
+        stats.segments = len(unique)
+        known = self.memory.get_many(unique, source, target) if unique else {}
+        stats.memory_hits = len(known)
+        missing = [segment for segment in unique if segment not in known]
+
+        if missing and self.llm_manager is not None:
+            fresh = self._translate_missing(missing, source, target, stats)
+            if fresh:
+                self.memory.put_many(fresh, source, target)
+                known.update(fresh)
+            stats.translated = len(fresh)
+        elif missing:
+            logger.warning("No LLM manager available for translation")
+
+        return [_rebuild(pieces, known) for pieces in segmented]
+
+    def _translate_missing(
+        self, missing: List[str], source: str, target: str, stats: TranslationStats
+    ) -> Dict[str, str]:
+        """Translate segments in LLM batches, concurrently when there are several."""
+        batches = self._batches(missing)
+        try:
+            if len(batches) == 1 or self.max_concurrency <= 1:
+                outcomes = [self._translate_batch(batch, source, target) for batch in batches]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                    outcomes = list(pool.map(lambda b: self._translate_batch(b, source, target), batches))
+        except Exception as e:
+            logger.error(f"LLM translation error: {e}")
+            outcomes = []
+        fresh: Dict[str, str] = {}
+        for translations, calls in outcomes:
+            fresh.update(translations)
+            stats.llm_calls += calls
+        return fresh
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        """Translate one text."""
+        return self.translate_many([text], source, target)[0]
+
+
+def _plausible_translation(segment: str, item: Any) -> bool:
+    """Whether a batched reply item can be stored as the translation of ``segment``."""
+    if not isinstance(item, str) or not item.strip():
+        return False
+    # Far longer than its source usually means the model merged or shifted segments
+    return len(item) <= _MAX_LENGTH_RATIO * len(segment) + _LENGTH_SLACK
+
+
+def _parse_batch_reply(reply: Optional[str], segments: Sequence[str]) -> Dict[str, str]:
+    """Translations from a batched JSON reply, leaving out items that do not look like one."""
+    match = re.search(r"\[.*\]", reply, re.DOTALL) if reply else None
+    if match is None:
+        return {}
+    try:
+        parsed = json.loads(match.group())
+    except ValueError:
+        return {}
+    if not isinstance(parsed, list) or len(parsed) != len(segments):
+        return {}
+    return {segment: item for segment, item in zip(segments, parsed) if _plausible_translation(segment, item)}
+
+
+def _rebuild(pieces: List[Tuple[str, str]], known: Dict[str, str]) -> str:
+    """Join segments back together, substituting known translations."""
+    out = []
+    for segment, separator in pieces:
+        stripped = segment.strip()
+        if stripped in known:
+            # Keep the segment's own surrounding whitespace
+            lead = segment[: len(segment) - len(segment.lstrip())]
+            trail = segment[len(segment.rstrip()) :]
+            segment = lead + known[stripped] + trail
+        out.append(segment + separator)
+    return "".join(out)
+
+
+_default_memory: Optional[TranslationMemory] = None
+_default_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory:
+    """Return the shared on-disk translation memory."""
+    global _default_memory
+    with _default_memory_lock:
+        if _default_memory is None:
+            _default_memory = TranslationMemory()
+        return _default_memory
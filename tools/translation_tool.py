@@ -4,12 +4,23 @@ Translation Tool for Ukrainian/Russian Support
 This tool handles automatic translation for Ukrainian and Russian users,
 translating incoming messages to English for internal processing and
 translating responses back to the user's language.
+
+Translations go through a sentence-level translation memory (see
+``tools.translation_memory``), so repeated UI strings and phrases are never
+sent to the LLM twice, and new sentences are translated in batches.
 """
 
 import logging
 import re
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Tuple
+from typing import List, Optional, Sequence, Tuple
+
+from tools.translation_memory import (
+    TranslationEngine,
+    TranslationMemory,
+    detect_language_fast,
+)
 
 try:
     from utils.llm_manager import LLMManager
@@ -36,8 +47,12 @@ class TranslationResult:
 class TranslationTool:
     """Handles translation for Ukrainian/Russian chat messages."""
 
-    def __init__(self, llm_manager=None):
-        self.llm_manager = llm_manager
+    # Detection results remembered per tool instance
+    DETECTION_CACHE_SIZE = 1024
+
+    def __init__(self, llm_manager=None, memory: Optional[TranslationMemory] = None):
+        self.engine = TranslationEngine(llm_manager, memory)
+        self._detection_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
         self.supported_languages = {
             "uk": "Ukrainian",
             "ru": "Russian",
@@ -71,16 +86,41 @@ class TranslationTool:
             ],
         }
 
+    @property
+    def llm_manager(self):
+        return self.engine.llm_manager
+
+    @llm_manager.setter
+    def llm_manager(self, value) -> None:
+        self.engine.llm_manager = value
+
     def detect_language(self, text: str) -> Tuple[str, float]:
         """
         Detect the language of the input text.
 
+        A single-pass letter/stopword classifier decides most texts; the
+        keyword patterns are only consulted when it is ambiguous. Results are
+        memoized.
+
         Returns:
             Tuple of (language_code, confidence)
         """
         if not text.strip():
             return "en", 0.0
 
+        cached = self._detection_cache.get(text)
+        if cached is not None:
+            self._detection_cache.move_to_end(text)
+            return cached
+
+        result = detect_language_fast(text) or self._detect_with_patterns(text)
+        self._detection_cache[text] = result
+        if len(self._detection_cache) > self.DETECTION_CACHE_SIZE:
+            self._detection_cache.popitem(last=False)
+        return result
+
+    def _detect_with_patterns(self, text: str) -> Tuple[str, float]:
+        """Keyword-pattern scoring used when the fast classifier is unsure."""
         text_lower = text.lower()
         scores = {"uk": 0, "ru": 0, "en": 0}
 
@@ -118,35 +158,14 @@ class TranslationTool:
         return detected_lang, confidence
 
     def translate_with_llm(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Translate text using the LLM manager."""
-        if not self.llm_manager:
-            logger.warning("No LLM manager available for translation")
-            return text
-
-        source_name = self.supported_languages.get(source_lang, source_lang)
-        target_name = self.supported_languages.get(target_lang, target_lang)
-
-        translation_prompt = f"""You are a professional translator. Translate the following text from {source_name} to {target_name}.
-
-Preserve the original meaning, tone, and intent. If the text contains technical terms or commands, keep them accurate.
-If the text is already in {target_name}, return it unchanged.
-
-Text to translate: {text}
-
-Provide only the translation, no additional explanation."""
-
-        try:
-            messages = [{"role": "user", "content": translation_prompt}]
-            result = self.llm_manager.chat(messages)
-
-            if result and result.response_text:
-                return result.response_text.strip()
-            logger.warning("LLM translation failed - no response")
-            return text
+        """Translate text, reusing remembered sentences and batching new ones."""
+        return self.engine.translate(text, source_lang, target_lang)
 
-        except Exception as e:
-            logger.error(f"LLM translation error: {e}")
-            return text
+    def translate_many(
+        self, texts: Sequence[str], source_lang: str, target_lang: str
+    ) -> List[str]:
+        """Translate several texts (e.g. UI strings) with shared LLM batches."""
+        return self.engine.translate_many(texts, source_lang, target_lang)
 
     def translate_to_english(self, text: str) -> TranslationResult:
         """
@@ -233,9 +252,9 @@ Provide only the translation, no additional explanation."""
 
 
 # Tool function for registration
-def create_translation_tool(llm_manager=None) -> TranslationTool:
+def create_translation_tool(llm_manager=None, memory=None) -> TranslationTool:
     """Create and return a translation tool instance."""
-    return TranslationTool(llm_manager)
+    return TranslationTool(llm_manager, memory)
 
 
 # For backward compatibility and registration
@@ -10,7 +10,8 @@ class ContextUI(QWidget):
         super().__init__(parent)
         self.context_engine = context_engine
         self.init_ui()
-        self.context_engine.register_listener("ui_update", self.on_context_updated)
+        # Emitted once per update cycle from the engine's thread; delivered queued on the GUI thread
+        self.context_engine.contexts_updated.connect(self.on_contexts_updated)
 
     def init_ui(self) -> None:
         """Initialize the UI layout and components."""
@@ -31,10 +32,14 @@ class ContextUI(QWidget):
         """Callback for when context data is updated."""
         self.update_context_display()
 
+    def on_contexts_updated(self, changes: dict) -> None:
+        """Callback for one update cycle's change-set."""
+        self.update_context_display()
+
     def update_context_display(self) -> None:
         """Update the tree widget with the latest context data."""
         self.context_tree.clear()
-        for context_type, data in self.context_engine.get_contexts().items():
+        for context_type, data in self.context_engine.get_all_contexts().items():
             type_item = QTreeWidgetItem(self.context_tree, [context_type, ""])
             for key, value in data.items():
                 QTreeWidgetItem(type_item, [str(key), str(value)])
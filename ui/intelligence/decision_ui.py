@@ -68,12 +68,12 @@ class DecisionUI(QWidget):
                     QTreeWidgetItem(type_item, ["Value", str(factor_data)])
 
             # Display decision history if available
-            history = self.decision_engine.get_decision_history()
+            history = self.decision_engine.get_decision_history(limit=5)
             if history:
                 history_item = QTreeWidgetItem(
                     self.decision_tree, ["Decision History", ""]
                 )
-                for i, decision in enumerate(history[:5]):  # Limit to last 5 decisions
+                for i, decision in enumerate(history):  # Last 5 decisions
                     decision_text = (
                         f"Decision {i + 1}: {decision.get('goal', 'Unknown')}"
                     )
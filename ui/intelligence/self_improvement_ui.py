@@ -106,12 +106,12 @@ class SelfImprovementUI(QWidget):
                     QTreeWidgetItem(steps_item, [f"Step {i + 1}", step])
 
             # Display improvement history if available
-            history = self.improvement_engine.get_improvement_history()
+            history = self.improvement_engine.get_improvement_history(limit=5)
             if history:
                 history_item = QTreeWidgetItem(
                     self.improvement_tree, ["Improvement History", ""]
                 )
-                for i, result in enumerate(history[:5]):  # Limit to last 5 improvements
+                for i, result in enumerate(history):  # Last 5 improvements
                     result_text = (
                         f"Improvement {i + 1}: {result.get('area', 'Unknown')}"
                     )
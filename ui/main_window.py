@@ -1,4 +1,7 @@
+import importlib
 import logging
+import time
+from functools import partial
 from typing import Any, Dict, Optional
 
 from PySide6.QtCore import (
@@ -95,6 +98,7 @@ class AtlasMainWindow(QMainWindow):
         self.event_bus = EventBus()
         self.memory_manager = MemoryManager()
         self.modules = {}
+        self._register_modules()
         # Temporarily commented out unresolved imports to prevent startup crashes
         # self.self_learning_agent = SelfLearningAgent(memory_manager=self.memory_manager)
         # self.task_planner_agent = TaskPlannerAgent(memory_manager=self.memory_manager)
@@ -154,9 +158,8 @@ class AtlasMainWindow(QMainWindow):
         self._initialize_modules()
         self._setup_topbar()
         self._setup_sidebar()
-        self.central.setCurrentWidget(
-            list(self.modules.values())[0] if self.modules else QWidget()
-        )
+        # Only the default module is built now; the others on first selection
+        self.show_module("Chat")
         logger.info("UI initialization complete")
 
     def _create_menu_bar(self):
@@ -232,24 +235,13 @@ class AtlasMainWindow(QMainWindow):
         )
 
     def show_module(self, module_name: str) -> None:
-        """Show the specified module in the central widget area."""
+        """Show the specified module, building it the first time it is selected."""
         logger = logging.getLogger(__name__)
         logger.info(f"Showing module: {module_name}")
-        module_map = {
-            "Chat": self.chat_module,
-            "Tasks": self.tasks_module,
-            "Plugins": self.plugins_module,
-            "Settings": self.settings_module,
-            "Stats": self.stats_module,
-            "System": getattr(self, "system_module", None),
-            "SelfImprovement": getattr(self, "self_improvement_module", None),
-            "DecisionExplanation": getattr(self, "decision_explanation_module", None),
-            "UserManagement": getattr(self, "user_management_module", None),
-            "Consent": getattr(self, "consent_module", None),
-        }
-        if module_name in module_map and module_map[module_name] is not None:
+        module = self._ensure_module(module_name)
+        if module is not None:
             try:
-                self.central.setCurrentWidget(module_map[module_name])
+                self.central.setCurrentWidget(module)
                 logger.info(f"Module {module_name} displayed")
             except Exception as e:
                 logger.error(f"Error displaying module {module_name}: {e}")
@@ -276,152 +268,116 @@ class AtlasMainWindow(QMainWindow):
         logger.info(f"Tool execution for {tool_name} is temporarily disabled")
         return None
 
-    def _initialize_modules(self):  # noqa: C901
-        """Initialize all UI modules."""
-        logger = logging.getLogger(__name__)
-        logger.info("Initializing modules")
-        from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+    def _register_modules(self) -> None:
+        """Register factories for the stacked UI modules.
 
-        from ui.chat.chat_module import ChatModule
-        from ui.plugins.plugins_module import PluginsModule
-        from ui.settings.settings_module import SettingsModule
-        from ui.stats_module import StatsModule
-        from ui.tasks.tasks_module import TasksModule
+        Nothing is imported or constructed here; each module is built the first
+        time ``show_module`` selects it (see ``_ensure_module``).
+        """
+        build = self._build_module
+        # module name -> (attribute, factory, placeholder title)
+        self._module_factories = {
+            "Chat": ("chat_module", partial(build, "ui.chat.chat_module", "ChatModule"), "Chat Module"),
+            "Tasks": ("tasks_module", self._build_tasks_module, "Tasks Module"),
+            "Plugins": (
+                "plugins_module",
+                partial(build, "ui.plugins.plugins_module", "PluginsModule"),
+                "Plugins Module",
+            ),
+            "Settings": (
+                "settings_module",
+                partial(build, "ui.settings.settings_module", "SettingsModule"),
+                "Settings Module",
+            ),
+            "Stats": ("stats_module", partial(build, "ui.stats_module", "StatsModule"), "Stats Module"),
+            "System": ("system_module", self._build_system_module, "System Control Module"),
+            "SelfImprovement": (
+                "self_improvement_module",
+                partial(build, "ui.self_improvement_center", "SelfImprovementCenter", parented=True),
+                "Self Improvement Center",
+            ),
+            "DecisionExplanation": (
+                "decision_explanation_module",
+                partial(build, "ui.decision_explanation", "DecisionExplanation", parented=True),
+                "Decision Explanation",
+            ),
+            "UserManagement": (
+                "user_management_module",
+                partial(build, "ui.user_management", "UserManagement", parented=True),
+                "User Management",
+            ),
+            "Consent": (
+                "consent_module",
+                partial(build, "ui.consent_manager", "ConsentManager", parented=True),
+                "Consent Manager",
+            ),
+        }
 
-        try:
-            from ui.system_control_module import SystemControlModule
-        except ImportError:
-            logger.warning("SystemControlModule not found, using placeholder")
+    def _build_module(self, module_path: str, class_name: str, parented: bool = False) -> QWidget:
+        """Import a module widget class and construct it."""
+        widget_class = getattr(importlib.import_module(module_path), class_name)
+        return widget_class(self.central) if parented else widget_class()
 
-            class SystemControlModule(QWidget):
-                def __init__(self, parent=None):
-                    super().__init__(parent)
-                    self.setMinimumSize(300, 200)
-                    layout = QVBoxLayout()
-                    layout.addWidget(QLabel("System Control Module Placeholder"))
-                    self.setLayout(layout)
+    def _build_tasks_module(self) -> QWidget:
+        from ui.tasks.tasks_module import TasksModule
 
-                def set_agent_manager(self, agent_manager):
-                    pass
+        planner = getattr(self, "task_planner_agent", None)
+        return TasksModule(
+            task_manager=planner,
+            task_planner_agent=planner,
+            user_id="default_user",
+        )
 
-        try:
-            from ui.self_improvement_center import SelfImprovementCenter
-        except ImportError:
-            logger.warning("SelfImprovementCenter not found, using placeholder")
-
-            class SelfImprovementCenter(QWidget):
-                def __init__(self, parent=None):
-                    super().__init__(parent)
-                    self.setMinimumSize(300, 200)
-                    layout = QVBoxLayout()
-                    layout.addWidget(QLabel("Self Improvement Center Placeholder"))
-                    self.setLayout(layout)
+    def _build_system_module(self) -> QWidget:
+        from ui.system_control_module import SystemControlModule
 
-        try:
-            from ui.decision_explanation import DecisionExplanation
-        except ImportError:
-            logger.warning("DecisionExplanation not found, using placeholder")
-
-            class DecisionExplanation(QWidget):
-                def __init__(self, parent=None):
-                    super().__init__(parent)
-                    self.setMinimumSize(300, 200)
-                    layout = QVBoxLayout()
-                    layout.addWidget(QLabel("Decision Explanation Placeholder"))
-                    self.setLayout(layout)
+        module = SystemControlModule(self.central)
+        if hasattr(module, "set_agent_manager"):
+            module.set_agent_manager(self.meta_agent)
+        return module
 
-        try:
-            from ui.user_management import UserManagement
-        except ImportError:
-            logger.warning("UserManagement not found, using placeholder")
-
-            class UserManagement(QWidget):
-                def __init__(self, parent=None):
-                    super().__init__(parent)
-                    self.setMinimumSize(300, 200)
-                    layout = QVBoxLayout()
-                    layout.addWidget(QLabel("User Management Placeholder"))
-                    self.setLayout(layout)
+    def _placeholder_module(self, title: str) -> QWidget:
+        """Create a placeholder widget for a module that failed to load."""
+        widget = QWidget(self.central)
+        widget.setMinimumSize(300, 200)
+        layout = QVBoxLayout(widget)
+        layout.addWidget(QLabel(f"{title} Placeholder"))
+        return widget
 
-        try:
-            from ui.consent_manager import ConsentManager
-        except ImportError:
-            logger.warning("ConsentManager not found, using placeholder")
-
-            class ConsentManager(QWidget):
-                def __init__(self, parent=None):
-                    super().__init__(parent)
-                    self.setMinimumSize(300, 200)
-                    layout = QVBoxLayout()
-                    layout.addWidget(QLabel("Consent Manager Placeholder"))
-                    self.setLayout(layout)
+    def _ensure_module(self, module_name: str) -> Optional[QWidget]:
+        """Return a module widget, building it on first use.
 
-        try:
-            from ui.tasks.task_widget import TaskWidget  # noqa: F401
-        except ImportError as e:
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Import error for TaskWidget: {e}")
+        Args:
+            module_name: Name used by ``show_module`` (e.g. "Chat").
+
+        Returns:
+            The module widget, or None if the name is unknown.
+        """
+        if module_name in self.modules:
+            return self.modules[module_name]
+        if not hasattr(self, "_module_factories"):
+            self._register_modules()
+        if module_name not in self._module_factories:
+            return None
 
+        logger = logging.getLogger(__name__)
+        attribute, factory, title = self._module_factories[module_name]
+        start = time.perf_counter()
         try:
-            from ui.user_management import UserManagement
-        except ImportError as e:
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Import error for UserManagement: {e}")
-            UserManagement = None
-
-        # Manually initialize modules without passing module_name
-        self.chat_module = ChatModule()
-        self.tasks_module = TasksModule(
-            task_manager=self.task_planner_agent,
-            task_planner_agent=self.task_planner_agent,
-            user_id="default_user",
-        )
-        self.plugins_module = PluginsModule()
-        self.settings_module = SettingsModule()
-        self.stats_module = StatsModule()
-        self.system_module = (
-            SystemControlModule(parent=self.central)
-            if "SystemControlModule" in globals()
-            else SystemControlModule(self.central)
+            widget = factory()
+        except Exception as e:
+            logger.warning(f"{title} unavailable, using placeholder: {e}")
+            widget = None
+        if not isinstance(widget, QWidget):
+            widget = self._placeholder_module(title)
+        self.central.addWidget(widget)
+        self.modules[module_name] = widget
+        setattr(self, attribute, widget)
+        logger.info(
+            f"Module {module_name} built on first use in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
         )
-        if hasattr(self, "system_module") and hasattr(
-            self.system_module, "set_agent_manager"
-        ):
-            try:
-                self.system_module.set_agent_manager(
-                    self.meta_agent if hasattr(self, "meta_agent") else None
-                )
-            except Exception as e:
-                logger.error(f"Error setting agent manager for System module: {e}")
-        self.self_improvement_module = SelfImprovementCenter(self.central)
-        self.decision_explanation_module = DecisionExplanation(self.central)
-        self.user_management_module = UserManagement(self.central)
-        self.consent_module = ConsentManager(self.central)
-        # Add initialized modules to central widget stack
-        self.central.addWidget(self.chat_module)
-        self.central.addWidget(self.tasks_module)
-        self.central.addWidget(self.plugins_module)
-        self.central.addWidget(self.settings_module)
-        self.central.addWidget(self.stats_module)
-        if hasattr(self, "system_module") and isinstance(self.system_module, QWidget):
-            self.central.addWidget(self.system_module)
-        if hasattr(self, "self_improvement_module") and isinstance(
-            self.self_improvement_module, QWidget
-        ):
-            self.central.addWidget(self.self_improvement_module)
-        if hasattr(self, "decision_explanation_module") and isinstance(
-            self.decision_explanation_module, QWidget
-        ):
-            self.central.addWidget(self.decision_explanation_module)
-        if hasattr(self, "user_management_module") and isinstance(
-            self.user_management_module, QWidget
-        ):
-            self.central.addWidget(self.user_management_module)
-        if hasattr(self, "consent_module") and isinstance(self.consent_module, QWidget):
-            self.central.addWidget(self.consent_module)
-        # Set the active module (typically chat as default)
-        self.central.setCurrentWidget(self.chat_module)
-        logger.info("Modules initialized")
+        return widget
 
     def _setup_topbar(self):
         """Create the topbar with necessary actions."""
@@ -0,0 +1,124 @@
+"""
+Aho-Corasick multi-keyword matching.
+
+``KeywordAutomaton`` compiles a set of keywords into a deterministic automaton
+and finds every occurrence of all of them in one left-to-right pass over the
+text, instead of one substring scan per keyword. Each keyword carries
+arbitrary payloads (e.g. ``(group, index)`` pairs), so a caller can score many
+keyword lists in a single pass.
+
+Example::
+
+    automaton = KeywordAutomaton()
+    automaton.add("error", ("problem", 0))
+    automaton.add("err", ("short", 0))
+    automaton.build()
+    automaton.find("an error")  # {("problem", 0): 3, ("short", 0): 3}
+
+The automaton is pure Python (one dict lookup per character). When the
+optional ``pyahocorasick`` package is installed, the scan runs in C instead.
+"""
+
+from collections import deque
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordAutomaton:
+    """Deterministic Aho-Corasick automaton over a fixed keyword set."""
+
+    def __init__(self, use_c_extension: bool = True) -> None:
+        """
+        Args:
+            use_c_extension: Use ``pyahocorasick`` when it is installed.
+        """
+        self.use_c_extension = use_c_extension and AHOCORASICK_AVAILABLE
+        self._keywords: Dict[str, List[Hashable]] = {}
+        self._delta: List[Dict[str, int]] = []
+        # Per state: (payload, keyword length) for every keyword ending there
+        self._outputs: List[Tuple[Tuple[Hashable, int], ...]] = []
+        self._native: Optional[Any] = None
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def add(self, keyword: str, payload: Hashable) -> None:
+        """Add a keyword (again, to attach another payload)."""
+        if not keyword:
+            raise ValueError("keywords must be non-empty")
+        self._keywords.setdefault(keyword, []).append(payload)
+        self._built = False
+
+    def build(self) -> "KeywordAutomaton":
+        """Compile the keywords; called automatically on first search."""
+        if self.use_c_extension:
+            native = ahocorasick.Automaton()
+            for keyword, payloads in self._keywords.items():
+                native.add_word(keyword, (len(keyword), tuple(payloads)))
+            if len(native):
+                native.make_automaton()
+            self._native = native
+            self._built = True
+            return self
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[Hashable, int]]] = [[]]
+        for keyword, payloads in self._keywords.items():
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].extend((payload, len(keyword)) for payload in payloads)
+
+        # Breadth-first: fill in failure transitions so every state has a
+        # complete transition table over the keyword alphabet.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            outputs[state].extend(outputs[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                queue.append(child)
+        self._delta = delta
+        self._outputs = [tuple(output) for output in outputs]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, Hashable]]:
+        """Yield ``(start, payload)`` for every occurrence, in order of end position."""
+        if not self._built:
+            self.build()
+        if self._native is not None:
+            if len(self._native):
+                for last, (length, payloads) in self._native.iter(text):
+                    for payload in payloads:
+                        yield last + 1 - length, payload
+            return
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char, 0)
+            for payload, length in outputs[state]:
+                yield end - length, payload
+
+    def find(self, text: str) -> Dict[Any, int]:
+        """Map each matched payload to the start of its first occurrence."""
+        found: Dict[Any, int] = {}
+        for start, payload in self.iter_matches(text):
+            if payload not in found:
+                found[payload] = start
+        return found
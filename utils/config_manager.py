@@ -1,9 +1,11 @@
+import copy
 import json
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, Optional, Union
 
 import yaml
 
+from core.config_watcher import FileSignature, file_signature
 from utils.logger import get_logger
 
 logger = get_logger()
@@ -19,16 +21,26 @@ class ConfigManager:
 
     def __init__(self, path: Union[Path, None] = None) -> None:
         self.path = Path(path) if path else DEFAULT_CONFIG_PATH
+        # Parsed file contents, reused until the file's (mtime, size) changes
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_signature: FileSignature = None
         if not self.path.exists():
             self._create_default()
 
     def load(self) -> Dict[str, Any]:
-        """Return the parsed configuration as a dictionary."""
+        """Return the parsed configuration as a dictionary.
+
+        The file is only parsed again after it changes on disk; every call
+        returns a fresh copy that the caller may modify.
+        """
+        signature = file_signature(str(self.path))
+        if signature is not None and signature == self._cache_signature:
+            return copy.deepcopy(self._cache)
         try:
             with self.path.open("r", encoding="utf-8") as f:
-                if self.path.suffix == ".json":
-                    return json.load(f)
-                return yaml.safe_load(f) or {}
+                data = json.load(f) if self.path.suffix == ".json" else yaml.safe_load(f) or {}
+            self._cache, self._cache_signature = data, signature
+            return copy.deepcopy(data)
         except (OSError, yaml.YAMLError, json.JSONDecodeError) as e:
             logger.error(
                 f"Failed to load config from {self.path}: {e}. Creating default."
@@ -44,6 +56,7 @@ class ConfigManager:
                     json.dump(data, f, indent=2)
                 else:
                     yaml.safe_dump(data, f, sort_keys=False)
+            self._cache, self._cache_signature = copy.deepcopy(data), file_signature(str(self.path))
             logger.info(f"Configuration saved to {self.path}")
         except (OSError, yaml.YAMLError) as e:
             logger.error(f"Failed to save config to {self.path}: {e}")
@@ -1,13 +1,23 @@
 """
 Інтелектуальний детектор режимів чату Atlas
 Розумна system визначення, коли використовувати advanced thinking vs звичайний help mode
+
+Детекція виконується на кожне (debounced) натискання клавіші в чаті, тому всі
+паттерни компілюються один раз: ключові слова всіх груп - в один автомат
+Aho-Corasick (один прохід по повідомленню), якірні регулярні вирази - в один
+regex з іменованими групами, а решта регулярних виразів запускається лише
+тоді, коли автомат знайшов їхній обов'язковий літерал. Повторні повідомлення
+обслуговує LRU-кеш.
 """
 
+import functools
 import logging
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.aho_corasick import KeywordAutomaton
 
 
 class ChatMode(Enum):
@@ -29,16 +39,245 @@ class DetectionResult:
     fallback_to_simple: bool = False
 
 
+# Точні збіги на початку повідомлення мають найвищий пріоритет
+EXACT_SIMPLE_PREFIXES = (
+    "read file",
+    "show file",
+    "list directory",
+    "show tree",
+    "search for",
+    "info about",
+    "metrics",
+    "stats",
+)
+
+SHORT_COMMAND_VERBS = ("read", "show", "list", "tree")
+
+# Конкретні українські та англійські ключові слова з високою вагою
+ADVANCED_KEYWORDS: Tuple[Tuple[str, float], ...] = (
+    # Аналітичні слова
+    ("проаналізуй", 0.4),
+    ("analyze", 0.4),
+    ("аналіз", 0.3),
+    ("analysis", 0.3),
+    ("розгляну", 0.3),
+    ("examine", 0.3),
+    ("досліди", 0.3),
+    ("investigate", 0.3),
+    # Проблемні слова
+    ("що не так", 0.5),
+    ("what's wrong", 0.5),
+    ("what is wrong", 0.5),
+    ("проблем", 0.4),
+    ("problem", 0.4),
+    ("issue", 0.4),
+    ("помилк", 0.4),
+    ("error", 0.4),
+    ("не працює", 0.4),
+    ("doesn't work", 0.4),
+    ("not working", 0.4),
+    # Покращення
+    ("покращи", 0.4),
+    ("improve", 0.4),
+    ("покращення", 0.3),
+    ("improvement", 0.3),
+    ("як можна", 0.4),
+    ("how can", 0.4),
+    ("удосконал", 0.3),
+    ("enhance", 0.3),
+    ("оптиміз", 0.3),
+    ("optimize", 0.3),
+    # Порівняння
+    ("порівня", 0.4),
+    ("compare", 0.4),
+    ("різниц", 0.3),
+    ("difference", 0.3),
+    ("який кращ", 0.4),
+    ("which is better", 0.4),
+    ("що вибрати", 0.4),
+    # Архітектурні
+    ("архітектур", 0.4),
+    ("architecture", 0.4),
+    ("структур", 0.3),
+    ("structure", 0.3),
+    ("систем", 0.3),
+    ("system", 0.3),
+    ("дизайн", 0.3),
+    ("design", 0.3),
+    # Концептуальні
+    ("як працює", 0.5),
+    ("how does", 0.4),
+    ("how it works", 0.5),
+    ("чому", 0.3),
+    ("why", 0.3),
+    ("навіщо", 0.3),
+    ("what is the purpose", 0.4),
+    ("принцип", 0.3),
+    ("principle", 0.3),
+    ("підхід", 0.3),
+    ("approach", 0.3),
+)
+
+# Регулярні вирази для складних паттернів: (regex, вага, назва, обов'язкові літерали).
+# Regex запускається лише якщо в повідомленні є хоча б один з його літералів;
+# порожній кортеж означає "запускати завжди".
+COMPLEX_PATTERNS: Tuple[Tuple[str, float, str, Tuple[str, ...]], ...] = (
+    (r"як\s+(можна\s+)?(покращи|удосконал)", 0.4, "improvement_question", ("як",)),
+    (r"що\s+не\s+так\s+з", 0.5, "problem_question", ("що",)),
+    (r"чому\s+.+\s+(не\s+)?працює", 0.4, "why_not_working", ("чому",)),
+    (r"як\s+.+\s+працює", 0.4, "how_it_works", ("як",)),
+    (r"порівня.+\s+(з|та|and|with)", 0.4, "comparison", ("порівня",)),
+    (r"проаналізуй\s+.+", 0.5, "analysis_request", ("проаналізуй",)),
+    (r"(how|як)\s+(can|to|могти)\s+.+", 0.3, "how_to_question", ("how", "як")),
+    (r"(what|що)\s+(should|треба|потрібно)", 0.3, "what_should", ("what", "що")),
+)
+
+# Питальні слова з складністю (на початку повідомлення)
+COMPLEX_QUESTION_STARTERS = (
+    "як можна",
+    "чому саме",
+    "що робити",
+    "як краще",
+    "how can",
+    "why does",
+    "what should",
+    "how to",
+)
+
+# Технічні терміни Atlas
+ATLAS_TERMS = (
+    "atlas",
+    "пам'ять",
+    "memory",
+    "агент",
+    "agent",
+    "модуль",
+    "module",
+    "менеджер",
+    "manager",
+    "думання",
+    "thinking",
+    "аналіз",
+    "analysis",
+)
+
+# Терміни, через які неоднозначний випадок вирішується на користь advanced
+FALLBACK_COMPLEX_TERMS = ("проаналізуй", "архітектур", "що не так", "покращ", "порівня")
+
+# Групи ключових слів в автоматі
+_SIMPLE_KEYWORD = "simple_keyword"
+_SHORT_VERB = "short_verb"
+_EXACT_PREFIX = "exact_prefix"
+_ADVANCED_KEYWORD = "advanced_keyword"
+_QUESTION_STARTER = "question_starter"
+_ATLAS_TERM = "atlas_term"
+_COMPLEXITY = "complexity"
+_SIMPLICITY = "simplicity"
+_TECHNICAL = "technical"
+_FALLBACK_TERM = "fallback_term"
+_TRIGGER = "trigger"
+
+
+class _Scan:
+    """Результат одного проходу по повідомленню"""
+
+    __slots__ = ("groups", "starts", "simple_patterns", "complex_patterns")
+
+    def __init__(self, keywords: Dict[Tuple[str, int], int], simple_patterns: List[int], complex_patterns: List[int]):
+        # група -> індекси знайдених ключових слів; індекси тих, з яких починається повідомлення
+        self.groups: Dict[str, List[int]] = {}
+        self.starts: Dict[str, List[int]] = {}
+        for (group, index), start in keywords.items():
+            self.groups.setdefault(group, []).append(index)
+            if start == 0:
+                self.starts.setdefault(group, []).append(index)
+        self.simple_patterns = simple_patterns
+        self.complex_patterns = complex_patterns
+
+    def hits(self, group: str) -> List[int]:
+        """Індекси знайдених ключових слів групи, в порядку списку"""
+        return sorted(self.groups.get(group, ()))
+
+    def prefixes(self, group: str) -> List[int]:
+        """Індекси ключових слів групи, з яких починається повідомлення"""
+        return sorted(self.starts.get(group, ()))
+
+
+class _CompiledPatterns:
+    """Усі паттерни детектора, скомпільовані один раз"""
+
+    def __init__(self, patterns: Dict[str, Any]):
+        simple = patterns["simple_commands"]
+        modifiers = patterns["context_modifiers"]
+        self.simple_patterns: Sequence[str] = simple["patterns"]
+        self.simple_keywords: Sequence[str] = simple["keywords"]
+
+        self.automaton = KeywordAutomaton()
+        groups = {
+            _SIMPLE_KEYWORD: self.simple_keywords,
+            _SHORT_VERB: SHORT_COMMAND_VERBS,
+            _EXACT_PREFIX: EXACT_SIMPLE_PREFIXES,
+            _ADVANCED_KEYWORD: [keyword for keyword, _ in ADVANCED_KEYWORDS],
+            _QUESTION_STARTER: COMPLEX_QUESTION_STARTERS,
+            _ATLAS_TERM: ATLAS_TERMS,
+            _COMPLEXITY: modifiers["complexity_indicators"],
+            _SIMPLICITY: modifiers["simplicity_indicators"],
+            _TECHNICAL: modifiers["technical_terms"],
+            _FALLBACK_TERM: FALLBACK_COMPLEX_TERMS,
+        }
+        for group, keywords in groups.items():
+            for index, keyword in enumerate(keywords):
+                self.automaton.add(keyword, (group, index))
+
+        # Якірні паттерни - один regex з іменованою lookahead-групою на кожен,
+        # щоб за один match() дізнатися, які з них збігаються
+        anchored = [(i, p[1:]) for i, p in enumerate(self.simple_patterns) if p.startswith("^")]
+        self.anchored = re.compile("".join(f"(?:(?=(?P<p{i}>{body}))|)" for i, body in anchored))
+        self.anchored_groups = [(i, self.anchored.groupindex[f"p{i}"]) for i, _ in anchored]
+        self.unanchored_simple = [
+            (i, re.compile(p)) for i, p in enumerate(self.simple_patterns) if not p.startswith("^")
+        ]
+
+        self.complex = []
+        for index, (pattern, _weight, _name, triggers) in enumerate(COMPLEX_PATTERNS):
+            for trigger in triggers:
+                self.automaton.add(trigger, (_TRIGGER, index))
+            self.complex.append((index, re.compile(pattern), (_TRIGGER, index) if triggers else None))
+        self.automaton.build()
+
+    def scan(self, message_lower: str) -> _Scan:
+        keywords = self.automaton.find(message_lower)
+        match = self.anchored.match(message_lower)
+        simple = [i for i, group in self.anchored_groups if match.start(group) != -1]
+        simple.extend(i for i, regex in self.unanchored_simple if regex.search(message_lower))
+        simple.sort()
+        complex_hits = [
+            index
+            for index, regex, trigger in self.complex
+            if (trigger is None or trigger in keywords) and regex.search(message_lower)
+        ]
+        return _Scan(keywords, simple, complex_hits)
+
+
 class IntelligentModeDetector:
     """
     Інтелектуальний детектор режимів з контекстним аналізом
     """
 
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024):
+        """
+        Args:
+            cache_size: Кількість останніх повідомлень у LRU-кеші (0 вимикає кеш).
+                Закешовані DetectionResult спільні - не змінюйте їх.
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
 
         # Вдосконалені паттерни детекції
         self.patterns = self._initialize_detection_patterns()
+        self._compiled = _CompiledPatterns(self.patterns)
+        self._detect = (
+            functools.lru_cache(maxsize=cache_size)(self._detect_uncached) if cache_size else self._detect_uncached
+        )
 
         # Статистика для навчання
         self.detection_stats: Dict[str, Any] = {
@@ -176,6 +415,14 @@ class IntelligentModeDetector:
         Основний метод детекції режиму чату
         """
         message = message.strip()
+        final_result = self._detect(message)
+
+        # Логування для навчання
+        self._log_detection(message, final_result)
+
+        return final_result
+
+    def _detect_uncached(self, message: str) -> DetectionResult:
         message_lower = message.lower()
 
         if not message:
@@ -186,77 +433,61 @@ class IntelligentModeDetector:
                 should_use_advanced=False,
             )
 
+        # Один прохід по повідомленню для всіх паттернів
+        scan = self._compiled.scan(message_lower)
+
         # Фаза 1: Verification простих команд (високий пріоритет)
         simple_score, simple_reasoning = self._check_simple_commands(
-            message, message_lower
+            message, message_lower, scan
         )
 
         # Фаза 2: Verification складних запитів
         advanced_score, advanced_reasoning = self._check_advanced_thinking(
-            message, message_lower
+            message, message_lower, scan
         )
 
         # Фаза 3: Контекстні модифікатори
-        context_modifier = self._analyze_context_modifiers(message, message_lower)
+        context_modifier = self._analyze_context_modifiers(message, message_lower, scan)
 
         # Фаза 4: Вирішення конфліктів та фінальне рішення
-        final_result = self._resolve_mode_conflict(
+        return self._resolve_mode_conflict(
             simple_score,
             advanced_score,
             context_modifier,
             simple_reasoning,
             advanced_reasoning,
             message,
+            scan,
         )
 
-        # Логування для навчання
-        self._log_detection(message, final_result)
-
-        return final_result
-
     def _check_simple_commands(
-        self, message: str, message_lower: str
+        self, message: str, message_lower: str, scan: Optional[_Scan] = None
     ) -> Tuple[float, str]:
         """Verification простих команд"""
+        scan = scan or self._compiled.scan(message_lower)
         score = 0.0
         matched_patterns = []
 
         # Verification регулярних виразів
-        for pattern in self.patterns["simple_commands"]["patterns"]:
-            if re.search(pattern, message_lower):
-                score += 0.3
-                matched_patterns.append(f"pattern: {pattern[:30]}...")
+        for index in scan.simple_patterns:
+            score += 0.3
+            matched_patterns.append(f"pattern: {self._compiled.simple_patterns[index][:30]}...")
 
         # Verification ключових слів
-        for keyword in self.patterns["simple_commands"]["keywords"]:
-            if keyword in message_lower:
-                score += 0.2
-                matched_patterns.append(f"keyword: {keyword}")
+        for index in scan.hits(_SIMPLE_KEYWORD):
+            score += 0.2
+            matched_patterns.append(f"keyword: {self._compiled.simple_keywords[index]}")
 
         # Додаткові правила для простих команд
-        if len(message.split()) <= 4 and any(
-            cmd in message_lower for cmd in ["read", "show", "list", "tree"]
-        ):
+        if len(message.split()) <= 4 and scan.hits(_SHORT_VERB):
             score += 0.3
             matched_patterns.append("short_command")
 
         # Точні збіги мають найвищий пріоритет
-        exact_matches = [
-            "read file",
-            "show file",
-            "list directory",
-            "show tree",
-            "search for",
-            "info about",
-            "metrics",
-            "stats",
-        ]
-
-        for exact in exact_matches:
-            if message_lower.startswith(exact):
-                score = 0.95  # Майже гарантована проста команда
-                matched_patterns = [f"exact_match: {exact}"]
-                break
+        exact = scan.prefixes(_EXACT_PREFIX)
+        if exact:
+            score = 0.95  # Майже гарантована проста команда
+            matched_patterns = [f"exact_match: {EXACT_SIMPLE_PREFIXES[exact[0]]}"]
 
         reasoning = (
             f"Simple command indicators: {', '.join(matched_patterns)}"
@@ -266,117 +497,31 @@ class IntelligentModeDetector:
         return min(score, 1.0), reasoning
 
     def _check_advanced_thinking(
-        self, message: str, message_lower: str
+        self, message: str, message_lower: str, scan: Optional[_Scan] = None
     ) -> Tuple[float, str]:
         """Verification потреби в складному мисленні"""
+        scan = scan or self._compiled.scan(message_lower)
         score = 0.0
         matched_patterns = []
 
-        # Конкретні українські та англійські ключові слова з високою вагою
-        high_priority_keywords = {
-            # Аналітичні слова
-            "проаналізуй": 0.4,
-            "analyze": 0.4,
-            "аналіз": 0.3,
-            "analysis": 0.3,
-            "розгляну": 0.3,
-            "examine": 0.3,
-            "досліди": 0.3,
-            "investigate": 0.3,
-            # Проблемні слова
-            "що не так": 0.5,
-            "what's wrong": 0.5,
-            "what is wrong": 0.5,
-            "проблем": 0.4,
-            "problem": 0.4,
-            "issue": 0.4,
-            "помилк": 0.4,
-            "error": 0.4,
-            "не працює": 0.4,
-            "doesn't work": 0.4,
-            "not working": 0.4,
-            # Покращення
-            "покращи": 0.4,
-            "improve": 0.4,
-            "покращення": 0.3,
-            "improvement": 0.3,
-            "як можна": 0.4,
-            "how can": 0.4,
-            "удосконал": 0.3,
-            "enhance": 0.3,
-            "оптиміз": 0.3,
-            "optimize": 0.3,
-            # Порівняння
-            "порівня": 0.4,
-            "compare": 0.4,
-            "різниц": 0.3,
-            "difference": 0.3,
-            "який кращ": 0.4,
-            "which is better": 0.4,
-            "що вибрати": 0.4,
-            # Архітектурні
-            "архітектур": 0.4,
-            "architecture": 0.4,
-            "структур": 0.3,
-            "structure": 0.3,
-            "систем": 0.3,
-            "system": 0.3,
-            "дизайн": 0.3,
-            "design": 0.3,
-            # Концептуальні
-            "як працює": 0.5,
-            "how does": 0.4,
-            "how it works": 0.5,
-            "чому": 0.3,
-            "why": 0.3,
-            "навіщо": 0.3,
-            "what is the purpose": 0.4,
-            "принцип": 0.3,
-            "principle": 0.3,
-            "підхід": 0.3,
-            "approach": 0.3,
-        }
-
         # Verification ключових слів з вагами
-        for keyword, weight in high_priority_keywords.items():
-            if keyword in message_lower:
-                score += weight
-                matched_patterns.append(f"keyword: {keyword} (+{weight})")
+        for index in scan.hits(_ADVANCED_KEYWORD):
+            keyword, weight = ADVANCED_KEYWORDS[index]
+            score += weight
+            matched_patterns.append(f"keyword: {keyword} (+{weight})")
 
         # Регулярні вирази для складних паттернів
-        complex_patterns = [
-            (r"як\s+(можна\s+)?(покращи|удосконал)", 0.4, "improvement_question"),
-            (r"що\s+не\s+так\s+з", 0.5, "problem_question"),
-            (r"чому\s+.+\s+(не\s+)?працює", 0.4, "why_not_working"),
-            (r"як\s+.+\s+працює", 0.4, "how_it_works"),
-            (r"порівня.+\s+(з|та|and|with)", 0.4, "comparison"),
-            (r"проаналізуй\s+.+", 0.5, "analysis_request"),
-            (r"(how|як)\s+(can|to|могти)\s+.+", 0.3, "how_to_question"),
-            (r"(what|що)\s+(should|треба|потрібно)", 0.3, "what_should"),
-        ]
-
-        for pattern, weight, name in complex_patterns:
-            if re.search(pattern, message_lower):
-                score += weight
-                matched_patterns.append(f"pattern: {name} (+{weight})")
+        for index in scan.complex_patterns:
+            _, weight, name, _ = COMPLEX_PATTERNS[index]
+            score += weight
+            matched_patterns.append(f"pattern: {name} (+{weight})")
 
         # Додаткові правила
 
         # Питальні слова з складністю
-        complex_question_starters = [
-            "як можна",
-            "чому саме",
-            "що робити",
-            "як краще",
-            "how can",
-            "why does",
-            "what should",
-            "how to",
-        ]
-        for starter in complex_question_starters:
-            if message_lower.startswith(starter):
-                score += 0.3
-                matched_patterns.append(f"complex_start: {starter}")
+        for index in scan.prefixes(_QUESTION_STARTER):
+            score += 0.3
+            matched_patterns.append(f"complex_start: {COMPLEX_QUESTION_STARTERS[index]}")
 
         # Довгі речення часто потребують аналізу (але не дуже довгі файлові шляхи)
         word_count = len(message.split())
@@ -392,22 +537,7 @@ class IntelligentModeDetector:
             matched_patterns.append(f"multiple_questions: {question_count}")
 
         # Наявність технічних термінів Atlas
-        atlas_terms = [
-            "atlas",
-            "пам'ять",
-            "memory",
-            "агент",
-            "agent",
-            "модуль",
-            "module",
-            "менеджер",
-            "manager",
-            "думання",
-            "thinking",
-            "аналіз",
-            "analysis",
-        ]
-        atlas_count = sum(1 for term in atlas_terms if term in message_lower)
+        atlas_count = len(scan.hits(_ATLAS_TERM))
         if atlas_count > 1:
             score += atlas_count * 0.05
             matched_patterns.append(f"atlas_terms: {atlas_count}")
@@ -419,32 +549,21 @@ class IntelligentModeDetector:
         )
         return min(score, 1.0), reasoning
 
-    def _analyze_context_modifiers(self, message: str, message_lower: str) -> float:
+    def _analyze_context_modifiers(
+        self, message: str, message_lower: str, scan: Optional[_Scan] = None
+    ) -> float:
         """Аналіз контекстних модифікаторів"""
+        scan = scan or self._compiled.scan(message_lower)
         modifier = 0.0
 
         # Індикатори складності
-        complexity_indicators = self.patterns["context_modifiers"][
-            "complexity_indicators"
-        ]
-        complexity_count = sum(
-            1 for indicator in complexity_indicators if indicator in message_lower
-        )
-        modifier += complexity_count * 0.1
+        modifier += len(scan.hits(_COMPLEXITY)) * 0.1
 
         # Індикатори простоти
-        simplicity_indicators = self.patterns["context_modifiers"][
-            "simplicity_indicators"
-        ]
-        simplicity_count = sum(
-            1 for indicator in simplicity_indicators if indicator in message_lower
-        )
-        modifier -= simplicity_count * 0.1
+        modifier -= len(scan.hits(_SIMPLICITY)) * 0.1
 
         # Технічні терміни
-        technical_terms = self.patterns["context_modifiers"]["technical_terms"]
-        technical_count = sum(1 for term in technical_terms if term in message_lower)
-        if technical_count > 2:
+        if len(scan.hits(_TECHNICAL)) > 2:
             modifier += 0.15  # Багато технічних термінів = складність
 
         return max(-0.3, min(0.3, modifier))  # Обмежуємо модифікатор
@@ -457,6 +576,7 @@ class IntelligentModeDetector:
         simple_reasoning: str,
         advanced_reasoning: str,
         original_message: str,
+        scan: Optional[_Scan] = None,
     ) -> DetectionResult:
         """Вирішення конфліктів та фінальне рішення"""
 
@@ -499,16 +619,8 @@ class IntelligentModeDetector:
 
         else:
             # Вибір за найвищою оцінкою або за замовчуванням advanced для складних термінів
-            has_complex_terms = any(
-                term in original_message.lower()
-                for term in [
-                    "проаналізуй",
-                    "архітектур",
-                    "що не так",
-                    "покращ",
-                    "порівня",
-                ]
-            )
+            scan = scan or self._compiled.scan(original_message.lower())
+            has_complex_terms = bool(scan.hits(_FALLBACK_TERM))
 
             if adjusted_advanced_score > simple_score or has_complex_terms:
                 mode = ChatMode.ADVANCED_THINKING
@@ -538,13 +650,25 @@ class IntelligentModeDetector:
             self.detection_stats["mode_counts"][mode_key] = 0
         self.detection_stats["mode_counts"][mode_key] += 1
 
-        self.logger.debug(
-            f"Mode detection: '{message[:50]}...' -> {result.mode.value} (confidence: {result.confidence:.2f})"
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                f"Mode detection: '{message[:50]}...' -> {result.mode.value} (confidence: {result.confidence:.2f})"
+            )
 
     def get_detection_stats(self) -> Dict:
         """Getting статистики детекції"""
-        return self.detection_stats.copy()
+        stats = self.detection_stats.copy()
+        cache_info = getattr(self._detect, "cache_info", None)
+        if cache_info is not None:
+            info = cache_info()
+            stats["cache"] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        return stats
+
+    def clear_cache(self) -> None:
+        """Очищення LRU-кешу результатів"""
+        cache_clear = getattr(self._detect, "cache_clear", None)
+        if cache_clear is not None:
+            cache_clear()
 
     def add_feedback(
         self,
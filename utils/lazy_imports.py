@@ -0,0 +1,143 @@
+"""
+Lazy imports for heavy optional dependencies.
+
+Importing pandas, scikit-learn, networkx, OpenCV, chromadb or the macOS
+automation frameworks costs hundreds of milliseconds to seconds, and most
+Atlas entry points (CLI tools, tests, the first window) never use them.
+Modules should therefore not import them at module level. Two helpers are
+provided:
+
+* ``lazy_module(name)`` returns a stand-in module that performs the real
+  import on first attribute access. It is a drop-in replacement for
+  ``import pandas as pd``::
+
+      pd = lazy_module("pandas")
+
+* The module itself implements PEP 562 ``__getattr__`` for the names in
+  ``HEAVY_MODULES``::
+
+      from utils import lazy_imports as optional
+
+      frame = optional.pandas.DataFrame(rows)
+
+Availability can be checked without importing via ``is_available``.
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+from typing import Any, List
+
+# Attribute name -> module imported on first use
+HEAVY_MODULES = {
+    "pandas": "pandas",
+    "numpy": "numpy",
+    "sklearn": "sklearn",
+    "networkx": "networkx",
+    "cv2": "cv2",
+    "chromadb": "chromadb",
+    "Quartz": "Quartz",
+    "AppKit": "AppKit",
+    "pyautogui": "pyautogui",
+    "matplotlib": "matplotlib",
+    "pyplot": "matplotlib.pyplot",
+    "seaborn": "seaborn",
+    "requests": "requests",
+}
+
+
+class MissingOptionalDependency(ImportError):
+    """Raised when a lazily imported optional dependency is not installed."""
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    try:
+                        module = importlib.import_module(self.__name__)
+                    except ImportError as e:
+                        raise MissingOptionalDependency(
+                            f"Optional dependency '{self.__name__}' is not installed: {e}"
+                        ) from e
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._load(), name, value)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Return ``name`` without importing it until an attribute is used.
+
+    If the module has already been imported the real module is returned.
+
+    Args:
+        name: Dotted module name, e.g. ``"sklearn.cluster"``.
+
+    Returns:
+        The module, or a ``LazyModule`` proxy for it.
+    """
+    module = sys.modules.get(name)
+    if module is not None and not isinstance(module, LazyModule):
+        return module
+    return LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """Whether ``name`` can be imported, without importing it.
+
+    Only the parent packages of a dotted name are imported.
+    """
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def __getattr__(name: str) -> types.ModuleType:
+    """PEP 562 hook: import a ``HEAVY_MODULES`` entry on first access."""
+    if name not in HEAVY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = importlib.import_module(HEAVY_MODULES[name])
+    except ImportError as e:
+        raise MissingOptionalDependency(
+            f"Optional dependency '{HEAVY_MODULES[name]}' is not installed: {e}"
+        ) from e
+    globals()[name] = module
+    return module
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(HEAVY_MODULES))
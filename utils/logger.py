@@ -7,10 +7,13 @@ import logging
 import os
 from logging import Handler, Logger
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+from core.log_pipeline import BatchingRotatingFileHandler, get_log_pipeline
 
 LOG_DIR = Path.home() / ".atlas" / "logs"
 LOG_FILE_PATH = LOG_DIR / "atlas.log.jsonl"
+JSONL_ROUTE = "jsonl"
 
 _logger_initialized = False
 
@@ -39,21 +42,27 @@ def get_logger(name: str = "atlas") -> Logger:
         logger.addHandler(logging.NullHandler())
         return logger
 
-    # Proceed with file and stream handlers for normal execution
+    # Proceed with file and stream handlers for normal execution; both are
+    # written by the logging pipeline's background thread
     global _logger_initialized
     if not _logger_initialized:
         LOG_DIR.mkdir(parents=True, exist_ok=True)
         _logger_initialized = True
 
-    fh = logging.FileHandler(LOG_FILE_PATH, encoding="utf-8")
+    pipeline = get_log_pipeline()
+    pipeline.ensure_route(JSONL_ROUTE, _jsonl_sinks)
+    logger.addHandler(pipeline.handler(JSONL_ROUTE))
+
+    return logger
+
+
+def _jsonl_sinks() -> List[Handler]:
+    fh = BatchingRotatingFileHandler(str(LOG_FILE_PATH))
     fh.setFormatter(JsonLFormatter())
-    logger.addHandler(fh)
 
     sh = logging.StreamHandler()
     sh.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
-    logger.addHandler(sh)
-
-    return logger
+    return [fh, sh]
 
 
 def add_handler(handler: Handler, name: str = "atlas") -> None:
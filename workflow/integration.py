@@ -9,7 +9,10 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 
-import requests
+from utils.lazy_imports import lazy_module
+
+# Imported when the first adapter session is created
+requests = lazy_module("requests")
 
 # Configure logging
 logging.basicConfig(
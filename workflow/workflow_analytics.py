@@ -5,13 +5,17 @@ This module provides comprehensive analytics for workflow execution, including p
 bottleneck visualization, customizable dashboards, comparative analytics, and predictive failure analysis.
 """
 
+from __future__ import annotations
+
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-from sklearn.ensemble import IsolationForest
+from utils.lazy_imports import lazy_module
+
+plt = lazy_module("matplotlib.pyplot")
+pd = lazy_module("pandas")
+sns = lazy_module("seaborn")
+sklearn_ensemble = lazy_module("sklearn.ensemble")
 
 
 class WorkflowAnalytics:
@@ -41,7 +45,7 @@ class WorkflowAnalytics:
                 "error_message",
             ]
         )
-        self.predictive_model = IsolationForest(contamination=0.1, random_state=42)
+        self.predictive_model = sklearn_ensemble.IsolationForest(contamination=0.1, random_state=42)
 
     def record_execution(
         self,
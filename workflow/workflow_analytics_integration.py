@@ -8,11 +8,13 @@ correlations between performance metrics and user feedback.
 import random
 from datetime import datetime, timedelta
 
-import matplotlib.pyplot as plt
-import pandas as pd
 from workflow_analytics import WorkflowAnalytics
 
 from user.user_satisfaction import UserSatisfactionMonitor
+from utils.lazy_imports import lazy_module
+
+plt = lazy_module("matplotlib.pyplot")
+pd = lazy_module("pandas")
 
 
 class AnalyticsIntegration:
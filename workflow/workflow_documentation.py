@@ -10,9 +10,12 @@ import re
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import networkx as nx
 from workflow_analytics import WorkflowAnalytics
 
+from utils.lazy_imports import lazy_module
+
+nx = lazy_module("networkx")
+
 
 class WorkflowDocumentation:
     def __init__(self, analytics: Optional[WorkflowAnalytics] = None):
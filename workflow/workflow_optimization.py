@@ -5,13 +5,18 @@ This module provides intelligent recommendations for workflow optimization based
 historical performance data, user feedback, and system constraints.
 """
 
+from __future__ import annotations
+
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
-import networkx as nx
-from sklearn.cluster import KMeans
 from workflow_analytics import WorkflowAnalytics
 
+from utils.lazy_imports import lazy_module
+
+nx = lazy_module("networkx")
+sklearn_cluster = lazy_module("sklearn.cluster")
+
 
 class WorkflowOptimizer:
     def __init__(self, analytics: WorkflowAnalytics):
@@ -133,7 +138,7 @@ class WorkflowOptimizer:
         features["day_of_week"] = wf_executions["start_time"].dt.weekday
 
         # Perform clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        kmeans = sklearn_cluster.KMeans(n_clusters=n_clusters, random_state=42)
         labels = kmeans.fit_predict(features)
 
         return {